@@ -1,35 +1,55 @@
 import streamlit as st
-from supabase import create_client
+from nucleo import metricas
 
 # --- CONFIGURACIÓN DE LA PÁGINA ---
 st.set_page_config(page_title="Project-uva - Acceso", page_icon="🔐", layout="centered")
 
-# --- CONEXIÓN A SUPABASE ---
-@st.cache_resource
-def init_supabase():
-    try:
-        url = st.secrets["SUPABASE_URL"]
-        key = st.secrets["SUPABASE_KEY"]
-        return create_client(url, key)
-    except Exception as e:
-        st.error(f"Error de configuración en secrets: {e}")
-        return None
-
-supabase = init_supabase()
+# --- MÉTRICAS (Prometheus en un hilo aparte; arranca una vez por proceso) ---
+metricas.iniciar_servidor()
 
 # --- FUNCIÓN PARA VERIFICAR CREDENCIALES ---
 def verificar_usuario(usuario, clave):
-    if not supabase:
+    # ⚡ pandas, httpx y supabase se importan recién al enviar el PIN: la pantalla de login abre sin ellos
+    from nucleo.datos import ErrorDatos, fetch, obtener_cliente
+    try:
+        obtener_cliente()
+    except ErrorDatos as e:
+        st.error(f"Error de configuración en secrets: {e}")
         return None
     try:
-        res = supabase.table("Usuarios").select("*").eq("Usuario", usuario).eq("Clave", clave).execute()
-        if res.data and len(res.data) > 0:
-            return res.data[0]
+        df = fetch("Usuarios", filtros={"Usuario": usuario, "Clave": clave}, limite=1)
+        if not df.empty:
+            return df.iloc[0].to_dict()
         return None
     except Exception as e:
         st.error(f"Error al consultar la base de datos: {e}")
         return None
 
+# --- PERFIL DEL RERUN (sólo Programador) ---
+def mostrar_perfil(informe):
+    """Barra lateral: a dónde se fue el tiempo y la memoria del último rerun de la página."""
+    with st.sidebar.expander("🔬 Perfil de este rerun", expanded=True):
+        if informe.get("ocupado"):
+            st.info("Otra sesión está perfilando: este rerun corrió sin perfil.")
+            return
+        if "total_s" not in informe:
+            return
+        c1, c2 = st.columns(2)
+        c1.metric("⏱️ Total", f"{informe['total_s']:.2f} s")
+        c2.metric("🧠 Pico", f"{informe['pico_mb']:.1f} MB")
+        st.caption(f"🌐 Red (reloj): {informe['red_s']:.2f} s en {informe['consultas']} consultas. "
+                   "Con el perfil activo todo corre 2-3 veces más lento.")
+        st.markdown("**Reparto (tiempo propio, hilo principal)**")
+        st.dataframe(informe["reparto"].style.format({"segundos": "{:.3f}", "porcentaje": "{:.0%}"}),
+                     hide_index=True, use_container_width=True)
+        st.markdown("**Funciones con más tiempo acumulado**")
+        st.dataframe(informe["funciones"][["funcion", "acumulado_s", "propio_s", "llamadas", "archivo"]]
+                     .style.format({"acumulado_s": "{:.3f}", "propio_s": "{:.3f}"}),
+                     hide_index=True, use_container_width=True)
+        st.markdown("**Memoria viva al terminar, por línea**")
+        st.dataframe(informe["asignaciones"].style.format({"mb": "{:.2f}"}),
+                     hide_index=True, use_container_width=True)
+
 # --- INICIALIZAR VARIABLES DE SESIÓN ---
 if "autenticado" not in st.session_state:
     st.session_state["autenticado"] = False
@@ -102,6 +122,8 @@ else:
     p_rend_raleo = st.Page("modulos/5_Rendimiento_Raleo.py", title="Rendimiento Raleo", icon="📈")
     p_dash_general = st.Page("modulos/6_Dashboard_General.py", title="Dashboard General Fundo", icon="🏢")
     p_carga_masiva = st.Page("modulos/99_Carga_Masiva.py", title="Carga Masiva", icon="🚀")
+    p_mantenimiento = st.Page("modulos/99_Mantenimiento.py", title="Mantenimiento", icon="🧰")
+    p_consultas = st.Page("modulos/99_Consultas.py", title="Consultas Supabase", icon="⏱️")
     p_clima = st.Page("modulos/7_Dashboard_Clima.py", title="Estación Meteorológica", icon="🌤️")
 
     # NUEVO: Módulos de Tareas
@@ -117,7 +139,7 @@ else:
             "Logística y Almacén": [p_kardex, p_ingreso, p_mezclas],
             "Maquinaria": [p_tractor],
             "Reportes y Finanzas": [p_dash_finanzas, p_rend_raleo, p_dash_sanidad],
-            "Mantenimiento BD": [p_carga_masiva]
+            "Mantenimiento BD": [p_carga_masiva, p_mantenimiento, p_consultas]
         }
 
     elif rol == "Sanidad":
@@ -146,7 +168,7 @@ else:
             "Logística y Almacén": [p_kardex, p_ingreso, p_mezclas],
             "Maquinaria": [p_tractor],
             "Reportes y Finanzas": [p_dash_finanzas, p_rend_raleo, p_dash_sanidad],
-            "Mantenimiento": [p_carga_masiva]
+            "Mantenimiento": [p_carga_masiva, p_mantenimiento, p_consultas]
         }
     else:
         paginas = []
@@ -161,9 +183,29 @@ else:
             st.session_state["rol"] = None
             st.session_state["nombre"] = None
             st.rerun()
+        # 📡 Sube solas las bandejas offline del teléfono (fragmento con run_every, en cualquier página)
+        if st.session_state.get("almacen_bandeja"):   # lo marca nucleo.bandeja al montar LocalStorage
+            from nucleo.bandeja import sincronizacion_automatica
+            sincronizacion_automatica()
 
     if paginas:
         menu = st.navigation(paginas)
-        menu.run()
+        try:
+            with metricas.medir_rerun(menu.title):
+                # 🔬 Interruptor de perfil: cProfile + tracemalloc alrededor de la página elegida
+                if rol == "Programador" and st.sidebar.toggle("🔬 Perfilar esta página", key="perfilar_pagina"):
+                    from nucleo.perfilador import perfil
+                    informe = {}
+                    try:
+                        with perfil(informe):
+                            menu.run()
+                    finally:
+                        mostrar_perfil(informe)   # también si la página terminó con st.stop()
+                else:
+                    menu.run()
+        finally:
+            # 📡 Bandejas offline del dispositivo (también las de páginas no abiertas en esta corrida)
+            from nucleo.bandeja import reportar_pendientes
+            reportar_pendientes()
     else:
         st.warning("No tienes módulos asignados. Contacta al administrador.")
\ No newline at end of file
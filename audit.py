@@ -1,37 +1,385 @@
-import os
+"""
+Auditoría estática de las páginas (AST): rendimiento, seguridad y UX.
+
+Recorre el árbol sintáctico de cada archivo (no busca texto), así que sabe
+si una llamada está dentro de un loader cacheado, de un callback de botón o
+en el cuerpo de la página que se ejecuta en cada rerun.
+
+Reglas de rendimiento:
+    P001  iterrows()                        (alta dentro de un loader)
+    P002  apply(axis=1)                     (alta dentro de un loader)
+    P003  select("*") sin limit/range, o fetch() sin columnas/vista/límite
+    P004  lectura de Supabase fuera de todo caché (en cada rerun)
+    P005  Excel armado fuera de un callback de descarga (en cada rerun)
+    P006  .copy() completo de un DataFrame en cada rerun
+    P007  st.cache_data.clear() global
+Y las de antes: S001 candado de autenticación, S002 st.session_state["rol"]
+(salvo que el mismo módulo lo haya fijado antes, como app.py), B001
+pd.to_datetime sin errors=, U001 st.columns(n >= 3).
+
+Uso:
+    python audit.py                              # modulos/*.py y app.py
+    python audit.py modulos/1_Control_Raleo.py --formato json
+    python audit.py --severidad alta --resumen
+    python audit.py --maximo 40                  # sale con 1 si hay más de 40 hallazgos
+
+Cada hallazgo sale como ``archivo:línea:columna: severidad código mensaje``
+(o JSON / CSV), para seguir en el tiempo cómo baja el conteo.
+"""
+import argparse
+import ast
+import csv
 import glob
+import json
+import os
+import sys
+from collections import Counter
+
+RAIZ = os.path.dirname(os.path.abspath(__file__))
+SEVERIDADES = ("alta", "media", "baja")
+
+REGLAS = {
+    "P001": ("media", "iterrows() recorre fila por fila en Python; usar operaciones vectorizadas o itertuples()"),
+    "P002": ("media", "apply(axis=1) llama a Python por cada fila; vectorizar con columnas o np.where/np.select"),
+    "P003": ("media", 'select("*") sin limit/range baja la tabla entera con todas sus columnas'),
+    "P004": ("media", "lectura de Supabase fuera de un caché: se repite en cada rerun"),
+    "P005": ("alta", "Excel armado en cada rerun; generarlo al hacer clic (nucleo.exportar.boton_descarga)"),
+    "P006": ("baja", ".copy() completo de un DataFrame en cada rerun (cache_memoria ya entrega una copia)"),
+    "P007": ("media", "st.cache_data.clear() borra el caché de todas las páginas; usar <loader>.clear()"),
+    "S001": ("alta", "falta el candado de autenticación (cualquiera puede entrar)"),
+    "S002": ("media", 'st.session_state["rol"] directo: KeyError si no hay sesión; usar .get("rol")'),
+    "B001": ("baja", "pd.to_datetime sin errors=: una fecha inválida rompe la página"),
+    "U001": ("baja", "st.columns con 3 o más columnas se ve aplastado en el teléfono"),
+}
+
+# Decoradores que cachean el resultado de un loader
+DECORADORES_CACHE = {"cache_memoria", "cache_disco", "cache_data", "cache_resource", "segun_version"}
+# Lecturas de nucleo.datos / nucleo.cache_tablas / nucleo.asincrono
+LECTURAS = {"fetch", "fetch_varios", "rpc", "tabla_incremental"}
+# Métodos del query builder que acotan la cantidad de filas
+ACOTAN = {"limit", "range", "single", "maybe_single"}
+ESCRITURAS = {"insert", "update", "upsert", "delete"}
+# Llamadas cuyo resultado verdadero significa "el usuario hizo clic"
+BOTONES = {"button", "form_submit_button", "download_button"}
+EXCEL = {"to_excel", "ExcelWriter", "Workbook", "a_excel"}
+
+
+# --- UTILIDADES AST ---
+def _nombre(nodo):
+    """Último nombre de ``a.b.c`` / ``c`` / ``c(...)`` (None si no aplica)."""
+    if isinstance(nodo, ast.Call):
+        nodo = nodo.func
+    if isinstance(nodo, ast.Attribute):
+        return nodo.attr
+    if isinstance(nodo, ast.Name):
+        return nodo.id
+    return None
+
+
+def _punteado(nodo):
+    """``st.cache_data.clear`` -> "st.cache_data.clear" (None si no es un nombre punteado)."""
+    partes = []
+    while isinstance(nodo, ast.Attribute):
+        partes.append(nodo.attr)
+        nodo = nodo.value
+    if isinstance(nodo, ast.Name):
+        partes.append(nodo.id)
+        return ".".join(reversed(partes))
+    return None
+
+
+def _cadena(llamada):
+    """Métodos de una cadena ``supabase.table(t).select(c).eq(...).execute()`` -> {nombre: Call}."""
+    metodos = {}
+    nodo = llamada
+    while isinstance(nodo, ast.Call) and isinstance(nodo.func, ast.Attribute):
+        metodos.setdefault(nodo.func.attr, nodo)
+        nodo = nodo.func.value
+    return metodos
+
+
+def _argumento(llamada, nombre, posicion=None):
+    for kw in llamada.keywords:
+        if kw.arg == nombre:
+            return kw.value
+    if posicion is not None and len(llamada.args) > posicion:
+        return llamada.args[posicion]
+    return None
+
+
+def _constante(nodo):
+    return nodo.value if isinstance(nodo, ast.Constant) else None
+
+
+def _menciona_df(nodo):
+    """¿La expresión usa una variable con nombre de DataFrame (df, df_x, x_df)?"""
+    return any(isinstance(n, ast.Name) and (n.id == "df" or n.id.startswith("df_") or n.id.endswith("_df"))
+               for n in ast.walk(nodo))
+
+
+# --- ANALIZADOR ---
+class Analizador(ast.NodeVisitor):
+    """Recorre un módulo llevando la pila de contextos (loader, caché, callback, clic)."""
+
+    def __init__(self, ruta, arbol, bajo_demanda=()):
+        self.ruta = ruta
+        self.hallazgos = []
+        self.pila = []   # dicts {cache, cargador, demanda}
+        self.callbacks = self._callbacks(arbol) | set(bajo_demanda)
+        self.usos = {}   # función local -> [¿llamada en cada rerun?, ...]
+        # variables que guardan un botón: btn = st.form_submit_button(...); if btn: ...
+        self.botones = {t.id for n in ast.walk(arbol) if isinstance(n, ast.Assign)
+                        and isinstance(n.value, ast.Call) and _nombre(n.value) in BOTONES
+                        for t in n.targets if isinstance(t, ast.Name)}
+        # línea donde el módulo fija "rol" por primera vez (app.py la inicializa antes de leerla)
+        self.rol_fijado = _primera_asignacion(arbol, "rol")
+
+    # --- contexto ---
+    @staticmethod
+    def _callbacks(arbol):
+        """Funciones pasadas como on_click/on_change o como datos de un botón de descarga."""
+        nombres = set()
+        for nodo in ast.walk(arbol):
+            if not isinstance(nodo, ast.Call):
+                continue
+            candidatos = [kw.value for kw in nodo.keywords if kw.arg in ("on_click", "on_change", "data")]
+            if _nombre(nodo) == "boton_descarga" and len(nodo.args) > 1:
+                candidatos.append(nodo.args[1])
+            nombres.update(c.id for c in candidatos if isinstance(c, ast.Name))
+        return nombres
+
+    def _en(self, clave):
+        return any(marco[clave] for marco in self.pila)
+
+    @property
+    def en_cache(self):
+        return self._en("cache")
+
+    @property
+    def en_cargador(self):
+        return self._en("cargador")
+
+    @property
+    def por_rerun(self):
+        """Código que corre en cada rerun: ni cacheado ni sólo tras un clic."""
+        return not self.en_cache and not self._en("demanda")
+
+    def _con(self, nodos, **marco):
+        self.pila.append({"cache": False, "cargador": False, "demanda": False, **marco})
+        try:
+            for nodo in nodos if isinstance(nodos, list) else [nodos]:
+                self.visit(nodo)
+        finally:
+            self.pila.pop()
+
+    def reportar(self, nodo, codigo, severidad=None, detalle=""):
+        severidad_base, mensaje = REGLAS[codigo]
+        self.hallazgos.append({
+            "archivo": self.ruta, "linea": getattr(nodo, "lineno", 1), "columna": getattr(nodo, "col_offset", 0) + 1,
+            "severidad": severidad or severidad_base, "regla": codigo,
+            "mensaje": f"{mensaje}{f' ({detalle})' if detalle else ''}",
+        })
+
+    # --- definiciones y ramas ---
+    def visit_FunctionDef(self, nodo):
+        for decorador in nodo.decorator_list:
+            self.visit(decorador)
+        cacheada = any(_nombre(d) in DECORADORES_CACHE for d in nodo.decorator_list)
+        cargador = cacheada or nodo.name.startswith(("cargar", "load_", "get_"))
+        self._con(nodo.body, cache=cacheada, cargador=cargador, demanda=nodo.name in self.callbacks)
+
+    visit_AsyncFunctionDef = visit_FunctionDef
+
+    def visit_If(self, nodo):
+        self.visit(nodo.test)
+        clic = any((isinstance(n, ast.Call) and _nombre(n) in BOTONES)
+                   or (isinstance(n, ast.Name) and n.id in self.botones) for n in ast.walk(nodo.test))
+        self._con(nodo.body, demanda=clic)
+        self._con(nodo.orelse)
+
+    # --- llamadas ---
+    def visit_Call(self, nodo):
+        nombre = _nombre(nodo)
+        if isinstance(nodo.func, ast.Name):
+            self.usos.setdefault(nombre, []).append(self.por_rerun)
+        self._revisar(nodo, nombre)
+        self.visit(nodo.func)
+        for i, arg in enumerate(nodo.args):
+            # boton_descarga(etiqueta, datos=lambda: ...): la lambda corre al hacer clic
+            if isinstance(arg, ast.Lambda) and nombre == "boton_descarga" and i == 1:
+                self._con(arg, demanda=True)
+            else:
+                self.visit(arg)
+        for kw in nodo.keywords:
+            if isinstance(kw.value, ast.Lambda) and kw.arg in ("on_click", "on_change", "data"):
+                self._con(kw.value, demanda=True)
+            else:
+                self.visit(kw.value)
+
+    def _revisar(self, nodo, nombre):
+        if nombre == "iterrows":
+            self.reportar(nodo, "P001", "alta" if self.en_cargador else None)
+        elif nombre == "apply" and _constante(_argumento(nodo, "axis")) in (1, "columns"):
+            self.reportar(nodo, "P002", "alta" if self.en_cargador else None)
+        elif nombre == "execute":
+            self._consulta(nodo)
+        elif nombre in LECTURAS:
+            self._lectura(nodo, nombre)
+        elif nombre in EXCEL and self.por_rerun:
+            self.reportar(nodo, "P005")
+        elif nombre == "copy" and isinstance(nodo.func, ast.Attribute):
+            profunda = _constante(_argumento(nodo, "deep", 0))
+            if self.por_rerun and profunda is not False and _menciona_df(nodo.func.value):
+                self.reportar(nodo, "P006")
+        elif nombre == "clear" and _punteado(nodo.func) == "st.cache_data.clear":
+            self.reportar(nodo, "P007")
+        elif nombre == "to_datetime" and _argumento(nodo, "errors") is None:
+            self.reportar(nodo, "B001")
+        elif nombre == "columns" and _punteado(nodo.func) == "st.columns":
+            n = _constante(_argumento(nodo, "spec", 0))
+            if isinstance(n, int) and n >= 3:
+                self.reportar(nodo, "U001", detalle=f"{n} columnas")
+
+    def _consulta(self, nodo):
+        """Cadena del query builder terminada en .execute()."""
+        metodos = _cadena(nodo)
+        if "table" not in metodos or "select" not in metodos or ESCRITURAS & metodos.keys():
+            return
+        seleccion = metodos["select"]
+        columnas = _constante(seleccion.args[0]) if seleccion.args else "*"
+        if columnas == "*" and not ACOTAN & metodos.keys():
+            self.reportar(nodo, "P003")
+        if self.por_rerun:
+            self.reportar(nodo, "P004", detalle="supabase.table().select()")
+
+    def _lectura(self, nodo, nombre):
+        """fetch / fetch_varios / rpc / tabla_incremental de nucleo."""
+        if nombre == "fetch":
+            columnas = _argumento(nodo, "columnas", 1)
+            acotada = any(_argumento(nodo, k) is not None for k in ("vista", "limite", "filtros"))
+            if (columnas is None or _constante(columnas) == "*") and not acotada:
+                self.reportar(nodo, "P003", "baja", detalle="fetch() sin columnas, vista ni límite")
+        if self.por_rerun:
+            self.reportar(nodo, "P004", detalle=f"{nombre}()")
+
+    # --- session_state["rol"] ---
+    def visit_Subscript(self, nodo):
+        if (isinstance(nodo.ctx, ast.Load) and _punteado(nodo.value) == "st.session_state"
+                and _constante(nodo.slice) == "rol"
+                and not (self.rol_fijado is not None and self.rol_fijado < nodo.lineno)):
+            self.reportar(nodo, "S002")
+        self.generic_visit(nodo)
+
+
+def _primera_asignacion(arbol, clave):
+    """Primera línea con ``st.session_state[clave] = ...`` o ``st.session_state.setdefault(clave, ...)``."""
+    lineas = []
+    for nodo in ast.walk(arbol):
+        if (isinstance(nodo, ast.Subscript) and isinstance(nodo.ctx, ast.Store)
+                and _punteado(nodo.value) == "st.session_state" and _constante(nodo.slice) == clave):
+            lineas.append(nodo.lineno)
+        elif (isinstance(nodo, ast.Call) and _punteado(nodo.func) == "st.session_state.setdefault"
+                and nodo.args and _constante(nodo.args[0]) == clave):
+            lineas.append(nodo.lineno)
+    return min(lineas, default=None)
+
+
+def _tiene_candado(arbol):
+    """¿Hay un ``"autenticado" not in st.session_state`` en el módulo?"""
+    for nodo in ast.walk(arbol):
+        if (isinstance(nodo, ast.Compare) and _constante(nodo.left) == "autenticado"
+                and any(isinstance(op, ast.NotIn) for op in nodo.ops)):
+            return True
+    return False
+
+
+def analizar_archivo(ruta):
+    """Lista de hallazgos (dicts) de un archivo .py."""
+    relativa = os.path.relpath(ruta, RAIZ) if os.path.abspath(ruta).startswith(RAIZ) else ruta
+    with open(ruta, encoding="utf-8") as f:
+        codigo = f.read()
+    try:
+        arbol = ast.parse(codigo, filename=ruta)
+    except SyntaxError as e:
+        return [{"archivo": relativa, "linea": e.lineno or 1, "columna": e.offset or 1, "severidad": "alta",
+                 "regla": "E000", "mensaje": f"no se pudo analizar: {e.msg}"}]
+    # 1ª pasada: dónde se llama cada función local. Las que sólo se llaman tras un
+    # clic o desde un loader cacheado (o nunca) no corren en cada rerun.
+    sondeo = Analizador(relativa, arbol)
+    sondeo.visit(arbol)
+    definidas = {n.name for n in ast.walk(arbol) if isinstance(n, (ast.FunctionDef, ast.AsyncFunctionDef))}
+    bajo_demanda = {f for f in definidas if not any(sondeo.usos.get(f, []))}
+    analizador = Analizador(relativa, arbol, bajo_demanda)
+    analizador.visit(arbol)
+    if os.path.basename(ruta) != "app.py" and not _tiene_candado(arbol):
+        analizador.reportar(arbol.body[0] if arbol.body else arbol, "S001")
+    return sorted(analizador.hallazgos, key=lambda h: (h["linea"], h["columna"], h["regla"]))
+
+
+def archivos(rutas):
+    """Expande carpetas a sus .py (por defecto modulos/ y app.py)."""
+    rutas = rutas or [os.path.join(RAIZ, "modulos"), os.path.join(RAIZ, "app.py")]
+    salida = []
+    for ruta in rutas:
+        if os.path.isdir(ruta):
+            salida += sorted(glob.glob(os.path.join(ruta, "*.py")))
+        else:
+            salida.append(ruta)
+    return salida
+
+
+def analizar(rutas=None, severidad="baja"):
+    """Hallazgos de todos los archivos con severidad igual o mayor a ``severidad``."""
+    tope = SEVERIDADES.index(severidad)
+    return [h for ruta in archivos(rutas) for h in analizar_archivo(ruta)
+            if SEVERIDADES.index(h["severidad"]) <= tope]
+
+
+# --- SALIDA ---
+def _texto(hallazgos, destino):
+    for h in hallazgos:
+        destino.write(f"{h['archivo']}:{h['linea']}:{h['columna']}: {h['severidad']} {h['regla']} {h['mensaje']}\n")
+
+
+def _resumen(hallazgos, destino):
+    por_regla = Counter(h["regla"] for h in hallazgos)
+    por_severidad = Counter(h["severidad"] for h in hallazgos)
+    destino.write(f"\n{len(hallazgos)} hallazgo(s): "
+                  + ", ".join(f"{s} {por_severidad[s]}" for s in SEVERIDADES) + "\n")
+    for regla, n in sorted(por_regla.items()):
+        destino.write(f"  {regla} {n:4d}  {REGLAS.get(regla, ('', ''))[1]}\n")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("rutas", nargs="*", help="archivos o carpetas (por defecto modulos/ y app.py)")
+    parser.add_argument("--formato", choices=("texto", "json", "csv"), default="texto")
+    parser.add_argument("--severidad", choices=SEVERIDADES, default="baja", help="mínima a informar")
+    parser.add_argument("--resumen", action="store_true", help="conteo por regla y severidad al final")
+    parser.add_argument("--maximo", type=int, help="sale con código 1 si hay más hallazgos que este")
+    parser.add_argument("--salida", help="archivo de salida (por defecto la consola)")
+    args = parser.parse_args(argv)
+
+    hallazgos = analizar(args.rutas, args.severidad)
+    destino = open(args.salida, "w", encoding="utf-8", newline="") if args.salida else sys.stdout
+    try:
+        if args.formato == "json":
+            json.dump({"total": len(hallazgos), "por_regla": dict(Counter(h["regla"] for h in hallazgos)),
+                       "hallazgos": hallazgos}, destino, ensure_ascii=False, indent=2)
+            destino.write("\n")
+        elif args.formato == "csv":
+            escritor = csv.DictWriter(destino, fieldnames=["archivo", "linea", "columna", "severidad", "regla", "mensaje"])
+            escritor.writeheader()
+            escritor.writerows(hallazgos)
+        else:
+            _texto(hallazgos, destino)
+            if args.resumen:
+                _resumen(hallazgos, destino)
+    finally:
+        if args.salida:
+            destino.close()
+    return 1 if args.maximo is not None and len(hallazgos) > args.maximo else 0
+
 
-def analyze_files():
-    modules = glob.glob(r'c:\Users\lenovo\Proyecto-uva\modulos\*.py')
-    modules.append(r'c:\Users\lenovo\Proyecto-uva\app.py')
-    
-    for file_path in modules:
-        with open(file_path, 'r', encoding='utf-8') as f:
-            content = f.read()
-            lines = content.split('\n')
-            
-        name = os.path.basename(file_path)
-        print(f"\n--- Analizando: {name} ---")
-        
-        # 1. Seguridad: Candado de autenticación
-        if '"autenticado" not in st.session_state' not in content and 'app.py' not in name:
-            print("🚨 PELIGRO: Falta candado de autenticación (Cualquiera puede entrar)")
-            
-        # 2. Seguridad: Rol hardcodeado (KeyError risk)
-        if 'st.session_state["rol"]' in content:
-            print("⚠️ RIESGO: Usa st.session_state[\"rol\"] directamente en lugar de .get('rol'). Riesgo de KeyError.")
-            
-        # 3. Eficiencia: Global Cache Clear
-        if 'st.cache_data.clear()' in content:
-            print("⚠️ EFICIENCIA: Usa st.cache_data.clear() global. Borra toda la caché en lugar de una función específica.")
-            
-        # 4. Bugs: pd.to_datetime sin coerce
-        if 'pd.to_datetime' in content and 'errors=' not in content:
-            print("⚠️ BUGS: Usa pd.to_datetime sin errors='coerce'. Si hay fechas inválidas, la app explotará.")
-            
-        # 5. UX: Layout
-        if 'st.columns(3)' in content or 'st.columns(4)' in content or 'st.columns(5)' in content:
-            print("💡 UX: Tiene layouts de 3 a 5 columnas. En móviles se verá aplastado. Sugerencia: usar st.columns en pantallas grandes o métricas apiladas en móviles.")
-
-if __name__ == '__main__':
-    analyze_files()
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1 @@
+"""Benchmarks reproducibles con datos sintéticos (``benchmarks.sinteticos``) y el Supabase falso (``nucleo.supabase_falso``)."""
@@ -0,0 +1,169 @@
+"""
+Pool de hilos vs event loop (``nucleo.asincrono``) para las lecturas masivas.
+
+Siembra un Supabase falso con latencia de red simulada y mide, con cada
+camino, la mediana de varias corridas, las peticiones hechas y el pico de
+hilos vivos del proceso en tres escenarios:
+
+- ``dashboard``: las 6 tablas del Dashboard General a la vez (``fetch_varios``).
+- ``paginada``: cada tabla grande por ventanas Range, de a una.
+- ``sesiones``: N sesiones abriendo el dashboard al mismo tiempo.
+
+También verifica que ambos caminos entreguen los mismos DataFrames.
+
+Uso:
+    python -m benchmarks.asincrono [--escala 1] [--latencia 0.05] [--sesiones 4] [--salida res.json]
+"""
+import argparse
+import json
+import random
+import statistics
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from benchmarks.sinteticos import INICIO_TEMPORADA, SECTORES, a_registros, datos_sinteticos
+from benchmarks.transporte import _iguales, filas_sinteticas
+from nucleo import asincrono
+from nucleo.datos import fetch, fetch_varios, usar_cliente
+from nucleo.supabase_falso import ClienteFalso
+
+VISTA = 'Dashboard General'
+PARALELO = 4   # ventanas por tabla del camino con hilos (como en las páginas)
+# tabla -> argumentos de fetch, igual que cargar_datos_maestros_v2 sin instantáneas
+DASHBOARD = {
+    'Monitoreo_Mosca':          dict(vista=VISTA, normalizar=True),
+    'Control_Raleo':            dict(vista=VISTA, formato='csv'),
+    'Ordenes_de_Trabajo':       dict(vista=VISTA, normalizar=True),
+    'Diametro_Baya':            dict(vista=VISTA, formato='csv'),
+    'Evaluaciones_Fenologicas': dict(vista=VISTA, normalizar=True),
+    # la tabla de script_sincronizacion/tabla_clima.sql se crea sin comillas: en Postgres queda 'clima'
+    'Clima':                    dict(tabla='clima', columnas="fecha_hora, temp_out", formato='csv'),
+}
+PAGINADAS = ('Control_Raleo', 'Diametro_Baya', 'Clima')
+
+
+def _fenologicas(n, gen):
+    fechas = INICIO_TEMPORADA + pd.to_timedelta(gen.integers(0, 180, n), unit='D')
+    return pd.DataFrame({
+        'Fecha': fechas.strftime('%Y-%m-%d'), 'Sector': gen.choice(SECTORES, n),
+        **{c: gen.integers(0, 100, n) for c in ('Punta_algodon', 'Punta_verde', 'Salida_de_hojas',
+                                                'Hojas_extendidas', 'Racimos_visibles')},
+    })
+
+
+def sembrar(cliente, escala, semilla=0):
+    tablas = datos_sinteticos(escala=escala, semilla=semilla)
+    for tabla in ('Monitoreo_Mosca', 'Control_Raleo', 'Ordenes_de_Trabajo', 'Diametro_Baya'):
+        cliente.sembrar(tabla, a_registros(tablas[tabla]))
+    cliente.sembrar('Evaluaciones_Fenologicas', a_registros(_fenologicas(2600 * escala, np.random.default_rng(semilla))))
+    cliente.sembrar('clima', filas_sinteticas('clima', 17280 * escala, random.Random(semilla)))   # 15 min x 180 días
+
+
+class _PicoHilos:
+    """Muestrea ``threading.active_count()`` mientras dura el bloque ``with``."""
+
+    def __enter__(self):
+        self.pico, self._fin = threading.active_count(), threading.Event()
+        self._hilo = threading.Thread(target=self._muestrear, daemon=True)
+        self._hilo.start()
+        return self
+
+    def _muestrear(self):
+        while not self._fin.wait(0.002):
+            self.pico = max(self.pico, threading.active_count() - 1)   # sin contar el muestreador
+
+    def __exit__(self, *exc):
+        self._fin.set()
+        self._hilo.join()
+
+
+# --- LOS DOS CAMINOS ---
+def _hilos(nombre):
+    return fetch(**{'tabla': nombre, 'paralelo': PARALELO, **DASHBOARD[nombre]})
+
+
+def _hilos_dashboard():
+    return fetch_varios({t: (lambda t=t: _hilos(t)) for t in DASHBOARD})
+
+
+def _async_dashboard():
+    return asincrono.fetch_varios(DASHBOARD)
+
+
+def _sesiones(cargar, n):
+    with ThreadPoolExecutor(max_workers=n, thread_name_prefix="sesion") as pool:
+        return list(pool.map(lambda _: cargar(), range(n)))[0]
+
+
+def escenarios(sesiones):
+    """{escenario: {camino: función que devuelve {nombre: DataFrame}}}."""
+    return {
+        'dashboard': {'hilos': _hilos_dashboard, 'async': _async_dashboard},
+        'paginada': {
+            'hilos': lambda: {t: _hilos(t) for t in PAGINADAS},
+            'async': lambda: {t: asincrono.fetch(**{'tabla': t, **DASHBOARD[t]}) for t in PAGINADAS},
+        },
+        f'sesiones x{sesiones}': {
+            'hilos': lambda: _sesiones(_hilos_dashboard, sesiones),
+            'async': lambda: _sesiones(_async_dashboard, sesiones),
+        },
+    }
+
+
+def medir(escala=1, latencia=0.05, repeticiones=3, sesiones=4):
+    """Devuelve una lista de resultados {escenario, camino, segundos, peticiones, pico_hilos, iguales}."""
+    cliente = ClienteFalso()
+    sembrar(cliente, escala)
+    cliente.postgrest.session.latencia = latencia
+    usar_cliente(cliente)
+    asincrono.fetch('clima', limite=1)   # arranca el loop fuera de la medición (hilo permanente)
+
+    resultados = []
+    for escenario, caminos in escenarios(sesiones).items():
+        frames = {}
+        for camino, cargar in caminos.items():
+            tiempos, picos = [], []
+            antes = cliente.estadisticas["peticiones"]
+            for _ in range(repeticiones):
+                with _PicoHilos() as pico:
+                    t0 = time.perf_counter()
+                    frames[camino] = cargar()
+                    tiempos.append(time.perf_counter() - t0)
+                picos.append(pico.pico)
+            resultados.append({
+                'escenario': escenario, 'camino': camino,
+                'filas': sum(len(df) for df in frames[camino].values()),
+                'segundos': round(statistics.median(tiempos), 4),
+                'peticiones': (cliente.estadisticas["peticiones"] - antes) // repeticiones,
+                'pico_hilos': max(picos),
+            })
+        iguales = all(_iguales(frames['hilos'][t], frames['async'][t]) for t in frames['hilos'])
+        for r in resultados[-len(caminos):]:
+            r['iguales'] = iguales
+    return resultados
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--escala', type=int, default=1)
+    parser.add_argument('--latencia', type=float, default=0.05, help="s de red simulada por petición")
+    parser.add_argument('--repeticiones', type=int, default=3)
+    parser.add_argument('--sesiones', type=int, default=4)
+    parser.add_argument('--concurrencia', type=int, default=asincrono.CONCURRENCIA)
+    parser.add_argument('--salida', help="ruta de un JSON con los resultados")
+    args = parser.parse_args(argv)
+
+    asincrono.CONCURRENCIA = args.concurrencia
+    resultados = medir(args.escala, args.latencia, args.repeticiones, args.sesiones)
+    print(pd.DataFrame(resultados).to_string(index=False))
+    if args.salida:
+        with open(args.salida, 'w', encoding='utf-8') as f:
+            json.dump({**vars(args), 'resultados': resultados}, f, indent=2)
+
+
+if __name__ == '__main__':
+    main()
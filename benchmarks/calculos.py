@@ -0,0 +1,152 @@
+"""
+Tiempo de los cálculos de ``nucleo.calculos`` con 1x, 10x y 100x el volumen
+de una temporada (``benchmarks.sinteticos``).
+
+Mide kardex, FEFO, aplanado de Sanidad, tasa de crecimiento de baya, radar de
+plagas y el cruce de la planilla de Finanzas. Cada cálculo recibe copias
+frescas de sus entradas (preparadas fuera del cronómetro, igual que las
+entrega el loader de la página) y se reporta la mediana de varias corridas.
+
+El JSON de ``--salida`` trae versión de Python/pandas y commit, y
+``--comparar`` imprime la razón contra un JSON anterior:
+
+    python -m benchmarks.calculos --salida antes.json
+    ... cambios ...
+    python -m benchmarks.calculos --salida despues.json --comparar antes.json
+
+Uso:
+    python -m benchmarks.calculos [--escalas 1 10 100] [--repeticiones 3] [--salida res.json]
+"""
+import argparse
+import json
+import platform
+import statistics
+import subprocess
+import time
+from datetime import date
+
+import pandas as pd
+
+from benchmarks.sinteticos import INICIO_TEMPORADA, datos_sinteticos
+from nucleo.calculos import (aplanar_sanidad, armar_planilla, calcular_dpv, calcular_riesgo_plagas,
+                             calcular_tasa_crecimiento, generar_kardex, obtener_fefo)
+
+ESCALAS = (1, 10, 100)
+MAX_SEGUNDOS = 20   # una corrida más lenta que esto no se repite
+
+
+# --- ENTRADAS DE CADA CÁLCULO (como las deja la página antes de llamarlo) ---
+def _kardex(t):
+    return t['Productos'], t['Ingresos'], t['Salidas'][['Ingreso_ID', 'Cantidad_Usada']]
+
+
+def _fefo(t):
+    return (t['Productos'], t['Ingresos'][['id', 'Codigo_Producto', 'Codigo_Lote', 'Cantidad_Ingresada', 'Precio_Unitario_PEN']],
+            t['Salidas'])
+
+
+def _sanidad(t):
+    return (t['Evaluaciones_Sanitarias'],)
+
+
+def _tasa(t):
+    return (t['Diametro_Baya'].assign(Fecha=pd.to_datetime(t['Diametro_Baya']['Fecha'])),)
+
+
+def _riesgo(t):
+    clima = t['clima'].assign(fecha_hora=pd.to_datetime(t['clima']['fecha_hora']))
+    return (clima.assign(dpv=calcular_dpv(clima['temp_out'], clima['hum_out']).round(3)),)
+
+
+def _planilla(t):
+    fin = (INICIO_TEMPORADA + pd.Timedelta(days=365)).date()
+    return t['Registro_Horas_Tractor'], t['Personal'], INICIO_TEMPORADA.date(), fin
+
+
+CALCULOS = {
+    'generar_kardex':            (generar_kardex, _kardex),
+    'obtener_fefo':              (obtener_fefo, _fefo),
+    'aplanar_sanidad':           (aplanar_sanidad, _sanidad),
+    'calcular_tasa_crecimiento': (calcular_tasa_crecimiento, _tasa),
+    'calcular_riesgo_plagas':    (calcular_riesgo_plagas, _riesgo),
+    'armar_planilla':            (armar_planilla, _planilla),
+}
+
+
+def _copias(args):
+    return [a.copy() if isinstance(a, pd.DataFrame) else a for a in args]
+
+
+def _filas(args):
+    return sum(len(a) for a in args if isinstance(a, pd.DataFrame))
+
+
+def medir(escalas=ESCALAS, repeticiones=3, calculos=None, semilla=0):
+    """Lista de resultados {calculo, escala, filas_entrada, segundos, corridas}."""
+    resultados = []
+    for escala in escalas:
+        tablas = datos_sinteticos(escala, semilla)
+        for nombre in calculos or CALCULOS:
+            funcion, preparar = CALCULOS[nombre]
+            entradas = preparar(tablas)
+            tiempos = []
+            for _ in range(repeticiones):
+                args = _copias(entradas)
+                t0 = time.perf_counter()
+                funcion(*args)
+                tiempos.append(time.perf_counter() - t0)
+                if tiempos[-1] > MAX_SEGUNDOS:
+                    break
+            resultados.append({
+                'calculo': nombre, 'escala': escala, 'filas_entrada': _filas(entradas),
+                'segundos': round(statistics.median(tiempos), 5), 'corridas': len(tiempos),
+            })
+            print(f"{nombre:<28} {escala:>4}x  {resultados[-1]['segundos']:.4f} s", flush=True)
+    return resultados
+
+
+def _commit():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True,
+                              text=True, timeout=10).stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        return None
+
+
+def comparar(resultados, ruta_anterior):
+    """Tabla calculo/escala con los segundos de antes, de ahora y la aceleración."""
+    with open(ruta_anterior, encoding='utf-8') as f:
+        anterior = pd.DataFrame(json.load(f)['resultados'])
+    ahora = pd.DataFrame(resultados)
+    tabla = anterior.merge(ahora, on=['calculo', 'escala'], suffixes=('_antes', '_ahora'))
+    tabla['aceleracion'] = (tabla['segundos_antes'] / tabla['segundos_ahora']).round(2)
+    return tabla[['calculo', 'escala', 'segundos_antes', 'segundos_ahora', 'aceleracion']]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--escalas', type=float, nargs='+', default=list(ESCALAS))
+    parser.add_argument('--repeticiones', type=int, default=3)
+    parser.add_argument('--calculos', nargs='+', choices=list(CALCULOS))
+    parser.add_argument('--salida', help="ruta de un JSON con los resultados")
+    parser.add_argument('--comparar', help="JSON de una corrida anterior")
+    args = parser.parse_args(argv)
+
+    escalas = [int(e) if e == int(e) else e for e in args.escalas]
+    resultados = medir(escalas, args.repeticiones, args.calculos)
+    print()
+    print(pd.DataFrame(resultados).to_string(index=False))
+    if args.comparar:
+        print()
+        print(comparar(resultados, args.comparar).to_string(index=False))
+    if args.salida:
+        with open(args.salida, 'w', encoding='utf-8') as f:
+            json.dump({
+                'fecha': date.today().isoformat(), 'commit': _commit(),
+                'python': platform.python_version(), 'pandas': pd.__version__,
+                'escalas': escalas, 'repeticiones': args.repeticiones, 'resultados': resultados,
+            }, f, indent=2)
+
+
+if __name__ == '__main__':
+    main()
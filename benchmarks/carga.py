@@ -0,0 +1,222 @@
+"""
+Prueba de carga: N usuarios simultáneos recorriendo la app con AppTest.
+
+Cada usuario virtual es un ``streamlit.testing.v1.AppTest`` de ``app.py`` en
+su propio hilo (como las sesiones de un servidor Streamlit: un proceso, un
+hilo por sesión, cachés compartidos). Todos leen del Supabase falso sembrado
+con ``benchmarks.sinteticos``. El recorrido:
+
+    login -> Kardex -> filtro del buscador -> Dashboard Sanidad
+          -> pestaña Plagas (cambia la plaga) -> pestaña Enfermedades
+
+Para cada nivel de concurrencia se reporta p50/p95 de cada paso (un paso =
+un rerun completo), peticiones y MB pedidos a Supabase, el pico de RSS del
+proceso y la mayor concurrencia cuyo peor p95 queda bajo ``--umbral-p95``.
+
+Uso:
+    python -m benchmarks.carga [--usuarios 1 2 4 8 16] [--recorridos 2] [--escala 1]
+                               [--frio] [--pausa 0.5] [--salida res.json]
+"""
+import argparse
+import json
+import os
+import random
+import resource
+import statistics
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+# Antes de importar nucleo: el cliente y los cachés se configuran al importar
+os.environ.setdefault("PROYECTO_UVA_SUPABASE_FALSO", "1")
+os.environ.setdefault("PROYECTO_UVA_METRICAS_PUERTO", "0")
+os.environ.setdefault("PROYECTO_UVA_CACHE_DIR", tempfile.mkdtemp(prefix="uva_carga_"))
+
+import pandas as pd
+from streamlit.testing.v1 import AppTest
+
+from benchmarks.sinteticos import a_registros, datos_sinteticos
+from nucleo import cache_disco, cache_memoria, cache_tablas
+from nucleo.datos import obtener_cliente
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+APP = os.path.join(RAIZ, "app.py")
+PAGINA_KARDEX = "modulos/4_Gestión_de_Productos_y_Kardex.py"
+PAGINA_SANIDAD = "modulos/3_Dashboard_Sanidad.py"
+PIN = "1234"
+TIMEOUT = 120
+
+
+# --- PREPARACIÓN ---
+def sembrar(escala, usuarios, rol):
+    """Siembra el Supabase falso con una temporada sintética y ``usuarios`` cuentas de ``rol``."""
+    cliente = obtener_cliente()
+    for tabla, df in datos_sinteticos(escala).items():
+        cliente.sembrar(tabla, a_registros(df))
+    cliente.sembrar("Usuarios", [{"Usuario": f"carga{i}", "Clave": PIN, "Rol": rol,
+                                  "Nombre_Completo": f"Usuario de carga {i}"} for i in range(usuarios)])
+    return cliente
+
+
+def purgar_caches():
+    cache_memoria.borrar()
+    cache_tablas.olvidar()
+    cache_disco.borrar()
+
+
+# --- RECORRIDO DE UN USUARIO ---
+def _widget(elementos, etiqueta):
+    return next(w for w in elementos if etiqueta in w.label)
+
+
+PASOS = [
+    ("login",                lambda at, i: (at.text_input[0].input(f"carga{i}"), at.text_input[1].input(PIN),
+                                            at.button[0].click())),
+    ("kardex",               lambda at, i: at.switch_page(PAGINA_KARDEX)),
+    ("kardex:filtro",        lambda at, i: _widget(at.text_input, "Buscador").input("PRODUCTO 1")),
+    ("sanidad",              lambda at, i: at.switch_page(PAGINA_SANIDAD)),
+    ("sanidad:plagas",       lambda at, i: _widget(at.selectbox, "Plaga").select("A_ROJA")),
+    ("sanidad:enfermedades", lambda at, i: _widget(at.selectbox, "Enfermedad").select("MILDIU")),
+]
+
+
+def recorrido(usuario, pausa=0.0):
+    """Corre el recorrido completo de un usuario; devuelve una fila por paso."""
+    at = AppTest.from_file(APP, default_timeout=TIMEOUT)
+    at.session_state["storage_init"] = {}   # streamlit_local_storage espera al navegador si falta
+    at.run()
+    filas = []
+    for paso, accion in PASOS:
+        if pausa:
+            time.sleep(random.uniform(0.5, 1.5) * pausa)   # tiempo de lectura del usuario
+        error = None
+        inicio = time.perf_counter()
+        try:
+            accion(at, usuario)
+            at.run()
+            if at.exception:
+                error = at.exception[0].value[:200]
+        except Exception as e:
+            error = f"{type(e).__name__}: {e}"[:200]
+        filas.append({"usuario": usuario, "paso": paso, "segundos": time.perf_counter() - inicio, "error": error})
+        if error:
+            break   # el resto del recorrido depende de este paso
+    return filas
+
+
+# --- MEMORIA ---
+def _rss_mb():
+    try:
+        with open("/proc/self/status") as f:
+            for linea in f:
+                if linea.startswith("VmRSS:"):
+                    return int(linea.split()[1]) / 1024
+    except OSError:
+        pass
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024   # Linux: kB (macOS da bytes)
+
+
+class _PicoRSS:
+    """Muestrea el RSS del proceso mientras dura el bloque."""
+
+    def __init__(self, intervalo=0.1):
+        self.intervalo, self.pico = intervalo, _rss_mb()
+        self._fin = threading.Event()
+
+    def _muestrear(self):
+        while not self._fin.wait(self.intervalo):
+            self.pico = max(self.pico, _rss_mb())
+
+    def __enter__(self):
+        self._hilo = threading.Thread(target=self._muestrear, daemon=True)
+        self._hilo.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._fin.set()
+        self._hilo.join()
+        self.pico = max(self.pico, _rss_mb())
+
+
+# --- NIVELES DE CONCURRENCIA ---
+def _percentil(valores, q):
+    return float(pd.Series(valores).quantile(q))
+
+
+def nivel(cliente, usuarios, recorridos=1, pausa=0.0, frio=False):
+    """Corre ``usuarios`` recorridos simultáneos, ``recorridos`` veces cada uno."""
+    if frio:
+        purgar_caches()
+    cliente.reiniciar_estadisticas()
+    inicio = time.perf_counter()
+    with _PicoRSS() as rss, ThreadPoolExecutor(max_workers=usuarios) as pool:
+        futuros = [pool.submit(recorrido, u, pausa) for u in range(usuarios) for _ in range(recorridos)]
+        filas = [fila for f in futuros for fila in f.result()]
+    duracion = time.perf_counter() - inicio
+
+    estadisticas = cliente.estadisticas
+    pasos = []
+    for paso, _ in PASOS:
+        tiempos = [f["segundos"] for f in filas if f["paso"] == paso and not f["error"]]
+        pasos.append({
+            "paso": paso, "reruns": len(tiempos),
+            "errores": sum(1 for f in filas if f["paso"] == paso and f["error"]),
+            "p50_s": round(statistics.median(tiempos), 3) if tiempos else None,
+            "p95_s": round(_percentil(tiempos, 0.95), 3) if tiempos else None,
+            "max_s": round(max(tiempos), 3) if tiempos else None,
+        })
+    return {
+        "usuarios": usuarios, "recorridos": usuarios * recorridos, "duracion_s": round(duracion, 2),
+        "peticiones_supabase": estadisticas["peticiones"],
+        "mb_supabase": round(estadisticas["bytes_recibidos"] / 1e6, 2),
+        "rss_pico_mb": round(rss.pico, 1),
+        "errores": sorted({f["error"] for f in filas if f["error"]}),
+        "pasos": pasos,
+    }
+
+
+def capacidad(resultados, umbral_p95):
+    """Mayor concurrencia sin errores cuyo peor p95 de paso queda bajo ``umbral_p95``."""
+    aptos = [r["usuarios"] for r in resultados
+             if not r["errores"] and all(p["p95_s"] is not None and p["p95_s"] <= umbral_p95 for p in r["pasos"])]
+    return max(aptos) if aptos else 0
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--usuarios", type=int, nargs="+", default=[1, 2, 4, 8, 16])
+    parser.add_argument("--recorridos", type=int, default=2, help="recorridos por usuario en cada nivel")
+    parser.add_argument("--escala", type=float, default=1, help="múltiplo del volumen de una temporada")
+    parser.add_argument("--rol", default="Admin", help="rol de las cuentas (debe ver Kardex y Sanidad)")
+    parser.add_argument("--pausa", type=float, default=0.0, help="segundos de lectura entre pasos (±50%%)")
+    parser.add_argument("--frio", action="store_true", help="vaciar los cachés antes de cada nivel")
+    parser.add_argument("--umbral-p95", type=float, default=3.0)
+    parser.add_argument("--salida", help="ruta de un JSON con los resultados")
+    args = parser.parse_args(argv)
+
+    cliente = sembrar(args.escala, max(args.usuarios), args.rol)
+    resultados = []
+    for usuarios in args.usuarios:
+        r = nivel(cliente, usuarios, args.recorridos, args.pausa, args.frio)
+        resultados.append(r)
+        peor = max((p["p95_s"] or 0) for p in r["pasos"])
+        print(f"{usuarios:>3} usuarios: {r['duracion_s']:>7.1f} s, peor p95 {peor:.2f} s, "
+              f"{r['peticiones_supabase']} peticiones, RSS pico {r['rss_pico_mb']:.0f} MB"
+              + (f", {len(r['errores'])} errores" if r["errores"] else ""), flush=True)
+
+    tabla = pd.DataFrame([{"usuarios": r["usuarios"], **p} for r in resultados for p in r["pasos"]])
+    print()
+    print(tabla.pivot(index="paso", columns="usuarios", values="p95_s")
+          .reindex([p for p, _ in PASOS]).to_string(float_format=lambda x: f"{x:.2f}"))
+    maximo = capacidad(resultados, args.umbral_p95)
+    print(f"\nCapacidad con p95 <= {args.umbral_p95:.1f} s: {maximo} usuarios simultáneos")
+    if args.salida:
+        with open(args.salida, "w", encoding="utf-8") as f:
+            json.dump({"escala": args.escala, "rol": args.rol, "pausa": args.pausa, "frio": args.frio,
+                       "umbral_p95": args.umbral_p95, "capacidad": maximo, "niveles": resultados},
+                      f, indent=2, ensure_ascii=False)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,205 @@
+"""
+Costo de arranque en frío de ``app.py`` y de cada página de ``modulos/``.
+
+Para cada archivo se mide, en un intérprete nuevo:
+
+- importaciones: las sentencias ``import``/``from`` de nivel superior del
+  archivo (extraídas con ``ast``) corridas con ``python -X importtime``. Se
+  reporta el total acumulado, los módulos más caros y qué módulos pesados
+  (plotly, supabase, sklearn, ...) quedaron cargados.
+- primer rerun (``--rerun``): el primer ``AppTest.run()`` del archivo contra el
+  Supabase falso vacío; la página corre con una sesión Admin ya iniciada. Se
+  reporta el tiempo y los módulos pesados que el rerun cargó.
+
+Cada medida es la mediana de ``--repeticiones`` procesos. Igual que
+``benchmarks.calculos``, ``--salida`` guarda un JSON y ``--comparar`` imprime
+la razón contra una corrida anterior:
+
+    python -m benchmarks.importaciones --rerun --salida antes.json
+    ... cambios ...
+    python -m benchmarks.importaciones --rerun --salida despues.json --comparar antes.json
+
+Uso:
+    python -m benchmarks.importaciones [--archivos app.py modulos/...] [--repeticiones 3]
+                                       [--rerun] [--salida res.json] [--comparar antes.json]
+"""
+import argparse
+import ast
+import glob
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import date
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+# Módulos que no deberían pagarse antes de que la pantalla los necesite (streamlit ya
+# importa el paquete plotly base; lo caro es plotly.express)
+PESADOS = ("pandas", "numpy", "plotly.express", "supabase", "postgrest", "httpx", "openpyxl", "xlsxwriter",
+           "streamlit_extras", "sklearn", "joblib", "requests", "pyarrow")
+TOP = 8
+TIMEOUT = 300
+
+
+def archivos_por_defecto():
+    return ["app.py"] + sorted(os.path.relpath(p, RAIZ) for p in glob.glob(os.path.join(RAIZ, "modulos", "*.py")))
+
+
+def _entorno():
+    entorno = dict(os.environ)
+    entorno["PYTHONPATH"] = os.pathsep.join(filter(None, [RAIZ, entorno.get("PYTHONPATH")]))
+    entorno.setdefault("PROYECTO_UVA_SUPABASE_FALSO", "1")
+    entorno.setdefault("PROYECTO_UVA_METRICAS_PUERTO", "0")
+    entorno.setdefault("PROYECTO_UVA_CACHE_DIR", tempfile.mkdtemp(prefix="uva_importaciones_"))
+    return entorno
+
+
+def _pesados(modulos):
+    return [p for p in PESADOS if any(m == p or m.startswith(p + ".") for m in modulos)]
+
+
+# --- IMPORTACIONES DE NIVEL SUPERIOR (-X importtime) ---
+def importaciones(ruta):
+    """Código de las sentencias import/from de nivel superior de ``ruta``."""
+    with open(os.path.join(RAIZ, ruta), encoding="utf-8") as f:
+        fuente = f.read()
+    return "\n".join(ast.get_source_segment(fuente, nodo) for nodo in ast.parse(fuente).body
+                     if isinstance(nodo, (ast.Import, ast.ImportFrom)))
+
+
+def _importtime(codigo):
+    """{modulo: (propio_us, acumulado_us, profundidad)} de ``python -X importtime -c codigo``."""
+    proceso = subprocess.run([sys.executable, "-X", "importtime", "-c", codigo], cwd=RAIZ, env=_entorno(),
+                             capture_output=True, text=True, timeout=TIMEOUT)
+    if proceso.returncode:
+        raise RuntimeError(proceso.stderr.strip().splitlines()[-1])
+    modulos = {}
+    for linea in proceso.stderr.splitlines():
+        if not linea.startswith("import time:") or "|" not in linea:
+            continue
+        propio, acumulado, nombre = linea[len("import time:"):].split("|")
+        if not propio.strip().isdigit():
+            continue   # encabezado
+        modulos[nombre.strip()] = (int(propio), int(acumulado), len(nombre) - len(nombre.lstrip()))
+    return modulos
+
+
+def medir_importaciones(ruta, repeticiones=3, base=()):
+    """Total (ms), los ``TOP`` módulos más caros y los pesados cargados por las importaciones de ``ruta``."""
+    codigo = importaciones(ruta)
+    corridas = []
+    for _ in range(repeticiones):
+        modulos = {m: v for m, v in _importtime(codigo).items() if m not in base}
+        profundidad = min((v[2] for v in modulos.values()), default=0)
+        propios = {m: v[1] for m, v in modulos.items() if v[2] == profundidad}
+        corridas.append((sum(propios.values()) / 1000, propios, modulos))
+    total, propios, modulos = sorted(corridas, key=lambda c: c[0])[len(corridas) // 2]   # la corrida mediana
+    top = sorted(propios.items(), key=lambda kv: kv[1], reverse=True)[:TOP]
+    return {"importaciones_ms": round(total, 1),
+            "top": [{"modulo": m, "ms": round(us / 1000, 1)} for m, us in top],
+            "pesados_importacion": _pesados(modulos)}
+
+
+# --- PRIMER RERUN (AppTest) ---
+def _primer_rerun(ruta):
+    """Corre en el proceso hijo: imprime un JSON con el tiempo del primer rerun de ``ruta``."""
+    from streamlit.testing.v1 import AppTest
+
+    antes = set(sys.modules)
+    at = AppTest.from_file(os.path.join(RAIZ, ruta), default_timeout=TIMEOUT)
+    at.session_state["storage_init"] = {}   # streamlit_local_storage espera al navegador si falta
+    if ruta != "app.py":
+        for clave, valor in {"autenticado": True, "rol": "Admin", "usuario": "bench",
+                             "nombre": "Benchmark"}.items():
+            at.session_state[clave] = valor
+    inicio = time.perf_counter()
+    at.run()
+    segundos = time.perf_counter() - inicio
+    print(json.dumps({"segundos": segundos, "pesados": _pesados(set(sys.modules) - antes),
+                      "error": at.exception[0].value[:200] if at.exception else None}))
+
+
+def medir_rerun(ruta, repeticiones=3):
+    corridas = []
+    for _ in range(repeticiones):
+        proceso = subprocess.run([sys.executable, "-m", "benchmarks.importaciones", "--_primer-rerun", ruta],
+                                 cwd=RAIZ, env=_entorno(), capture_output=True, text=True, timeout=TIMEOUT)
+        if proceso.returncode:
+            raise RuntimeError(proceso.stderr.strip().splitlines()[-1])
+        corridas.append(json.loads(proceso.stdout.strip().splitlines()[-1]))
+    return {"primer_rerun_s": round(statistics.median(c["segundos"] for c in corridas), 3),
+            "pesados_rerun": corridas[-1]["pesados"], "error_rerun": corridas[-1]["error"]}
+
+
+# --- REPORTE ---
+def medir(archivos, repeticiones=3, rerun=False):
+    base = set(_importtime("pass"))   # lo que el intérprete importa antes de correr nada
+    resultados = []
+    for ruta in archivos:
+        fila = {"archivo": ruta, **medir_importaciones(ruta, repeticiones, base)}
+        if rerun:
+            fila.update(medir_rerun(ruta, repeticiones))
+        resultados.append(fila)
+        print(f"{ruta:<48} {fila['importaciones_ms']:>8.1f} ms"
+              + (f"  rerun {fila['primer_rerun_s']:.2f} s" if rerun else "")
+              + f"  pesados: {', '.join(fila['pesados_importacion']) or '-'}", flush=True)
+    return resultados
+
+
+def _commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, cwd=RAIZ,
+                              text=True, timeout=10).stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        return None
+
+
+def comparar(resultados, ruta_anterior):
+    """Filas archivo/medida con el valor de antes, el de ahora y la aceleración."""
+    with open(ruta_anterior, encoding="utf-8") as f:
+        anterior = {r["archivo"]: r for r in json.load(f)["resultados"]}
+    filas = []
+    for r in resultados:
+        previo = anterior.get(r["archivo"])
+        for medida in ("importaciones_ms", "primer_rerun_s"):
+            if previo and previo.get(medida) and r.get(medida):
+                filas.append((r["archivo"], medida, previo[medida], r[medida], round(previo[medida] / r[medida], 2)))
+    return filas
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--archivos", nargs="+", help="rutas relativas a la raíz (por defecto app.py y modulos/*.py)")
+    parser.add_argument("--repeticiones", type=int, default=3)
+    parser.add_argument("--rerun", action="store_true", help="medir también el primer rerun con AppTest")
+    parser.add_argument("--salida", help="ruta de un JSON con los resultados")
+    parser.add_argument("--comparar", help="JSON de una corrida anterior")
+    parser.add_argument("--_primer-rerun", dest="primer_rerun", help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.primer_rerun:
+        return _primer_rerun(args.primer_rerun)
+
+    resultados = medir(args.archivos or archivos_por_defecto(), args.repeticiones, args.rerun)
+    print()
+    for r in resultados:
+        print(f"{r['archivo']}:")
+        for t in r["top"]:
+            print(f"    {t['modulo']:<40} {t['ms']:>8.1f} ms")
+    if args.comparar:
+        print()
+        for archivo, medida, antes, ahora, aceleracion in comparar(resultados, args.comparar):
+            print(f"{archivo:<48} {medida:<18} {antes:>9} -> {ahora:>9}  x{aceleracion}")
+    if args.salida:
+        with open(args.salida, "w", encoding="utf-8") as f:
+            json.dump({"fecha": date.today().isoformat(), "commit": _commit(),
+                       "python": platform.python_version(), "repeticiones": args.repeticiones,
+                       "resultados": resultados}, f, indent=2, ensure_ascii=False)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,65 @@
+"""
+Memoria de los frames cacheados antes y después de ``nucleo.tipos.normalizar``.
+
+Para cada tabla con esquema en ``NORMALIZACION`` siembra N filas sintéticas en
+el Supabase falso, las lee con ``fetch`` y compara bytes (``memory_usage
+(deep=True)``) y el tiempo de un groupby típico por Sector.
+
+Uso:
+    python -m benchmarks.memoria --filas 50000 [--salida res.json]
+"""
+import argparse
+import json
+import random
+import time
+
+import pandas as pd
+
+from benchmarks.transporte import filas_sinteticas
+from nucleo.datos import fetch, usar_cliente
+from nucleo.supabase_falso import ClienteFalso
+from nucleo.tipos import normalizar
+
+
+def _groupby(df):
+    t0 = time.perf_counter()
+    for _ in range(10):
+        df.groupby(['Fecha', 'Sector'], observed=True).size()
+    return (time.perf_counter() - t0) / 10
+
+
+def medir(filas, semilla=0):
+    cliente = usar_cliente(ClienteFalso())
+    rnd = random.Random(semilla)
+    resultados = []
+    for tabla in ('Control_Raleo', 'Diametro_Baya'):
+        cliente.sembrar(tabla, filas_sinteticas(tabla, filas, rnd))
+        crudo = fetch(tabla, paralelo=4)
+        compacto = normalizar(crudo, tabla)
+        memoria = compacto.attrs['memoria']
+        resultados.append({
+            'tabla': tabla, 'filas': len(crudo),
+            'mb_antes': round(memoria['antes'] / 1e6, 2), 'mb_despues': round(memoria['despues'] / 1e6, 2),
+            'reduccion': round(memoria['antes'] / max(memoria['despues'], 1), 1),
+            # el frame crudo trae Fecha como texto, igual que lo agrupaban las páginas
+            'groupby_ms_antes': round(_groupby(crudo) * 1000, 2),
+            'groupby_ms_despues': round(_groupby(compacto) * 1000, 2),
+        })
+    return resultados
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--filas', type=int, default=50000)
+    parser.add_argument('--salida', help="ruta de un JSON con los resultados")
+    args = parser.parse_args(argv)
+
+    resultados = medir(args.filas)
+    print(pd.DataFrame(resultados).to_string(index=False))
+    if args.salida:
+        with open(args.salida, 'w', encoding='utf-8') as f:
+            json.dump({'filas': args.filas, 'resultados': resultados}, f, indent=2)
+
+
+if __name__ == '__main__':
+    main()
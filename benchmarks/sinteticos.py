@@ -0,0 +1,220 @@
+"""
+Datos sintéticos con el volumen de una temporada (o un múltiplo) para todas
+las tablas que leen los módulos pesados.
+
+Las columnas y formatos imitan lo que devuelve ``nucleo.datos.fetch``
+(fechas como texto ISO, JSONB ya decodificado a listas de dicts), así que los
+frames sirven tanto para llamar directo a ``nucleo.calculos`` como para
+sembrar el Supabase falso con ``a_registros``.
+
+    tablas = datos_sinteticos(escala=10)
+    tablas['Ingresos']        # DataFrame
+"""
+import numpy as np
+import pandas as pd
+
+from nucleo.calculos import generar_datos_demo
+
+SECTORES = ['J1', 'J2', 'R1', 'R2', 'W1', 'W2', 'W3', 'K1', 'K2', 'K3']
+PLANTAS_EVALUADAS = 25
+DIAS_TEMPORADA = 180
+# La temporada termina hoy: los filtros de "últimos N días" de las páginas encuentran datos
+INICIO_TEMPORADA = pd.Timestamp.today().normalize() - pd.Timedelta(days=DIAS_TEMPORADA)
+
+# Filas de una temporada (~6 meses) en un fundo de 10 sectores
+VOLUMEN_TEMPORADA = {
+    'Productos':               120,
+    'Ingresos':                900,
+    'Salidas':                9000,
+    'Evaluaciones_Sanitarias': 260,    # 10 sectores x 1 evaluación/semana x 26 semanas (25 plantas c/u)
+    'Control_Raleo':         30000,
+    'Diametro_Baya':          6500,    # 10 sectores x 25 plantas x 26 semanas
+    'Monitoreo_Mosca':        1560,    # 60 trampas x 26 semanas
+    'Ordenes_de_Trabajo':      600,
+    'Registro_Horas_Tractor': 2500,
+    'Personal':                 60,
+}
+
+FORMULACIONES = ['WG', 'SC', 'EC', 'SL', 'WP', 'OD', 'EW', None]
+TIPOS_ACCION = ['Insecticida', 'Fungicida', 'Foliar', 'Coadyuvante', 'Regulador de pH', 'Herbicida']
+ROLES = ['Tractorista', 'Operador', 'Maquinista', 'Evaluador', 'Almacén', 'Supervisor']
+
+
+def _fechas(gen, n, dias=DIAS_TEMPORADA):
+    return (INICIO_TEMPORADA + pd.to_timedelta(gen.integers(0, dias, n), unit='D')).strftime('%Y-%m-%d')
+
+
+def _catalogo(gen, n):
+    codigos = [f"P{i:05d}" for i in range(n)]
+    return pd.DataFrame({
+        'id': np.arange(1, n + 1),
+        'Codigo': codigos, 'Producto': [f"PRODUCTO {i}" for i in range(n)],
+        'Unidad': gen.choice(['001', '002'], n), 'Tipo_Accion': gen.choice(TIPOS_ACCION, n),
+        'Stock_Minimo': gen.integers(0, 50, n).astype(float), 'Activo': gen.random(n) > 0.05,
+        'Ingrediente_Activo': gen.choice(['Abamectina', 'Azufre', 'Imidacloprid', 'Boro', None], n),
+        'Marca': gen.choice(['BAYER', 'SYNGENTA', 'BASF', 'FMC'], n),
+        'Formulacion': gen.choice(np.array(FORMULACIONES, dtype=object), n),
+        'Banda_Toxicologica': gen.choice(['Verde (Ligeramente Tóxico)', 'Azul (Moderadamente Tóxico)', 'No Aplica'], n),
+        'Ficha_Tecnica_URL': None,
+        # sin sorteos: no corre la secuencia del generador para las demás tablas
+        'Periodo_Carencia_Dias': (np.arange(n) % 4) * 7, 'Incompatible_Con': None,
+    })
+
+
+def _ingresos(gen, n, codigos):
+    vencimiento = INICIO_TEMPORADA + pd.to_timedelta(gen.integers(-60, 900, n), unit='D')
+    return pd.DataFrame({
+        'id': np.arange(1, n + 1),
+        'Codigo_Producto': gen.choice(codigos, n), 'Codigo_Lote': [f"L{i:06d}" for i in range(n)],
+        'Cantidad_Ingresada': gen.integers(5, 400, n).astype(float),
+        'Precio_Unitario_PEN': gen.uniform(5, 300, n).round(2),
+        'Fecha_Vencimiento': vencimiento.strftime('%Y-%m-%d'),
+        'Proveedor': gen.choice(['Agro Norte', 'Fertisur', 'Química Andina'], n),
+        'Factura': [f"F001-{i:06d}" for i in range(n)],
+        'Observaciones': None,
+        'Estado_Registro': gen.choice(np.array(['Completo 🟢', 'Provisional 🔴', None], dtype=object), n, p=[0.85, 0.1, 0.05]),
+        'Guia_Remision': None, 'Responsable': gen.choice(['Miguel', 'Rosa'], n),
+    })
+
+
+def _salidas(gen, n, ingresos):
+    return pd.DataFrame({
+        'id': np.arange(1, n + 1),
+        'Ingreso_ID': gen.choice(ingresos['id'].to_numpy(), n),
+        # ~10 salidas por lote sin agotar la mayoría del stock
+        'Cantidad_Usada': gen.uniform(0.1, 12, n).round(2),
+        'Fecha_Aplicacion': _fechas(gen, n), 'Sector_Destino': gen.choice(SECTORES, n),
+    })
+
+
+def _evaluaciones_sanitarias(gen, n):
+    def plantas(columnas, escalas):
+        valores = (gen.exponential(1.0, (n, PLANTAS_EVALUADAS, len(columnas))) * escalas).round(1)
+        return [[{'Planta': f"P.{p + 1}", **dict(zip(columnas, fila.tolist()))}
+                 for p, fila in enumerate(evaluacion)] for evaluacion in valores]
+    return pd.DataFrame({
+        'id': np.arange(1, n + 1), 'Fecha': _fechas(gen, n), 'Sector': gen.choice(SECTORES, n),
+        'Evaluador': gen.choice([f"Evaluador {i}" for i in range(6)], n),
+        'Datos_Plagas': plantas(['TRIPS', 'M.BLANCA', 'A.ROJA', 'COCHINILLA'], np.array([2.0, 3.0, 4.0, 1.0])),
+        'Datos_Enfermedades': plantas(['OIDIO %', 'MILDIU %', 'BOTRYTIS'], np.array([8.0, 4.0, 2.0])),
+    })
+
+
+def _control_raleo(gen, n):
+    return pd.DataFrame({
+        'id': np.arange(1, n + 1), 'Fecha': _fechas(gen, n), 'Sector': gen.choice(SECTORES, n),
+        'Evaluador': gen.choice([f"Evaluador {i}" for i in range(7)], n),
+        'Numero_de_Fila': gen.integers(1, 500, n),
+        'Nombre_del_Trabajador': gen.choice([f"Trabajador {i}" for i in range(90)], n),
+        'Racimos_Reales': gen.integers(0, 1000, n), 'Tandas_Equivalentes': gen.integers(0, 1000, n) / 100.0,
+    })
+
+
+def _diametro_baya(gen, n):
+    # Bloques de 25 plantas por sector y semana; pasadas las 26 semanas se suman
+    # sectores nuevos (J1-1, J2-1, ...) en lugar de alargar la temporada
+    bloque = np.arange(n) // PLANTAS_EVALUADAS
+    semana = (bloque // len(SECTORES)) % 26
+    vuelta = bloque // (len(SECTORES) * 26)
+    sectores = np.array(SECTORES, dtype=object)[bloque % len(SECTORES)]
+    sectores = np.where(vuelta > 0, sectores + '-' + vuelta.astype(str).astype(object), sectores)
+    # Crecimiento ~0.15 mm/día con ruido por planta
+    base = 6 + semana * 7 * 0.15
+    racimos = {f"Racimo_{r}_{p}": (base + gen.normal(0, 1.5, n)).clip(5, 40).round(2)
+               for r in (1, 2) for p in ("Superior", "Medio", "Inferior")}
+    return pd.DataFrame({
+        'id': np.arange(1, n + 1),
+        'Fecha': (INICIO_TEMPORADA + pd.to_timedelta(semana * 7, unit='D')).strftime('%Y-%m-%d'),
+        'Sector': sectores,
+        'Planta': np.arange(n) % PLANTAS_EVALUADAS + 1,
+        **racimos,
+    })
+
+
+def _monitoreo_mosca(gen, n):
+    return pd.DataFrame({
+        'id': np.arange(1, n + 1), 'Fecha': _fechas(gen, n), 'Sector': gen.choice(SECTORES, n),
+        'Numero_Trampa': gen.integers(1, 61, n), 'Tipo_Trampa': gen.choice(['Jackson', 'McPhail'], n),
+        'Ceratitis_capitata': gen.poisson(0.6, n), 'Anastrepha_fraterculus': gen.poisson(0.2, n),
+        'Anastrepha_distinta': gen.poisson(0.1, n),
+    })
+
+
+def _ordenes(gen, n, ingresos, productos):
+    nombres = dict(zip(productos['Codigo'], productos['Producto']))
+    lotes = ingresos[['id', 'Codigo_Producto', 'Codigo_Lote', 'Precio_Unitario_PEN']].to_dict('records')
+    recetas, datos = [], []
+    for i in range(n):
+        receta = []
+        for j in gen.integers(0, len(lotes), int(gen.integers(1, 5))):
+            lote, cantidad = lotes[j], round(float(gen.uniform(0.5, 10)), 2)
+            receta.append({
+                'id': int(lote['id']), 'p': nombres.get(lote['Codigo_Producto'], ''), 'l': lote['Codigo_Lote'],
+                'c': cantidad, 'precio_u': float(lote['Precio_Unitario_PEN']),
+                'costo_total': round(cantidad * float(lote['Precio_Unitario_PEN']), 2),
+                'banda': 'No Aplica', 'paso_orden': int(gen.integers(1, 16)),
+            })
+        costo = sum(insumo['costo_total'] for insumo in receta)
+        recetas.append(sorted(receta, key=lambda x: x['paso_orden']))
+        datos.append({'Costo_Estimado_Total': costo, 'Costo_Por_Ha': round(costo / 1.8, 2),
+                      'Metodo': 'Foliar', 'Categoria': 'Sanidad', 'Nro_App': i % 12 + 1})
+    return pd.DataFrame({
+        'id': np.arange(1, n + 1), 'ID_Orden_Personalizado': [f"OT-{i:06d}" for i in range(n)],
+        'Status': gen.choice(['En Preparación', 'Despachado', 'Completado'], n, p=[0.1, 0.2, 0.7]),
+        'Fecha_Programada': _fechas(gen, n), 'Sector_Aplicacion': gen.choice(SECTORES, n),
+        'Objetivo': gen.choice(['Trips', 'Oidio', 'Nutrición', 'Arañita'], n),
+        'Receta_Mezcla_Lotes': recetas, 'Volumen_Hectarea': 1.8, 'Datos_Tecnicos': datos,
+        'created_at': (INICIO_TEMPORADA + pd.to_timedelta(gen.integers(0, DIAS_TEMPORADA * 86400, n), unit='s'))
+                      .strftime('%Y-%m-%dT%H:%M:%S+00:00'),
+        'Tipo_Aplicacion': 'Pulverizado', 'Marcha': 2, 'Presion_Bar': 12.0, 'Color_Boquilla': 'Amarilla',
+    })
+
+
+def _personal(gen, n):
+    return pd.DataFrame({
+        'id': np.arange(1, n + 1), 'nombre_completo': [f"Operario {i}" for i in range(n)],
+        'rol': gen.choice(ROLES, n), 'activo': True,
+        # ~5% sin tarifa, como en producción
+        'Sueldo_Hora': np.where(gen.random(n) < 0.05, np.nan, gen.uniform(8, 20, n).round(2)),
+    })
+
+
+def _horas_tractor(gen, n, personal):
+    inicial = gen.uniform(1000, 5000, n).round(1)
+    horas = gen.uniform(1, 9, n).round(1)
+    return pd.DataFrame({
+        'id': np.arange(1, n + 1), 'Fecha': _fechas(gen, n), 'Turno': gen.choice(['Mañana', 'Tarde'], n),
+        'personal_id': gen.choice(personal['id'].to_numpy(), n), 'maquinaria_id': gen.integers(1, 8, n),
+        'Implemento': 'Pulverizador', 'Labor_Realizada': gen.choice(['Aplicación Trips', 'Aplicación Oidio'], n),
+        'Sector': gen.choice(SECTORES, n), 'Horometro_Inicial': inicial, 'Horometro_Final': inicial + horas,
+        'Total_Horas': horas, 'Observaciones': None,
+    })
+
+
+def datos_sinteticos(escala=1, semilla=0):
+    """Un DataFrame por tabla con ``escala`` veces el volumen de una temporada (dict tabla -> df)."""
+    gen = np.random.default_rng(semilla)
+    n = {tabla: max(1, int(filas * escala)) for tabla, filas in VOLUMEN_TEMPORADA.items()}
+    productos = _catalogo(gen, n['Productos'])
+    ingresos = _ingresos(gen, n['Ingresos'], productos['Codigo'].to_numpy())
+    personal = _personal(gen, n['Personal'])
+    clima = generar_datos_demo(dias=int(DIAS_TEMPORADA * escala))
+    return {
+        'Productos': productos,
+        'Ingresos': ingresos,
+        'Salidas': _salidas(gen, n['Salidas'], ingresos),
+        'Evaluaciones_Sanitarias': _evaluaciones_sanitarias(gen, n['Evaluaciones_Sanitarias']),
+        'Control_Raleo': _control_raleo(gen, n['Control_Raleo']),
+        'Diametro_Baya': _diametro_baya(gen, n['Diametro_Baya']),
+        'Monitoreo_Mosca': _monitoreo_mosca(gen, n['Monitoreo_Mosca']),
+        'Ordenes_de_Trabajo': _ordenes(gen, n['Ordenes_de_Trabajo'], ingresos, productos),
+        'Personal': personal,
+        'Registro_Horas_Tractor': _horas_tractor(gen, n['Registro_Horas_Tractor'], personal),
+        'clima': clima.assign(fecha_hora=clima['fecha_hora'].dt.strftime('%Y-%m-%dT%H:%M:%S')),
+    }
+
+
+def a_registros(df):
+    """Filas listas para ``ClienteFalso.sembrar`` (NaN -> None, numpy -> Python)."""
+    return [{k: (None if isinstance(v, float) and np.isnan(v) else v) for k, v in fila.items()}
+            for fila in df.astype(object).to_dict('records')]
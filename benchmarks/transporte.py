@@ -0,0 +1,103 @@
+"""
+Transporte JSON vs CSV para las lecturas masivas de ``nucleo.datos.fetch``.
+
+Siembra un Supabase falso con N filas sintéticas de las tablas grandes y
+planas (Control_Raleo, Diametro_Baya, clima) y mide, para cada formato,
+tiempo de lectura (mediana de varias corridas), bytes recibidos y páginas.
+También verifica que ambos formatos entreguen el mismo DataFrame.
+
+Uso:
+    python -m benchmarks.transporte --filas 20000 [--repeticiones 5] [--salida res.json]
+"""
+import argparse
+import json
+import random
+import statistics
+import time
+from datetime import datetime, timedelta
+
+import pandas as pd
+
+from nucleo.datos import fetch, usar_cliente
+from nucleo.supabase_falso import ClienteFalso
+
+SECTORES = ['J1', 'J2', 'R1', 'R2', 'W1', 'W2', 'W3', 'K1', 'K2', 'K3']
+FORMATOS = ("json", "csv")
+
+
+def filas_sinteticas(tabla, n, rnd):
+    """Filas falsas pero realistas (sectores, fechas, rangos) para ``tabla``."""
+    inicio = datetime(2025, 1, 1)
+    if tabla == 'Control_Raleo':
+        return [{
+            'Fecha': (inicio + timedelta(days=i % 120)).strftime('%Y-%m-%d'),
+            'Sector': rnd.choice(SECTORES), 'Evaluador': f"Evaluador {i % 7}",
+            'Numero_de_Fila': rnd.randint(1, 500), 'Nombre_del_Trabajador': f"Trabajador {i % 90}",
+            'Racimos_Reales': rnd.randint(0, 1000), 'Tandas_Equivalentes': rnd.randint(0, 1000) / 100.0,
+        } for i in range(n)]
+    if tabla == 'Diametro_Baya':
+        return [{
+            'Fecha': (inicio + timedelta(days=i % 120)).strftime('%Y-%m-%d'),
+            'Sector': rnd.choice(SECTORES), 'Planta': i % 25 + 1,
+            **{f"Racimo_{r}_{p}": round(rnd.uniform(5, 40), 2)
+               for r in (1, 2) for p in ("Superior", "Medio", "Inferior")},
+        } for i in range(n)]
+    return [{
+        'fecha_hora': (inicio + timedelta(minutes=15 * i)).isoformat(),
+        'temp_out': round(rnd.uniform(8, 35), 1), 'hum_out': round(rnd.uniform(20, 100), 1),
+        'viento_vel': round(rnd.uniform(0, 12), 1), 'viento_dir': rnd.choice(['N', 'NE', 'E', 'SE', 'S', 'SO', 'O', 'NO']),
+        'lluvia_mm': 0.0, 'radiacion_solar': round(rnd.uniform(0, 1000), 1),
+    } for i in range(n)]
+
+
+def _iguales(a, b):
+    if list(a.columns) != list(b.columns) or len(a) != len(b):
+        return False
+    norm = lambda df: df.astype(object).where(df.notna(), None).values.tolist()
+    return norm(a) == norm(b)
+
+
+def medir(filas, repeticiones=3, paralelo=4, semilla=0):
+    """Devuelve una lista de resultados {tabla, formato, segundos, bytes, paginas, iguales}."""
+    cliente = usar_cliente(ClienteFalso())
+    rnd = random.Random(semilla)
+    resultados = []
+    for tabla in ('Control_Raleo', 'Diametro_Baya', 'clima'):
+        cliente.sembrar(tabla, filas_sinteticas(tabla, filas, rnd))
+        frames = {}
+        for formato in FORMATOS:
+            tiempos = []
+            for _ in range(repeticiones):
+                t0 = time.perf_counter()
+                df = fetch(tabla, paralelo=paralelo, formato=formato)
+                tiempos.append(time.perf_counter() - t0)
+            frames[formato] = df
+            resultados.append({
+                'tabla': tabla, 'formato': formato, 'filas': len(df),
+                'segundos': round(statistics.median(tiempos), 4),
+                'bytes': df.attrs.get('bytes', 0), 'paginas': df.attrs.get('paginas', 0),
+                'memoria_mb': round(df.memory_usage(deep=True).sum() / 1e6, 2),
+            })
+        iguales = _iguales(frames['json'], frames['csv'])
+        for r in resultados[-len(FORMATOS):]:
+            r['iguales'] = iguales
+    return resultados
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--filas', type=int, default=20000)
+    parser.add_argument('--repeticiones', type=int, default=3)
+    parser.add_argument('--paralelo', type=int, default=4)
+    parser.add_argument('--salida', help="ruta de un JSON con los resultados")
+    args = parser.parse_args(argv)
+
+    resultados = medir(args.filas, args.repeticiones, args.paralelo)
+    print(pd.DataFrame(resultados).to_string(index=False))
+    if args.salida:
+        with open(args.salida, 'w', encoding='utf-8') as f:
+            json.dump({'filas': args.filas, 'resultados': resultados}, f, indent=2)
+
+
+if __name__ == '__main__':
+    main()
@@ -1,8 +1,12 @@
 import streamlit as st
 import pandas as pd
 from datetime import datetime
-from io import BytesIO
-from supabase import create_client, Client
+from nucleo import exportar
+from nucleo.bandeja import Bandeja, BandejaLlena
+from nucleo.cache_memoria import cache_memoria
+from nucleo.cache_tablas import tabla_incremental
+from nucleo.datos import ErrorDatos, obtener_cliente
+from nucleo.versiones import segun_version
 
 # 🚨 CANDADO DE SEGURIDAD (Colocar al inicio de la página, justo debajo de los imports)
 if "autenticado" not in st.session_state or not st.session_state["autenticado"]:
@@ -18,53 +22,36 @@ st.write("Registre el avance detallado del personal, indicando las tandas comple
 # Sigue siendo útil para el cálculo de las tandas equivalentes
 RACIMOS_POR_TANDA = 100.0
 
-# --- FUNCIÓN DE CONEXIÓN SEGURA A SUPABASE ---
-@st.cache_resource
-def init_supabase_connection():
-    try:
-        url = st.secrets["SUPABASE_URL"]
-        key = st.secrets["SUPABASE_KEY"]
-        return create_client(url, key)
-    except Exception as e:
-        st.error(f"Error al conectar con Supabase: {e}")
-        return None
-
-supabase = init_supabase_connection()
+# --- CONEXIÓN SEGURA A SUPABASE (cliente compartido del proceso) ---
+try:
+    supabase = obtener_cliente()
+except ErrorDatos as e:
+    st.error(f"Error al conectar con Supabase: {e}")
+    supabase = None
 
-# --- MEMORIA LOCAL (COLA OFFLINE) ---
-if 'cola_raleo' not in st.session_state:
-    st.session_state.cola_raleo = []
+# --- MEMORIA LOCAL (BANDEJA OFFLINE EN EL DISPOSITIVO) ---
+bandeja = Bandeja('Control_Raleo', heredadas=('cola_raleo',))
 
 # --- FUNCIONES ---
-@st.cache_data(ttl=60)
-def cargar_raleo_supabase():
+@segun_version('Control_Raleo')
+@cache_memoria(ttl=60)
+def cargar_raleo_supabase(version=None):
     """Carga el historial de raleo desde la tabla de Supabase."""
     if supabase:
         try:
-            response = supabase.table('Control_Raleo').select("*").execute()
-            return pd.DataFrame(response.data)
+            return tabla_incremental('Control_Raleo', paralelo=4, formato='csv')
         except Exception:
             pass
     return pd.DataFrame()
 
-def to_excel(df):
-    from io import BytesIO
-    output = BytesIO()
-    with pd.ExcelWriter(output, engine='xlsxwriter') as writer:
-        df.to_excel(writer, index=False, sheet_name='Reporte_Raleo')
-    return output.getvalue()
-
 def sync_raleo():
-    """Intenta subir la cola pendiente a Supabase."""
-    if not st.session_state.cola_raleo:
+    """Intenta subir la bandeja pendiente a Supabase."""
+    if not bandeja:
         st.info("No hay jornadas pendientes de sincronizar.")
         return
     try:
         with st.spinner("Subiendo datos a la nube..."):
-            supabase.table('Control_Raleo').insert(st.session_state.cola_raleo).execute()
-            n = len(st.session_state.cola_raleo)
-            st.session_state.cola_raleo = []
-            cargar_raleo_supabase.clear()
+            n = bandeja.sincronizar(supabase)
             st.success(f"✅ ¡{n} registros sincronizados exitosamente!")
             st.balloons()
     except Exception as e:
@@ -73,8 +60,8 @@ def sync_raleo():
 # --- INTERFAZ DE REGISTRO ---
 
 # BANNER OFFLINE: Aparece solo si hay datos pendientes
-if st.session_state.cola_raleo:
-    n_pendientes = len(st.session_state.cola_raleo)
+if bandeja:
+    n_pendientes = len(bandeja)
     st.markdown(f"""
         <div style="background-color:#fff3cd; padding:15px; border-radius:10px; border:1px solid #ffc107; margin-bottom:15px;">
             📴 <strong>{n_pendientes} registro(s) de raleo guardados sin conexión.</strong><br>
@@ -155,14 +142,17 @@ with st.expander("➕ Registrar Nueva Cartilla de Raleo por Fila", expanded=True
                 columnas_finales = ['Fecha', 'Sector', 'Evaluador', 'Numero_de_Fila', 'Nombre_del_Trabajador', 'Racimos_Reales', 'Tandas_Equivalentes']
                 registros = df_final_jornada[columnas_finales].to_dict(orient='records')
 
-                # ✅ OFFLINE-FIRST: Intentamos Supabase, si falla → cola local
+                # ✅ OFFLINE-FIRST: primero al dispositivo, luego se intenta subir la bandeja completa
+                try:
+                    bandeja.agregar(registros)
+                except BandejaLlena as e:
+                    st.error(str(e))
+                    st.stop()
                 try:
-                    supabase.table('Control_Raleo').insert(registros).execute()
-                    cargar_raleo_supabase.clear()
+                    bandeja.sincronizar(supabase)
                     st.success("¡Jornada de raleo guardada en la nube! ☁️")
                     st.rerun()
                 except Exception as e:
-                    st.session_state.cola_raleo.extend(registros)
                     st.warning(f"📴 Sin conexión. Jornada guardada en el dispositivo ({len(registros)} filas). Se subirá cuando vuelva el internet.")
             else:
                 st.warning("No se ingresaron datos de trabajadores.")
@@ -175,7 +165,7 @@ df_historial = cargar_raleo_supabase()
 
 if df_historial is not None and not df_historial.empty:
     df_historial['Fecha'] = pd.to_datetime(df_historial['Fecha'])
-    jornadas = df_historial.groupby(['Fecha', 'Sector', 'Evaluador']).size().reset_index(name='counts')
+    jornadas = df_historial.groupby(['Fecha', 'Sector', 'Evaluador'], observed=True).size().reset_index(name='counts')
     
     st.write("A continuación se muestra un resumen de las últimas jornadas registradas.")
 
@@ -197,11 +187,11 @@ if df_historial is not None and not df_historial.empty:
 
             with col5:
                 st.write("") # Spacer
-                reporte_individual = to_excel(df_jornada_actual)
-                st.download_button(
-                    label="📥 Detalle",
-                    data=reporte_individual,
-                    file_name=f"Reporte_Raleo_{jornada['Sector']}_{jornada['Fecha'].strftime('%Y%m%d')}.xlsx",
+                exportar.boton_descarga(
+                    "📥 Detalle",
+                    df_jornada_actual,
+                    f"Reporte_Raleo_{jornada['Sector']}_{jornada['Fecha'].strftime('%Y%m%d')}.xlsx",
+                    hoja='Reporte_Raleo',
                     key=f"download_raleo_{index}"
                 )
 else:
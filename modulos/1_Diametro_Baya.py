@@ -1,12 +1,16 @@
 import streamlit as st
 import pandas as pd
 from datetime import datetime
-import json
 from io import BytesIO
-import plotly.express as px
 import numpy as np
-from supabase import create_client, Client
-from streamlit_local_storage import LocalStorage
+from nucleo.bandeja import Bandeja, BandejaLlena
+from nucleo.cache_memoria import cache_memoria
+from nucleo.cache_tablas import tabla_incremental
+from nucleo.calculos import calcular_tasa_crecimiento
+from nucleo.datos import ErrorDatos, obtener_cliente
+from nucleo.perezoso import modulo_perezoso
+from nucleo.versiones import segun_version
+px = modulo_perezoso("plotly.express")   # ⚡ plotly se importa al dibujar el primer gráfico
 
 # 🚨 CANDADO DE SEGURIDAD (Colocar al inicio de la página, justo debajo de los imports)
 if "autenticado" not in st.session_state or not st.session_state["autenticado"]:
@@ -19,8 +23,7 @@ st.title("🍇 Medición de Diámetro de Baya")
 st.write("Registre el diámetro (mm) y visualice los promedios por racimo y planta en tiempo real.")
 
 # --- Inicialización y Constantes ---
-localS = LocalStorage()
-LOCAL_STORAGE_KEY = 'diametro_baya_offline_v3'
+bandeja = Bandeja('Diametro_Baya', heredadas=('diametro_baya_offline_v3',))
 columnas_racimo1 = ["Racimo 1 - Superior", "Racimo 1 - Medio", "Racimo 1 - Inferior"]
 columnas_racimo2 = ["Racimo 2 - Superior", "Racimo 2 - Medio", "Racimo 2 - Inferior"]
 columnas_medicion = columnas_racimo1 + columnas_racimo2
@@ -28,26 +31,20 @@ columnas_medicion = columnas_racimo1 + columnas_racimo2
 columnas_db = [c.replace(' - ', '_').replace(' ', '_') for c in columnas_medicion]
 mapeo_columnas = dict(zip(columnas_medicion, columnas_db))
 
-# --- Conexión a Supabase ---
-@st.cache_resource
-def init_supabase_connection():
-    try:
-        url = st.secrets["SUPABASE_URL"]
-        key = st.secrets["SUPABASE_KEY"]
-        return create_client(url, key)
-    except Exception as e:
-        st.error(f"Error al conectar con Supabase: {e}")
-        return None
-
-supabase = init_supabase_connection()
+# --- Conexión a Supabase (cliente compartido del proceso) ---
+try:
+    supabase = obtener_cliente()
+except ErrorDatos as e:
+    st.error(f"Error al conectar con Supabase: {e}")
+    supabase = None
 
 # --- Funciones de Datos ---
-@st.cache_data(ttl=60)
-def cargar_diametro_supabase():
+@segun_version('Diametro_Baya')
+@cache_memoria(ttl=60)
+def cargar_diametro_supabase(version=None):
     if supabase:
         try:
-            response = supabase.table('Diametro_Baya').select("*").execute()
-            df = pd.DataFrame(response.data)
+            df = tabla_incremental('Diametro_Baya', paralelo=4, formato='csv')
             if not df.empty:
                 df['Fecha'] = pd.to_datetime(df['Fecha'])
             return df
@@ -61,28 +58,6 @@ def to_excel(df):
         df.to_excel(writer, index=False, sheet_name='Reporte_Diametro')
     return output.getvalue()
 
-def calcular_tasa_crecimiento(df):
-    columnas_reales = [c for c in df.columns if c.startswith('Racimo_')]
-    if df.shape[0] < 2 or not columnas_reales:
-        return pd.DataFrame()
-
-    df['Diametro_Prom_Planta'] = df[columnas_reales].mean(axis=1)
-    tasas = []
-    for sector in df['Sector'].unique():
-        df_sector = df[df['Sector'] == sector].copy()
-        promedio_por_fecha = df_sector.groupby('Fecha')['Diametro_Prom_Planta'].mean()
-        if len(promedio_por_fecha) >= 2:
-            ultimas_dos = promedio_por_fecha.sort_index().tail(2)
-            (p_penultimo, p_ultimo), (f_penultima, f_ultima) = ultimas_dos.values, ultimas_dos.index
-            dias = (f_ultima - f_penultima).days
-            if dias > 0:
-                tasa = (p_ultimo - p_penultimo) / dias
-                tasas.append({
-                    "Sector": sector, "Tasa (mm/día)": tasa, "Desde": f_penultima.strftime('%d/%m/%Y'),
-                    "Hasta": f_ultima.strftime('%d/%m/%Y'), "Días Transcurridos": dias
-                })
-    return pd.DataFrame(tasas)
-
 # --- Interfaz de Registro ---
 with st.expander("➕ Registrar Nueva Medición", expanded=True):
     col1, col2 = st.columns(2)
@@ -155,37 +130,33 @@ with st.expander("➕ Registrar Nueva Medición", expanded=True):
         
         registros_json = df_para_guardar.to_dict('records')
         
-        registros_locales_str = localS.getItem(LOCAL_STORAGE_KEY)
-        registros_locales = json.loads(registros_locales_str) if registros_locales_str else []
-        registros_locales.extend(registros_json)
-        localS.setItem(LOCAL_STORAGE_KEY, json.dumps(registros_locales))
-        st.success(f"¡Medición guardada! Hay {len(registros_locales)} registros de plantas pendientes.")
-        st.rerun()
+        try:
+            bandeja.agregar(registros_json)
+            st.success(f"¡Medición guardada! Hay {len(bandeja)} registros de plantas pendientes.")
+            st.rerun()
+        except BandejaLlena as e:
+            st.error(str(e))
 
 # --- Sección de Sincronización ---
 st.divider()
 st.subheader("📡 Sincronización con la Base de Datos")
-registros_pendientes_str = localS.getItem(LOCAL_STORAGE_KEY)
-registros_pendientes = json.loads(registros_pendientes_str) if registros_pendientes_str else []
 
 # --- NUEVO: Botón para limpiar datos locales corruptos ---
-if registros_pendientes:
+if bandeja:
     st.error("Hay datos guardados en el dispositivo. Si la sincronización falla, límpielos con el siguiente botón.")
     if st.button("🧹 Limpiar Almacenamiento Local (Solucionar Errores)"):
-        localS.setItem(LOCAL_STORAGE_KEY, json.dumps([]))
+        bandeja.vaciar()
         st.toast("Almacenamiento local limpiado. Recargando...")
         st.rerun()
 
-if registros_pendientes:
-    st.warning(f"Hay **{len(registros_pendientes)}** mediciones de plantas guardadas localmente pendientes de sincronizar.")
+if bandeja:
+    st.warning(f"Hay **{len(bandeja)}** mediciones de plantas guardadas localmente pendientes de sincronizar.")
     if st.button("Sincronizar Ahora con Supabase"):
         if supabase:
             with st.spinner("Sincronizando..."):
                 try:
-                    supabase.table('Diametro_Baya').insert(registros_pendientes).execute()
-                    localS.setItem(LOCAL_STORAGE_KEY, json.dumps([]))
+                    bandeja.sincronizar(supabase)
                     st.success("¡Sincronización completada!")
-                    cargar_diametro_supabase.clear()
                     st.rerun()
                 except Exception as e:
                     st.error(f"Error al guardar en Supabase: {e}. Sus datos locales están a salvo.")
@@ -228,13 +199,13 @@ else:
         if columnas_reales:
             df_melted = df_filtrado.melt(id_vars=['Fecha', 'Sector'], value_vars=columnas_reales, var_name='Posicion', value_name='Diametro')
             df_melted = df_melted[df_melted['Diametro'] > 0]
-            df_tendencia = df_melted.groupby(['Fecha', 'Sector'])['Diametro'].mean().reset_index()
+            df_tendencia = df_melted.groupby(['Fecha', 'Sector'], observed=True)['Diametro'].mean().reset_index()
         else:
             df_tendencia = pd.DataFrame()
         
         if not df_tendencia.empty:
             st.write("Tabla de Diámetro Promedio (mm):")
-            df_pivot = df_tendencia.pivot_table(index='Fecha', columns='Sector', values='Diametro').sort_index(ascending=False)
+            df_pivot = df_tendencia.pivot_table(index='Fecha', columns='Sector', values='Diametro', observed=True).sort_index(ascending=False)
             st.dataframe(df_pivot.style.format("{:.2f}", na_rep="-"), use_container_width=True)
 
             st.write("Gráfico de Tendencia:")
@@ -1,8 +1,9 @@
 import streamlit as st
 import pandas as pd
 from datetime import datetime, date
-from io import BytesIO
-from supabase import create_client
+from nucleo import exportar
+from nucleo.bandeja import Bandeja, BandejaLlena
+from nucleo.datos import fetch, obtener_cliente
 
 # 🚨 CANDADO DE SEGURIDAD (Colocar al inicio de la página, justo debajo de los imports)
 if "autenticado" not in st.session_state or not st.session_state["autenticado"]:
@@ -22,62 +23,50 @@ st.markdown("""
     </style>
     """, unsafe_allow_html=True)
 
-# --- 2. INICIALIZACIÓN DE MEMORIA LOCAL (COLA OFFLINE) ---
-if 'cola_sincronizacion' not in st.session_state:
-    st.session_state.cola_sincronizacion = []
+# --- 2. INICIALIZACIÓN DE MEMORIA LOCAL (BANDEJA OFFLINE EN EL TELÉFONO) ---
+bandeja = Bandeja('Evaluaciones_Sanitarias', heredadas=('cola_sincronizacion',))
 
 # --- 3. CONEXIÓN ---
-@st.cache_resource
-def init_supabase():
-    return create_client(st.secrets["SUPABASE_URL"], st.secrets["SUPABASE_KEY"])
-
-supabase = init_supabase()
+supabase = obtener_cliente()
 
 # --- 4. FUNCIONES DE APOYO ---
 def sync_ahora():
-    """Sube los datos de la cola local a Supabase."""
-    if not st.session_state.cola_sincronizacion:
+    """Sube la bandeja del teléfono a Supabase (por lotes, sin duplicar en reintentos)."""
+    if not bandeja:
         st.info("No hay datos pendientes de sincronizar.")
         return
 
-    exitos = 0
     try:
-        for evaluacion in st.session_state.cola_sincronizacion:
-            supabase.table('Evaluaciones_Sanitarias').insert(evaluacion).execute()
-            exitos += 1
-        
-        st.session_state.cola_sincronizacion = [] # Limpiar cola
+        exitos = bandeja.sincronizar(supabase)
         st.success(f"¡Éxito! {exitos} evaluaciones subidas a la nube.")
         st.balloons()
     except Exception as e:
-        st.error(f"Error al sincronizar: {e}. Intente cuando tenga mejor señal.")
-
-def to_excel_detailed(evaluacion_row):
-    output = BytesIO()
-    with pd.ExcelWriter(output, engine='xlsxwriter') as writer:
-        # Resumen
-        resumen = pd.DataFrame([{
-            "Fecha": evaluacion_row['Fecha'],
-            "Sector": evaluacion_row['Sector'],
-            "Evaluador": evaluacion_row['Evaluador']
-        }])
-        resumen.to_excel(writer, index=False, sheet_name='Resumen')
-        
-        # Datos JSONB
-        for sheet, key in [('Plagas', 'Datos_Plagas'), ('Enfermedades', 'Datos_Enfermedades'), ('Lindero', 'Datos_Perimetro')]:
-            if key in evaluacion_row and evaluacion_row[key]:
-                pd.DataFrame(evaluacion_row[key]).to_excel(writer, index=False, sheet_name=sheet)
-    return output.getvalue()
+        st.error(f"Error al sincronizar: {e}. Intente cuando tenga mejor señal. "
+                 f"Quedan {len(bandeja)} evaluaciones en el teléfono.")
+
+def hojas_detalle(evaluacion_row):
+    """Hojas del Excel de una evaluación (se arma recién al hacer clic en descargar)."""
+    # Resumen
+    hojas = {'Resumen': pd.DataFrame([{
+        "Fecha": evaluacion_row['Fecha'],
+        "Sector": evaluacion_row['Sector'],
+        "Evaluador": evaluacion_row['Evaluador']
+    }])}
+    # Datos JSONB
+    for sheet, key in [('Plagas', 'Datos_Plagas'), ('Enfermedades', 'Datos_Enfermedades'), ('Lindero', 'Datos_Perimetro')]:
+        if key in evaluacion_row and evaluacion_row[key]:
+            hojas[sheet] = pd.DataFrame(evaluacion_row[key])
+    return hojas
 
 # --- 5. INTERFAZ PRINCIPAL ---
 st.title("🔬 Monitor Sanitario Móvil")
 
 # --- BLOQUE DE SINCRONIZACIÓN (SOLO APARECE SI HAY PENDIENTES) ---
-if st.session_state.cola_sincronizacion:
+if bandeja:
     with st.container():
         st.markdown(f"""
             <div class="sync-box">
-                <strong>⚠️ Tienes {len(st.session_state.cola_sincronizacion)} evaluaciones guardadas en el teléfono.</strong><br>
+                <strong>⚠️ Tienes {len(bandeja)} evaluaciones guardadas en el teléfono.</strong><br>
                 Presiona el botón de abajo cuando tengas internet para subirlas.
             </div>
             """, unsafe_allow_html=True)
@@ -130,16 +119,18 @@ with st.expander("📝 Nueva Evaluación de Campo", expanded=True):
                     "Datos_Enfermedades": df_enferm_input.reset_index().to_dict(orient='records'),
                     "Datos_Perimetro": df_lindero_input.reset_index().to_dict(orient='records')
                 }
-                st.session_state.cola_sincronizacion.append(nueva_eval)
-                st.success(f"✅ Evaluación de {sector} guardada localmente. ¡Sigue con el siguiente lote!")
+                try:
+                    bandeja.agregar(nueva_eval)
+                    st.success(f"✅ Evaluación de {sector} guardada localmente. ¡Sigue con el siguiente lote!")
+                except BandejaLlena as e:
+                    st.error(str(e))
                 # Nota: st.rerun() no es necesario aquí porque el st.form(clear_on_submit=True) limpia los campos
 
 # --- 6. HISTORIAL (PARA EL JEFE DE SANIDAD) ---
 st.divider()
 st.subheader("📚 Historial en la Nube")
 try:
-    res = supabase.table('Evaluaciones_Sanitarias').select("*").order('Fecha', desc=True).limit(20).execute()
-    df_historial = pd.DataFrame(res.data)
+    df_historial = fetch('Evaluaciones_Sanitarias', orden='-Fecha', limite=20)
 except:
     df_historial = pd.DataFrame()
 
@@ -150,12 +141,12 @@ if not df_historial.empty:
             col_a.write(f"📅 **{fila['Fecha']}**")
             col_b.write(f"📍 Sector: **{fila['Sector']}**")
             
-            excel_data = to_excel_detailed(fila)
-            col_c.download_button(
-                label="📥 Excel",
-                data=excel_data,
-                file_name=f"Sanidad_{fila['Sector']}_{fila['Fecha']}.xlsx",
-                mime="application/vnd.ms-excel",
+            # ⚡ el Excel se genera al hacer clic, no en cada rerun por cada fila
+            exportar.boton_descarga(
+                "📥 Excel",
+                lambda fila=fila: hojas_detalle(fila),
+                f"Sanidad_{fila['Sector']}_{fila['Fecha']}.xlsx",
+                contenedor=col_c,
                 key=f"dl_{fila['id']}"
             )
 else:
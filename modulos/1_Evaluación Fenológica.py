@@ -1,10 +1,11 @@
 import streamlit as st
 import pandas as pd
 from datetime import datetime
-import json
-from io import BytesIO
-from supabase import create_client, Client
-from streamlit_local_storage import LocalStorage
+from nucleo import exportar
+from nucleo.bandeja import Bandeja, BandejaLlena
+from nucleo.cache_memoria import cache_memoria
+from nucleo.datos import ErrorDatos, fetch, obtener_cliente
+from nucleo.versiones import segun_version
 
 # 🚨 CANDADO DE SEGURIDAD (Colocar al inicio de la página, justo debajo de los imports)
 if "autenticado" not in st.session_state or not st.session_state["autenticado"]:
@@ -17,46 +18,32 @@ st.title("🌱 Evaluación Fenológica por Estados")
 st.write("Registre los conteos y guárdelos en el dispositivo. Sincronice cuando tenga conexión.")
 
 # --- Inicialización y Constantes ---
-localS = LocalStorage()
-LOCAL_STORAGE_KEY = 'fenologia_offline'
+bandeja = Bandeja('Evaluaciones_Fenologicas', heredadas=('fenologia_offline',))
 
 # Mapeo de nombres de columna para la interfaz y la base de datos
 columnas_display = ['Punta algodón', 'Punta verde', 'Salida de hojas', 'Hojas extendidas', 'Racimos visibles']
 columnas_db = ['Punta_algodon', 'Punta_verde', 'Salida_de_hojas', 'Hojas_extendidas', 'Racimos_visibles']
 mapeo_columnas = dict(zip(columnas_display, columnas_db))
 
-# --- Conexión a Supabase ---
-@st.cache_resource
-def init_supabase_connection():
-    try:
-        url = st.secrets["SUPABASE_URL"]
-        key = st.secrets["SUPABASE_KEY"]
-        return create_client(url, key)
-    except Exception as e:
-        st.error(f"Error al conectar con Supabase: {e}")
-        return None
-
-supabase = init_supabase_connection()
+# --- Conexión a Supabase (cliente compartido del proceso) ---
+try:
+    supabase = obtener_cliente()
+except ErrorDatos as e:
+    st.error(f"Error al conectar con Supabase: {e}")
+    supabase = None
 
 # --- Nuevas Funciones para Supabase ---
-@st.cache_data(ttl=60)
-def cargar_fenologia_supabase():
+@segun_version('Evaluaciones_Fenologicas')
+@cache_memoria(ttl=60)
+def cargar_fenologia_supabase(version=None):
     """Carga el historial de evaluaciones desde la tabla de Supabase."""
     if supabase:
         try:
-            response = supabase.table('Evaluaciones_Fenologicas').select("*").execute()
-            df = pd.DataFrame(response.data)
-            return df
+            return fetch('Evaluaciones_Fenologicas', vista='Evaluación Fenológica')
         except Exception as e:
             st.error(f"Error al cargar el historial de Supabase: {e}")
     return pd.DataFrame()
 
-def to_excel(df):
-    output = BytesIO()
-    with pd.ExcelWriter(output, engine='xlsxwriter') as writer:
-        df.to_excel(writer, index=False, sheet_name='Reporte_Fenologia')
-    return output.getvalue()
-
 # --- Interfaz de Registro ---
 with st.expander("➕ Registrar Nueva Evaluación", expanded=True):
     col1, col2 = st.columns(2)
@@ -83,32 +70,26 @@ with st.expander("➕ Registrar Nueva Evaluación", expanded=True):
         
         registros_json = df_para_guardar.to_dict('records')
         
-        registros_locales_str = localS.getItem(LOCAL_STORAGE_KEY)
-        registros_locales = json.loads(registros_locales_str) if registros_locales_str else []
-        registros_locales.extend(registros_json)
-        localS.setItem(LOCAL_STORAGE_KEY, json.dumps(registros_locales))
-        
-        st.success(f"¡Evaluación guardada! Hay {len(registros_locales)} registros de plantas pendientes.")
-        st.rerun()
+        try:
+            bandeja.agregar(registros_json)
+            st.success(f"¡Evaluación guardada! Hay {len(bandeja)} registros de plantas pendientes.")
+            st.rerun()
+        except BandejaLlena as e:
+            st.error(str(e))
 
 # --- Sección de Sincronización ---
 st.divider()
 st.subheader("📡 Sincronización con la Base de Datos")
 
-registros_pendientes_str = localS.getItem(LOCAL_STORAGE_KEY)
-registros_pendientes = json.loads(registros_pendientes_str) if registros_pendientes_str else []
-
-if registros_pendientes:
-    st.warning(f"Hay **{len(registros_pendientes)}** registros guardados localmente pendientes de sincronizar.")
+if bandeja:
+    st.warning(f"Hay **{len(bandeja)}** registros guardados localmente pendientes de sincronizar.")
     if st.button("Sincronizar Ahora con Supabase"):
         if supabase:
             with st.spinner("Sincronizando..."):
                 try:
-                    # Insertamos los registros pendientes en la tabla de Supabase
-                    supabase.table('Evaluaciones_Fenologicas').insert(registros_pendientes).execute()
-                    localS.setItem(LOCAL_STORAGE_KEY, json.dumps([]))
+                    # Upsert por lotes: un reintento tras un corte no duplica filas
+                    bandeja.sincronizar(supabase)
                     st.success("¡Sincronización completada!")
-                    cargar_fenologia_supabase.clear()
                     st.rerun()
                 except Exception as e:
                     st.error(f"Error al guardar en Supabase: {e}. Sus datos locales están a salvo.")
@@ -137,11 +118,11 @@ if df_historial is not None and not df_historial.empty:
                 st.metric("Sector Evaluado", sesion['Sector'])
             with col3:
                 st.write("")
-                reporte_individual = to_excel(df_sesion_actual)
-                st.download_button(
-                    label="📥 Descargar Detalle",
-                    data=reporte_individual,
-                    file_name=f"Reporte_Fenologia_{sesion['Sector']}_{pd.to_datetime(sesion['Fecha']).strftime('%Y%m%d')}.xlsx",
+                exportar.boton_descarga(
+                    "📥 Descargar Detalle",
+                    df_sesion_actual,
+                    f"Reporte_Fenologia_{sesion['Sector']}_{pd.to_datetime(sesion['Fecha']).strftime('%Y%m%d')}.xlsx",
+                    hoja='Reporte_Fenologia',
                     key=f"download_fenologia_{sesion['Fecha']}_{sesion['Sector']}"
                 )
 else:
@@ -1,8 +1,9 @@
 import streamlit as st
 import pandas as pd
 from datetime import datetime, date
-from io import BytesIO
-from supabase import create_client
+from nucleo import exportar
+from nucleo.bandeja import Bandeja, BandejaLlena
+from nucleo.datos import fetch, obtener_cliente
 
 # 🚨 CANDADO DE SEGURIDAD (Colocar al inicio de la página, justo debajo de los imports)
 if "autenticado" not in st.session_state or not st.session_state["autenticado"]:
@@ -22,49 +23,37 @@ st.markdown("""
     </style>
     """, unsafe_allow_html=True)
 
-# --- 2. MEMORIA LOCAL (COLA OFFLINE) ---
-if 'cola_mosca' not in st.session_state:
-    st.session_state.cola_mosca = []
+# --- 2. MEMORIA LOCAL (BANDEJA OFFLINE EN EL TELÉFONO) ---
+bandeja = Bandeja('Monitoreo_Mosca', heredadas=('cola_mosca',))
 if 'sector_fijo' not in st.session_state:
     st.session_state.sector_fijo = ""
 
 # --- 3. CONEXIÓN ---
-@st.cache_resource
-def init_supabase():
-    return create_client(st.secrets["SUPABASE_URL"], st.secrets["SUPABASE_KEY"])
-
-supabase = init_supabase()
+supabase = obtener_cliente()
 
 # --- 4. FUNCIONES ---
 def sync_mosca():
-    if not st.session_state.cola_mosca:
+    if not bandeja:
         st.info("No hay datos pendientes.")
         return
 
     try:
         with st.spinner("Subiendo datos a la nube..."):
-            supabase.table('Monitoreo_Mosca').insert(st.session_state.cola_mosca).execute()
-            st.session_state.cola_mosca = []
+            bandeja.sincronizar(supabase)
             st.success("¡Sincronización Exitosa!")
             st.balloons()
     except Exception as e:
         st.error(f"Error de conexión: {e}. Los datos siguen guardados en el celular.")
 
-def to_excel(df):
-    output = BytesIO()
-    with pd.ExcelWriter(output, engine='xlsxwriter') as writer:
-        df.to_excel(writer, index=False, sheet_name='Monitoreo_Mosca')
-    return output.getvalue()
-
 # --- 5. INTERFAZ PRINCIPAL ---
 with st.container():
     st.title("🪰 Monitor de Mosca")
     
     # INDICADOR DE COLA PENDIENTE
-    if st.session_state.cola_mosca:
+    if bandeja:
         st.markdown(f"""
             <div class="sync-box">
-                🔵 <strong>{len(st.session_state.cola_mosca)} registros listos</strong> para subir.<br>
+                🔵 <strong>{len(bandeja)} registros listos</strong> para subir.<br>
                 Sincroniza cuando tengas internet.
             </div>
             """, unsafe_allow_html=True)
@@ -106,24 +95,26 @@ with st.expander("📝 Registro de Trampa", expanded=True):
                     "Anastrepha_fraterculus": int(fraterculus),
                     "Anastrepha_distinta": int(distinta)
                 }
-                st.session_state.cola_mosca.append(nuevo_registro)
-                st.toast(f"Trampa {n_trampa} guardada", icon="✅")
+                try:
+                    bandeja.agregar(nuevo_registro)
+                    st.toast(f"Trampa {n_trampa} guardada", icon="✅")
+                except BandejaLlena as e:
+                    st.error(str(e))
 
 # --- 6. VISUALIZACIÓN DE COLA ACTUAL ---
-if st.session_state.cola_mosca:
+if bandeja:
     with st.expander("📋 Ver registros en el teléfono"):
-        df_cola = pd.DataFrame(st.session_state.cola_mosca)
+        df_cola = pd.DataFrame(bandeja.registros)
         st.dataframe(df_cola[['Numero_Trampa', 'Ceratitis_capitata', 'Anastrepha_fraterculus']], use_container_width=True)
         if st.button("🗑️ Borrar lista local"):
-            st.session_state.cola_mosca = []
+            bandeja.vaciar()
             st.rerun()
 
 # --- 7. HISTORIAL (NUBE) ---
 st.divider()
 st.subheader("📚 Historial Sincronizado")
 try:
-    res = supabase.table('Monitoreo_Mosca').select("*").order('Fecha', desc=True).limit(50).execute()
-    df_db = pd.DataFrame(res.data)
+    df_db = fetch('Monitoreo_Mosca', orden='-Fecha', limite=50)
 except:
     df_db = pd.DataFrame()
 
@@ -132,12 +123,11 @@ if not df_db.empty:
     df_view = df_db[['Fecha', 'Sector', 'Numero_Trampa', 'Ceratitis_capitata', 'Anastrepha_fraterculus', 'Anastrepha_distinta']]
     st.dataframe(df_view, use_container_width=True, hide_index=True)
     
-    excel_file = to_excel(df_db)
-    st.download_button(
-        label="📥 Descargar Historial Completo (Excel)",
-        data=excel_file,
-        file_name=f"Monitoreo_Mosca_{date.today()}.xlsx",
-        mime="application/vnd.ms-excel"
+    exportar.boton_descarga(
+        "📥 Descargar Historial Completo (Excel)",
+        df_db,
+        f"Monitoreo_Mosca_{date.today()}.xlsx",
+        hoja='Monitoreo_Mosca'
     )
 else:
     st.info("No hay datos históricos sincronizados.")
\ No newline at end of file
@@ -1,8 +1,12 @@
 import streamlit as st
 import pandas as pd
 from datetime import datetime, date, timedelta
-from supabase import create_client
-from streamlit_extras.stylable_container import stylable_container
+from nucleo import exportar
+from nucleo.cache_memoria import cache_memoria
+from nucleo.datos import fetch, obtener_cliente
+from nucleo.perezoso import funcion_perezosa
+from nucleo.versiones import segun_version
+stylable_container = funcion_perezosa("streamlit_extras.stylable_container", "stylable_container")
 
 # 🚨 CANDADO DE SEGURIDAD
 if "autenticado" not in st.session_state or not st.session_state["autenticado"]:
@@ -21,22 +25,19 @@ st.markdown("""
     """, unsafe_allow_html=True)
 
 # --- 2. CONEXIÓN ---
-@st.cache_resource
-def init_supabase():
-    return create_client(st.secrets["SUPABASE_URL"], st.secrets["SUPABASE_KEY"])
-
-supabase = init_supabase()
+supabase = obtener_cliente()
 
 # --- 3. CARGA DE DATOS (con caché específica) ---
-@st.cache_data(ttl=30)
-def cargar_datos_operacion():
+@segun_version('Ordenes_de_Trabajo', 'Personal', 'Maquinaria', sondeo=30)
+@cache_memoria(ttl=30)
+def cargar_datos_operacion(version=None):
     if not supabase: return pd.DataFrame(), pd.DataFrame(), pd.DataFrame()
     try:
         # ✅ FIX ESTADO: Traemos Finalizada + Aplicada en Campo para no perder histórico
-        res_o = supabase.table('Ordenes_de_Trabajo').select("*").in_('Status', ['Finalizada']).execute()
-        res_p = supabase.table('Personal').select("id, nombre_completo").eq('activo', True).execute()
-        res_m = supabase.table('Maquinaria').select("id, nombre").execute()
-        return pd.DataFrame(res_o.data), pd.DataFrame(res_p.data), pd.DataFrame(res_m.data)
+        df_o = fetch('Ordenes_de_Trabajo', filtros={'Status': ['Finalizada']})
+        df_p = fetch('Personal', "id, nombre_completo", filtros={'activo': True})
+        df_m = fetch('Maquinaria', "id, nombre")
+        return df_o, df_p, df_m
     except Exception as e:
         st.error(f"Error al cargar datos: {e}")
         return pd.DataFrame(), pd.DataFrame(), pd.DataFrame()
@@ -291,7 +292,6 @@ else:
                                     "Observaciones_Aplicacion":    reporte_final
                                 }).eq('id', tarea['id']).execute()
                                 st.success(f"¡Reporte enviado! {round(horas_trabajadas,2)} hrs | Turno: {turno_sel}")
-                                cargar_datos_operacion.clear()
                                 st.rerun()
                             except Exception as e:
                                 st.error(f"Error al enviar: {e}")
@@ -303,8 +303,7 @@ st.divider()
 st.header("📚 Historial de Aplicaciones")
 
 try:
-    res_h = supabase.table('Registro_Horas_Tractor').select("*").order('created_at', desc=True).limit(50).execute()
-    df_hist_fresco = pd.DataFrame(res_h.data)
+    df_hist_fresco = fetch('Registro_Horas_Tractor', orden='-created_at', limite=50)
 
     if not df_hist_fresco.empty:
         df_merged = pd.merge(df_hist_fresco, df_pers, left_on='personal_id', right_on='id', how='left')
@@ -324,9 +323,8 @@ try:
         c_h1.metric("Horas Totales", f"{horas_tot:.2f} hrs")
         c_h2.metric("Aplicaciones", f"{len(df_view)} registros")
 
-        csv = df_view.to_csv(index=False).encode('utf-8-sig')
-        c_h3.download_button("📥 Descargar Reporte", data=csv,
-                              file_name=f'reporte_tractor_{date.today()}.csv', mime='text/csv')
+        exportar.boton_descarga("📥 Descargar Reporte", df_view,
+                                f'reporte_tractor_{date.today()}.csv', contenedor=c_h3)
 
         st.dataframe(df_view, use_container_width=True, hide_index=True)
     else:
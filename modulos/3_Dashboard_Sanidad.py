@@ -1,10 +1,15 @@
 import streamlit as st
 import pandas as pd
-import plotly.express as px
-import plotly.graph_objects as go
 from datetime import datetime, timedelta, date
-from supabase import create_client
-from streamlit_extras.metric_cards import style_metric_cards
+from nucleo import instantaneas
+from nucleo.cache_disco import cache_disco
+from nucleo.calculos import aplanar_sanidad
+from nucleo.datos import fallida, fetch, obtener_cliente
+from nucleo.perezoso import funcion_perezosa, modulo_perezoso
+from nucleo.versiones import segun_version
+px = modulo_perezoso("plotly.express")   # ⚡ plotly se importa al dibujar el primer gráfico
+go = modulo_perezoso("plotly.graph_objects")
+style_metric_cards = funcion_perezosa("streamlit_extras.metric_cards", "style_metric_cards")
 
 # 🚨 CANDADO VIP: SANIDAD Y JEFATURA
 if "autenticado" not in st.session_state or not st.session_state["autenticado"]:
@@ -29,11 +34,7 @@ st.markdown("""
     """, unsafe_allow_html=True)
 
 # --- 2. CONEXIÓN A SUPABASE ---
-@st.cache_resource
-def init_supabase():
-    return create_client(st.secrets["SUPABASE_URL"], st.secrets["SUPABASE_KEY"])
-
-supabase = init_supabase()
+supabase = obtener_cliente()
 
 # --- 3. UMBRALES DE ACCIÓN (líneas rojas agronómicas) ---
 UMBRALES = {
@@ -47,60 +48,35 @@ UMBRALES = {
 }
 
 # --- 4. EXTRACCIÓN Y PROCESAMIENTO DE DATOS ---
-@st.cache_data(ttl=60)
-def cargar_datos_sanidad():
+@segun_version('Monitoreo_Mosca', 'Evaluaciones_Sanitarias')
+@cache_disco(ttl=60)  # ✅ sobrevive reinicios: se sirve lo último conocido y se refresca de fondo
+def cargar_datos_sanidad(version=None):
+    # 💡 Sin st.* aquí: el refresco de fondo corre en otro hilo. El error se muestra al llamar.
     if not supabase: return pd.DataFrame(), pd.DataFrame(), pd.DataFrame()
     
     try:
         # 1. Monitoreo de Mosca
-        res_mosca = supabase.table('Monitoreo_Mosca').select("*").execute()
-        df_mosca = pd.DataFrame(res_mosca.data)
+        # 💡 Con instantánea vigente (nucleo/instantaneas.py) se lee el Parquet local y no la API
+        df_mosca = instantaneas.leer('Monitoreo_Mosca', vista='Dashboard Sanidad')
+        if df_mosca is None:
+            df_mosca = fetch('Monitoreo_Mosca', vista='Dashboard Sanidad', paralelo=4)
         if not df_mosca.empty:
             df_mosca['Fecha'] = pd.to_datetime(df_mosca['Fecha']).dt.date
             
-        # 2. Evaluaciones Sanitarias (JSONB)
-        res_san = supabase.table('Evaluaciones_Sanitarias').select("*").execute()
-        df_san_raw = pd.DataFrame(res_san.data)
-        
-        plagas_records = []
-        enfermedades_records = []
-        
-        if not df_san_raw.empty:
-            for _, row in df_san_raw.iterrows():
-                fecha = pd.to_datetime(row['Fecha']).date()
-                sector = row['Sector']
-                evaluador = row.get('Evaluador', 'N/A')
-                
-                # Desempaquetar Plagas
-                datos_p = row.get('Datos_Plagas', [])
-                if isinstance(datos_p, list):
-                    for planta in datos_p:
-                        plagas_records.append({
-                            'Fecha': fecha, 'Sector': sector, 'Evaluador': evaluador,
-                            'TRIPS': float(planta.get('TRIPS', 0)),
-                            'M_BLANCA': float(planta.get('M.BLANCA', 0)),
-                            'A_ROJA': float(planta.get('A.ROJA', 0)),
-                            'COCHINILLA': float(planta.get('COCHINILLA', 0))
-                        })
-                
-                # Desempaquetar Enfermedades
-                datos_e = row.get('Datos_Enfermedades', [])
-                if isinstance(datos_e, list):
-                    for planta in datos_e:
-                        enfermedades_records.append({
-                            'Fecha': fecha, 'Sector': sector, 'Evaluador': evaluador,
-                            'OIDIO': float(planta.get('OIDIO %', 0)),
-                            'MILDIU': float(planta.get('MILDIU %', 0)),
-                            'BOTRYTIS': float(planta.get('BOTRYTIS', 0))
-                        })
+        # 2. Evaluaciones Sanitarias (JSONB) — sólo los arrays que se desempaquetan abajo
+        df_san_raw = instantaneas.leer('Evaluaciones_Sanitarias', vista='Dashboard Sanidad')
+        if df_san_raw is None:
+            df_san_raw = fetch('Evaluaciones_Sanitarias', vista='Dashboard Sanidad', paralelo=4)
         
-        return df_mosca, pd.DataFrame(plagas_records), pd.DataFrame(enfermedades_records)
+        df_plagas, df_enfermedades = aplanar_sanidad(df_san_raw)
+        return df_mosca, df_plagas, df_enfermedades
 
     except Exception as e:
-        st.error(f"Error cargando datos: {e}")
-        return pd.DataFrame(), pd.DataFrame(), pd.DataFrame()
+        return fallida('Monitoreo_Mosca', e), pd.DataFrame(), pd.DataFrame()
 
 df_mosca, df_plagas, df_enfermedades = cargar_datos_sanidad()
+if 'error' in df_mosca.attrs:
+    st.error(f"Error cargando datos: {df_mosca.attrs['error']}")
 
 # --- 5. FILTROS LATERALES ---
 st.sidebar.header("Filtros de Sanidad")
@@ -1,7 +1,12 @@
 import streamlit as st
 import pandas as pd
 from datetime import datetime, date
-from supabase import create_client
+from nucleo import exportar
+from nucleo.cache_memoria import cache_memoria
+from nucleo.cache_tablas import tabla_incremental
+from nucleo.calculos import obtener_fefo
+from nucleo.datos import fetch, fetch_varios, obtener_cliente
+from nucleo.versiones import segun_version
 
 # 🚨 CANDADO VIP: EXCLUSIVO PARA ALMACÉN
 if "autenticado" not in st.session_state or not st.session_state["autenticado"]:
@@ -25,36 +30,34 @@ st.markdown("""
     """, unsafe_allow_html=True)
 
 # --- 2. CONEXIÓN ---
-@st.cache_resource
-def init_supabase():
-    return create_client(st.secrets["SUPABASE_URL"], st.secrets["SUPABASE_KEY"])
-
-supabase = init_supabase()
+supabase = obtener_cliente()
 
 # --- 3. CARGA DE DATOS RELACIONALES (Jalando de tus tablas SQL reales) ---
-@st.cache_data(ttl=60)
-def cargar_catalogos():
-    pers = supabase.table('Personal').select("id, nombre_completo").eq('activo', True).execute()
-    maq = supabase.table('Maquinaria').select("id, nombre").execute()
-    
-    # 💡 NUEVO: Traemos la Banda Toxicológica, Ficha e Ingrediente Activo
-    prod = supabase.table('Productos').select("Codigo, Producto, Unidad, Banda_Toxicologica, Ficha_Tecnica_URL, Ingrediente_Activo, Formulacion, Tipo_Accion").execute()
-    ing = supabase.table('Ingresos').select("id, Codigo_Producto, Codigo_Lote, Cantidad_Ingresada, Precio_Unitario_PEN").execute()
-    sal = supabase.table('Salidas').select("*").execute()
-    ord_ = supabase.table('Ordenes_de_Trabajo').select("*").order('created_at', desc=True).execute()
-
-    return pd.DataFrame(pers.data), pd.DataFrame(maq.data), pd.DataFrame(prod.data), pd.DataFrame(ing.data), pd.DataFrame(sal.data), pd.DataFrame(ord_.data)
+@segun_version('Personal', 'Maquinaria', 'Productos', 'Ingresos', 'Salidas', 'Ordenes_de_Trabajo', sondeo=60)
+@cache_memoria(ttl=60)
+def cargar_catalogos(version=None):
+    # ⚡ Las seis tablas viajan a la vez (fetch_varios): se espera sólo a la más lenta
+    res = fetch_varios({
+        'Personal':   lambda: fetch('Personal', "id, nombre_completo", filtros={'activo': True}),
+        'Maquinaria': lambda: fetch('Maquinaria', "id, nombre"),
+        # 💡 NUEVO: Traemos la Banda Toxicológica, Ficha e Ingrediente Activo
+        'Productos':  lambda: fetch('Productos', "Codigo, Producto, Unidad, Banda_Toxicologica, Ficha_Tecnica_URL, Ingrediente_Activo, Formulacion, Tipo_Accion"),
+        'Ingresos':   lambda: fetch('Ingresos', "id, Codigo_Producto, Codigo_Lote, Cantidad_Ingresada, Precio_Unitario_PEN"),
+        'Salidas':    lambda: tabla_incremental('Salidas', paralelo=4),
+        'Ordenes_de_Trabajo': lambda: fetch('Ordenes_de_Trabajo', vista='Gestión de Mezclas', orden='-created_at'),
+    })
+    return tuple(res.values())
 
 df_pers, df_maq, df_prod, df_ing, df_sal, df_ord = cargar_catalogos()
-
-# Motor FEFO (First Expired, First Out)
-def obtener_fefo(df_p, df_i, df_s):
-    if df_i.empty: return pd.DataFrame()
-    gastado = df_s.groupby('Ingreso_ID')['Cantidad_Usada'].sum().reset_index() if not df_s.empty else pd.DataFrame(columns=['Ingreso_ID', 'Cantidad_Usada'])
-    df_res = pd.merge(df_i, gastado, left_on='id', right_on='Ingreso_ID', how='left').fillna(0)
-    df_res['Stock_Actual'] = df_res['Cantidad_Ingresada'] - df_res['Cantidad_Usada']
-    return pd.merge(df_res[df_res['Stock_Actual'] > 0], df_p, left_on='Codigo_Producto', right_on='Codigo')
-
+# Sin Productos/Ingresos/Salidas el FEFO despacharía sobre un stock falso: se detiene la página
+_fallidas = [d.attrs['tabla'] for d in (df_pers, df_maq, df_prod, df_ing, df_sal, df_ord) if 'error' in d.attrs]
+if _fallidas:
+    if set(_fallidas) & {'Productos', 'Ingresos', 'Salidas'}:
+        st.error(f"❌ No se pudo cargar: {', '.join(_fallidas)}. Reintente en unos segundos.")
+        st.stop()
+    st.warning(f"⚠️ No se pudo cargar: {', '.join(_fallidas)}.")
+
+# Motor FEFO (First Expired, First Out): nucleo/calculos.py
 df_stock = obtener_fefo(df_prod, df_ing, df_sal)
 
 # --- 🧠 MOTOR INTELIGENTE DE ORDEN DE MEZCLA EN TANQUE ---
@@ -221,8 +224,6 @@ with tab1:
                     
                     supabase.table('Ordenes_de_Trabajo').insert(ot_data).execute()
                     st.success(f"✅ Orden enviada a Almacén. Inversión calculada: S/ {costo_total_mezcla:,.2f}")
-                    # ✅ MEJORA 3: Caché específica
-                    cargar_catalogos.clear()
                     st.rerun()
 
 # ==========================================
@@ -273,8 +274,6 @@ with tab2:
                                 supabase.table('Ordenes_de_Trabajo').update({"Status": "Finalizada"}).eq('id', ot['id']).execute()
 
                                 st.success("✅ Despacho exitoso. Kardex actualizado.")
-                                # ✅ MEJORA 3: Caché específica
-                                cargar_catalogos.clear()
                                 st.rerun()
                             except Exception as e:
                                 # ✅ MEJORA 2: Mensaje de error amigable para el operador
@@ -361,12 +360,11 @@ with tab3:
         st.dataframe(df_mostrar_salidas, use_container_width=True, hide_index=True)
         
         # Botón de descarga para archivo de Excel/CSV
-        csv_salidas = df_mostrar_salidas.to_csv(index=False).encode('utf-8')
-        st.download_button(
-            label="📥 Descargar Historial de Salidas",
-            data=csv_salidas,
-            file_name=f"Salidas_Trazabilidad_{date.today()}.csv",
-            mime="text/csv"
+        exportar.boton_descarga(
+            "📥 Descargar Historial de Salidas",
+            df_mostrar_salidas,
+            f"Salidas_Trazabilidad_{date.today()}.csv",
+            bom=False
         )
     else:
         st.info("No hay registros detallados de salidas recientes en la base de datos.")
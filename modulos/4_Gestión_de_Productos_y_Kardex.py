@@ -2,10 +2,14 @@ import streamlit as st
 import pandas as pd
 from datetime import datetime, date
 import numpy as np
-from supabase import create_client
-import io
-from streamlit_extras.metric_cards import style_metric_cards
-from streamlit_extras.stylable_container import stylable_container
+from nucleo import agregados, exportar
+from nucleo.cache_disco import cache_disco
+from nucleo.calculos import generar_kardex
+from nucleo.datos import fetch, fetch_varios, obtener_cliente
+from nucleo.perezoso import funcion_perezosa
+from nucleo.versiones import segun_version
+style_metric_cards = funcion_perezosa("streamlit_extras.metric_cards", "style_metric_cards")
+stylable_container = funcion_perezosa("streamlit_extras.stylable_container", "stylable_container")
 
 # 🚨 CANDADO VIP: EXCLUSIVO PARA ALMACÉN
 if "autenticado" not in st.session_state or not st.session_state["autenticado"]:
@@ -35,148 +39,35 @@ if 'editing_product_id' not in st.session_state:
     st.session_state.editing_product_id = None
 
 # --- 2. CONEXIÓN ---
-@st.cache_resource
-def init_supabase():
-    return create_client(st.secrets["SUPABASE_URL"], st.secrets["SUPABASE_KEY"])
-
-supabase = init_supabase()
+supabase = obtener_cliente()
 
 st.info("💡 **Guía de Unidades:** Usa **001** para productos líquidos (Lt) y **002** para sólidos/polvos (Kg).")
 
 # --- 3. CARGA DE DATOS ---
-@st.cache_data(ttl=60)
-def cargar_todo():
+@segun_version('Productos', 'Ingresos', 'Salidas', sondeo=60)  # 💡 sin cambios en el servidor no se recalcula
+@cache_disco(ttl=60)  # ✅ sobrevive reinicios: se sirve lo último conocido y se refresca de fondo
+def cargar_todo(version=None):
     if not supabase: return pd.DataFrame(), pd.DataFrame(), pd.DataFrame()
-    p   = supabase.table('Productos').select("*").order('Producto').execute()
-    i   = supabase.table('Ingresos').select(
-        "id, Codigo_Producto, Codigo_Lote, Cantidad_Ingresada, Precio_Unitario_PEN, "
-        "Fecha_Vencimiento, Proveedor, Factura, Observaciones, Estado_Registro, Guia_Remision, Responsable"
-    ).execute()
-    s   = supabase.table('Salidas').select("Ingreso_ID, Cantidad_Usada").execute()
-    return pd.DataFrame(p.data), pd.DataFrame(i.data), pd.DataFrame(s.data)
-
-
-def generar_kardex(df_p, df_i, df_s):
-    """Devuelve (df_por_lote, df_por_producto).
-    df_por_lote : una fila por cada ingreso/lote (vista técnica de almacén).
-    df_por_producto: stock total agrupado por producto (vista gerencial).
-    """
-    if df_p.empty:
-        return pd.DataFrame(), pd.DataFrame()
-
-    df_p = df_p.copy()
-    df_p['Stock_Minimo'] = pd.to_numeric(df_p.get('Stock_Minimo', 0), errors='coerce').fillna(0.0)
-    if 'Activo' not in df_p.columns:
-        df_p['Activo'] = True
-    df_p['Activo'] = df_p['Activo'].fillna(True).astype(bool)
-
-    # --- Calcular stock por lote ---
-    if df_i.empty:
-        df_lotes = df_p.copy()
-        df_lotes['Stock_Lote']     = 0.0
-        df_lotes['Valorizado_PEN'] = 0.0
-        df_lotes['Dias_para_Vencer'] = 999
-        return df_lotes, pd.DataFrame()
-
-    if 'Estado_Registro' not in df_i.columns:
-        df_i['Estado_Registro'] = 'Completo 🟢'
-    df_i['Estado_Registro'] = df_i['Estado_Registro'].fillna('Completo 🟢')
-
-    if not df_s.empty:
-        gastado    = df_s.groupby('Ingreso_ID')['Cantidad_Usada'].sum().reset_index()
-        df_balance = pd.merge(df_i, gastado, left_on='id', right_on='Ingreso_ID', how='left').fillna({'Cantidad_Usada': 0})
-    else:
-        df_balance = df_i.copy()
-        df_balance['Cantidad_Usada'] = 0
-
-    df_balance['Stock_Lote'] = df_balance['Cantidad_Ingresada'] - df_balance['Cantidad_Usada']
-
-    # --- Merge lotes → catálogo ---
-    df_lotes = pd.merge(df_balance, df_p, left_on='Codigo_Producto', right_on='Codigo', how='right')
-    df_lotes['Stock_Lote']          = df_lotes['Stock_Lote'].fillna(0.0)
-    df_lotes['Precio_Unitario_PEN'] = pd.to_numeric(df_lotes.get('Precio_Unitario_PEN', 0), errors='coerce').fillna(0.0)
-    df_lotes['Valorizado_PEN']      = df_lotes['Stock_Lote'] * df_lotes['Precio_Unitario_PEN']
-    df_lotes['Cantidad_Usada']      = df_lotes['Cantidad_Usada'].fillna(0.0)
-
-    hoy = pd.Timestamp(date.today())
-    df_lotes['Venc_Date']        = pd.to_datetime(df_lotes.get('Fecha_Vencimiento'), errors='coerce')
-    df_lotes['Dias_para_Vencer'] = (df_lotes['Venc_Date'] - hoy).dt.days
-    df_lotes.loc[df_lotes['Venc_Date'].isnull() | (df_lotes['Venc_Date'].dt.year < 2000), 'Dias_para_Vencer'] = 999
-
-    # ✅ FIX: Prox_Vencimiento solo sobre lotes con stock real (evita falsas alarmas)
-    df_lotes_con_stock = df_lotes[df_lotes['Stock_Lote'] > 0].copy()
-
-    # --- KPI: Salidas por producto para Rotación y Días de Cobertura ---
-    # Cruzamos Salidas → Ingresos → Producto para saber cuánto se consumió de cada producto
-    if not df_s.empty and 'Ingreso_ID' in df_s.columns:
-        # Traemos el código de producto desde los ingresos
-        df_s_prod = pd.merge(
-            df_s[['Ingreso_ID', 'Cantidad_Usada']],
-            df_i[['id', 'Codigo_Producto']],
-            left_on='Ingreso_ID', right_on='id', how='left'
-        )
-        salidas_por_prod = df_s_prod.groupby('Codigo_Producto')['Cantidad_Usada'].sum().reset_index()
-        salidas_por_prod.columns = ['Codigo', 'Total_Salidas']
-    else:
-        salidas_por_prod = pd.DataFrame(columns=['Codigo', 'Total_Salidas'])
-
-    # ✅ Calculamos Prox_Vencimiento FUERA del groupby para evitar el KeyError de índices
-    # Solo contamos lotes que aún tienen stock real (evita falsas alarmas de lotes vacíos)
-    venc_con_stock = (
-        df_lotes_con_stock.groupby('Codigo')['Dias_para_Vencer']
-        .min()
-        .reset_index()
-        .rename(columns={'Dias_para_Vencer': 'Prox_Vencimiento'})
-    )
-
-    # Vista agrupada por PRODUCTO (sin Prox_Vencimiento por ahora)
-    df_por_producto = (
-        df_lotes.groupby(['Codigo', 'Producto', 'Unidad', 'Tipo_Accion', 'Stock_Minimo', 'Activo',
-                          'Ingrediente_Activo', 'Marca', 'Formulacion', 'Banda_Toxicologica', 'Ficha_Tecnica_URL'],
-                         dropna=False)
-        .agg(
-            Stock_Total    =('Stock_Lote',    'sum'),
-            Valorizado_PEN =('Valorizado_PEN', 'sum'),
-            N_Lotes        =('Codigo_Lote',    'count'),
-        )
-        .reset_index()
-    )
-
-    # Incorporamos Prox_Vencimiento limpio (999 = sin vencimiento próximo)
-    df_por_producto = pd.merge(df_por_producto, venc_con_stock, on='Codigo', how='left')
-    df_por_producto['Prox_Vencimiento'] = df_por_producto['Prox_Vencimiento'].fillna(999).astype(int)
-
-
-
-    # Unir Total_Salidas
-    df_por_producto = pd.merge(df_por_producto, salidas_por_prod, on='Codigo', how='left')
-    df_por_producto['Total_Salidas'] = df_por_producto['Total_Salidas'].fillna(0.0)
-
-    # --- KPIs derivados ---
-    PERIODO_DIAS = 180  # Ventana de cálculo: últimos 6 meses
-
-    # ✅ División segura: reemplazamos 0 con NaN ANTES de dividir.
-    # np.where evalúa ambas ramas siempre, por eso no podemos usarlo con divisiones.
-    stock_safe   = df_por_producto['Stock_Total'].replace(0, np.nan)
-    consumo_diario = df_por_producto['Total_Salidas'] / PERIODO_DIAS
-    consumo_safe = consumo_diario.replace(0, np.nan)
-
-    # Rotación = Total salidas / Stock actual  (NaN si sin stock)
-    df_por_producto['Rotacion'] = (df_por_producto['Total_Salidas'] / stock_safe).round(2)
-
-    # Días de Cobertura = Stock actual / consumo diario  (NaN si sin consumo)
-    df_por_producto['Dias_Cobertura'] = (df_por_producto['Stock_Total'] / consumo_safe).round(0)
-
-    # Stock Muerto = tiene stock pero 0 salidas registradas
-    df_por_producto['Stock_Muerto'] = (
-        (df_por_producto['Stock_Total'] > 0) & (df_por_producto['Total_Salidas'] == 0)
-    )
-
-    return df_lotes, df_por_producto
+    # ⚡ Las tres tablas viajan a la vez: se espera sólo a la más lenta
+    res = fetch_varios({
+        'Productos': lambda: fetch('Productos', vista='Gestión de Productos y Kardex', orden='Producto'),
+        'Ingresos':  lambda: fetch('Ingresos',
+            "id, Codigo_Producto, Codigo_Lote, Cantidad_Ingresada, Precio_Unitario_PEN, "
+            "Fecha_Vencimiento, Proveedor, Factura, Observaciones, Estado_Registro, Guia_Remision, Responsable"
+        ),
+        # 💡 Una fila por lote: vista Salidas_por_Ingreso o delta-sync + groupby (nucleo/agregados.py)
+        'Salidas':   lambda: agregados.salidas_por_ingreso(),
+    })
+    return res['Productos'], res['Ingresos'], res['Salidas']
 
 
 # --- 4. PROCESAMIENTO Y ANÁLISIS ABC ---
 df_p, df_i, df_s          = cargar_todo()
+# Un stock calculado sin alguna de las tres tablas sería falso: mejor no mostrarlo
+_fallidas = [d.attrs['tabla'] for d in (df_p, df_i, df_s) if 'error' in d.attrs]
+if _fallidas:
+    st.error(f"❌ No se pudo cargar: {', '.join(_fallidas)}. Reintente en unos segundos.")
+    st.stop()
 df_kardex_lotes, df_kardex = generar_kardex(df_p, df_i, df_s)
 
 # Análisis ABC sobre la vista agrupada
@@ -313,12 +204,8 @@ if not df_vista.empty:
 
     # Exportación Excel
     st.write("")
-    buffer = io.BytesIO()
-    with pd.ExcelWriter(buffer, engine='xlsxwriter') as writer:
-        df_vista[cols_visibles].to_excel(writer, index=False)
-    st.download_button("📥 Descargar Reporte (Excel)", data=buffer.getvalue(),
-                       file_name=f"Kardex_{date.today()}.xlsx",
-                       mime="application/vnd.ms-excel")
+    exportar.boton_descarga("📥 Descargar Reporte (Excel)", df_vista[cols_visibles],
+                            f"Kardex_{date.today()}.xlsx", hoja='Sheet1')
 
     # --- 9. DETALLE DE LOTES AL SELECCIONAR UN PRODUCTO ---
     filas_sel = sel.selection.rows
@@ -360,8 +247,6 @@ if not df_vista.empty:
             if not match.empty:
                 supabase.table('Productos').update({"Activo": False}).eq('id', int(match.iloc[0]['id'])).execute()
                 st.success(f"'{prod_sel}' archivado correctamente.")
-                # ✅ MEJORA 2: Caché específica, no global
-                cargar_todo.clear()
                 st.rerun()
 
         # Panel de ficha técnica / toxicidad
@@ -454,8 +339,6 @@ if st.session_state.editing_product_id:
                     }
                     supabase.table('Productos').update(data_upd).eq('id', p['id']).execute()
                     st.session_state.editing_product_id = None
-                    # ✅ MEJORA 2: Caché específica
-                    cargar_todo.clear()
                     st.rerun()
 
             if st.button("❌ Cancelar Edición"):
@@ -3,7 +3,9 @@ import pandas as pd
 from datetime import datetime, date
 from typing import Optional
 from pydantic import BaseModel, ValidationError, field_validator
-from supabase import create_client
+from nucleo.cache_memoria import cache_memoria
+from nucleo.datos import fallida, fetch, obtener_cliente
+from nucleo.versiones import segun_version
 
 # 🚨 CANDADO VIP: EXCLUSIVO PARA ALMACÉN
 if "autenticado" not in st.session_state or not st.session_state["autenticado"]:
@@ -65,25 +67,24 @@ class IngresoSchema(BaseModel):
         return v
 
 # --- 3. CONEXIÓN ---
-@st.cache_resource
-def init_supabase():
-    return create_client(st.secrets["SUPABASE_URL"], st.secrets["SUPABASE_KEY"])
-
-supabase = init_supabase()
+supabase = obtener_cliente()
 
 # --- 4. FUNCIONES DE CARGA (con caché específico) ---
-@st.cache_data(ttl=60)
-def get_products():
-    res = supabase.table('Productos').select("Codigo, Producto").execute()
-    df = pd.DataFrame(res.data)
+@segun_version('Productos', sondeo=60)  # 💡 el catálogo casi no cambia: se sondea antes de bajarlo
+@cache_memoria(ttl=3600, ttl_vacio=30)  # ✅ un catálogo vacío no queda una hora
+def get_products(version=None):
+    try:
+        df = fetch('Productos', "Codigo, Producto")
+    except Exception as e:
+        return fallida('Productos', e)
     return df if not df.empty else pd.DataFrame(columns=['Codigo', 'Producto'])
 
-@st.cache_data(ttl=30)
-def get_history():
+@segun_version('Ingresos', 'Productos', sondeo=30)
+@cache_memoria(ttl=30)
+def get_history(version=None):
     try:
-        res_i = supabase.table('Ingresos').select("*").order('created_at', desc=True).limit(100).execute()
-        res_p = supabase.table('Productos').select("Codigo, Producto").execute()
-        df_i, df_p = pd.DataFrame(res_i.data), pd.DataFrame(res_p.data)
+        df_i = fetch('Ingresos', orden='-created_at', limite=100)
+        df_p = fetch('Productos', "Codigo, Producto")
         if df_i.empty: return pd.DataFrame()
         if df_p.empty:
             df_i['Producto'] = "N/A"
@@ -101,6 +102,8 @@ st.markdown("""
 """, unsafe_allow_html=True)
 
 df_p = get_products()
+if 'error' in df_p.attrs:
+    st.error(f"❌ Error al cargar el catálogo de productos: {df_p.attrs['error']}")
 
 # --- DIÁLOGO PARA CREAR PRODUCTO NUEVO ---
 @st.dialog("📦 Registrar Nuevo Producto en el Catálogo")
@@ -146,8 +149,6 @@ def modal_crear_producto():
                     }
                     supabase.table('Productos').insert(nuevo_prod).execute()
                     st.success(f"¡{n_nom} agregado al catálogo con éxito!")
-                    # ✅ MEJORA 4: Limpieza de caché específica, no global
-                    get_products.clear()
                     st.rerun()
                 except Exception as e:
                     st.error(f"Error (¿Código duplicado?): {e}")
@@ -217,8 +218,6 @@ with st.form("form_registro", clear_on_submit=True):
                     )
                     supabase.table('Ingresos').insert(nuevo.model_dump(mode='json')).execute()
                     st.success(f"✅ Ingreso registrado como **{estado_actual}** | Total: **S/ {total_calculado:,.2f}**")
-                    # ✅ MEJORA 4: Solo limpiamos el caché del historial, no de todo el sistema
-                    get_history.clear()
                     st.rerun()
                 except Exception as e:
                     st.error(f"Error al guardar: {e}")
@@ -282,7 +281,6 @@ if not df_hist.empty:
                             "Factura": n_fact, "Precio_Unitario_PEN": n_precio, "Estado_Registro": "Completo 🟢"
                         }).eq('id', int(real_id)).execute()
                         st.success("✅ Registro actualizado.")
-                        get_history.clear()
                         st.rerun()
 
         # BOTÓN 2: ANULAR INGRESO (Cero borrados, por trazabilidad)
@@ -298,7 +296,6 @@ if not df_hist.empty:
                                 "Cantidad_Ingresada": 0, "Estado_Registro": "ANULADO ❌", "Motivo_Anulacion": motivo
                             }).eq('id', int(real_id)).execute()
                             st.success("Movimiento anulado por trazabilidad.")
-                            get_history.clear()
                             st.rerun()
                         else:
                             st.error("Debes escribir un motivo para la auditoría.")
@@ -24,24 +24,31 @@ st.markdown("""
     """, unsafe_allow_html=True)
 
 # --- 3. CONEXIÓN A SUPABASE ---
-from supabase import create_client
-@st.cache_resource
-def init_supabase():
-    return create_client(st.secrets["SUPABASE_URL"], st.secrets["SUPABASE_KEY"])
+from nucleo import exportar
+from nucleo.cache_memoria import cache_memoria
+from nucleo.datos import fallida, fetch, obtener_cliente
+from nucleo.versiones import segun_version
 
-supabase = init_supabase()
+supabase = obtener_cliente()
 
 # --- 4. CARGA DE CATÁLOGOS (Personal para Jefes de Cuadrilla) ---
-@st.cache_data(ttl=60)
-def cargar_personal_cosecha():
+@segun_version('Personal', sondeo=60)
+@cache_memoria(ttl=3600, ttl_vacio=30)  # ✅ un catálogo vacío no queda una hora
+def cargar_personal_cosecha(version=None):
     try:
-        res = supabase.table('Personal').select("id, nombre_completo").eq('activo', True).execute()
-        return pd.DataFrame(res.data)
+        return fetch('Personal', "id, nombre_completo", filtros={'activo': True})
     except Exception as e:
-        st.error(f"❌ Error al cargar catálogo de personal: {e}")
-        return pd.DataFrame()
+        return fallida('Personal', e)   # no se cachea: el próximo rerun reintenta
+
+@segun_version('Registro_Cosecha')
+@cache_memoria(ttl=60)
+def cargar_historial_cosecha(version=None):
+    # 💡 Sólo las columnas que muestra la pestaña de historial (nucleo/columnas.py)
+    return fetch('Registro_Cosecha', vista='Gestión de Cosecha', orden='-Fecha')
 
 df_pers = cargar_personal_cosecha()
+if 'error' in df_pers.attrs:
+    st.error(f"❌ Error al cargar catálogo de personal: {df_pers.attrs['error']}")
 
 # --- 5. INTERFAZ PRINCIPAL ---
 st.title("🍇 Control de Cosecha y Rendimiento de Fruta")
@@ -120,9 +127,8 @@ with tab_hist:
     st.subheader("📚 Trazabilidad de Producción por Sectores")
     
     try:
-        # Jalamos el historial crudo directamente de Supabase
-        res_h = supabase.table('Registro_Cosecha').select("*").order('Fecha', desc=True).execute()
-        df_cosecha_raw = pd.DataFrame(res_h.data)
+        # Historial cacheado; un ingreso nuevo sube la versión de Registro_Cosecha y lo refresca
+        df_cosecha_raw = cargar_historial_cosecha()
         
         if df_cosecha_raw.empty:
             st.info("📊 El almacén de acopio está vacío. Esperando los primeros ingresos de fruta de la campaña.")
@@ -164,12 +170,10 @@ with tab_hist:
             )
             
             # Botón para descargar reporte para el directorio o packing
-            csv_cosecha = df_view.to_csv(index=False).encode('utf-8-sig')
-            st.download_button(
-                label="📥 Descargar Reporte de Cosecha (CSV)",
-                data=csv_cosecha,
-                file_name=f"Reporte_Cosecha_Rendimiento_{date.today()}.csv",
-                mime="text/csv"
+            exportar.boton_descarga(
+                "📥 Descargar Reporte de Cosecha (CSV)",
+                df_view,
+                f"Reporte_Cosecha_Rendimiento_{date.today()}.csv"
             )
             
     except Exception as e:
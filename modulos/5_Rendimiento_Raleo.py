@@ -1,9 +1,13 @@
 import streamlit as st
 import pandas as pd
 from datetime import datetime, timedelta
-import plotly.express as px
-from io import BytesIO
-from supabase import create_client, Client
+from nucleo import exportar
+from nucleo.cache_memoria import cache_memoria
+from nucleo.cache_tablas import tabla_incremental
+from nucleo.datos import ErrorDatos, obtener_cliente
+from nucleo.perezoso import modulo_perezoso
+from nucleo.versiones import segun_version
+px = modulo_perezoso("plotly.express")   # ⚡ plotly se importa al dibujar el primer gráfico
 
 # 🚨 CANDADO DE SEGURIDAD
 if "autenticado" not in st.session_state or not st.session_state["autenticado"]:
@@ -24,29 +28,23 @@ st.write("Analiza el rendimiento del personal, calcula los pagos y visualiza el
 # La tarifa real se asigna en el sidebar para que Admin pueda ajustarla sin tocar el código
 TARIFA_POR_RACIMO_DEFAULT = 0.07
 
-# --- FUNCIÓN DE CONEXIÓN SEGURA A SUPABASE ---
-@st.cache_resource
-def init_supabase_connection():
-    try:
-        url = st.secrets["SUPABASE_URL"]
-        key = st.secrets["SUPABASE_KEY"]
-        return create_client(url, key)
-    except Exception as e:
-        st.error(f"Error al conectar con Supabase: {e}")
-        return None
-
-supabase = init_supabase_connection()
+# --- CONEXIÓN SEGURA A SUPABASE (cliente compartido del proceso) ---
+try:
+    supabase = obtener_cliente()
+except ErrorDatos as e:
+    st.error(f"Error al conectar con Supabase: {e}")
+    supabase = None
 
 # --- NUEVAS FUNCIONES ADAPTADAS PARA SUPABASE ---
-@st.cache_data(ttl=60)
-def cargar_datos_raleo_supabase():
+@segun_version('Control_Raleo')
+@cache_memoria(ttl=60)
+def cargar_datos_raleo_supabase(version=None):
     """Carga, limpia y procesa los datos de raleo desde la tabla de Supabase."""
     if supabase is None:
         return pd.DataFrame()
     
     try:
-        response = supabase.table('Control_Raleo').select("*").execute()
-        df = pd.DataFrame(response.data)
+        df = tabla_incremental('Control_Raleo', paralelo=4, formato='csv')
         
         if df.empty:
             return pd.DataFrame()
@@ -60,13 +58,6 @@ def cargar_datos_raleo_supabase():
         st.error(f"Error al cargar los datos de raleo: {e}")
         return pd.DataFrame()
 
-def to_excel(df):
-    """Convierte un DataFrame a un archivo Excel en memoria para descarga."""
-    output = BytesIO()
-    with pd.ExcelWriter(output, engine='openpyxl') as writer:
-        df.to_excel(writer, index=False, sheet_name='Reporte_Raleo')
-    return output.getvalue()
-
 # --- CARGA Y FILTROS ---
 df_raleo = cargar_datos_raleo_supabase()
 
@@ -135,7 +126,7 @@ else:
 
     with col_graf1:
         st.subheader("🏆 Ranking de Personal")
-        df_ranking = df_filtrado.groupby('Nombre_del_Trabajador').agg(
+        df_ranking = df_filtrado.groupby('Nombre_del_Trabajador', observed=True).agg(
             Total_Racimos=('Racimos_Reales', 'sum')
         ).sort_values(by='Total_Racimos', ascending=True).reset_index().tail(10)
         fig_ranking = px.bar(
@@ -159,7 +150,7 @@ else:
 
     # Pie chart a ancho completo
     st.subheader("💰 Inversión por Sector")
-    df_sector_costo = df_filtrado.groupby('Sector')['Pago_Calculado_S'].sum().reset_index()
+    df_sector_costo = df_filtrado.groupby('Sector', observed=True)['Pago_Calculado_S'].sum().reset_index()
     fig_sector = px.pie(
         df_sector_costo, values='Pago_Calculado_S', names='Sector',
         title='Distribución de Pago por Lote', hole=0.4,
@@ -179,10 +170,9 @@ else:
     
     st.dataframe(df_display[columnas_display].sort_values(by="Fecha", ascending=False), use_container_width=True)
     
-    excel_data = to_excel(df_filtrado[columnas_display])
-    st.download_button(
-        label="📥 Descargar Reporte Filtrado a Excel",
-        data=excel_data,
-        file_name=f"Reporte_Raleo_{fecha_inicio.strftime('%Y%m%d')}_al_{fecha_fin.strftime('%Y%m%d')}.xlsx",
-        mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+    exportar.boton_descarga(
+        "📥 Descargar Reporte Filtrado a Excel",
+        df_filtrado[columnas_display],
+        f"Reporte_Raleo_{fecha_inicio.strftime('%Y%m%d')}_al_{fecha_fin.strftime('%Y%m%d')}.xlsx",
+        hoja='Reporte_Raleo'
     )
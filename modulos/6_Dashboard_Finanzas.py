@@ -1,8 +1,6 @@
 import streamlit as st
 import pandas as pd
-import plotly.express as px
 from datetime import datetime, date, timedelta
-from io import BytesIO
 
 # --- 1. CANDADO DE SEGURIDAD ---
 if "autenticado" not in st.session_state or not st.session_state["autenticado"]:
@@ -18,31 +16,34 @@ if st.session_state.get("rol", "") not in ["Admin", "Programador", "Costos"]:
 st.set_page_config(page_title="Módulo Financiero - Project Uva", page_icon="💰", layout="wide")
 
 # --- 3. CONEXIÓN A SUPABASE ---
-from supabase import create_client
+from nucleo import agregados, exportar, instantaneas
+from nucleo.cache_memoria import cache_memoria
+from nucleo.calculos import armar_planilla
+from nucleo.datos import fetch, obtener_cliente
+from nucleo.perezoso import modulo_perezoso
+from nucleo.versiones import segun_version
+px = modulo_perezoso("plotly.express")   # ⚡ plotly se importa al dibujar el primer gráfico
 
-@st.cache_resource
-def init_supabase():
-    return create_client(st.secrets["SUPABASE_URL"], st.secrets["SUPABASE_KEY"])
-
-supabase = init_supabase()
+supabase = obtener_cliente()
 
 # --- 4. CARGA DE DATA ---
-@st.cache_data(ttl=60)
-def cargar_data_financiera():
+@segun_version('Registro_Horas_Tractor', 'Personal', sondeo=60)
+@cache_memoria(ttl=60)
+def cargar_data_financiera(version=None):
     try:
-        res_horas    = supabase.table('Registro_Horas_Tractor').select("*").execute()
-        res_personal = supabase.table('Personal').select("id, nombre_completo, rol, Sueldo_Hora, activo").execute()
-        return pd.DataFrame(res_horas.data), pd.DataFrame(res_personal.data)
+        # 💡 Con instantánea vigente (nucleo/instantaneas.py) se lee el Parquet local y no la API
+        df_horas    = instantaneas.leer('Registro_Horas_Tractor', vista='Dashboard Finanzas')
+        if df_horas is None:
+            df_horas = fetch('Registro_Horas_Tractor', vista='Dashboard Finanzas')
+        columnas_personal = ["id", "nombre_completo", "rol", "Sueldo_Hora", "activo"]
+        df_personal = instantaneas.leer('Personal', columnas_personal)
+        if df_personal is None:
+            df_personal = fetch('Personal', columnas_personal)
+        return df_horas, df_personal
     except Exception as e:
         st.error(f"❌ Error crítico en servidor: {e}")
         return pd.DataFrame(), pd.DataFrame()
 
-def to_excel_finanzas(df):
-    output = BytesIO()
-    with pd.ExcelWriter(output, engine='xlsxwriter') as writer:
-        df.to_excel(writer, index=False, sheet_name='Planilla')
-    return output.getvalue()
-
 df_horas_raw, df_personal_raw = cargar_data_financiera()
 
 # --- 5. INTERFAZ PRINCIPAL ---
@@ -69,25 +70,8 @@ st.sidebar.header("🗓️ Periodo de Liquidación")
 f_inicio = st.sidebar.date_input("Fecha Inicio", value=date.today() - timedelta(days=30))
 f_fin    = st.sidebar.date_input("Fecha Fin",    value=date.today() + timedelta(days=1))
 
-# ✅ FIX: NaT-safe date conversion
-df_horas_raw['Fecha'] = pd.to_datetime(df_horas_raw['Fecha'], errors='coerce')
-df_horas_raw = df_horas_raw.dropna(subset=['Fecha'])
-df_horas_raw['Fecha_date'] = df_horas_raw['Fecha'].dt.date
-df_horas_filtradas = df_horas_raw[
-    (df_horas_raw['Fecha_date'] >= f_inicio) & (df_horas_raw['Fecha_date'] <= f_fin)
-]
-
-# Cruce relacional
-df_planilla = pd.merge(
-    df_horas_filtradas,
-    df_personal_raw[['id', 'nombre_completo', 'rol', 'Sueldo_Hora']],
-    left_on='personal_id', right_on='id', how='left'
-)
-
-# Filtrar solo tractoristas/operadores
-if not df_planilla.empty and 'rol' in df_planilla.columns:
-    df_planilla['rol_clean'] = df_planilla['rol'].astype(str).str.strip().str.lower()
-    df_planilla = df_planilla[df_planilla['rol_clean'].isin(['tractorista', 'operador', 'maquinista'])]
+# Cruce relacional horas → personal (sólo tractoristas/operadores del periodo)
+df_horas_filtradas, df_planilla = armar_planilla(df_horas_raw, df_personal_raw, f_inicio, f_fin)
 
 if df_planilla.empty:
     st.warning("⏳ No se encontraron aplicaciones de tractoristas en este rango de fechas.")
@@ -160,11 +144,8 @@ AREAS_SECTOR = {
 }
 
 if 'Sector' in df_planilla.columns:
-    df_costo_sector = df_planilla.groupby('Sector').agg(
-        Costo_Total   =('Total_Pago_Labor', 'sum'),
-        Horas_Total   =('Total_Horas',      'sum'),
-        Jornadas      =('Fecha_date',       'nunique'),
-    ).reset_index()
+    # 💡 Con PROYECTO_UVA_AGREGADOS_SERVIDOR=1 lo calcula la RPC horas_tractor_por_sector (sql/migraciones/003)
+    df_costo_sector = agregados.horas_tractor_por_sector(f_inicio, f_fin, df_planilla)
     
     df_costo_sector['Hectareas'] = df_costo_sector['Sector'].map(AREAS_SECTOR).fillna(1.5)
     df_costo_sector['Costo_por_Ha'] = (df_costo_sector['Costo_Total'] / df_costo_sector['Hectareas']).round(2)
@@ -242,12 +223,11 @@ st.dataframe(
 )
 
 # Descarga Excel
-excel_data = to_excel_finanzas(df_resumen)
-st.download_button(
-    label="📥 Descargar Planilla (Excel)",
-    data=excel_data,
-    file_name=f"Planilla_{f_inicio.strftime('%Y%m%d')}_al_{f_fin.strftime('%Y%m%d')}.xlsx",
-    mime="application/vnd.ms-excel"
+exportar.boton_descarga(
+    "📥 Descargar Planilla (Excel)",
+    df_resumen,
+    f"Planilla_{f_inicio.strftime('%Y%m%d')}_al_{f_fin.strftime('%Y%m%d')}.xlsx",
+    hoja='Planilla'
 )
 
 st.divider()
@@ -1,8 +1,13 @@
 import streamlit as st
 import pandas as pd
 from datetime import datetime, date, timedelta
-import plotly.express as px
-from supabase import create_client
+from nucleo import agregados, instantaneas
+from nucleo.cache_memoria import cache_memoria
+from nucleo.cache_tablas import tabla_incremental
+from nucleo.datos import fetch, fetch_varios, obtener_cliente
+from nucleo.perezoso import modulo_perezoso
+from nucleo.versiones import segun_version
+px = modulo_perezoso("plotly.express")   # ⚡ plotly se importa al dibujar el primer gráfico
 
 # 🚨 CANDADO VIP: EXCLUSIVO PARA JEFATURA
 if "autenticado" not in st.session_state or not st.session_state["autenticado"]:
@@ -35,31 +40,42 @@ st.markdown("""
     """, unsafe_allow_html=True)
 
 # --- 2. CONEXIÓN A SUPABASE ---
-@st.cache_resource
-def init_supabase():
-    return create_client(st.secrets["SUPABASE_URL"], st.secrets["SUPABASE_KEY"])
-
-supabase = init_supabase()
+supabase = obtener_cliente()
 
 # --- 3. EXTRACCIÓN DE DATOS GLOBALES (Caché de 5 mins para rendimiento) ---
-@st.cache_data(ttl=300)
-def cargar_datos_maestros_v2():
+@segun_version('Monitoreo_Mosca', 'Control_Raleo', 'Ordenes_de_Trabajo', 'Diametro_Baya', 'Evaluaciones_Fenologicas', 'Clima')
+@cache_memoria(ttl=300)
+def cargar_datos_maestros_v2(version=None):
     hoy = date.today()
     hace_30_dias = hoy - timedelta(days=30)
     
-    # Manejo de errores individual por tabla para evitar que el dashboard caiga completo
+    PARALELO = 4  # ventanas Range simultáneas por tabla (las históricas pasan de 1000 filas)
+    
+    # 💡 Sólo se piden las columnas declaradas en nucleo/columnas.py (nada de select *)
     def fetch_table(table_name):
-        try:
-            return pd.DataFrame(supabase.table(table_name).select("*").execute().data)
-        except:
-            return pd.DataFrame()
-
-    df_mosca = fetch_table('Monitoreo_Mosca')
-    df_raleo = fetch_table('Control_Raleo')
-    df_ots = fetch_table('Ordenes_de_Trabajo')
-    df_diam = fetch_table('Diametro_Baya')
-    df_feno = fetch_table('Evaluaciones_Fenologicas')
-    df_clima = fetch_table('Clima')
+        # 💡 Si el trabajo de instantáneas corrió (nucleo/instantaneas.py) se lee el Parquet local, no la API.
+        # Raleo y mosca sólo se usan sumados por fecha/sector: el group-by corre sobre el Parquet
+        if table_name == 'Control_Raleo':
+            df = instantaneas.agrupar(table_name, ['Fecha'], {'Racimos_Reales': ('Racimos_Reales', 'sum')})
+        elif table_name == 'Monitoreo_Mosca':
+            df = instantaneas.agrupar(table_name, ['Fecha', 'Sector'], {'Ceratitis_capitata': ('Ceratitis_capitata', 'sum')})
+        else:
+            df = instantaneas.leer(table_name, vista='Dashboard General', normalizar=True)
+        if df is not None:
+            return df
+        if table_name == 'Monitoreo_Mosca':
+            # 💡 Con PROYECTO_UVA_AGREGADOS_SERVIDOR=1 viaja la vista Mosca_por_Sector_Fecha (una fila por sector y día)
+            return agregados.mosca_por_sector_fecha(['Ceratitis_capitata'])
+        if table_name in ('Control_Raleo', 'Diametro_Baya', 'Clima'):  # sólo crecen: delta-sync
+            # 💡 Tablas planas y grandes: viajan como CSV con tipos declarados (nucleo/tipos.py)
+            return tabla_incremental(table_name, vista='Dashboard General', paralelo=PARALELO, formato='csv')
+        return fetch(table_name, vista='Dashboard General', paralelo=PARALELO, normalizar=True)
+
+    # ⚡ Las 6 tablas viajan a la vez: la primera carga tarda lo que la tabla más lenta.
+    # fetch_varios aísla errores por tabla (vacía si falla) para que el dashboard no caiga completo
+    tablas = ['Monitoreo_Mosca', 'Control_Raleo', 'Ordenes_de_Trabajo', 'Diametro_Baya', 'Evaluaciones_Fenologicas', 'Clima']
+    res = fetch_varios({t: (lambda t=t: fetch_table(t)) for t in tablas})
+    df_mosca, df_raleo, df_ots, df_diam, df_feno, df_clima = res.values()
     
     # Procesamiento básico si hay datos
     if not df_mosca.empty: df_mosca['Fecha'] = pd.to_datetime(df_mosca['Fecha'])
@@ -208,7 +224,7 @@ col_alert1, col_alert2 = st.columns(2)
 with col_alert1:
     st.markdown("**🪰 Sectores con Mayor Presencia de Ceratitis (Histórico)**")
     if not df_mosca.empty:
-        df_mosca_alert = df_mosca.groupby('Sector')['Ceratitis_capitata'].sum().reset_index().sort_values(by='Ceratitis_capitata', ascending=False)
+        df_mosca_alert = df_mosca.groupby('Sector', observed=True)['Ceratitis_capitata'].sum().reset_index().sort_values(by='Ceratitis_capitata', ascending=False)
         df_mosca_alert = df_mosca_alert[df_mosca_alert['Ceratitis_capitata'] > 0].head(5)
         if not df_mosca_alert.empty:
             st.dataframe(df_mosca_alert, use_container_width=True, hide_index=True)
@@ -245,7 +261,7 @@ with col_crec1:
             # Calculamos el promedio de la planta en esa fila
             df_diam['Promedio_Planta'] = df_diam[cols_medicion].mean(axis=1)
             # Agrupamos por Fecha y Sector
-            df_diam_hist = df_diam.groupby(['Fecha', 'Sector'])['Promedio_Planta'].mean().reset_index()
+            df_diam_hist = df_diam.groupby(['Fecha', 'Sector'], observed=True)['Promedio_Planta'].mean().reset_index()
             
             fig_diam = px.line(
                 df_diam_hist, x='Fecha', y='Promedio_Planta', color='Sector',
@@ -267,7 +283,7 @@ with col_crec2:
         
         # Columnas de fenología
         cols_feno = ['Punta_algodon', 'Punta_verde', 'Salida_de_hojas', 'Hojas_extendidas', 'Racimos_visibles']
-        df_feno_resumen = df_feno_reciente.groupby('Sector')[cols_feno].sum().reset_index()
+        df_feno_resumen = df_feno_reciente.groupby('Sector', observed=True)[cols_feno].sum().reset_index()
         
         # Transformar para plotly (Melt)
         df_feno_melt = df_feno_resumen.melt(id_vars=['Sector'], value_vars=cols_feno, var_name='Etapa', value_name='Conteo')
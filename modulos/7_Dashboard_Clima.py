@@ -1,11 +1,17 @@
 import streamlit as st
 import pandas as pd
 import numpy as np
-import plotly.express as px
-import plotly.graph_objects as go
-import requests
 from datetime import datetime, timedelta
-from supabase import create_client
+from nucleo.cache_disco import cache_disco
+from nucleo.cache_memoria import cache_memoria
+from nucleo.cache_tablas import tabla_incremental
+from nucleo.calculos import calcular_dpv, calcular_riesgo_plagas, generar_datos_demo
+from nucleo.datos import fallida, fetch, obtener_cliente
+from nucleo.perezoso import modulo_perezoso
+from nucleo.versiones import segun_version
+px = modulo_perezoso("plotly.express")   # ⚡ plotly se importa al dibujar el primer gráfico
+go = modulo_perezoso("plotly.graph_objects")
+requests = modulo_perezoso("requests")   # sólo para los respaldos Open-Meteo / NASA
 
 # 🚨 1. CANDADO DE SEGURIDAD (Portero)
 if "autenticado" not in st.session_state or not st.session_state["autenticado"]:
@@ -17,29 +23,32 @@ st.title("🌤️ Estación Meteorológica e Índice de Estrés")
 st.markdown("Monitorización del clima, DPV y radar predictivo de riesgo sanitario.")
 
 # --- CONEXIÓN ---
-@st.cache_resource
-def init_supabase():
-    try:
-        return create_client(st.secrets["SUPABASE_URL"], st.secrets["SUPABASE_KEY"])
-    except:
-        return None
+try:
+    supabase = obtener_cliente()
+except:
+    supabase = None
 
-supabase = init_supabase()
+VENTANA_CLIMA = 30 * 86400   # s; con una lectura por hora o más seguida cubre las 500 que se muestran
 
-def obtener_datos_clima_supabase():
+@segun_version('clima')
+@cache_disco(ttl=60)
+def obtener_datos_clima_supabase(version=None):
+    # Sin st.* aquí: cache_disco puede correrlo en un hilo de fondo (ver nucleo/cache_disco.py)
     if supabase:
         try:
-            res = supabase.table("clima").select("*").order("fecha_hora", desc=True).limit(500).execute()
-            if res.data:
-                df = pd.DataFrame(res.data)
+            # Delta-sync por fecha_hora: en cada rerun sólo viajan las lecturas nuevas;
+            # cada hora se reconcilia por id para traer lecturas cargadas con retraso.
+            # ✅ Con ventana sólo se guardan los últimos 30 días: el historial de la estación no se acumula
+            df = tabla_incremental("clima", reconciliar_cada=3600, formato="csv", ventana=VENTANA_CLIMA)
+            if not df.empty:
                 df['fecha_hora'] = pd.to_datetime(df['fecha_hora'])
-                return df.sort_values('fecha_hora')
+                return df.sort_values('fecha_hora').tail(500)
         except Exception as e:
-            st.sidebar.warning(f"⚠️ Supabase Clima: {e}")
+            return fallida('clima', e)
     return pd.DataFrame()
 
 # ── FUENTE 2: Open-Meteo ──────────────────────
-@st.cache_data(ttl=3600)
+@cache_disco(ttl=3600)  # ✅ compartido entre réplicas: menos golpes a Open-Meteo (429)
 def _fetch_open_meteo():
     lat, lon = -7.156903, -79.445073
     url = (
@@ -80,7 +89,7 @@ def obtener_datos_clima_openmeteo():
     return df
 
 # ── FUENTE 3: NASA POWER (sin API key, gratis, agroclimático) ──────
-@st.cache_data(ttl=21600)  # 6 horas
+@cache_memoria(ttl=21600)  # 6 horas
 def obtener_datos_nasa_power():
     """API de la NASA para datos agroclimáticos — sin clave, sin límites estrictos."""
     lat, lon = -7.156903, -79.445073
@@ -117,56 +126,9 @@ def obtener_datos_nasa_power():
     return pd.DataFrame()
 
 # ── FUENTE 4: MODO DEMO (datos sintéticos realistas para exposiciones) ──
-def generar_datos_demo():
-    """Genera 14 días de clima realista para la costa norte del Perú (Trujillo/Pacanguilla)."""
-    np.random.seed(42)
-    horas = pd.date_range(end=datetime.now(), periods=24*14, freq="h")
-    hora_del_dia = horas.hour
-
-    # Temperatura: ciclo diurno costero (fresco de madrugada, pico al mediodía)
-    temp_base = 22 + 4 * np.sin((hora_del_dia - 6) * np.pi / 12)
-    temp = temp_base + np.random.normal(0, 0.8, len(horas))
-
-    # Humedad: inversamente relacionada con temp (alta de noche, baja al mediodía)
-    hum_base = 85 - 12 * np.sin((hora_del_dia - 6) * np.pi / 12)
-    hum = np.clip(hum_base + np.random.normal(0, 3, len(horas)), 55, 98)
-
-    # Radiación solar: solo de día (6am-6pm)
-    rad = np.where((hora_del_dia >= 6) & (hora_del_dia <= 18),
-                   600 * np.sin((hora_del_dia - 6) * np.pi / 12) + np.random.normal(0, 40, len(horas)),
-                   0)
-    rad = np.clip(rad, 0, 900)
-
-    # Viento y lluvia
-    viento = np.abs(np.random.normal(8, 3, len(horas)))
-    lluvia = np.where(np.random.random(len(horas)) < 0.02, np.random.uniform(0.2, 2.5, len(horas)), 0)
-
-    return pd.DataFrame({
-        "fecha_hora":     horas,
-        "temp_out":       temp.round(1),
-        "hum_out":        hum.round(1),
-        "lluvia_mm":      lluvia.round(2),
-        "viento_vel":     viento.round(1),
-        "radiacion_solar":rad.round(0),
-    })
-
 # ─────────────────────────────────────────────
 # 3. FUNCIÓN DPV (Déficit de Presión de Vapor)
 # ─────────────────────────────────────────────
-def calcular_dpv(temp_c, hr_pct):
-    """
-    DPV (kPa) = Presión de vapor saturante × (1 − HR/100)
-    Referencia: Allen et al. (1998), FAO-56.
-    Rango: 
-      <0.4  → Zona húmeda (riesgo Botrytis/Oidio)
-      0.4-0.8 → Óptimo bajo (crecimiento activo con riesgo)
-      0.8-1.6 → Óptimo vitícola ✅
-      1.6-2.5 → Estrés hídrico leve ⚠️
-      >2.5  → Estrés severo (estomas cerrados) 🔥
-    """
-    svp = 0.6108 * np.exp(17.27 * temp_c / (temp_c + 237.3))
-    return svp * (1 - hr_pct / 100)
-
 def zona_dpv(dpv):
     if dpv < 0.4:   return "🌧️ Zona Húmeda"
     if dpv < 0.8:   return "🌿 Óptimo Bajo"
@@ -174,54 +136,13 @@ def zona_dpv(dpv):
     if dpv < 2.5:   return "⚠️ Estrés Leve"
     return "🔥 Estrés Severo"
 
-# ─────────────────────────────────────────────
-# 4. FUNCIÓN RADAR DE RIESGO DE PLAGAS
-# ─────────────────────────────────────────────
-def calcular_riesgo_plagas(df_pasado):
-    """
-    Calcula índices de riesgo para las 3 plagas/enfermedades clave.
-    Devuelve un dict con puntaje 0-100 y nivel de alerta.
-    """
-    if df_pasado.empty:
-        return {}
-
-    temp  = df_pasado['temp_out']
-    hr    = df_pasado['hum_out']
-    dpv   = df_pasado['dpv']
-    n     = len(df_pasado)
-
-    # --- OIDIO (Uncinula necator) ---
-    # Favorable: 20-30°C y HR > 60% y DPV < 1.2
-    h_oidio = ((temp >= 20) & (temp <= 30) & (hr > 60) & (dpv < 1.2)).sum()
-    riesgo_oidio = min(100, round(h_oidio / n * 200))
-
-    # --- BOTRYTIS (Botrytis cinerea) ---
-    # Favorable: 15-25°C y HR > 85%
-    h_bot = ((temp >= 15) & (temp <= 25) & (hr > 85)).sum()
-    riesgo_botrytis = min(100, round(h_bot / n * 250))
-
-    # --- ARAÑITA ROJA (Tetranychus urticae) ---
-    # Favorable: T > 28°C y HR < 50% (condiciones secas y calurosas)
-    h_ara = ((temp > 28) & (hr < 50)).sum()
-    riesgo_aranita = min(100, round(h_ara / n * 300))
-
-    def nivel(pct):
-        if pct < 20:  return "🟢 Bajo"
-        if pct < 50:  return "🟡 Moderado"
-        if pct < 75:  return "🟠 Alto"
-        return "🔴 Crítico"
-
-    return {
-        "Oidio":         {"pct": riesgo_oidio,    "nivel": nivel(riesgo_oidio)},
-        "Botrytis":      {"pct": riesgo_botrytis, "nivel": nivel(riesgo_botrytis)},
-        "Arañita Roja":  {"pct": riesgo_aranita,  "nivel": nivel(riesgo_aranita)},
-    }
-
 # ─────────────────────────────────────────────
 # CARGA DE DATOS + DIAGNÓSTICO
 # ─────────────────────────────────────────────
 # ── CADENA DE FALLBACK: Supabase → Open-Meteo → NASA POWER → Demo ──
 df_clima = obtener_datos_clima_supabase()
+if 'error' in df_clima.attrs:
+    st.sidebar.warning(f"⚠️ Supabase Clima: {df_clima.attrs['error']}")
 origen_datos = "🌡️ Estación Física (WeatherLink)"
 
 if df_clima.empty:
@@ -246,9 +167,9 @@ if df_clima is None or df_clima.empty:
     with st.expander("🔬 Ver Diagnóstico Técnico"):
         st.write("**Probando Supabase (tabla `clima`)...**")
         try:
-            res = supabase.table("clima").select("*").limit(1).execute()
-            if res.data:
-                st.success(f"✅ Supabase conecta y tiene datos: `{res.data[0]}`")
+            df_prueba = fetch("clima", limite=1)
+            if not df_prueba.empty:
+                st.success(f"✅ Supabase conecta y tiene datos: `{df_prueba.iloc[0].to_dict()}`")
             else:
                 st.warning("⚠️ Supabase conecta bien, pero la tabla `clima` está **VACÍA** — no se ha registrado ningún dato del sensor todavía.")
         except Exception as e:
@@ -1,7 +1,9 @@
 import streamlit as st
 import pandas as pd
 from datetime import datetime, date, timedelta
-from supabase import create_client
+from nucleo.cache_memoria import cache_memoria
+from nucleo.datos import fallida, fetch, obtener_cliente
+from nucleo.versiones import segun_version
 
 # 🚨 CANDADO DE SEGURIDAD
 if "autenticado" not in st.session_state or not st.session_state["autenticado"]:
@@ -29,21 +31,16 @@ st.markdown("""
 """, unsafe_allow_html=True)
 
 # --- CONEXIÓN ---
-@st.cache_resource
-def init_supabase():
-    return create_client(st.secrets["SUPABASE_URL"], st.secrets["SUPABASE_KEY"])
-
-supabase = init_supabase()
+supabase = obtener_cliente()
 
 # --- CARGA DE TAREAS ---
-@st.cache_data(ttl=30)
-def cargar_tareas():
+@segun_version('Tareas_Evaluador', sondeo=30)
+@cache_memoria(ttl=600)
+def cargar_tareas(version=None):
     try:
-        res = supabase.table('Tareas_Evaluador').select("*").order('Fecha', desc=True).limit(100).execute()
-        return pd.DataFrame(res.data) if res.data else pd.DataFrame()
+        return fetch('Tareas_Evaluador', orden='-Fecha', limite=100)
     except Exception as e:
-        st.sidebar.error(f"⚠️ Error cargando tareas: {e}")
-        return pd.DataFrame()
+        return fallida('Tareas_Evaluador', e)   # ✅ no se cachea: el próximo rerun reintenta
 
 # --- INTERFAZ ---
 st.title("📋 Asignar Tareas al Evaluador de Campo")
@@ -101,7 +98,6 @@ with tab_nueva:
             try:
                 supabase.table('Tareas_Evaluador').insert(tarea_data).execute()
                 st.success(f"✅ ¡Tarea enviada! El evaluador verá: **{modulo_corto}** en el sector **{sector_sel}** para el **{fecha_tarea}**.")
-                cargar_tareas.clear()
                 st.balloons()
             except Exception as e:
                 st.error(f"❌ Error al guardar la tarea: {e}")
@@ -112,6 +108,8 @@ with tab_nueva:
 # ==========================================
 with tab_historial:
     df_tareas = cargar_tareas()
+    if 'error' in df_tareas.attrs:
+        st.sidebar.error(f"⚠️ Error cargando tareas: {df_tareas.attrs['error']}")
     
     if df_tareas.empty:
         st.info("📭 No hay tareas registradas aún.")
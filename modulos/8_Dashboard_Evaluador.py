@@ -1,7 +1,9 @@
 import streamlit as st
 import pandas as pd
 from datetime import datetime, date, timedelta, timezone
-from supabase import create_client
+from nucleo.cache_memoria import cache_memoria
+from nucleo.datos import fallida, fetch, obtener_cliente
+from nucleo.versiones import segun_version
 
 # Zona horaria de Perú (UTC-5, sin horario de verano)
 ZONA_PERU = timezone(timedelta(hours=-5))
@@ -60,20 +62,17 @@ st.markdown("""
 """, unsafe_allow_html=True)
 
 # --- CONEXIÓN ---
-@st.cache_resource
-def init_supabase():
-    return create_client(st.secrets["SUPABASE_URL"], st.secrets["SUPABASE_KEY"])
-
-supabase = init_supabase()
+supabase = obtener_cliente()
 
 # --- CARGA DE TAREAS ---
-@st.cache_data(ttl=15)  # Refresco cada 15 seg para campo
-def cargar_mis_tareas():
+@segun_version('Tareas_Evaluador', sondeo=15)  # 💡 cada 15 seg un sondeo de 1 fila; se baja sólo si hubo cambios
+@cache_memoria(ttl=600)
+def cargar_mis_tareas(version=None):
     try:
-        res = supabase.table('Tareas_Evaluador').select("*").order('Fecha', desc=True).limit(50).execute()
-        return pd.DataFrame(res.data) if res.data else pd.DataFrame()
-    except:
-        return pd.DataFrame()
+        return fetch('Tareas_Evaluador', orden='-Fecha', limite=50)
+    except Exception as e:
+        # ✅ marcado con attrs['error']: no se cachea y el próximo rerun reintenta
+        return fallida('Tareas_Evaluador', e)
 
 # --- INTERFAZ ---
 nombre_user = st.session_state.get("nombre", "Evaluador")
@@ -91,6 +90,8 @@ st.caption(f"📅 {ahora_peru.strftime('%A %d de %B, %Y')} — Tu panel de tarea
 st.divider()
 
 df_tareas = cargar_mis_tareas()
+if 'error' in df_tareas.attrs:
+    st.warning("📡 No se pudieron cargar tus tareas (¿sin señal?). Se reintenta al actualizar la página.")
 
 # Filtrar tareas de hoy (usando fecha de Perú)
 hoy_str = str(ahora_peru.date())
@@ -167,7 +168,6 @@ if total_pendientes > 0:
                     "Completada_a": datetime.now().isoformat()
                 }).eq('id', tarea['id']).execute()
                 st.success(f"🎉 ¡Tarea completada! Buen trabajo.")
-                cargar_mis_tareas.clear()
                 st.rerun()
             except Exception as e:
                 st.error(f"Error: {e}")
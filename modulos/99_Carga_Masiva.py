@@ -1,7 +1,7 @@
 import streamlit as st
 import pandas as pd
 import math
-from supabase import create_client
+from nucleo.datos import obtener_cliente
 from datetime import datetime
 
 # 🚨 CANDADO DE SEGURIDAD
@@ -14,7 +14,8 @@ st.set_page_config(page_title="Carga Masiva Pro", page_icon="🚀", layout="wide
 st.title("🚀 Migración Maestra de Datos")
 st.caption("Flujo recomendado: Primero sube el **Catálogo de Productos**, luego los **Ingresos**.")
 
-supabase = create_client(st.secrets["SUPABASE_URL"], st.secrets["SUPABASE_KEY"])
+# Cliente compartido del proceso: no se crea uno nuevo en cada rerun
+supabase = obtener_cliente()
 
 # ─────────────────────────────────────────────
 # UTILIDADES
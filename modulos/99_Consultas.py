@@ -0,0 +1,65 @@
+import streamlit as st
+import pandas as pd
+from nucleo import instrumentacion
+
+# 🚨 CANDADO DE SEGURIDAD
+if "autenticado" not in st.session_state or not st.session_state["autenticado"]:
+    st.warning("⚠️ Por favor, inicie sesión en la página principal.")
+    st.stop()
+if st.session_state.get("rol") not in ("Admin", "Programador"):
+    st.error("⛔ Módulo reservado para administración.")
+    st.stop()
+
+# --- CONFIGURACIÓN ---
+st.set_page_config(page_title="Consultas a Supabase", page_icon="⏱️", layout="wide")
+st.title("⏱️ Consultas a Supabase")
+st.caption(
+    f"Últimas {instrumentacion.TAMANO_BUFFER} consultas de este proceso del servidor. "
+    f"Lenta = más de {instrumentacion.LENTA_MS:.0f} ms (PROYECTO_UVA_CONSULTA_LENTA_MS). "
+    f"Historial completo en `{instrumentacion.RUTA_LOG}`."
+)
+
+FORMATO = {"p50_ms": "{:.0f}", "p95_ms": "{:.0f}", "max_ms": "{:.0f}", "mb": "{:.2f}",
+           "latencia_ms": "{:.0f}", "filas": "{:.0f}"}
+
+
+def mostrar(df):
+    st.dataframe(df.style.format({c: f for c, f in FORMATO.items() if c in df.columns}, na_rep="-"),
+                 use_container_width=True, hide_index=True)
+
+
+registros = pd.DataFrame(instrumentacion.recientes())
+if registros.empty:
+    st.info("Todavía no se registraron consultas en este proceso. Navegue por los módulos y vuelva.")
+    st.stop()
+
+# --- KPIs ---
+c1, c2, c3, c4 = st.columns(4)
+c1.metric("Consultas", f"{len(registros):,}")
+c2.metric("p95 global", f"{registros['latencia_ms'].quantile(0.95):.0f} ms")
+c3.metric("🐢 Lentas", f"{int(registros['lenta'].sum())}")
+c4.metric("Datos recibidos", f"{registros['bytes'].sum() / 1e6:.1f} MB")
+
+# --- AGREGADOS ---
+tab_tabla, tab_pagina, tab_lentas, tab_todas = st.tabs(["Por tabla", "Por página / función", "🐢 Lentas", "Recientes"])
+with tab_tabla:
+    mostrar(instrumentacion.agregados(("tabla", "metodo")))
+with tab_pagina:
+    mostrar(instrumentacion.agregados(("pagina", "funcion")))
+with tab_lentas:
+    lentas = registros[registros['lenta']]
+    if lentas.empty:
+        st.success("Ninguna consulta superó el umbral.")
+    else:
+        mostrar(lentas.sort_values('latencia_ms', ascending=False)
+                [['tabla', 'metodo', 'filtros', 'latencia_ms', 'filas', 'bytes', 'pagina', 'funcion', 'error']])
+with tab_todas:
+    recientes = registros.iloc[::-1].head(500).copy()
+    recientes['hora'] = pd.to_datetime(recientes['ts'], unit='s').dt.strftime('%H:%M:%S')
+    mostrar(recientes[['hora', 'tabla', 'metodo', 'filtros', 'estado', 'latencia_ms', 'filas', 'bytes',
+                       'pagina', 'funcion']])
+
+st.divider()
+if st.button("🧹 Vaciar buffer en memoria"):
+    instrumentacion.vaciar()
+    st.rerun()
@@ -0,0 +1,82 @@
+import streamlit as st
+import pandas as pd
+from nucleo import cache_disco, cache_memoria, cache_tablas
+
+# 🚨 CANDADO DE SEGURIDAD
+if "autenticado" not in st.session_state or not st.session_state["autenticado"]:
+    st.warning("⚠️ Por favor, inicie sesión en la página principal.")
+    st.stop()
+if st.session_state.get("rol") not in ("Admin", "Programador"):
+    st.error("⛔ Módulo reservado para administración.")
+    st.stop()
+
+# --- CONFIGURACIÓN ---
+st.set_page_config(page_title="Mantenimiento", page_icon="🧰", layout="wide")
+st.title("🧰 Mantenimiento de Cachés")
+st.caption("Lo que este proceso del servidor tiene guardado en memoria y en disco. Purgar sólo fuerza una recarga: no borra datos de Supabase.")
+
+FORMATO_TIEMPO = {"edad_max_s": "{:.0f}", "edad_min_s": "{:.0f}", "sin_usar_s": "{:.0f}",
+                  "reconciliado_hace_s": "{:.0f}", "mb": "{:.2f}", "tasa_acierto": "{:.0%}"}
+
+
+def tabla(filas, columnas):
+    df = pd.DataFrame(filas, columns=columnas)
+    st.dataframe(df.style.format({c: f for c, f in FORMATO_TIEMPO.items() if c in df.columns}, na_rep="-"),
+                 use_container_width=True, hide_index=True)
+
+
+def botones_purga(nombres, accion, clave):
+    col1, col2 = st.columns([3, 1])
+    with col1:
+        elegido = st.selectbox("Loader", options=nombres, key=f"sel_{clave}", label_visibility="collapsed")
+    with col2:
+        if st.button("🧹 Purgar", key=f"btn_{clave}", use_container_width=True, disabled=not nombres):
+            accion(elegido)
+            st.toast(f"Purgado: {elegido}")
+            st.rerun()
+
+
+# --- 1. CACHÉ EN MEMORIA (LRU con presupuesto) ---
+st.subheader("🧠 Caché en memoria (loaders)")
+ocupado, limite = cache_memoria.ocupado_mb(), cache_memoria.LIMITE_MB
+st.progress(min(ocupado / limite, 1.0) if limite else 0.0,
+            text=f"{ocupado:.1f} MB de {limite:.0f} MB (PROYECTO_UVA_CACHE_MEMORIA_MB)")
+
+resumen_mem = cache_memoria.resumen()
+if resumen_mem:
+    tabla(resumen_mem, ['loader', 'entradas', 'mb', 'aciertos', 'fallos', 'tasa_acierto',
+                        'desalojos', 'demasiado_grande', 'edad_min_s', 'edad_max_s'])
+    with st.expander("Ver entradas una por una"):
+        tabla(cache_memoria.entradas(), ['loader', 'clave', 'mb', 'edad_s', 'sin_usar_s', 'aciertos'])
+    botones_purga([f['loader'] for f in resumen_mem], cache_memoria.borrar, "mem")
+else:
+    st.info("Todavía no hay loaders cacheados en este proceso.")
+
+# --- 2. CACHÉ INCREMENTAL DE TABLAS ---
+st.divider()
+st.subheader("📈 Caché incremental de tablas (delta-sync)")
+resumen_tablas = cache_tablas.resumen()
+if resumen_tablas:
+    tabla(resumen_tablas, ['tabla', 'columnas', 'filas', 'mb', 'marca', 'reconciliado_hace_s'])
+    botones_purga(sorted({f['tabla'] for f in resumen_tablas}), cache_tablas.olvidar, "inc")
+else:
+    st.info("Ninguna tabla cargada de forma incremental todavía.")
+
+# --- 3. CACHÉ EN DISCO (compartido entre procesos) ---
+st.divider()
+st.subheader("💾 Caché en disco (SQLite)")
+resumen_disco = cache_disco.resumen()
+if resumen_disco:
+    st.caption(f"Archivo: `{cache_disco.RUTA}` · límite {cache_disco.LIMITE_MB:.0f} MB")
+    tabla(resumen_disco, ['loader', 'entradas', 'mb', 'edad_min_s', 'edad_max_s', 'sin_usar_s'])
+    botones_purga([f['loader'] for f in resumen_disco], cache_disco.borrar, "disco")
+else:
+    st.info("El caché en disco está vacío.")
+
+# --- PURGA TOTAL ---
+st.divider()
+if st.button("🔥 Purgar todos los cachés", type="primary"):
+    cache_memoria.borrar()
+    cache_tablas.olvidar()
+    cache_disco.borrar()
+    st.success("Cachés vaciados: la próxima visita a cada módulo recarga desde Supabase.")
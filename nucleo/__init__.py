@@ -0,0 +1,22 @@
+"""Código compartido por app.py y las páginas de modulos/.
+
+Los atributos de conveniencia (``from nucleo import fetch``) se resuelven al
+primer uso: importar un submódulo liviano como ``nucleo.metricas`` no debe
+arrastrar pandas, httpx ni supabase a la pantalla de login.
+"""
+import importlib
+
+_REEXPORTADOS = {
+    "ColumnaNoDeclarada": "nucleo.columnas",
+    "ErrorDatos": "nucleo.datos",
+    "fetch": "nucleo.datos",
+    "fetch_varios": "nucleo.datos",
+    "obtener_cliente": "nucleo.datos",
+}
+__all__ = list(_REEXPORTADOS)
+
+
+def __getattr__(nombre):
+    if nombre in _REEXPORTADOS:
+        return getattr(importlib.import_module(_REEXPORTADOS[nombre]), nombre)
+    raise AttributeError(f"module 'nucleo' has no attribute {nombre!r}")
@@ -0,0 +1,91 @@
+"""
+Agregados precalculados en Postgres (vistas y RPC de ``sql/migraciones/``).
+
+Cada función devuelve el mismo DataFrame por dos caminos:
+
+- servidor: lee la vista o llama la RPC; viaja una fila por lote/sector/día,
+  no una por movimiento.
+- cliente (por defecto): baja las filas y agrupa con pandas, como antes.
+
+El interruptor es ``PROYECTO_UVA_AGREGADOS_SERVIDOR=1`` (una vez aplicadas
+las migraciones en Supabase); cada función acepta además ``servidor=True/False``
+para forzar un camino. Los loaders llaman a estas funciones en lugar de
+agrupar ellos mismos:
+
+    'Salidas': lambda: agregados.salidas_por_ingreso(),
+"""
+import os
+
+import pandas as pd
+
+from nucleo.cache_tablas import tabla_incremental
+from nucleo.datos import fetch, rpc
+
+# --- CONFIGURACIÓN ---
+EN_SERVIDOR = os.environ.get("PROYECTO_UVA_AGREGADOS_SERVIDOR", "") == "1"
+MOSCAS = ("Ceratitis_capitata", "Anastrepha_fraterculus", "Anastrepha_distinta")
+
+
+def en_servidor(servidor=None):
+    return EN_SERVIDOR if servidor is None else servidor
+
+
+def _rango(columna, desde, hasta):
+    filtros = []
+    if desde is not None:
+        filtros.append((columna, "gte", desde))
+    if hasta is not None:
+        filtros.append((columna, "lte", hasta))
+    return filtros or None
+
+
+# --- KARDEX / FEFO ---
+def salidas_por_ingreso(servidor=None):
+    """Cantidad_Usada acumulada por Ingreso_ID (vista Salidas_por_Ingreso, migración 001)."""
+    if en_servidor(servidor):
+        # la vista no tiene id: Ingreso_ID es única por fila y da el orden estable para paginar
+        return fetch('Salidas_por_Ingreso', "Ingreso_ID, Cantidad_Usada", paralelo=4, clave_orden='Ingreso_ID')
+    df = tabla_incremental('Salidas', "Ingreso_ID, Cantidad_Usada", paralelo=4)   # sólo crece: delta-sync
+    if df.empty:
+        return df
+    return df.groupby('Ingreso_ID', as_index=False)['Cantidad_Usada'].sum()
+
+
+# --- MOSCA DE LA FRUTA ---
+def mosca_por_sector_fecha(columnas=MOSCAS, desde=None, hasta=None, servidor=None):
+    """Capturas sumadas por Sector y Fecha (vista Mosca_por_Sector_Fecha, migración 002)."""
+    columnas = list(columnas)
+    tabla = 'Mosca_por_Sector_Fecha' if en_servidor(servidor) else 'Monitoreo_Mosca'
+    clave = ['Sector', 'Fecha'] if tabla == 'Mosca_por_Sector_Fecha' else 'id'   # la vista no tiene id
+    df = fetch(tabla, ['Sector', 'Fecha', *columnas], filtros=_rango('Fecha', desde, hasta), paralelo=4,
+               clave_orden=clave)
+    if df.empty or tabla == 'Mosca_por_Sector_Fecha':
+        return df
+    return df.groupby(['Sector', 'Fecha'], as_index=False)[columnas].sum()
+
+
+# --- MAQUINARIA ---
+def horas_tractor_por_sector(desde=None, hasta=None, df_planilla=None, servidor=None):
+    """Costo, horas, jornadas y registros de maquinaria por Sector (RPC horas_tractor_por_sector, migración 003).
+
+    En el camino cliente se agrupa ``df_planilla`` (la de ``nucleo.calculos.armar_planilla``,
+    ya con ``Total_Pago_Labor``), que la página de Finanzas ya tiene cargada; se le
+    aplica el mismo rango ``desde``/``hasta`` (sobre ``Fecha_date``) que a la RPC.
+    """
+    if en_servidor(servidor):
+        return rpc('horas_tractor_por_sector', desde=desde, hasta=hasta)
+    if df_planilla is None:
+        raise ValueError("horas_tractor_por_sector: el camino cliente necesita df_planilla "
+                         "(la de nucleo.calculos.armar_planilla)")
+    fechas = pd.to_datetime(df_planilla['Fecha_date'])
+    mascara = pd.Series(True, index=df_planilla.index)
+    if desde is not None:
+        mascara &= fechas >= pd.Timestamp(desde)
+    if hasta is not None:
+        mascara &= fechas <= pd.Timestamp(hasta)
+    return df_planilla[mascara].groupby('Sector').agg(
+        Costo_Total=('Total_Pago_Labor', 'sum'),
+        Horas_Total=('Total_Horas',      'sum'),
+        Jornadas   =('Fecha_date',       'nunique'),
+        Registros  =('Total_Horas',      'size'),
+    ).reset_index()
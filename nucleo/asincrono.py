@@ -0,0 +1,214 @@
+"""
+Camino asyncio para las lecturas masivas (un event loop por proceso).
+
+``nucleo.datos`` bloquea un hilo por petición: ``fetch_varios`` usa el pool
+del proceso y cada ``fetch(paralelo=N)`` abre además su propio pool para las
+ventanas Range, así que 6 tablas x 4 ventanas son hasta 32 hilos esperando
+red. Aquí todas las peticiones de todas las sesiones corren como corrutinas
+en UN event loop (hilo daemon ``uva-asyncio``) sobre un ``httpx.AsyncClient``
+keep-alive, con un único tope global ``CONCURRENCIA`` de peticiones en vuelo.
+
+La página sigue siendo síncrona: espera el resultado con ``ejecutar()``. El
+parseo JSON/CSV se hace en el hilo que pidió (no en el loop), para no frenar
+las descargas de las demás sesiones.
+
+    from nucleo import asincrono
+
+    df = asincrono.fetch('Control_Raleo', formato='csv')    # mismas opciones que datos.fetch
+    res = asincrono.fetch_varios({
+        'Personal':  dict(columnas="id, nombre_completo", filtros={'activo': True}),
+        'Productos': dict(orden='Producto'),
+        'Clima':     dict(tabla='clima', vista='Dashboard General'),
+    })
+
+Con ``PROYECTO_UVA_ASYNC=1`` además ``datos.fetch(paralelo>1)`` baja sus
+ventanas por este loop (así lo usan sin cambios ``tabla_incremental`` y los
+loaders de los dashboards). Comparación con el pool de hilos:
+``python -m benchmarks.asincrono``.
+"""
+import asyncio
+import logging
+import os
+import threading
+import time
+
+import httpx
+import pandas as pd
+
+from nucleo import datos, instrumentacion
+
+# --- CONFIGURACIÓN ---
+CONCURRENCIA = int(os.environ.get("PROYECTO_UVA_ASYNC_CONCURRENCIA", 16))   # peticiones en vuelo por proceso
+
+log = logging.getLogger(__name__)
+
+_bucle = None
+_candado = threading.Lock()
+_sesiones = {}      # id(cliente síncrono) -> httpx.AsyncClient (vive en el loop)
+_semaforo = None
+
+
+# --- EVENT LOOP DEL PROCESO ---
+def bucle():
+    """Event loop compartido del proceso (se arranca en un hilo daemon al primer uso)."""
+    global _bucle, _semaforo
+    if _bucle is None:
+        with _candado:
+            if _bucle is None:
+                nuevo = asyncio.new_event_loop()
+                threading.Thread(target=nuevo.run_forever, name="uva-asyncio", daemon=True).start()
+                _semaforo = asyncio.Semaphore(CONCURRENCIA)
+                _bucle = nuevo
+    return _bucle
+
+
+async def _con_origen(origen, sesion, corrutina):
+    # la tarea copia su propio contexto: las consultas se atribuyen a la página y sesión que las pidieron
+    instrumentacion._origen.set(origen)
+    instrumentacion._sesion.set(sesion)
+    return await corrutina
+
+
+def ejecutar(corrutina, timeout=None):
+    """Corre ``corrutina`` en el loop del proceso y espera su resultado desde el hilo actual."""
+    futuro = asyncio.run_coroutine_threadsafe(
+        _con_origen(instrumentacion.origen_actual(), instrumentacion.sesion_actual(), corrutina), bucle())
+    return futuro.result(timeout)
+
+
+def _sesion():
+    """httpx.AsyncClient del cliente Supabase actual (mismas URL y cabeceras que la sesión síncrona)."""
+    sincrona = datos.obtener_cliente().postgrest.session
+    sesion = _sesiones.get(id(sincrona))
+    if sesion is None:
+        limites = httpx.Limits(max_connections=CONCURRENCIA, max_keepalive_connections=CONCURRENCIA)
+        if isinstance(sincrona, httpx.Client):
+            sesion = httpx.AsyncClient(base_url=sincrona.base_url, headers=sincrona.headers, limits=limites)
+        else:
+            # Supabase falso (nucleo/supabase_falso.py): mismo SQLite, transporte asíncrono
+            from nucleo.supabase_falso import URL_BASE
+            sesion = httpx.AsyncClient(base_url=URL_BASE, transport=sincrona.transporte_async(), limits=limites)
+        _sesiones[id(sincrona)] = sesion
+    return sesion
+
+
+# --- PETICIÓN CON LÍMITE GLOBAL Y REINTENTOS ---
+async def pedir(metodo, tabla, params, headers=None, timeout=None):
+    """Versión asíncrona de ``datos._pedir``: mismos reintentos, errores e instrumentación."""
+    sesion = _sesion()
+    timeout = datos.TIMEOUT_POR_DEFECTO if timeout is None else timeout
+    error = None
+
+    for intento in range(datos.REINTENTOS):
+        async with _semaforo:
+            inicio = time.perf_counter()
+            try:
+                resp = await sesion.request(metodo, f"/{tabla}", params=params, headers=headers, timeout=timeout)
+            except httpx.TransportError as e:
+                resp, error = None, e
+                instrumentacion.registrar(metodo, tabla, params, inicio, error=e)
+            else:
+                instrumentacion.registrar(metodo, tabla, params, inicio, resp=resp)
+        if resp is not None:
+            if resp.status_code < 500 and resp.status_code != 429:
+                if resp.is_error:
+                    raise datos.ErrorDatos(f"{tabla}: HTTP {resp.status_code} — {resp.text[:300]}")
+                return resp
+            error = datos.ErrorDatos(f"{tabla}: HTTP {resp.status_code} — {resp.text[:300]}")
+
+        if intento < datos.REINTENTOS - 1:
+            await asyncio.sleep(datos.ESPERA_BASE * (2 ** intento))   # fuera del semáforo: no ocupa cupo
+
+    raise datos.ErrorDatos(f"{tabla}: sin respuesta tras {datos.REINTENTOS} intentos ({error})") from error
+
+
+async def ventanas(tabla, params, rangos, cabeceras, timeout=None):
+    """Baja todas las ventanas Range ``[(desde, hasta), ...]`` a la vez; respuestas en orden."""
+    return await asyncio.gather(*(
+        pedir("GET", tabla, params, headers={**cabeceras, **datos._rango(*r)}, timeout=timeout) for r in rangos
+    ))
+
+
+async def _respuestas(tabla, params, cabeceras, paginar, limite, timeout):
+    """Igual que ``datos._fetch_paginado`` pero con todas las ventanas como corrutinas."""
+    if not paginar:
+        return [await pedir("GET", tabla, params, headers=cabeceras or None, timeout=timeout)], None
+
+    paso_max = datos.TAMANO_PAGINA
+    primera = await pedir("GET", tabla, params, timeout=timeout,
+                          headers={**cabeceras, **datos._rango(0, paso_max - 1), "Prefer": "count=exact"})
+    respuestas, leidas = [primera], datos._filas_en(primera)
+    total = datos._total_de(primera)
+    objetivo = total if limite is None else (limite if total is None else min(total, limite))
+    paso = leidas if 0 < leidas < paso_max else paso_max
+
+    if objetivo is None:
+        while leidas and leidas % paso == 0:
+            resp = await pedir("GET", tabla, params, timeout=timeout,
+                               headers={**cabeceras, **datos._rango(leidas, leidas + paso - 1)})
+            respuestas.append(resp)
+            nuevas = datos._filas_en(resp)
+            if not nuevas:
+                break
+            leidas += nuevas
+        return respuestas, limite
+
+    rangos = [(d, min(d + paso, objetivo) - 1) for d in range(leidas, objetivo, paso)]
+    respuestas.extend(await ventanas(tabla, params, rangos, cabeceras, timeout))
+    return respuestas, objetivo
+
+
+# --- API PÚBLICA ---
+def _pedido(tabla, columnas="*", filtros=None, orden=None, limite=None, timeout=None, paralelo=None,
+            vista=None, formato="json", normalizar=False, clave_orden=datos.CLAVE_ORDEN):
+    params, cabeceras, paginar = datos._preparar(tabla, columnas, filtros, orden, limite, vista, formato,
+                                                 clave_orden)
+    corrutina = _respuestas(tabla, params, cabeceras, paginar, limite, timeout)
+    return corrutina, (vista, formato, normalizar)
+
+
+def fetch(tabla, columnas="*", filtros=None, orden=None, limite=None, timeout=None, paralelo=None,
+          vista=None, formato="json", normalizar=False, clave_orden=datos.CLAVE_ORDEN):
+    """``datos.fetch`` por el event loop. ``paralelo`` se ignora: manda ``CONCURRENCIA``."""
+    corrutina, (vista, formato, normalizar) = _pedido(tabla, columnas, filtros, orden, limite, timeout,
+                                                      paralelo, vista, formato, normalizar, clave_orden)
+    respuestas, objetivo = ejecutar(corrutina)
+    return datos._armar(tabla, respuestas, objetivo, vista, formato, normalizar)
+
+
+def fetch_varios(pedidos):
+    """Todas las tablas (y todas sus ventanas) en vuelo a la vez; devuelve {nombre: DataFrame}.
+
+    ``pedidos`` es {nombre: dict de argumentos de fetch}; ``tabla`` por defecto
+    es el nombre. Como ``datos.fetch_varios``, cada tabla se aísla: si falla,
+    su lugar lo ocupa un DataFrame vacío con ``attrs['error']``.
+    """
+    armados, resultados = {}, {}
+    for nombre, argumentos in pedidos.items():
+        argumentos = dict(argumentos)
+        tabla = argumentos.pop("tabla", nombre)
+        try:
+            # ✅ argumentos inválidos fallan aquí, antes de crear la corrutina: nada queda sin await
+            armados[nombre] = (tabla, *_pedido(tabla, **argumentos))
+        except Exception as e:
+            resultados[nombre] = _fallida(nombre, e)
+
+    async def _todas():
+        return await asyncio.gather(*(c for _, c, _ in armados.values()), return_exceptions=True)
+
+    salidas = ejecutar(_todas()) if armados else []
+    for (nombre, (tabla, _, (vista, formato, normalizar))), salida in zip(armados.items(), salidas):
+        try:
+            if isinstance(salida, BaseException):
+                raise salida
+            resultados[nombre] = datos._armar(tabla, *salida, vista, formato, normalizar)
+        except Exception as e:
+            resultados[nombre] = _fallida(nombre, e)
+    return {nombre: resultados[nombre] for nombre in pedidos}   # en el orden pedido
+
+
+def _fallida(nombre, error):
+    log.warning("fetch_varios (async): %s falló: %s", nombre, error)
+    df = pd.DataFrame()
+    df.attrs.update(tabla=nombre, error=str(error))
+    return df
@@ -0,0 +1,263 @@
+"""
+Bandeja de salida offline común a las páginas de campo.
+
+Cada página crea una ``Bandeja`` para su tabla. Lo capturado sin señal queda
+en el localStorage del teléfono (sobrevive a cerrar la pestaña) bajo la clave
+``bandeja_<Tabla>``; ``LocalStorage`` ya refleja esa clave en
+``st.session_state``, así que leerla no cuesta un viaje al navegador.
+
+Cada registro lleva un ``uuid`` generado en el dispositivo. La subida va por
+lotes acotados en filas y bytes con ``upsert(on_conflict="uuid")``: si la
+conexión se corta a mitad de camino, reintentar reenvía lotes que el servidor
+ya tiene y los ignora, sin duplicar filas (requiere la migración 004).
+
+    bandeja = Bandeja('Monitoreo_Mosca', heredadas=('cola_mosca',))
+    bandeja.agregar(registro)
+    bandeja.sincronizar(supabase)   # 300 registros -> 2 peticiones
+
+Además ``app.py`` monta en la barra lateral ``sincronizacion_automatica``, un
+fragmento con ``run_every`` que vacía solo todas las bandejas del teléfono
+mientras la app esté abierta (en cualquier página). Los datos viven en el
+navegador, así que el "trabajador" tiene que correr en la sesión: un hilo del
+proceso no ve el localStorage. Antes de subir hace un HEAD barato y, si falla,
+espera con backoff exponencial y jitter para no martillar con poca señal.
+"""
+import json
+import math
+import random
+import time
+import uuid
+
+import streamlit as st
+from streamlit_local_storage import LocalStorage
+
+from nucleo import metricas
+from nucleo.datos import ErrorDatos, obtener_cliente
+
+# --- CONFIGURACIÓN ---
+PREFIJO = "bandeja_"
+MONTADO = "almacen_bandeja"    # session_state: una Bandeja ya montó LocalStorage en esta sesión
+LOTE_FILAS = 200               # filas por petición de upsert
+LOTE_BYTES = 512 * 1024        # ...y tope de cuerpo JSON por petición
+MAXIMO_BYTES = 2 * 1024 ** 2   # por bandeja; el localStorage del navegador ronda 5 MB por sitio
+INTERVALO = 20                 # s entre vueltas del fragmento de sincronización automática
+ESPERA_BASE = 15               # s antes del primer reintento tras un fallo...
+ESPERA_MAXIMA = 600            # ...que se duplica en cada fallo seguido hasta este techo
+TIMEOUT_SONDEO = 3.0           # s del HEAD que comprueba la conexión
+
+
+class BandejaLlena(ErrorDatos):
+    """La bandeja del dispositivo llegó a ``MAXIMO_BYTES``: hay que sincronizar antes de seguir."""
+
+
+def _limpiar(valor):
+    # NaN no es JSON válido para PostgREST (sale de celdas vacías del data_editor)
+    if isinstance(valor, float) and math.isnan(valor):
+        return None
+    return valor
+
+
+def _sellar(registro):
+    """Copia del registro con ``uuid`` propio (se conserva si ya lo tenía)."""
+    fila = {k: _limpiar(v) for k, v in registro.items()}
+    fila.setdefault("uuid", str(uuid.uuid4()))
+    return fila
+
+
+def lotes(registros, filas=LOTE_FILAS, tope_bytes=LOTE_BYTES):
+    """Parte ``registros`` en lotes de a lo sumo ``filas`` registros y ``tope_bytes`` de JSON."""
+    lote, tamano = [], 0
+    for registro in registros:
+        peso = len(json.dumps(registro, ensure_ascii=False).encode())
+        if lote and (len(lote) >= filas or tamano + peso > tope_bytes):
+            yield lote
+            lote, tamano = [], 0
+        lote.append(registro)
+        tamano += peso
+    if lote:
+        yield lote
+
+
+class Bandeja:
+    """Cola offline de una tabla de Supabase, persistida en el dispositivo."""
+
+    def __init__(self, tabla, heredadas=(), almacen=None, origen="pagina"):
+        self.tabla = tabla
+        self.clave = PREFIJO + tabla
+        if almacen is None:
+            almacen = LocalStorage()
+            st.session_state[MONTADO] = True   # app.py monta la sincronización automática sólo entonces
+        self.almacen = almacen
+        self.origen = origen   # distingue las keys de componente de la página y del fragmento
+        self._escrituras = 0
+        self.registros = self._leer(self.clave)
+        self._migrar(heredadas)
+        self._reportar()
+
+    # --- persistencia ---
+    def _leer(self, clave):
+        texto = self.almacen.getItem(clave)
+        if not texto:
+            return []
+        try:
+            datos = json.loads(texto) if isinstance(texto, str) else texto
+        except ValueError:
+            return []   # valor corrupto: se descarta en la próxima escritura
+        return datos if isinstance(datos, list) else []
+
+    def _guardar(self):
+        # cada setItem es un componente: en una misma corrida necesitan keys distintas
+        self._escrituras += 1
+        self.almacen.setItem(self.clave, json.dumps(self.registros, ensure_ascii=False),
+                             key=f"{self.clave}_{self.origen}_{self._escrituras}")
+
+    def _migrar(self, heredadas):
+        """Absorbe las colas antiguas (session_state o claves sueltas de localStorage)."""
+        movidos = []
+        for vieja in heredadas:
+            if vieja in st.session_state:
+                movidos += st.session_state.pop(vieja) or []
+            elif self.almacen.getItem(vieja):
+                movidos += self._leer(vieja)
+                self.almacen.deleteItem(vieja, key=f"{self.clave}_borrar_{vieja}")
+        if movidos:
+            self.registros += [_sellar(r) for r in movidos]
+            self._guardar()
+
+    def _reportar(self):
+        metricas.reportar_cola(self.clave, len(self.registros))
+
+    # --- API ---
+    def __len__(self):
+        return len(self.registros)
+
+    def __bool__(self):
+        return bool(self.registros)
+
+    def agregar(self, registros):
+        """Sella con uuid y guarda en el dispositivo un registro o una lista de registros."""
+        nuevos = [_sellar(r) for r in ([registros] if isinstance(registros, dict) else registros)]
+        candidatos = self.registros + nuevos
+        if len(json.dumps(candidatos, ensure_ascii=False).encode()) > MAXIMO_BYTES:
+            raise BandejaLlena(f"La bandeja de {self.tabla} está llena ({len(self.registros)} registros). "
+                               "Sincronice antes de seguir capturando.")
+        self.registros = candidatos
+        self._guardar()
+        self._reportar()
+        return len(nuevos)
+
+    def vaciar(self):
+        self.registros = []
+        self._guardar()
+        self._reportar()
+
+    def sincronizar(self, cliente, al_avanzar=None):
+        """Sube la bandeja por lotes; devuelve cuántos registros confirmó el servidor.
+
+        Si un lote falla la excepción sube a la página, pero lo ya confirmado sale
+        del dispositivo igual. Un lote que llegó sin que volviera la respuesta se
+        reenvía en el próximo intento y el servidor lo ignora por su uuid.
+        ``al_avanzar(subidos, total)`` se llama tras cada lote (barra de progreso).
+        """
+        subidos, total = 0, len(self.registros)
+        try:
+            for lote in lotes(self.registros):
+                (cliente.table(self.tabla)
+                 .upsert(lote, on_conflict="uuid", ignore_duplicates=True, returning="minimal")
+                 .execute())
+                subidos += len(lote)
+                if al_avanzar:
+                    al_avanzar(subidos, total)
+        finally:
+            if subidos:
+                # ✅ una sola escritura al dispositivo al final: un corte entre lotes sólo cuesta reenviar
+                self.registros = self.registros[subidos:]
+                self._guardar()
+            self._reportar()
+        return subidos
+
+
+def _pendientes():
+    """{tabla: registros pendientes} de las bandejas del dispositivo, sin montar componentes."""
+    guardado = st.session_state.get("storage_init") or {}
+    pendientes = {}
+    for clave, texto in guardado.items():
+        if not str(clave).startswith(PREFIJO):
+            continue
+        try:
+            registros = json.loads(texto) if isinstance(texto, str) else texto
+        except ValueError:
+            registros = []
+        pendientes[clave[len(PREFIJO):]] = len(registros) if isinstance(registros, list) else 0
+    return pendientes
+
+
+def reportar_pendientes():
+    """Reporta todas las bandejas del dispositivo al gauge de colas (lo usa app.py)."""
+    for tabla, n in _pendientes().items():
+        metricas.reportar_cola(PREFIJO + tabla, n)
+
+
+# --- SINCRONIZACIÓN AUTOMÁTICA ---
+def espera(intentos, base=ESPERA_BASE, maximo=ESPERA_MAXIMA):
+    """Backoff exponencial con jitter: entre la mitad y el total de ``base * 2**(intentos-1)``.
+
+    El jitter evita que los teléfonos que recuperan señal a la vez en el mismo
+    cuartel reintenten todos en el mismo segundo.
+    """
+    tope = min(maximo, base * 2 ** max(intentos - 1, 0))
+    return random.uniform(tope / 2, tope)
+
+
+def hay_conexion(tabla, timeout=TIMEOUT_SONDEO):
+    """HEAD de cero filas a ``tabla``, sin los reintentos de ``nucleo.datos._pedir``."""
+    try:
+        sesion = obtener_cliente().postgrest.session
+        resp = sesion.request("HEAD", f"/{tabla}", params={"limit": "0"}, timeout=timeout)
+    except Exception:
+        return False
+    return resp.status_code < 500 and resp.status_code != 429
+
+
+@st.fragment(run_every=INTERVALO)
+def sincronizacion_automatica():
+    """Vacía solas las bandejas del teléfono; se llama dentro de ``with st.sidebar``."""
+    pendientes = {t: n for t, n in _pendientes().items() if n}
+    if not pendientes:
+        return
+    estado = st.session_state.setdefault("bandeja_auto", {"intentos": 0, "proximo": 0.0, "error": None})
+    total = sum(pendientes.values())
+    restante = estado["proximo"] - time.time()
+    if restante > 0:
+        st.caption(f"📴 {total} registro(s) en el teléfono · reintento automático en {restante:.0f} s")
+        if estado["error"]:
+            st.caption(f"Último error: {estado['error']}")
+        return
+
+    barra = st.progress(0.0, text=f"📡 Subiendo {total} registro(s) pendientes...")
+    subidos = 0
+    try:
+        if not hay_conexion(next(iter(pendientes))):
+            raise ErrorDatos("sin conexión con la nube")
+        cliente = obtener_cliente()
+        for tabla in pendientes:
+            bandeja = Bandeja(tabla, origen="auto")
+            base = subidos
+            subidos += bandeja.sincronizar(
+                cliente,
+                al_avanzar=lambda n, _t, base=base: barra.progress(
+                    min((base + n) / total, 1.0), text=f"📡 {base + n}/{total} registros subidos"),
+            )
+    except Exception as e:
+        estado["intentos"] += 1
+        estado["proximo"] = time.time() + espera(estado["intentos"])
+        estado["error"] = str(e)[:120]
+        metricas.BANDEJA_INTENTOS.sumar("fallo")
+        barra.empty()
+        st.caption(f"📴 {total - subidos} registro(s) siguen en el teléfono · "
+                   f"reintento en {estado['proximo'] - time.time():.0f} s")
+    else:
+        estado.update(intentos=0, proximo=0.0, error=None)
+        metricas.BANDEJA_INTENTOS.sumar("ok")
+        st.toast(f"✅ {subidos} registro(s) sincronizados automáticamente", icon="📡")
+        st.rerun()   # la página vuelve a dibujar sus avisos de pendientes
@@ -0,0 +1,268 @@
+"""
+Caché en disco compartido entre procesos (SQLite).
+
+``st.cache_data`` vive en la memoria de cada proceso: al reiniciar el
+contenedor o al sumar réplicas todo arranca en frío. ``@cache_disco(ttl=...)``
+es un reemplazo directo para los loaders que deben sobrevivir reinicios:
+
+    @cache_disco(ttl=60)
+    def cargar_todo():
+        ...
+
+    cargar_todo.clear()      # igual que con st.cache_data
+
+- Fresco (edad < ttl): se devuelve tal cual.
+- Vencido: se devuelve el último valor conocido al instante y se recalcula
+  en un hilo de fondo (stale-while-revalidate).
+- Sin valor: se calcula en línea y se guarda.
+
+Los resultados vacíos (DataFrames vacíos, típicamente un loader que atrapó un
+error de red) o incompletos (alguna tabla con ``attrs['error']``) no se guardan
+ni pisan un valor bueno anterior.
+
+⚠️ El refresco de fondo corre el loader en un hilo sin contexto de Streamlit:
+un ``@cache_disco`` no debe llamar a ``st.*`` (ahí ``st.error`` no se ve o
+falla). Ante un error el loader devuelve ``datos.fallida(tabla, e)`` y es la
+página la que lo muestra al leer ``attrs['error']``. Si el refresco de fondo
+lanza, se registra en el log y en ``uva_cache_disco_refrescos_total``.
+
+Las escrituras son transacciones SQLite (atómicas, modo WAL para lectores
+concurrentes). El archivo no pasa de ``LIMITE_MB``: se desalojan primero las
+entradas menos usadas, y las que superan ``EDAD_MAXIMA`` se purgan. La copia
+en memoria de cada proceso no pasa de ``LIMITE_MEMORIA_MB`` (LRU); lo
+desalojado de ahí se vuelve a leer de SQLite.
+"""
+import functools
+import hashlib
+import logging
+import os
+import pickle
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+import pandas as pd
+
+from nucleo import metricas
+
+# --- CONFIGURACIÓN ---
+DIRECTORIO  = os.environ.get(
+    "PROYECTO_UVA_CACHE_DIR",
+    os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), ".cache"),
+)
+RUTA        = os.path.join(DIRECTORIO, "cache_disco.sqlite")
+LIMITE_MB   = float(os.environ.get("PROYECTO_UVA_CACHE_MB", 256))
+LIMITE_MEMORIA_MB = float(os.environ.get("PROYECTO_UVA_CACHE_DISCO_MEMORIA_MB", 64))
+EDAD_MAXIMA = 7 * 24 * 3600   # segundos; nada se sirve si es más viejo que esto
+
+log = logging.getLogger(__name__)
+
+_memoria = OrderedDict()      # clave -> (creado, blob): evita leer SQLite en cada rerun (LRU)
+_bytes_memoria = 0            # suma de len(blob) en _memoria
+_en_curso = set()             # claves refrescándose en segundo plano
+_candado = threading.Lock()
+
+
+# --- ALMACENAMIENTO ---
+def _recordar(clave, entrada):
+    """Guarda en _memoria y desaloja las menos usadas sobre LIMITE_MEMORIA_MB. Con _candado tomado."""
+    global _bytes_memoria
+    anterior = _memoria.pop(clave, None)
+    if anterior is not None:
+        _bytes_memoria -= len(anterior[1])
+    _memoria[clave] = entrada
+    _bytes_memoria += len(entrada[1])
+    limite = LIMITE_MEMORIA_MB * 1024 * 1024
+    while _bytes_memoria > limite and len(_memoria) > 1:
+        _, (_, blob) = _memoria.popitem(last=False)
+        _bytes_memoria -= len(blob)
+
+
+def _recordada(clave):
+    """Entrada en _memoria (o None), marcándola como recién usada. Con _candado tomado."""
+    entrada = _memoria.get(clave)
+    if entrada is not None:
+        _memoria.move_to_end(clave)
+    return entrada
+
+
+def _conectar():
+    os.makedirs(DIRECTORIO, exist_ok=True)
+    conn = sqlite3.connect(RUTA, timeout=30)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute(
+        "CREATE TABLE IF NOT EXISTS entradas ("
+        " clave TEXT PRIMARY KEY, prefijo TEXT, valor BLOB,"
+        " creado REAL, usado REAL, tamano INTEGER)"
+    )
+    return conn
+
+
+def _leer(clave):
+    conn = _conectar()
+    try:
+        with conn:
+            fila = conn.execute("SELECT creado, valor FROM entradas WHERE clave = ?", (clave,)).fetchone()
+            if fila:
+                conn.execute("UPDATE entradas SET usado = ? WHERE clave = ?", (time.time(), clave))
+        return fila
+    finally:
+        conn.close()
+
+
+def _escribir(clave, prefijo, blob, creado):
+    conn = _conectar()
+    try:
+        with conn:   # una sola transacción: o queda todo o no queda nada
+            conn.execute(
+                "INSERT OR REPLACE INTO entradas VALUES (?, ?, ?, ?, ?, ?)",
+                (clave, prefijo, blob, creado, creado, len(blob)),
+            )
+            conn.execute("DELETE FROM entradas WHERE creado < ?", (time.time() - EDAD_MAXIMA,))
+            _desalojar(conn)
+    finally:
+        conn.close()
+
+
+def _desalojar(conn):
+    """Borra las entradas menos usadas hasta quedar bajo LIMITE_MB."""
+    limite = LIMITE_MB * 1024 * 1024
+    total = conn.execute("SELECT COALESCE(SUM(tamano), 0) FROM entradas").fetchone()[0]
+    if total <= limite:
+        return
+    for clave, tamano in conn.execute("SELECT clave, tamano FROM entradas ORDER BY usado").fetchall():
+        conn.execute("DELETE FROM entradas WHERE clave = ?", (clave,))
+        total -= tamano
+        if total <= limite:
+            break
+
+
+def borrar(prefijo=None):
+    """Elimina las entradas de un loader (o todas) en memoria y en disco."""
+    global _bytes_memoria
+    with _candado:
+        for clave in [c for c in _memoria if prefijo is None or c.startswith(prefijo + ":")]:
+            _bytes_memoria -= len(_memoria.pop(clave)[1])
+    conn = _conectar()
+    try:
+        with conn:
+            if prefijo is None:
+                conn.execute("DELETE FROM entradas")
+            else:
+                conn.execute("DELETE FROM entradas WHERE prefijo = ?", (prefijo,))
+    finally:
+        conn.close()
+
+
+def resumen():
+    """Una fila por loader en el archivo: entradas, MB y edades (segundos)."""
+    conn = _conectar()
+    try:
+        filas = conn.execute(
+            "SELECT prefijo, COUNT(*), SUM(tamano), MIN(creado), MAX(creado), MAX(usado) "
+            "FROM entradas GROUP BY prefijo ORDER BY SUM(tamano) DESC"
+        ).fetchall()
+    finally:
+        conn.close()
+    ahora = time.time()
+    return [{'loader': p, 'entradas': n, 'mb': (t or 0) / 1e6, 'edad_max_s': ahora - viejo,
+             'edad_min_s': ahora - nuevo, 'sin_usar_s': ahora - usado}
+            for p, n, t, viejo, nuevo, usado in filas]
+
+
+# --- DECORADOR ---
+def _vacio(valor):
+    if isinstance(valor, pd.DataFrame):
+        return valor.empty
+    if isinstance(valor, tuple) and valor:
+        return all(_vacio(v) for v in valor)
+    return valor is None
+
+
+def _incompleto(valor):
+    """Algún DataFrame del resultado viene de una tabla que falló (ver fetch_varios)."""
+    if isinstance(valor, pd.DataFrame):
+        return 'error' in valor.attrs
+    if isinstance(valor, tuple):
+        return any(_incompleto(v) for v in valor)
+    return False
+
+
+def _clave(prefijo, funcion, args, kwargs):
+    h = hashlib.sha1(funcion.__code__.co_code)   # cambia el código -> cambia la clave
+    try:
+        h.update(pickle.dumps((args, sorted(kwargs.items()))))
+    except Exception:
+        h.update(repr((args, sorted(kwargs.items()))).encode())
+    return f"{prefijo}:{h.hexdigest()}"
+
+
+def _calcular_y_guardar(clave, prefijo, funcion, args, kwargs):
+    valor = funcion(*args, **kwargs)
+    if not _vacio(valor) and not _incompleto(valor):
+        creado, blob = time.time(), pickle.dumps(valor, protocol=pickle.HIGHEST_PROTOCOL)
+        with _candado:
+            _recordar(clave, (creado, blob))
+        _escribir(clave, prefijo, blob, creado)
+    return valor
+
+
+def _refrescar_en_fondo(clave, prefijo, funcion, args, kwargs):
+    with _candado:
+        if clave in _en_curso:
+            return
+        _en_curso.add(clave)
+
+    def _tarea():
+        try:
+            valor = _calcular_y_guardar(clave, prefijo, funcion, args, kwargs)
+        except Exception as e:
+            # seguimos sirviendo el valor anterior; el próximo rerun lo reintenta
+            log.warning("Refresco de fondo de %s falló: %s", prefijo, e)
+            metricas.CACHE_DISCO_REFRESCOS.sumar(prefijo, "error")
+        else:
+            # vacío o incompleto: no se guardó, queda el valor anterior
+            descartado = _vacio(valor) or _incompleto(valor)
+            metricas.CACHE_DISCO_REFRESCOS.sumar(prefijo, "descartado" if descartado else "ok")
+        finally:
+            with _candado:
+                _en_curso.discard(clave)
+
+    threading.Thread(target=_tarea, name=f"cache_disco:{prefijo}", daemon=True).start()
+
+
+def cache_disco(ttl, nombre=None):
+    """Decorador tipo ``st.cache_data`` respaldado en SQLite (ver docstring del módulo)."""
+    def decorador(funcion):
+        # Las páginas corren como __main__: usamos el archivo para distinguirlas
+        archivo = os.path.splitext(os.path.basename(funcion.__code__.co_filename))[0]
+        prefijo = nombre or f"{archivo}.{funcion.__qualname__}"
+
+        @functools.wraps(funcion)
+        def envoltura(*args, **kwargs):
+            clave = _clave(prefijo, funcion, args, kwargs)
+            with _candado:
+                entrada = _recordada(clave)
+            if entrada is None or time.time() - entrada[0] >= ttl:
+                # Otro proceso pudo haberlo refrescado ya: el disco manda si es más nuevo
+                en_disco = _leer(clave)
+                if en_disco is not None and (entrada is None or en_disco[0] > entrada[0]):
+                    entrada = en_disco
+                    with _candado:
+                        _recordar(clave, entrada)
+            if entrada is None or time.time() - entrada[0] >= EDAD_MAXIMA:
+                metricas.CACHE_DISCO_FALLOS.sumar(prefijo)
+                return _calcular_y_guardar(clave, prefijo, funcion, args, kwargs)
+
+            creado, blob = entrada
+            if time.time() - creado >= ttl:
+                metricas.CACHE_DISCO_ACIERTOS.sumar(prefijo, "vencido")
+                _refrescar_en_fondo(clave, prefijo, funcion, args, kwargs)
+            else:
+                metricas.CACHE_DISCO_ACIERTOS.sumar(prefijo, "fresco")
+            return pickle.loads(blob)   # copia nueva en cada llamada, como st.cache_data
+
+        envoltura.clear = lambda: borrar(prefijo)
+        return envoltura
+    return decorador
@@ -0,0 +1,253 @@
+"""
+Caché en memoria con presupuesto global (LRU por tamaño real).
+
+``st.cache_data`` sin ``max_entries`` guarda cada combinación de argumentos
+hasta que vence el TTL, sin mirar cuánto pesa; en la VM chica del fundo los
+loaders con parámetros y los frames derivados se acumulan. ``@cache_memoria``
+es un reemplazo directo:
+
+    @segun_version('Control_Raleo')
+    @cache_memoria(ttl=60)
+    def cargar_raleo_supabase(version=None):
+        ...
+
+    cargar_raleo_supabase.clear()      # igual que con st.cache_data
+
+- Cada entrada se mide con ``memory_usage(deep=True)`` (DataFrames, Series y
+  tuplas/listas/dicts de ellos; lo demás por su tamaño serializado).
+- Todas las entradas del proceso comparten ``LIMITE_MB``: al pasarse se
+  desalojan las menos usadas recientemente, sea del loader que sea.
+- Se devuelve una copia en cada llamada (las páginas mutan lo que reciben).
+- Los resultados incompletos (alguna tabla con ``attrs['error']``, ver
+  ``datos.fallida``) no se guardan.
+- ``ttl_vacio``: TTL propio para resultados vacíos (DataFrame sin filas). Un
+  catálogo vacío casi siempre es un problema pasajero: no debe quedar una hora.
+
+Fuera de un loader, ``obtener(clave, ttl)`` / ``guardar(clave, valor)`` usan
+el mismo presupuesto y los mismos contadores; el prefijo de la clave
+(``"exportar:<huella>"``) es el nombre con el que aparece en el resumen.
+
+Aciertos, fallos, desalojos, tamaños y edades por loader quedan en
+``resumen()``/``entradas()`` para la página de Mantenimiento.
+"""
+import copy
+import functools
+import hashlib
+import os
+import pickle
+import threading
+import time
+from collections import Counter, OrderedDict
+
+import pandas as pd
+
+from nucleo.cache_disco import _incompleto, _vacio
+
+# --- CONFIGURACIÓN ---
+LIMITE_MB = float(os.environ.get("PROYECTO_UVA_CACHE_MEMORIA_MB", 256))
+
+_entradas = OrderedDict()     # clave -> entrada; el orden es el LRU (primero = menos usado)
+_contadores = {}              # prefijo -> Counter(aciertos, fallos, desalojos, ...)
+_calculando = {}              # clave -> Lock: una sola sesión calcula cada clave
+_total = 0                    # bytes ocupados por todas las entradas
+_candado = threading.Lock()
+
+
+# --- MEDICIÓN Y COPIA ---
+def tamano(valor):
+    """Bytes que ocupa ``valor`` en memoria (profundo para pandas)."""
+    if isinstance(valor, pd.DataFrame):
+        return int(valor.memory_usage(deep=True, index=True).sum())
+    if isinstance(valor, pd.Series):
+        return int(valor.memory_usage(deep=True, index=True))
+    if isinstance(valor, (tuple, list)):
+        return sum(tamano(v) for v in valor)
+    if isinstance(valor, dict):
+        return sum(tamano(v) for v in valor.values())
+    try:
+        return len(pickle.dumps(valor, protocol=pickle.HIGHEST_PROTOCOL))
+    except Exception:
+        return 0
+
+
+def _copiar(valor):
+    if isinstance(valor, (pd.DataFrame, pd.Series)):
+        return valor.copy(deep=True)
+    if isinstance(valor, tuple):
+        return tuple(_copiar(v) for v in valor)
+    if isinstance(valor, list):
+        return [_copiar(v) for v in valor]
+    if isinstance(valor, dict):
+        return {k: _copiar(v) for k, v in valor.items()}
+    return copy.deepcopy(valor)
+
+
+# --- ALMACENAMIENTO ---
+def _contador(prefijo):
+    return _contadores.setdefault(prefijo, Counter())
+
+
+def _quitar(clave):
+    """Saca una entrada (con _candado tomado)."""
+    global _total
+    entrada = _entradas.pop(clave)
+    _total -= entrada['tamano']
+    return entrada
+
+
+def _insertar(clave, prefijo, valor, medida, ttl=None):
+    """Guarda una entrada ya medida y desaloja lo que sobre (con _candado tomado).
+
+    ``ttl`` propio de la entrada (None = el del llamador); lo usa ``ttl_vacio``.
+    """
+    global _total
+    limite = LIMITE_MB * 1024 * 1024
+    if clave in _entradas:
+        _quitar(clave)
+    if medida > limite:
+        _contador(prefijo)['demasiado_grande'] += 1   # no entra ni vaciando todo
+        return
+    ahora = time.time()
+    _entradas[clave] = {'prefijo': prefijo, 'valor': valor, 'tamano': medida,
+                        'creado': ahora, 'usado': ahora, 'aciertos': 0, 'ttl': ttl}
+    _total += medida
+    while _total > limite:
+        _, desalojada = _entradas.popitem(last=False)
+        _total -= desalojada['tamano']
+        _contador(desalojada['prefijo'])['desalojos'] += 1
+
+
+def _guardar(clave, prefijo, valor):
+    medida = tamano(valor)   # fuera del candado: medir un frame grande no frena a los demás
+    with _candado:
+        _insertar(clave, prefijo, valor, medida)
+
+
+def _prefijo(clave):
+    return clave.split(":", 1)[0]
+
+
+def obtener(clave, ttl=None):
+    """Copia del valor guardado bajo ``clave`` ("prefijo:resto"); None si no está o venció."""
+    entrada = _vigente(clave, ttl)
+    if entrada is None:
+        with _candado:
+            _contador(_prefijo(clave))['fallos'] += 1
+        return None
+    return _copiar(entrada['valor'])
+
+
+def guardar(clave, valor):
+    """Guarda ``valor`` bajo ``clave`` dentro del presupuesto compartido (LRU)."""
+    _guardar(clave, _prefijo(clave), valor)
+
+
+def borrar(prefijo=None):
+    """Elimina las entradas de un loader (o todas)."""
+    with _candado:
+        for clave in [c for c, e in _entradas.items() if prefijo is None or e['prefijo'] == prefijo]:
+            _quitar(clave)
+
+
+# --- INSPECCIÓN ---
+def resumen():
+    """Una fila por loader: entradas, MB, aciertos, fallos, tasa de acierto y edades."""
+    ahora = time.time()
+    with _candado:
+        por_loader = {p: {'loader': p, 'entradas': 0, 'mb': 0.0, **dict(c)} for p, c in _contadores.items()}
+        for entrada in _entradas.values():
+            fila = por_loader.setdefault(entrada['prefijo'], {'loader': entrada['prefijo'], 'entradas': 0, 'mb': 0.0})
+            fila['entradas'] += 1
+            fila['mb'] += entrada['tamano'] / 1e6
+            edad = ahora - entrada['creado']
+            fila['edad_max_s'] = max(fila.get('edad_max_s', 0), edad)
+            fila['edad_min_s'] = min(fila.get('edad_min_s', edad), edad)
+    for fila in por_loader.values():
+        pedidos = fila.get('aciertos', 0) + fila.get('fallos', 0)
+        fila['tasa_acierto'] = fila.get('aciertos', 0) / pedidos if pedidos else None
+    return sorted(por_loader.values(), key=lambda f: -f['mb'])
+
+
+def entradas():
+    """Una fila por entrada guardada, de la más a la menos usada recientemente."""
+    ahora = time.time()
+    with _candado:
+        return [{'loader': e['prefijo'], 'clave': c.split(':', 1)[1][:10], 'mb': e['tamano'] / 1e6,
+                 'edad_s': ahora - e['creado'], 'sin_usar_s': ahora - e['usado'], 'aciertos': e['aciertos']}
+                for c, e in reversed(_entradas.items())]
+
+
+def ocupado_mb():
+    return _total / 1e6
+
+
+# --- DECORADOR ---
+def _clave(prefijo, funcion, args, kwargs):
+    h = hashlib.sha1(funcion.__code__.co_code)   # cambia el código -> cambia la clave
+    try:
+        h.update(pickle.dumps((args, sorted(kwargs.items()))))
+    except Exception:
+        h.update(repr((args, sorted(kwargs.items()))).encode())
+    return f"{prefijo}:{h.hexdigest()}"
+
+
+def _vigente(clave, ttl):
+    """Devuelve la entrada si existe y no venció, marcándola como recién usada."""
+    with _candado:
+        entrada = _entradas.get(clave)
+        if entrada is None:
+            return None
+        ttl = entrada['ttl'] if entrada['ttl'] is not None else ttl
+        if ttl is not None and time.time() - entrada['creado'] >= ttl:
+            _quitar(clave)
+            return None
+        _entradas.move_to_end(clave)
+        entrada['usado'] = time.time()
+        entrada['aciertos'] += 1
+        _contador(entrada['prefijo'])['aciertos'] += 1
+        return entrada
+
+
+def cache_memoria(ttl=None, nombre=None, ttl_vacio=None):
+    """Decorador tipo ``st.cache_data`` con presupuesto de memoria (ver docstring del módulo)."""
+    def decorador(funcion):
+        # Las páginas corren como __main__: usamos el archivo para distinguirlas
+        archivo = os.path.splitext(os.path.basename(funcion.__code__.co_filename))[0]
+        prefijo = nombre or f"{archivo}.{funcion.__qualname__}"
+
+        @functools.wraps(funcion)
+        def envoltura(*args, **kwargs):
+            clave = _clave(prefijo, funcion, args, kwargs)
+            entrada = _vigente(clave, ttl)
+            if entrada is None:
+                with _candado:
+                    candado_clave = _calculando.setdefault(clave, threading.Lock())
+                with candado_clave:
+                    # Otra sesión pudo calcularlo mientras esperábamos
+                    entrada = _vigente(clave, ttl)
+                    if entrada is None:
+                        with _candado:
+                            _contador(prefijo)['fallos'] += 1
+                        try:
+                            valor = funcion(*args, **kwargs)
+                        except BaseException:
+                            with _candado:
+                                _calculando.pop(clave, None)
+                            raise
+                        completo = not _incompleto(valor)
+                        medida = tamano(valor) if completo else 0
+                        propio = ttl_vacio if ttl_vacio is not None and _vacio(valor) else None
+                        # ✅ se guarda y recién después se suelta la marca, en el mismo candado:
+                        # quien llegue entre ambos pasos ya encuentra la entrada y no recalcula
+                        with _candado:
+                            if completo:
+                                _insertar(clave, prefijo, valor, medida, propio)
+                            _calculando.pop(clave, None)
+                        if not completo:
+                            return valor
+                        return _copiar(valor)   # lo guardado no debe ver las mutaciones de la página
+            return _copiar(entrada['valor'])
+
+        envoltura.clear = lambda: borrar(prefijo)
+        return envoltura
+    return decorador
@@ -0,0 +1,198 @@
+"""
+Caché incremental de tablas (delta-sync por marca de agua).
+
+Las tablas que sólo crecen (Control_Raleo, Diametro_Baya, Salidas, clima) no
+necesitan bajarse completas cada vez que vence el TTL del loader:
+se guarda la última marca (``created_at`` o la columna que se indique) y en
+cada refresco se piden sólo las filas con marca >= a la guardada menos
+``MARGEN_MARCA`` (una transacción que confirma tarde puede traer una marca
+algo anterior a la última vista); el solape se deduplica por la clave. Cada
+``RECONCILIAR_CADA`` segundos se baja la lista de ids (más las columnas
+"mutables", p. ej. un estado de anulación) para descartar filas borradas,
+reflejar anulaciones y traer las filas que el delta no vio (cargas
+retroactivas con marca vieja).
+
+Con ``ventana=N`` (segundos) sólo se guardan las filas con marca de los
+últimos N segundos: la carga inicial, los deltas y la reconciliación llevan
+ese piso y el frame se recorta en cada refresco. Así una tabla que crece sin
+fin (la estación del clima) cuesta lo mismo en frío y en memoria al año que
+el primer mes.
+
+El caché vive en memoria del proceso y lo comparten todas las sesiones; por
+eso el frame guardado pasa por ``nucleo.tipos.normalizar`` (categorías,
+int32, datetime64) y ocupa varias veces menos.
+Los loaders siguen con su ``@cache_memoria``; lo que cambia es que su
+refresco cuesta unas pocas filas en lugar de la tabla entera:
+
+    @cache_memoria(ttl=60)
+    def cargar_raleo_supabase():
+        return tabla_incremental('Control_Raleo', paralelo=4)
+"""
+import threading
+import time
+
+import pandas as pd
+
+from nucleo.columnas import columnas_de, proyectar
+from nucleo.datos import fetch
+from nucleo.tipos import normalizar
+
+# --- CONFIGURACIÓN ---
+RECONCILIAR_CADA = 900   # segundos entre reconciliaciones de borrados/anulaciones
+MARGEN_MARCA = 300       # segundos de solape al pedir el delta (filas que confirman tarde)
+LOTE_FALTANTES = 200     # ids por petición al traer filas que faltan (URL acotada)
+
+# Columna marca de agua por tabla (por defecto created_at)
+MARCAS = {
+    'clima': 'fecha_hora',   # la tabla del clima usa creado_en; fecha_hora es UNIQUE e indexada
+    'Clima': 'fecha_hora',
+}
+
+_entradas = {}
+_candado = threading.Lock()
+
+
+def _lista(columnas):
+    if isinstance(columnas, str):
+        return [c.strip() for c in columnas.split(",") if c.strip()]
+    return list(columnas)
+
+
+def _entrada(llave):
+    with _candado:
+        if llave not in _entradas:
+            _entradas[llave] = {'df': None, 'marca': None, 'reconciliado': 0.0,
+                                'candado': threading.Lock()}
+        return _entradas[llave]
+
+
+def _marca_maxima(df, marca):
+    if df.empty or marca not in df.columns:
+        return None
+    maxima = pd.to_datetime(df[marca], utc=True, errors='coerce').max()
+    return None if pd.isna(maxima) else maxima.isoformat()
+
+
+def _piso(ventana):
+    """Marca más antigua que se guarda con ``ventana`` segundos (None = sin piso)."""
+    if ventana is None:
+        return None
+    return pd.Timestamp.now(tz='UTC') - pd.Timedelta(seconds=ventana)
+
+
+def _desde(marca, piso=None):
+    """Marca guardada menos el margen de solape (nunca antes del piso), en ISO 8601."""
+    desde = pd.Timestamp(marca) - pd.Timedelta(seconds=MARGEN_MARCA)
+    return (desde if piso is None else max(desde, piso)).isoformat()
+
+
+def _recortar(df, marca, piso):
+    if piso is None or df.empty or marca not in df.columns:
+        return df
+    vigentes = pd.to_datetime(df[marca], utc=True, errors='coerce') >= piso
+    return df if vigentes.all() else df[vigentes].reset_index(drop=True)
+
+
+def _fusionar(df, nuevas, clave):
+    # el solape trae de nuevo filas ya vistas: la última versión gana
+    df = pd.concat([df, nuevas], ignore_index=True)
+    return df.drop_duplicates(subset=clave, keep='last').sort_values(clave, ignore_index=True)
+
+
+def _reconciliar(tabla, df, columnas, clave, mutables, paralelo, formato, filtros=None):
+    """Quita filas borradas en el servidor, trae las que faltan y actualiza las columnas mutables."""
+    actual = fetch(tabla, [clave, *mutables], filtros=filtros, paralelo=paralelo, formato=formato)
+    if actual.empty:
+        return df.iloc[0:0]
+    actual = actual.set_index(clave)
+    df = df[df[clave].isin(actual.index)].copy()
+    for col in mutables:
+        df[col] = df[clave].map(actual[col])
+
+    # ✅ filas que el delta no vio (marca anterior a la guardada): se piden por clave
+    faltan = actual.index.difference(df[clave]).tolist()
+    lotes = [fetch(tabla, columnas, filtros={clave: faltan[i:i + LOTE_FALTANTES]}, formato=formato,
+                   normalizar=True)
+             for i in range(0, len(faltan), LOTE_FALTANTES)]
+    if lotes:
+        df = _fusionar(df, pd.concat(lotes, ignore_index=True), clave)
+    return df.reset_index(drop=True)
+
+
+def tabla_incremental(tabla, columnas="*", marca=None, clave='id', mutables=(),
+                      reconciliar_cada=RECONCILIAR_CADA, paralelo=1, vista=None, formato="json",
+                      ventana=None):
+    """Devuelve la tabla completa usando el caché incremental del proceso.
+
+    - marca:     columna de marca de agua (por defecto MARCAS o 'created_at').
+    - clave:     columna única para fusionar y reconciliar.
+    - mutables:  columnas que pueden cambiar después del insert (anulaciones);
+                 se refrescan en cada reconciliación.
+    - reconciliar_cada: segundos entre reconciliaciones (None = nunca).
+    - vista:     como en fetch(): pide sólo las columnas declaradas.
+    - formato:   como en fetch(): 'csv' para la carga inicial y los deltas.
+    - ventana:   segundos hacia atrás que se guardan (None = toda la tabla).
+    """
+    marca = marca or MARCAS.get(tabla, 'created_at')
+    declaradas = columnas_de(vista, tabla) if vista else None
+    if declaradas:
+        columnas = declaradas
+    if columnas != "*":
+        # Siempre traemos clave y marca, aunque la vista no las muestre
+        columnas = tuple(dict.fromkeys([*_lista(columnas), clave, marca, *mutables]))
+
+    entrada = _entrada((tabla, columnas, marca, clave, ventana))
+    with entrada['candado']:
+        ahora = time.monotonic()
+        piso = _piso(ventana)
+        recientes = None if piso is None else {marca: ('gte', piso.isoformat())}
+        if entrada['df'] is None or entrada['marca'] is None:
+            df = fetch(tabla, columnas, filtros=recientes, paralelo=paralelo, formato=formato, normalizar=True)
+            nuevas = df
+            entrada['reconciliado'] = ahora
+        else:
+            df = entrada['df']
+            nuevas = fetch(tabla, columnas, filtros={marca: ('gte', _desde(entrada['marca'], piso))},
+                           paralelo=paralelo, formato=formato, normalizar=True)
+            if not nuevas.empty:
+                df = _fusionar(df, nuevas, clave)
+            df = _recortar(df, marca, piso)
+            if reconciliar_cada is not None and ahora - entrada['reconciliado'] >= reconciliar_cada:
+                df = _reconciliar(tabla, df, columnas, clave, mutables, paralelo, formato, recientes)
+                entrada['reconciliado'] = ahora
+            if df is not entrada['df']:
+                # concat de categorías distintas vuelve a object: se renormaliza
+                df = normalizar(df, tabla)
+        entrada['df'], entrada['marca'] = df, _marca_maxima(df, marca)
+
+    resultado = df.copy()
+    resultado.attrs.update(tabla=tabla, filas_nuevas=len(nuevas),
+                           paginas=nuevas.attrs.get('paginas', 0), bytes=nuevas.attrs.get('bytes', 0))
+    if declaradas:
+        resultado = proyectar(resultado.reindex(columns=list(declaradas)), vista, tabla)
+    return resultado
+
+
+def olvidar(tabla=None):
+    """Descarta el caché de una tabla (o de todas): la próxima lectura será completa."""
+    with _candado:
+        for llave in [k for k in _entradas if tabla is None or k[0] == tabla]:
+            del _entradas[llave]
+
+
+def resumen():
+    """Una fila por tabla cacheada: filas, MB en memoria, marca y última reconciliación."""
+    ahora = time.monotonic()
+    with _candado:
+        items = list(_entradas.items())
+    filas = []
+    for (tabla, columnas, marca, _clave, _ventana), entrada in items:
+        df = entrada['df']
+        if df is None:
+            continue
+        filas.append({
+            'tabla': tabla, 'columnas': columnas if isinstance(columnas, str) else ", ".join(columnas),
+            'filas': len(df), 'mb': df.memory_usage(deep=True).sum() / 1e6,
+            'marca': entrada['marca'], 'reconciliado_hace_s': ahora - entrada['reconciliado'],
+        })
+    return filas
@@ -0,0 +1,321 @@
+"""
+Cálculos de las páginas que no dependen de Streamlit.
+
+Viven aquí (y no dentro de cada página) para poder medirlos con datos
+sintéticos desde ``benchmarks/`` sin levantar la interfaz: importar una página
+ejecuta su script completo. Las páginas los importan tal cual.
+"""
+from datetime import date, datetime
+
+import numpy as np
+import pandas as pd
+
+
+# --- ALMACÉN (Kardex y Mezclas) ---
+def generar_kardex(df_p, df_i, df_s):
+    """Devuelve (df_por_lote, df_por_producto).
+    df_por_lote : una fila por cada ingreso/lote (vista técnica de almacén).
+    df_por_producto: stock total agrupado por producto (vista gerencial).
+    """
+    if df_p.empty:
+        return pd.DataFrame(), pd.DataFrame()
+
+    df_p = df_p.copy()
+    df_p['Stock_Minimo'] = pd.to_numeric(df_p.get('Stock_Minimo', 0), errors='coerce').fillna(0.0)
+    if 'Activo' not in df_p.columns:
+        df_p['Activo'] = True
+    df_p['Activo'] = df_p['Activo'].fillna(True).astype(bool)
+
+    # --- Calcular stock por lote ---
+    if df_i.empty:
+        df_lotes = df_p.copy()
+        df_lotes['Stock_Lote']     = 0.0
+        df_lotes['Valorizado_PEN'] = 0.0
+        df_lotes['Dias_para_Vencer'] = 999
+        return df_lotes, pd.DataFrame()
+
+    if 'Estado_Registro' not in df_i.columns:
+        df_i['Estado_Registro'] = 'Completo 🟢'
+    df_i['Estado_Registro'] = df_i['Estado_Registro'].fillna('Completo 🟢')
+
+    if not df_s.empty:
+        gastado    = df_s.groupby('Ingreso_ID')['Cantidad_Usada'].sum().reset_index()
+        df_balance = pd.merge(df_i, gastado, left_on='id', right_on='Ingreso_ID', how='left').fillna({'Cantidad_Usada': 0})
+    else:
+        df_balance = df_i.copy()
+        df_balance['Cantidad_Usada'] = 0
+
+    df_balance['Stock_Lote'] = df_balance['Cantidad_Ingresada'] - df_balance['Cantidad_Usada']
+
+    # --- Merge lotes → catálogo ---
+    df_lotes = pd.merge(df_balance, df_p, left_on='Codigo_Producto', right_on='Codigo', how='right')
+    df_lotes['Stock_Lote']          = df_lotes['Stock_Lote'].fillna(0.0)
+    df_lotes['Precio_Unitario_PEN'] = pd.to_numeric(df_lotes.get('Precio_Unitario_PEN', 0), errors='coerce').fillna(0.0)
+    df_lotes['Valorizado_PEN']      = df_lotes['Stock_Lote'] * df_lotes['Precio_Unitario_PEN']
+    df_lotes['Cantidad_Usada']      = df_lotes['Cantidad_Usada'].fillna(0.0)
+
+    hoy = pd.Timestamp(date.today())
+    df_lotes['Venc_Date']        = pd.to_datetime(df_lotes.get('Fecha_Vencimiento'), errors='coerce')
+    df_lotes['Dias_para_Vencer'] = (df_lotes['Venc_Date'] - hoy).dt.days
+    df_lotes.loc[df_lotes['Venc_Date'].isnull() | (df_lotes['Venc_Date'].dt.year < 2000), 'Dias_para_Vencer'] = 999
+
+    # ✅ FIX: Prox_Vencimiento solo sobre lotes con stock real (evita falsas alarmas)
+    df_lotes_con_stock = df_lotes[df_lotes['Stock_Lote'] > 0].copy()
+
+    # --- KPI: Salidas por producto para Rotación y Días de Cobertura ---
+    # Cruzamos Salidas → Ingresos → Producto para saber cuánto se consumió de cada producto
+    if not df_s.empty and 'Ingreso_ID' in df_s.columns:
+        # Traemos el código de producto desde los ingresos
+        df_s_prod = pd.merge(
+            df_s[['Ingreso_ID', 'Cantidad_Usada']],
+            df_i[['id', 'Codigo_Producto']],
+            left_on='Ingreso_ID', right_on='id', how='left'
+        )
+        salidas_por_prod = df_s_prod.groupby('Codigo_Producto')['Cantidad_Usada'].sum().reset_index()
+        salidas_por_prod.columns = ['Codigo', 'Total_Salidas']
+    else:
+        salidas_por_prod = pd.DataFrame(columns=['Codigo', 'Total_Salidas'])
+
+    # ✅ Calculamos Prox_Vencimiento FUERA del groupby para evitar el KeyError de índices
+    # Solo contamos lotes que aún tienen stock real (evita falsas alarmas de lotes vacíos)
+    venc_con_stock = (
+        df_lotes_con_stock.groupby('Codigo')['Dias_para_Vencer']
+        .min()
+        .reset_index()
+        .rename(columns={'Dias_para_Vencer': 'Prox_Vencimiento'})
+    )
+
+    # Vista agrupada por PRODUCTO (sin Prox_Vencimiento por ahora)
+    df_por_producto = (
+        df_lotes.groupby(['Codigo', 'Producto', 'Unidad', 'Tipo_Accion', 'Stock_Minimo', 'Activo',
+                          'Ingrediente_Activo', 'Marca', 'Formulacion', 'Banda_Toxicologica', 'Ficha_Tecnica_URL'],
+                         dropna=False)
+        .agg(
+            Stock_Total    =('Stock_Lote',    'sum'),
+            Valorizado_PEN =('Valorizado_PEN', 'sum'),
+            N_Lotes        =('Codigo_Lote',    'count'),
+        )
+        .reset_index()
+    )
+
+    # Incorporamos Prox_Vencimiento limpio (999 = sin vencimiento próximo)
+    df_por_producto = pd.merge(df_por_producto, venc_con_stock, on='Codigo', how='left')
+    df_por_producto['Prox_Vencimiento'] = df_por_producto['Prox_Vencimiento'].fillna(999).astype(int)
+
+
+
+    # Unir Total_Salidas
+    df_por_producto = pd.merge(df_por_producto, salidas_por_prod, on='Codigo', how='left')
+    df_por_producto['Total_Salidas'] = df_por_producto['Total_Salidas'].fillna(0.0)
+
+    # --- KPIs derivados ---
+    PERIODO_DIAS = 180  # Ventana de cálculo: últimos 6 meses
+
+    # ✅ División segura: reemplazamos 0 con NaN ANTES de dividir.
+    # np.where evalúa ambas ramas siempre, por eso no podemos usarlo con divisiones.
+    stock_safe   = df_por_producto['Stock_Total'].replace(0, np.nan)
+    consumo_diario = df_por_producto['Total_Salidas'] / PERIODO_DIAS
+    consumo_safe = consumo_diario.replace(0, np.nan)
+
+    # Rotación = Total salidas / Stock actual  (NaN si sin stock)
+    df_por_producto['Rotacion'] = (df_por_producto['Total_Salidas'] / stock_safe).round(2)
+
+    # Días de Cobertura = Stock actual / consumo diario  (NaN si sin consumo)
+    df_por_producto['Dias_Cobertura'] = (df_por_producto['Stock_Total'] / consumo_safe).round(0)
+
+    # Stock Muerto = tiene stock pero 0 salidas registradas
+    df_por_producto['Stock_Muerto'] = (
+        (df_por_producto['Stock_Total'] > 0) & (df_por_producto['Total_Salidas'] == 0)
+    )
+
+    return df_lotes, df_por_producto
+
+
+# Motor FEFO (First Expired, First Out)
+def obtener_fefo(df_p, df_i, df_s):
+    if df_i.empty: return pd.DataFrame()
+    gastado = df_s.groupby('Ingreso_ID')['Cantidad_Usada'].sum().reset_index() if not df_s.empty else pd.DataFrame(columns=['Ingreso_ID', 'Cantidad_Usada'])
+    df_res = pd.merge(df_i, gastado, left_on='id', right_on='Ingreso_ID', how='left').fillna(0)
+    df_res['Stock_Actual'] = df_res['Cantidad_Ingresada'] - df_res['Cantidad_Usada']
+    return pd.merge(df_res[df_res['Stock_Actual'] > 0], df_p, left_on='Codigo_Producto', right_on='Codigo')
+
+
+# --- SANIDAD ---
+def aplanar_sanidad(df_san_raw):
+    """Desempaqueta los arrays JSONB de Evaluaciones_Sanitarias: una fila por planta.
+    Devuelve (df_plagas, df_enfermedades).
+    """
+    plagas_records = []
+    enfermedades_records = []
+    
+    if not df_san_raw.empty:
+        for _, row in df_san_raw.iterrows():
+            fecha = pd.to_datetime(row['Fecha']).date()
+            sector = row['Sector']
+            evaluador = row.get('Evaluador', 'N/A')
+            
+            # Desempaquetar Plagas
+            datos_p = row.get('Datos_Plagas', [])
+            if isinstance(datos_p, list):
+                for planta in datos_p:
+                    plagas_records.append({
+                        'Fecha': fecha, 'Sector': sector, 'Evaluador': evaluador,
+                        'TRIPS': float(planta.get('TRIPS', 0)),
+                        'M_BLANCA': float(planta.get('M.BLANCA', 0)),
+                        'A_ROJA': float(planta.get('A.ROJA', 0)),
+                        'COCHINILLA': float(planta.get('COCHINILLA', 0))
+                    })
+            
+            # Desempaquetar Enfermedades
+            datos_e = row.get('Datos_Enfermedades', [])
+            if isinstance(datos_e, list):
+                for planta in datos_e:
+                    enfermedades_records.append({
+                        'Fecha': fecha, 'Sector': sector, 'Evaluador': evaluador,
+                        'OIDIO': float(planta.get('OIDIO %', 0)),
+                        'MILDIU': float(planta.get('MILDIU %', 0)),
+                        'BOTRYTIS': float(planta.get('BOTRYTIS', 0))
+                    })
+
+    return pd.DataFrame(plagas_records), pd.DataFrame(enfermedades_records)
+
+
+# --- DIÁMETRO DE BAYA ---
+def calcular_tasa_crecimiento(df):
+    columnas_reales = [c for c in df.columns if c.startswith('Racimo_')]
+    if df.shape[0] < 2 or not columnas_reales:
+        return pd.DataFrame()
+
+    df['Diametro_Prom_Planta'] = df[columnas_reales].mean(axis=1)
+    tasas = []
+    for sector in df['Sector'].unique():
+        df_sector = df[df['Sector'] == sector].copy()
+        promedio_por_fecha = df_sector.groupby('Fecha')['Diametro_Prom_Planta'].mean()
+        if len(promedio_por_fecha) >= 2:
+            ultimas_dos = promedio_por_fecha.sort_index().tail(2)
+            (p_penultimo, p_ultimo), (f_penultima, f_ultima) = ultimas_dos.values, ultimas_dos.index
+            dias = (f_ultima - f_penultima).days
+            if dias > 0:
+                tasa = (p_ultimo - p_penultimo) / dias
+                tasas.append({
+                    "Sector": sector, "Tasa (mm/día)": tasa, "Desde": f_penultima.strftime('%d/%m/%Y'),
+                    "Hasta": f_ultima.strftime('%d/%m/%Y'), "Días Transcurridos": dias
+                })
+    return pd.DataFrame(tasas)
+
+
+# --- CLIMA ---
+def generar_datos_demo(dias=14):
+    """Genera ``dias`` días de clima horario realista para la costa norte del Perú (Trujillo/Pacanguilla)."""
+    np.random.seed(42)
+    horas = pd.date_range(end=datetime.now(), periods=24*dias, freq="h")
+    hora_del_dia = horas.hour
+
+    # Temperatura: ciclo diurno costero (fresco de madrugada, pico al mediodía)
+    temp_base = 22 + 4 * np.sin((hora_del_dia - 6) * np.pi / 12)
+    temp = temp_base + np.random.normal(0, 0.8, len(horas))
+
+    # Humedad: inversamente relacionada con temp (alta de noche, baja al mediodía)
+    hum_base = 85 - 12 * np.sin((hora_del_dia - 6) * np.pi / 12)
+    hum = np.clip(hum_base + np.random.normal(0, 3, len(horas)), 55, 98)
+
+    # Radiación solar: solo de día (6am-6pm)
+    rad = np.where((hora_del_dia >= 6) & (hora_del_dia <= 18),
+                   600 * np.sin((hora_del_dia - 6) * np.pi / 12) + np.random.normal(0, 40, len(horas)),
+                   0)
+    rad = np.clip(rad, 0, 900)
+
+    # Viento y lluvia
+    viento = np.abs(np.random.normal(8, 3, len(horas)))
+    lluvia = np.where(np.random.random(len(horas)) < 0.02, np.random.uniform(0.2, 2.5, len(horas)), 0)
+
+    return pd.DataFrame({
+        "fecha_hora":     horas,
+        "temp_out":       temp.round(1),
+        "hum_out":        hum.round(1),
+        "lluvia_mm":      lluvia.round(2),
+        "viento_vel":     viento.round(1),
+        "radiacion_solar":rad.round(0),
+    })
+
+
+def calcular_dpv(temp_c, hr_pct):
+    """
+    DPV (kPa) = Presión de vapor saturante × (1 − HR/100)
+    Referencia: Allen et al. (1998), FAO-56.
+    Rango: 
+      <0.4  → Zona húmeda (riesgo Botrytis/Oidio)
+      0.4-0.8 → Óptimo bajo (crecimiento activo con riesgo)
+      0.8-1.6 → Óptimo vitícola ✅
+      1.6-2.5 → Estrés hídrico leve ⚠️
+      >2.5  → Estrés severo (estomas cerrados) 🔥
+    """
+    svp = 0.6108 * np.exp(17.27 * temp_c / (temp_c + 237.3))
+    return svp * (1 - hr_pct / 100)
+
+
+def calcular_riesgo_plagas(df_pasado):
+    """
+    Calcula índices de riesgo para las 3 plagas/enfermedades clave.
+    Devuelve un dict con puntaje 0-100 y nivel de alerta.
+    """
+    if df_pasado.empty:
+        return {}
+
+    temp  = df_pasado['temp_out']
+    hr    = df_pasado['hum_out']
+    dpv   = df_pasado['dpv']
+    n     = len(df_pasado)
+
+    # --- OIDIO (Uncinula necator) ---
+    # Favorable: 20-30°C y HR > 60% y DPV < 1.2
+    h_oidio = ((temp >= 20) & (temp <= 30) & (hr > 60) & (dpv < 1.2)).sum()
+    riesgo_oidio = min(100, round(h_oidio / n * 200))
+
+    # --- BOTRYTIS (Botrytis cinerea) ---
+    # Favorable: 15-25°C y HR > 85%
+    h_bot = ((temp >= 15) & (temp <= 25) & (hr > 85)).sum()
+    riesgo_botrytis = min(100, round(h_bot / n * 250))
+
+    # --- ARAÑITA ROJA (Tetranychus urticae) ---
+    # Favorable: T > 28°C y HR < 50% (condiciones secas y calurosas)
+    h_ara = ((temp > 28) & (hr < 50)).sum()
+    riesgo_aranita = min(100, round(h_ara / n * 300))
+
+    def nivel(pct):
+        if pct < 20:  return "🟢 Bajo"
+        if pct < 50:  return "🟡 Moderado"
+        if pct < 75:  return "🟠 Alto"
+        return "🔴 Crítico"
+
+    return {
+        "Oidio":         {"pct": riesgo_oidio,    "nivel": nivel(riesgo_oidio)},
+        "Botrytis":      {"pct": riesgo_botrytis, "nivel": nivel(riesgo_botrytis)},
+        "Arañita Roja":  {"pct": riesgo_aranita,  "nivel": nivel(riesgo_aranita)},
+    }
+
+
+# --- FINANZAS ---
+def armar_planilla(df_horas, df_personal, f_inicio, f_fin):
+    """Cruza Registro_Horas_Tractor del periodo con Personal y deja sólo tractoristas/operadores.
+    Devuelve (df_horas_filtradas, df_planilla).
+    """
+    # ✅ FIX: NaT-safe date conversion (sin tocar el frame del caché)
+    df_horas = df_horas.assign(Fecha=pd.to_datetime(df_horas['Fecha'], errors='coerce')).dropna(subset=['Fecha'])
+    df_horas['Fecha_date'] = df_horas['Fecha'].dt.date
+    df_horas_filtradas = df_horas[
+        (df_horas['Fecha_date'] >= f_inicio) & (df_horas['Fecha_date'] <= f_fin)
+    ]
+
+    # Cruce relacional
+    df_planilla = pd.merge(
+        df_horas_filtradas,
+        df_personal[['id', 'nombre_completo', 'rol', 'Sueldo_Hora']],
+        left_on='personal_id', right_on='id', how='left'
+    )
+
+    # Filtrar solo tractoristas/operadores
+    if not df_planilla.empty and 'rol' in df_planilla.columns:
+        df_planilla['rol_clean'] = df_planilla['rol'].astype(str).str.strip().str.lower()
+        df_planilla = df_planilla[df_planilla['rol_clean'].isin(['tractorista', 'operador', 'maquinista'])]
+    return df_horas_filtradas, df_planilla
@@ -0,0 +1,103 @@
+"""
+Registro de columnas por vista (proyección declarativa).
+
+Cada página declara qué columnas de cada tabla usa de verdad; ``fetch(...,
+vista=...)`` pide sólo esas en el ``select`` en lugar de ``*``. Así no viajan
+los JSON grandes (Datos_Plagas, Receta_Mezcla_Lotes, Datos_Tecnicos...) cuando
+la vista no los muestra.
+
+Si una vista lee una columna que no declaró, el DataFrame devuelto lanza
+``ColumnaNoDeclarada`` con un mensaje que dice qué agregar aquí, en lugar del
+KeyError genérico de pandas.
+
+Para sumar una vista: agregar su entrada a ``REGISTRO`` y llamar
+``fetch('Tabla', vista='Nombre de la vista')`` desde la página.
+"""
+import pandas as pd
+
+# Columnas de medición de Diametro_Baya (mismo mapeo que usa 1_Diametro_Baya.py al guardar)
+_RACIMOS_DIAMETRO = tuple(
+    f"Racimo_{r}_{p}" for r in (1, 2) for p in ("Superior", "Medio", "Inferior")
+)
+
+REGISTRO = {
+    "Dashboard General": {
+        "Monitoreo_Mosca":          ("Fecha", "Sector", "Ceratitis_capitata"),
+        "Control_Raleo":            ("Fecha", "Racimos_Reales"),
+        "Ordenes_de_Trabajo":       ("Status", "Fecha_Programada", "Sector_Aplicacion", "Objetivo", "Datos_Tecnicos"),
+        "Diametro_Baya":            ("Fecha", "Sector") + _RACIMOS_DIAMETRO,
+        "Evaluaciones_Fenologicas": ("Fecha", "Sector", "Punta_algodon", "Punta_verde",
+                                     "Salida_de_hojas", "Hojas_extendidas", "Racimos_visibles"),
+        "Clima":                    ("fecha_hora", "temp_out"),
+    },
+    "Dashboard Sanidad": {
+        "Monitoreo_Mosca":          ("Fecha", "Sector", "Numero_Trampa", "Ceratitis_capitata",
+                                     "Anastrepha_fraterculus", "Anastrepha_distinta"),
+        "Evaluaciones_Sanitarias":  ("Fecha", "Sector", "Evaluador", "Datos_Plagas", "Datos_Enfermedades"),
+    },
+    "Dashboard Finanzas": {
+        "Registro_Horas_Tractor":   ("Fecha", "personal_id", "Sector", "Labor_Realizada", "Implemento", "Total_Horas"),
+    },
+    "Evaluación Fenológica": {
+        "Evaluaciones_Fenologicas": ("Fecha", "Sector", "Planta", "Punta_algodon", "Punta_verde",
+                                     "Salida_de_hojas", "Hojas_extendidas", "Racimos_visibles"),
+    },
+    "Gestión de Cosecha": {
+        "Registro_Cosecha":         ("Fecha", "Sector", "Cantidad_Javas", "Kilos_Exportacion_Premium",
+                                     "Kilos_Descarte_Local", "Kilos_Totales_Sectores",
+                                     "Responsable_Cuadrilla_id", "Observaciones"),
+    },
+    "Gestión de Mezclas": {
+        # Aquí los JSON sí viajan: la receta se muestra y de ella se despachan los lotes
+        "Ordenes_de_Trabajo":       ("id", "created_at", "Status", "ID_Orden_Personalizado", "Sector_Aplicacion",
+                                     "Fecha_Programada", "Objetivo", "Tipo_Aplicacion", "Volumen_Hectarea",
+                                     "Marcha", "Presion_Bar", "Color_Boquilla", "Datos_Tecnicos",
+                                     "Receta_Mezcla_Lotes"),
+    },
+    "Gestión de Productos y Kardex": {
+        "Productos":                ("id", "Codigo", "Producto", "Unidad", "Tipo_Accion", "Stock_Minimo", "Activo",
+                                     "Ingrediente_Activo", "Marca", "Formulacion", "Banda_Toxicologica",
+                                     "Ficha_Tecnica_URL", "Periodo_Carencia_Dias", "Incompatible_Con"),
+    },
+}
+
+
+class ColumnaNoDeclarada(KeyError):
+    """Una vista leyó una columna que no figura en REGISTRO."""
+
+
+def columnas_de(vista, tabla):
+    """Columnas declaradas por ``vista`` para ``tabla``; falla si no hay declaración."""
+    try:
+        return REGISTRO[vista][tabla]
+    except KeyError:
+        raise ColumnaNoDeclarada(
+            f"La vista '{vista}' no declaró columnas para '{tabla}' en nucleo/columnas.py"
+        ) from None
+
+
+class FrameProyectado(pd.DataFrame):
+    """DataFrame que recuerda de qué vista/tabla salió para dar errores claros."""
+
+    _metadata = ["_vista", "_tabla"]
+
+    @property
+    def _constructor(self):
+        return FrameProyectado
+
+    def __getitem__(self, clave):
+        try:
+            return super().__getitem__(clave)
+        except KeyError as e:
+            vista, tabla = getattr(self, "_vista", None), getattr(self, "_tabla", None)
+            raise ColumnaNoDeclarada(
+                f"'{vista}' leyó {e} de '{tabla}', columna no declarada: "
+                f"agréguela en REGISTRO['{vista}']['{tabla}'] (nucleo/columnas.py)"
+            ) from e
+
+
+def proyectar(df, vista, tabla):
+    """Envuelve el resultado de fetch() para que los accesos indebidos fallen en voz alta."""
+    df = FrameProyectado(df)
+    df._vista, df._tabla = vista, tabla
+    return df
@@ -0,0 +1,470 @@
+"""
+Capa de acceso a datos compartida (Supabase / PostgREST).
+
+Todas las páginas de ``modulos/`` y ``app.py`` importan de aquí en lugar de
+crear su propio cliente: hay UN solo cliente por proceso, con su pool de
+conexiones keep-alive, y todas las lecturas pasan por ``fetch()`` con
+timeout por llamada y reintentos.
+
+Uso típico en una página:
+
+    from nucleo.datos import obtener_cliente, fetch
+
+    supabase = obtener_cliente()            # para insert / update / upsert
+    df = fetch('Salidas', 'Ingreso_ID, Cantidad_Usada')
+    df = fetch('Tareas_Evaluador', filtros={'Estado': 'Pendiente'},
+               orden='-Fecha', limite=50)
+    df = fetch('Control_Raleo', paralelo=4)   # tabla grande: páginas en paralelo
+    df = fetch('Clima', vista='Dashboard General')   # columnas de nucleo/columnas.py
+
+Las lecturas sin límite se paginan solas con cabeceras ``Range`` para no
+chocar con el tope de filas del servidor (max-rows de PostgREST). El costo
+de cada lectura queda en ``df.attrs['paginas']`` y ``df.attrs['bytes']``.
+
+Las tablas grandes y planas pueden viajar como CSV (``formato='csv'``) en
+lugar de JSON: se parsean con pyarrow y tipos declarados en ``nucleo.tipos``.
+"""
+import io
+import logging
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, datetime
+from urllib.parse import unquote
+
+import httpx
+import pandas as pd
+
+from nucleo import instrumentacion
+from nucleo.columnas import columnas_de, proyectar
+from nucleo.tipos import normalizar as _normalizar, tipos_de
+from nucleo.versiones import incrementar
+
+# --- CONFIGURACIÓN ---
+TIMEOUT_POR_DEFECTO = 10.0   # segundos por petición HTTP
+REINTENTOS          = 3      # intentos totales ante fallos de red / 5xx / 429
+ESPERA_BASE         = 0.5    # segundos; se duplica en cada reintento
+MAX_HILOS           = 8      # pool compartido para cargar varias tablas a la vez
+TAMANO_PAGINA       = 1000   # filas por ventana Range (= max-rows por defecto de Supabase)
+CLAVE_ORDEN         = 'id'   # desempate estable para que las páginas no se solapen
+
+OPERADORES = ('eq', 'neq', 'gt', 'gte', 'lt', 'lte', 'like', 'ilike', 'is')
+
+
+log = logging.getLogger(__name__)
+
+
+class ErrorDatos(Exception):
+    """Fallo al hablar con Supabase: configuración, red o respuesta inválida."""
+
+
+# --- CLIENTE ÚNICO POR PROCESO ---
+_cliente = None
+_pool = None
+_candado = threading.Lock()
+
+
+def _credenciales():
+    """Lee URL y KEY de st.secrets; si no hay Streamlit, de las variables de entorno."""
+    try:
+        import streamlit as st
+        return st.secrets["SUPABASE_URL"], st.secrets["SUPABASE_KEY"]
+    except Exception:
+        url, key = os.environ.get("SUPABASE_URL"), os.environ.get("SUPABASE_KEY")
+        if url and key:
+            return url, key
+    raise ErrorDatos("Faltan SUPABASE_URL / SUPABASE_KEY en st.secrets o en el entorno.")
+
+
+def obtener_cliente():
+    """Devuelve el cliente Supabase del proceso (se crea una sola vez)."""
+    global _cliente
+    if _cliente is None:
+        with _candado:
+            if _cliente is None and os.environ.get("PROYECTO_UVA_SUPABASE_FALSO"):
+                # Modo sin conexión: SQLite en proceso (ver nucleo/supabase_falso.py)
+                from nucleo.supabase_falso import ClienteFalso
+                ruta = os.environ["PROYECTO_UVA_SUPABASE_FALSO"]
+                _instalar(ClienteFalso(None if ruta == "1" else ruta))
+            if _cliente is None:
+                from supabase import ClientOptions, create_client
+                url, key = _credenciales()
+                try:
+                    cliente = create_client(
+                        url, key, options=ClientOptions(postgrest_client_timeout=TIMEOUT_POR_DEFECTO)
+                    )
+                except Exception as e:
+                    raise ErrorDatos(f"No se pudo crear el cliente Supabase: {e}") from e
+                _instalar(cliente)
+    return _cliente
+
+
+def _instalar(cliente):
+    global _cliente
+    hooks = cliente.postgrest.session.event_hooks
+    # ✅ idempotente: reinstalar el mismo cliente no debe contar dos veces cada consulta
+    if _marcar_inicio not in hooks["request"]:
+        hooks["request"].append(_marcar_inicio)
+    for hook in (_registrar_escritura, _registrar_consulta):
+        if hook not in hooks["response"]:
+            hooks["response"].append(hook)
+    _cliente = cliente
+
+
+def usar_cliente(cliente):
+    """Reemplaza el cliente del proceso (p. ej. por un ClienteFalso en benchmarks)."""
+    with _candado:
+        _instalar(cliente)
+    return cliente
+
+
+def _registrar_escritura(resp):
+    """Hook httpx: toda escritura exitosa sube la versión de su tabla (ver nucleo.versiones)."""
+    req = resp.request
+    if req.method in ("POST", "PATCH", "PUT", "DELETE") and resp.is_success:
+        ruta = unquote(req.url.path)
+        if "/rpc/" not in ruta:
+            try:
+                incrementar(_tabla_de(req))
+            except Exception:
+                # La escritura ya se hizo: un fallo aquí sólo retrasa el refresco hasta el TTL
+                log.exception("No se pudo registrar la versión de %s", ruta)
+
+
+def _marcar_inicio(req):
+    req.extensions["inicio_consulta"] = time.perf_counter()
+
+
+def _tabla_de(req):
+    return unquote(req.url.path).rstrip("/").rsplit("/", 1)[-1]
+
+
+def _registrar_consulta(resp):
+    """Hook httpx: escrituras y RPC del query builder (las lecturas las registra _pedir)."""
+    req = resp.request
+    if req.method in ("GET", "HEAD") or "inicio_consulta" not in req.extensions:
+        return
+    try:
+        instrumentacion.registrar(req.method, _tabla_de(req), req.url.params.multi_items(),
+                                  req.extensions["inicio_consulta"], resp=resp,
+                                  bytes_enviados=len(req.content))
+    except Exception:
+        log.exception("No se pudo instrumentar %s %s", req.method, req.url.path)
+
+
+# --- CONSTRUCCIÓN DE PARÁMETROS POSTGREST ---
+def _formatear_valor(valor):
+    if isinstance(valor, bool):
+        return "true" if valor else "false"
+    if valor is None:
+        return "null"
+    if isinstance(valor, (date, datetime)):
+        return valor.isoformat()
+    return str(valor)
+
+
+def _formatear_lista(valores):
+    partes = []
+    for v in valores:
+        texto = _formatear_valor(v)
+        # PostgREST exige comillas si el valor trae comas, paréntesis o espacios
+        if isinstance(v, str) and any(c in texto for c in ',()" '):
+            texto = '"' + texto.replace('"', '\\"') + '"'
+        partes.append(texto)
+    return "(" + ",".join(partes) + ")"
+
+
+def _parametros(columnas, filtros, orden, limite):
+    """Traduce los argumentos de fetch() a la query string de PostgREST."""
+    if isinstance(columnas, (list, tuple)):
+        columnas = ",".join(columnas)
+    params = [("select", "".join(str(columnas).split()))]
+
+    if filtros:
+        items = filtros.items() if isinstance(filtros, dict) else ((c, (op, v)) for c, op, v in filtros)
+        for col, valor in items:
+            if isinstance(valor, (list, set, frozenset)):
+                params.append((col, "in." + _formatear_lista(valor)))
+            elif isinstance(valor, tuple):
+                op, v = valor
+                if op not in OPERADORES:
+                    raise ErrorDatos(f"Operador de filtro no soportado: {op}")
+                params.append((col, f"{op}.{_formatear_valor(v)}"))
+            else:
+                params.append((col, "eq." + _formatear_valor(valor)))
+
+    if orden:
+        campos = [orden] if isinstance(orden, str) else list(orden)
+        params.append(("order", ",".join(
+            f"{c[1:]}.desc" if c.startswith("-") else c for c in campos
+        )))
+
+    if limite is not None:
+        params.append(("limit", str(int(limite))))
+    return params
+
+
+# --- PETICIÓN CON TIMEOUT Y REINTENTOS ---
+def _pedir(metodo, tabla, params, headers=None, timeout=None, reintentos=None):
+    """Ejecuta la petición sobre la sesión keep-alive del cliente, con reintentos.
+
+    ``reintentos`` es el total de intentos (por defecto REINTENTOS; 1 = sin reintentar).
+    """
+    sesion = obtener_cliente().postgrest.session
+    timeout = TIMEOUT_POR_DEFECTO if timeout is None else timeout
+    reintentos = REINTENTOS if reintentos is None else reintentos
+    error = None
+
+    for intento in range(reintentos):
+        inicio = time.perf_counter()
+        try:
+            resp = sesion.request(metodo, f"/{tabla}", params=params, headers=headers, timeout=timeout)
+        except httpx.TransportError as e:
+            error = e
+            instrumentacion.registrar(metodo, tabla, params, inicio, error=e)
+        else:
+            instrumentacion.registrar(metodo, tabla, params, inicio, resp=resp)
+            if resp.status_code < 500 and resp.status_code != 429:
+                if resp.is_error:
+                    raise ErrorDatos(f"{tabla}: HTTP {resp.status_code} — {resp.text[:300]}")
+                return resp
+            error = ErrorDatos(f"{tabla}: HTTP {resp.status_code} — {resp.text[:300]}")
+
+        if intento < reintentos - 1:
+            time.sleep(ESPERA_BASE * (2 ** intento))
+
+    raise ErrorDatos(f"{tabla}: sin respuesta tras {reintentos} intentos ({error})") from error
+
+
+# --- PAGINACIÓN POR VENTANAS RANGE ---
+def _rango(desde, hasta):
+    return {"Range-Unit": "items", "Range": f"{desde}-{hasta}"}
+
+
+def _total_de(resp):
+    """Total de filas según ``Content-Range: 0-999/5321`` (None si el servidor no lo informa)."""
+    total = resp.headers.get("content-range", "").rsplit("/", 1)[-1]
+    return int(total) if total.isdigit() else None
+
+
+def _filas_en(resp):
+    """Filas de una respuesta según ``Content-Range: 0-999/*`` (sin cabecera, cuenta el JSON)."""
+    rango = resp.headers.get("content-range", "").split("/", 1)[0]
+    if "-" in rango:
+        desde, hasta = rango.split("-")
+        return int(hasta) - int(desde) + 1
+    if rango == "*":
+        return 0
+    return len(resp.json())
+
+
+def _fetch_paginado(tabla, params, limite, timeout, paralelo, cabeceras):
+    """Recorre la tabla en ventanas Range; devuelve (respuestas, máximo de filas o None)."""
+    primera = _pedir("GET", tabla, params, timeout=timeout,
+                     headers={**cabeceras, **_rango(0, TAMANO_PAGINA - 1), "Prefer": "count=exact"})
+    respuestas, leidas = [primera], _filas_en(primera)
+
+    total = _total_de(primera)
+    objetivo = total if limite is None else (limite if total is None else min(total, limite))
+
+    # Si el servidor corta antes (max-rows menor que TAMANO_PAGINA), usamos su tope como paso
+    paso = leidas if 0 < leidas < TAMANO_PAGINA else TAMANO_PAGINA
+
+    if objetivo is None:
+        # Sin conteo del servidor: avanzamos en serie hasta recibir una página vacía
+        while leidas and leidas % paso == 0:
+            resp = _pedir("GET", tabla, params, timeout=timeout,
+                          headers={**cabeceras, **_rango(leidas, leidas + paso - 1)})
+            respuestas.append(resp)
+            nuevas = _filas_en(resp)
+            if not nuevas:
+                break
+            leidas += nuevas
+        return respuestas, limite
+
+    ventanas = [(d, min(d + paso, objetivo) - 1) for d in range(leidas, objetivo, paso)]
+
+    if paralelo > 1 and len(ventanas) > 1 and os.environ.get("PROYECTO_UVA_ASYNC") == "1":
+        # ⚡ Ventanas al event loop del proceso (nucleo.asincrono): un solo límite global de concurrencia
+        from nucleo import asincrono
+        respuestas.extend(asincrono.ejecutar(asincrono.ventanas(tabla, params, ventanas, cabeceras, timeout)))
+        return respuestas, objetivo
+
+    @instrumentacion.propagar
+    def _bajar(ventana):
+        return _pedir("GET", tabla, params, timeout=timeout, headers={**cabeceras, **_rango(*ventana)})
+
+    if paralelo > 1 and len(ventanas) > 1:
+        with ThreadPoolExecutor(max_workers=paralelo) as pool:
+            respuestas.extend(pool.map(_bajar, ventanas))
+    else:
+        respuestas.extend(_bajar(v) for v in ventanas)
+    return respuestas, objetivo
+
+
+# --- DECODIFICACIÓN: JSON (por defecto) o CSV ---
+def _leer_json(respuestas):
+    return pd.DataFrame([fila for resp in respuestas for fila in resp.json()])
+
+
+def _leer_csv(respuestas, tabla):
+    """Parsea las páginas ``text/csv`` con pyarrow usando los tipos declarados en nucleo.tipos.
+
+    Se usa ``pyarrow.csv`` directo y no ``pd.read_csv(engine="pyarrow")``: este
+    último infiere primero y castea después, y convertiría los timestamps de
+    texto (created_at) a otro formato.
+    """
+    import pyarrow as pa
+    from pyarrow import csv as pacsv
+
+    tipos = tipos_de(tabla)
+    pa_tipos = {"str": pa.string(), "int64": pa.int64(), "Int64": pa.int64(),
+                "float64": pa.float64(), "bool": pa.bool_()}
+    opciones = pacsv.ConvertOptions(
+        column_types={c: pa_tipos[t] for c, t in tipos.items()},
+        strings_can_be_null=True,   # PostgREST escribe NULL como campo vacío
+    )
+    partes = []
+    for resp in respuestas:
+        if resp.content.strip():
+            df = pacsv.read_csv(io.BytesIO(resp.content), convert_options=opciones).to_pandas()
+            partes.append(df.astype({c: t for c, t in tipos.items() if c in df.columns}))
+    if not partes:
+        return pd.DataFrame()
+    return partes[0] if len(partes) == 1 else pd.concat(partes, ignore_index=True)
+
+
+# --- API PÚBLICA DE LECTURA ---
+def fetch(tabla, columnas="*", filtros=None, orden=None, limite=None, timeout=None, paralelo=1,
+          vista=None, formato="json", normalizar=False, clave_orden=CLAVE_ORDEN):
+    """Lee una tabla de Supabase y la devuelve como DataFrame.
+
+    - columnas: "*", "a, b, c" o lista de nombres.
+    - filtros:  dict {columna: valor}. Un valor lista/set se traduce a ``in``;
+                una tupla ``(operador, valor)`` usa ese operador (gte, lt, ...).
+                También acepta una lista de tuplas ``(columna, operador, valor)``
+                para aplicar varios filtros sobre la misma columna.
+    - orden:    "Fecha" ascendente, "-Fecha" descendente, o lista de ellos.
+    - limite:   máximo de filas. Sin límite (o mayor que TAMANO_PAGINA) la
+                lectura se pagina con ventanas Range hasta traer todo.
+    - timeout:  segundos por petición (por defecto TIMEOUT_POR_DEFECTO).
+    - paralelo: cuántas ventanas pedir a la vez en tablas grandes (1 = en serie).
+    - vista:    nombre de la vista en ``nucleo.columnas.REGISTRO``; pide sólo las
+                columnas declaradas y el DataFrame falla si se lee otra.
+    - formato:  "json" (por defecto) o "csv": pide ``text/csv`` y lo parsea con
+                pyarrow con los tipos de ``nucleo.tipos``. Más rápido y con menos
+                memoria en tablas grandes y planas; no usar con columnas JSON.
+    - normalizar: aplica ``nucleo.tipos.normalizar`` (categorías, int32,
+                datetime64) para frames que se guardan en caché.
+    - clave_orden: columna(s) únicas que desempatan el orden al paginar
+                ("id" por defecto). Las vistas sin id pasan su propia clave,
+                p. ej. "Ingreso_ID" o ["Sector", "Fecha"].
+
+    ``df.attrs['paginas']`` y ``df.attrs['bytes']`` informan el costo de la lectura.
+    """
+    params, cabeceras, paginar = _preparar(tabla, columnas, filtros, orden, limite, vista, formato, clave_orden)
+    if not paginar:
+        respuestas, objetivo = [_pedir("GET", tabla, params, headers=cabeceras or None, timeout=timeout)], None
+    else:
+        respuestas, objetivo = _fetch_paginado(tabla, params, limite, timeout, paralelo, cabeceras)
+    return _armar(tabla, respuestas, objetivo, vista, formato, normalizar)
+
+
+def _preparar(tabla, columnas, filtros, orden, limite, vista, formato, clave_orden=CLAVE_ORDEN):
+    """Valida los argumentos de fetch(); devuelve (params, cabeceras, paginar)."""
+    if vista is not None:
+        if columnas != "*":
+            raise ErrorDatos(f"{tabla}: use 'columnas' o 'vista', no ambos.")
+        columnas = columnas_de(vista, tabla)
+
+    if formato not in ("json", "csv"):
+        raise ErrorDatos(f"{tabla}: formato no soportado: {formato}")
+    cabeceras = {"Accept": "text/csv"} if formato == "csv" else {}
+
+    if limite is not None and limite <= TAMANO_PAGINA:
+        return _parametros(columnas, filtros, orden, limite), cabeceras, False
+    # Orden total y estable: sin él, dos ventanas podrían repetir u omitir filas
+    orden = [orden] if isinstance(orden, str) else list(orden or [])
+    if isinstance(clave_orden, str):
+        clave_orden = [c.strip() for c in clave_orden.split(",") if c.strip()]
+    presentes = [c.lstrip("-") for c in orden]
+    orden.extend(c for c in clave_orden or [] if c not in presentes)
+    return _parametros(columnas, filtros, orden, None), cabeceras, True
+
+
+def _armar(tabla, respuestas, objetivo, vista, formato, normalizar):
+    """Decodifica las respuestas de fetch() en un DataFrame con sus attrs de costo."""
+    df = _leer_csv(respuestas, tabla) if formato == "csv" else _leer_json(respuestas)
+    if objetivo is not None and len(df) > objetivo:
+        df = df.iloc[:objetivo]
+    if normalizar:
+        df = _normalizar(df, tabla)
+    paginas, n_bytes = len(respuestas), sum(len(r.content) for r in respuestas)
+    if vista is not None:
+        df = proyectar(df, vista, tabla)
+    df.attrs.update(tabla=tabla, paginas=paginas, bytes=n_bytes, formato=formato)
+    log.info("fetch %s: %d filas, %d páginas, %d bytes", tabla, len(df), paginas, n_bytes)
+    return df
+
+
+def rpc(funcion, timeout=None, **argumentos):
+    """Llama una función SQL de sólo lectura y devuelve su resultado como DataFrame.
+
+    Va por ``GET /rpc/<funcion>?arg=valor``: PostgREST lo acepta para funciones
+    STABLE/IMMUTABLE (ver sql/migraciones/) y así no cuenta como escritura ni
+    sube versiones. Los argumentos en None se omiten (toman su DEFAULT).
+    """
+    params = [(k, _formatear_valor(v)) for k, v in argumentos.items() if v is not None]
+    resp = _pedir("GET", f"rpc/{funcion}", params, timeout=timeout)
+    df = pd.DataFrame(resp.json())
+    df.attrs.update(tabla=f"rpc/{funcion}", paginas=1, bytes=len(resp.content), formato="json")
+    log.info("rpc %s: %d filas, %d bytes", funcion, len(df), len(resp.content))
+    return df
+
+
+# --- CARGA CONCURRENTE DE VARIAS TABLAS ---
+def _pool_compartido():
+    global _pool
+    if _pool is None:
+        with _candado:
+            if _pool is None:
+                _pool = ThreadPoolExecutor(max_workers=MAX_HILOS, thread_name_prefix="fetch_varios")
+    return _pool
+
+
+def fetch_varios(pedidos):
+    """Ejecuta varias lecturas a la vez y devuelve {nombre: DataFrame} en el mismo orden.
+
+    ``pedidos`` es un dict {nombre: función sin argumentos}, por ejemplo
+    ``{'Productos': lambda: fetch('Productos', orden='Producto')}``. El tiempo
+    total es el de la lectura más lenta, no la suma. Cada tabla se aísla: si
+    una falla, su lugar lo ocupa un DataFrame vacío con ``attrs['error']`` y
+    las demás llegan normalmente.
+
+    El pool es único por proceso (MAX_HILOS), así varias sesiones abriendo
+    dashboards a la vez no multiplican los hilos.
+    """
+    pool = _pool_compartido()
+    # propagar: las consultas hechas en el pool se atribuyen a la página que las pidió
+    futuros = {nombre: pool.submit(instrumentacion.propagar(funcion)) for nombre, funcion in pedidos.items()}
+    resultados = {}
+    for nombre, futuro in futuros.items():
+        try:
+            resultados[nombre] = futuro.result()
+        except Exception as e:
+            log.warning("fetch_varios: %s falló: %s", nombre, e)
+            resultados[nombre] = fallida(nombre, e)
+    return resultados
+
+
+def fallida(tabla, error):
+    """DataFrame vacío marcado con ``attrs['error']``: los cachés no lo guardan.
+
+    Para los loaders que atrapan un fallo de red: devolver ``fallida(...)`` en
+    lugar de ``pd.DataFrame()`` hace que el próximo rerun reintente en vez de
+    servir "sin datos" hasta que venza el TTL.
+    """
+    df = pd.DataFrame()
+    df.attrs.update(tabla=tabla, error=str(error))
+    return df
@@ -0,0 +1,144 @@
+"""
+Servicio de exportación a Excel/CSV para los botones de descarga.
+
+Antes cada página armaba el .xlsx en cada rerun (uno por fila del historial
+en Sanidad, uno por jornada en Raleo...) aunque nadie lo descargara. Ahora:
+
+- ``boton_descarga`` pasa a ``st.download_button`` un callable: los bytes se
+  generan recién al hacer clic (Streamlit lo corre en otro hilo).
+- El resultado se guarda en ``cache_memoria`` bajo una huella del contenido
+  (``hash_pandas_object``): volver a descargar lo mismo no recalcula nada.
+- El Excel se escribe fila por fila con xlsxwriter; desde ``FILAS_CONSTANTE``
+  filas con ``constant_memory`` (cada fila se vuelca a disco y no queda el
+  libro entero en RAM). El CSV se escribe por bloques directo a bytes.
+
+    exportar.boton_descarga("📥 Descargar", df, "Reporte.xlsx", hoja='Reporte_Raleo')
+    col.download_button -> exportar.boton_descarga(..., contenedor=col)
+
+``datos`` puede ser un DataFrame, un dict {hoja: DataFrame} o una función sin
+argumentos que devuelva cualquiera de los dos (así ni siquiera se arman los
+DataFrames hasta el clic).
+"""
+import functools
+import hashlib
+import io
+import json
+import math
+import os
+
+import pandas as pd
+import streamlit as st
+
+from nucleo import cache_memoria
+
+# --- CONFIGURACIÓN ---
+FILAS_CONSTANTE = 20_000   # desde aquí el Excel usa constant_memory
+BLOQUE_CSV = 10_000        # filas por bloque al escribir CSV
+VIGENCIA = 3600            # s que un archivo generado queda en caché
+MIME = {
+    "xlsx": "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+    "csv": "text/csv",
+}
+
+# ⚡ st.download_button acepta un callable en ``data`` (se ejecuta al hacer clic) desde Streamlit 1.52
+DIFERIDO = tuple(int(x) for x in st.__version__.split(".")[:2]) >= (1, 52)
+
+# Copy-on-Write (siempre activo desde pandas 3): una copia liviana ya no comparte escrituras
+CON_COW = int(pd.__version__.split(".")[0]) >= 3 or pd.options.mode.copy_on_write is True
+
+
+# --- HUELLA DEL CONTENIDO ---
+def _hojas(datos, hoja):
+    return datos if isinstance(datos, dict) else {hoja: datos}
+
+
+def huella(hojas, formato, opciones=()):
+    """Hash del contenido de las hojas (valores, columnas y nombres) más el formato."""
+    h = hashlib.blake2b(digest_size=16)
+    h.update(repr((formato, tuple(opciones))).encode())
+    for nombre, df in hojas.items():
+        h.update(repr((nombre, list(map(str, df.columns)), df.shape)).encode())
+        try:
+            valores = pd.util.hash_pandas_object(df, index=False)
+        except TypeError:
+            # celdas con listas/dicts (columnas JSONB) no son hasheables
+            valores = pd.util.hash_pandas_object(df.astype(str), index=False)
+        h.update(valores.to_numpy().tobytes())
+    return h.hexdigest()
+
+
+# --- GENERACIÓN ---
+def _celda(valor):
+    if valor is None or valor is pd.NA or valor is pd.NaT:
+        return None
+    if isinstance(valor, float) and math.isnan(valor):
+        return None
+    if isinstance(valor, pd.Timestamp):
+        return valor.tz_localize(None).to_pydatetime() if valor.tzinfo else valor.to_pydatetime()
+    if isinstance(valor, (list, dict)):
+        return json.dumps(valor, ensure_ascii=False)
+    return valor
+
+
+def a_excel(hojas):
+    """{hoja: DataFrame} -> bytes .xlsx, escrito fila por fila."""
+    import xlsxwriter
+
+    filas = sum(len(df) for df in hojas.values())
+    salida = io.BytesIO()
+    libro = xlsxwriter.Workbook(salida, {
+        "constant_memory": filas >= FILAS_CONSTANTE,
+        "default_date_format": "yyyy-mm-dd",
+        "strings_to_urls": False,
+    })
+    encabezado = libro.add_format({"bold": True, "border": 1, "align": "center"})
+    for nombre, df in hojas.items():
+        hoja = libro.add_worksheet(str(nombre)[:31])   # Excel limita el nombre a 31 caracteres
+        hoja.write_row(0, 0, [str(c) for c in df.columns], encabezado)
+        # constant_memory exige escribir en orden de filas (pandas.to_excel va por columnas)
+        for i, fila in enumerate(df.astype(object).itertuples(index=False, name=None), start=1):
+            hoja.write_row(i, 0, [_celda(v) for v in fila])
+    libro.close()
+    return salida.getvalue()
+
+
+def a_csv(df, bom=True):
+    """DataFrame -> bytes CSV (utf-8-sig por defecto para que Excel lea bien las tildes)."""
+    salida = io.BytesIO()
+    df.to_csv(salida, index=False, encoding="utf-8-sig" if bom else "utf-8", chunksize=BLOQUE_CSV)
+    return salida.getvalue()
+
+
+def exportar(datos, formato="xlsx", hoja="Datos", bom=True):
+    """Bytes del archivo, desde la caché si ya se generó uno con el mismo contenido."""
+    if callable(datos):
+        datos = datos()
+    hojas = _hojas(datos, hoja)
+    clave = f"exportar:{huella(hojas, formato, (bom,))}"
+    contenido = cache_memoria.obtener(clave, VIGENCIA)
+    if contenido is not None:
+        return contenido
+    if formato == "csv":
+        contenido = a_csv(next(iter(hojas.values())), bom=bom)
+    else:
+        contenido = a_excel(hojas)
+    cache_memoria.guardar(clave, contenido)
+    return contenido
+
+
+# --- BOTÓN ---
+def boton_descarga(etiqueta, datos, archivo, hoja="Datos", bom=True, contenedor=None, **kwargs):
+    """``st.download_button`` que genera el archivo (según su extensión) recién al hacer clic."""
+    formato = os.path.splitext(archivo)[1].lstrip(".").lower()
+    # La página puede seguir modificando su frame antes del clic. Sin Copy-on-Write una
+    # copia liviana comparte los datos de las columnas (sólo aísla reasignarlas): hace falta
+    # la profunda para que el archivo diferido salga con lo que se veía al armar el botón.
+    if isinstance(datos, pd.DataFrame):
+        datos = datos.copy(deep=not CON_COW)
+    elif isinstance(datos, dict):
+        datos = {nombre: df.copy(deep=not CON_COW) for nombre, df in datos.items()}
+    generar = functools.partial(exportar, datos, formato, hoja, bom)
+    contenedor = contenedor or st
+    kwargs.setdefault("mime", MIME.get(formato))
+    return contenedor.download_button(etiqueta, data=generar if DIFERIDO else generar(),
+                                      file_name=archivo, **kwargs)
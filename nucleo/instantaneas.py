@@ -0,0 +1,333 @@
+"""
+Instantáneas Parquet de las tablas para los dashboards analíticos.
+
+Un trabajo programado (cron, o a mano) baja cada tabla de Supabase una vez y
+la deja en disco como Parquet particionado por temporada y mes:
+
+    <DIRECTORIO>/control_raleo/temporada=2025-26/mes=2025-11/*.parquet
+    <DIRECTORIO>/control_raleo/_instantanea.json     (manifiesto)
+
+    python -m nucleo.instantaneas [--tablas Control_Raleo Monitoreo_Mosca ...]
+
+Los dashboards leen de ahí en lugar de la API transaccional:
+
+- ``leer(tabla, vista=..., desde=...)`` devuelve el DataFrame (sólo las
+  particiones del rango pedido), o ``None`` si no hay instantánea vigente y el
+  loader debe caer a ``fetch()``.
+- ``agrupar(tabla, por, agregados)`` hace el group-by sobre los Parquet sin
+  pasar las filas a pandas: con DuckDB si está instalado y si no con
+  ``pyarrow.compute``. El resultado es el mismo.
+- ``consultar(sql)`` corre SQL libre con DuckDB; cada tabla exportada es una
+  vista (``SELECT ... FROM control_raleo``), con todas las temporadas.
+
+Una instantánea está vigente si tiene menos de ``VIGENCIA`` segundos y su
+tabla no se escribió desde la app después de exportarla: el manifiesto
+guarda la versión de esa tabla en ``nucleo.versiones`` y se compara sólo con
+ella (una escritura en otra tabla no la invalida). Así un dashboard nunca
+muestra menos que lo que el usuario acaba de guardar. El trabajo tiene que
+correr con el mismo ``PROYECTO_UVA_CACHE_DIR`` que la app para ver sus
+contadores.
+"""
+import json
+import logging
+import os
+import shutil
+import threading
+import time
+
+import pandas as pd
+
+from nucleo.cache_disco import DIRECTORIO as _DIRECTORIO_CACHE
+from nucleo.columnas import columnas_de, proyectar
+from nucleo.datos import ErrorDatos, fetch
+from nucleo.tipos import normalizar as _normalizar
+from nucleo.versiones import versiones
+
+# --- CONFIGURACIÓN ---
+DIRECTORIO = os.environ.get("PROYECTO_UVA_INSTANTANEAS_DIR", os.path.join(_DIRECTORIO_CACHE, "instantaneas"))
+VIGENCIA   = float(os.environ.get("PROYECTO_UVA_INSTANTANEAS_VIGENCIA", 6 * 3600))   # segundos
+MES_INICIO_TEMPORADA = 7   # la campaña arranca con la poda: jul-2025 a jun-2026 es "2025-26"
+MANIFIESTO = "_instantanea.json"   # pyarrow y DuckDB ignoran los archivos que empiezan con "_"
+TEMPORAL, VIEJO = ".tmp-", ".viejo-"   # sufijos de los directorios de un reemplazo en curso
+
+# Tablas que exporta el trabajo y su columna de fecha (None = sin particionar)
+TABLAS = {
+    "Monitoreo_Mosca":          "Fecha",
+    "Evaluaciones_Sanitarias":  "Fecha",
+    "Control_Raleo":            "Fecha",
+    "Diametro_Baya":            "Fecha",
+    "Evaluaciones_Fenologicas": "Fecha",
+    "Ordenes_de_Trabajo":       "Fecha_Programada",
+    "Registro_Horas_Tractor":   "Fecha",
+    "clima":                    "fecha_hora",
+    "Personal":                 None,
+}
+AGREGADOS = ("sum", "mean", "count", "min", "max")
+
+log = logging.getLogger(__name__)
+_local = threading.local()   # una conexión DuckDB por hilo (no se comparten entre hilos)
+
+
+def _nombre(tabla):
+    # PostgreSQL pliega a minúsculas los nombres sin comillas (Clima == clima)
+    return tabla.lower()
+
+
+def _ruta(tabla):
+    return os.path.join(DIRECTORIO, _nombre(tabla))
+
+
+def _columna_fecha(tabla):
+    return {_nombre(t): c for t, c in TABLAS.items()}.get(_nombre(tabla))
+
+
+# --- EXPORTACIÓN ---
+def temporada(fechas):
+    """Etiqueta de temporada ("2025-26") de cada fecha; NaN si la fecha no se puede leer."""
+    fechas = pd.to_datetime(fechas, errors="coerce", utc=True)
+    inicio = fechas.dt.year - (fechas.dt.month < MES_INICIO_TEMPORADA)
+    etiquetas = {a: f"{int(a)}-{(int(a) + 1) % 100:02d}" for a in inicio.dropna().unique()}
+    return inicio.map(etiquetas)
+
+
+def _columnas_json(df):
+    """Columnas con listas/dicts (JSONB): Parquet las guarda como texto JSON."""
+    return [c for c in df.columns if df[c].dtype == object
+            and df[c].map(lambda v: isinstance(v, (list, dict))).any()]
+
+
+def exportar(tabla, paralelo=4):
+    """Baja ``tabla`` completa y reemplaza su instantánea en disco. Devuelve el manifiesto."""
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    version = _version(tabla)   # antes de leer: una escritura durante la exportación la invalida
+    df = fetch(tabla, paralelo=paralelo)
+    columna = _columna_fecha(tabla)
+    json_cols = _columnas_json(df)
+    for c in json_cols:
+        df[c] = df[c].map(lambda v: None if v is None else json.dumps(v, ensure_ascii=False))
+    particiones = []
+    if columna and columna in df.columns:
+        fechas = pd.to_datetime(df[columna], errors="coerce", utc=True)
+        df["temporada"], df["mes"] = temporada(fechas), fechas.dt.strftime("%Y-%m")
+        particiones = ["temporada", "mes"]
+
+    os.makedirs(DIRECTORIO, exist_ok=True)
+    destino = _ruta(tabla)
+    temporal = f"{destino}{TEMPORAL}{os.getpid()}"
+    shutil.rmtree(temporal, ignore_errors=True)
+    arrow = pa.Table.from_pandas(df, preserve_index=False)
+    if particiones:
+        pq.write_to_dataset(arrow, temporal, partition_cols=particiones)
+    else:
+        os.makedirs(temporal)
+        pq.write_table(arrow, os.path.join(temporal, "parte-0.parquet"))
+    manifiesto = {"tabla": tabla, "exportada": time.time(), "versiones": {_nombre(tabla): version},
+                  "filas": len(df),
+                  "columna_fecha": columna if particiones else None, "columnas_json": json_cols,
+                  "temporadas": sorted(df["temporada"].dropna().unique().tolist()) if particiones else []}
+    with open(os.path.join(temporal, MANIFIESTO), "w", encoding="utf-8") as f:
+        json.dump(manifiesto, f, ensure_ascii=False, indent=2)
+
+    # Reemplazo por renombre: un lector ve la instantánea vieja, la nueva o ninguna (cae a fetch)
+    viejo = f"{destino}{VIEJO}{os.getpid()}"
+    if os.path.exists(destino):
+        os.rename(destino, viejo)
+    os.rename(temporal, destino)
+    shutil.rmtree(viejo, ignore_errors=True)
+    log.info("Instantánea %s: %d filas, %d temporadas", tabla, len(df), len(manifiesto["temporadas"]))
+    return manifiesto
+
+
+def exportar_todas(tablas=None, paralelo=4):
+    """Exporta varias tablas; una que falla no detiene a las demás. Devuelve {tabla: manifiesto o error}."""
+    resultados = {}
+    for tabla in tablas or TABLAS:
+        try:
+            resultados[tabla] = exportar(tabla, paralelo)
+        except Exception as e:
+            log.exception("No se pudo exportar %s", tabla)
+            resultados[tabla] = {"tabla": tabla, "error": str(e)}
+    return resultados
+
+
+# --- ESTADO ---
+def _version(tabla):
+    return versiones(tabla)[0]
+
+
+def manifiesto(tabla):
+    """Manifiesto de la instantánea de ``tabla`` (None si no hay)."""
+    try:
+        with open(os.path.join(_ruta(tabla), MANIFIESTO), encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def vigente(tabla, vigencia=None):
+    """True si hay instantánea reciente y ``tabla`` no se escribió desde la app después."""
+    datos = manifiesto(tabla)
+    if datos is None:
+        return False
+    vigencia = VIGENCIA if vigencia is None else vigencia
+    exportada = datos.get("versiones", {}).get(_nombre(tabla))
+    return time.time() - datos["exportada"] < vigencia and exportada == _version(tabla)
+
+
+# --- LECTURA (pyarrow) ---
+def _filtro(tabla, desde, hasta):
+    import pyarrow.dataset as ds
+
+    columna = _columna_fecha(tabla)
+    condiciones = []
+    if columna and desde is not None:
+        desde = pd.Timestamp(desde)
+        # mes poda particiones enteras; la fecha filtra dentro de ellas (texto ISO ordena como fecha)
+        condiciones += [ds.field("mes") >= desde.strftime("%Y-%m"), ds.field(columna) >= desde.date().isoformat()]
+    if columna and hasta is not None:
+        hasta = pd.Timestamp(hasta)
+        condiciones += [ds.field("mes") <= hasta.strftime("%Y-%m"),
+                        ds.field(columna) < (hasta + pd.Timedelta(days=1)).date().isoformat()]
+    filtro = None
+    for condicion in condiciones:
+        filtro = condicion if filtro is None else filtro & condicion
+    return filtro
+
+
+def _dataset(tabla):
+    import pyarrow.dataset as ds
+
+    return ds.dataset(_ruta(tabla), format="parquet", partitioning="hive")
+
+
+def leer(tabla, columnas=None, desde=None, hasta=None, vista=None, normalizar=False, vigencia=None):
+    """DataFrame desde la instantánea de ``tabla``; None si no está vigente (usar fetch).
+
+    - columnas / vista: como en ``fetch`` (la vista toma las columnas de nucleo/columnas.py).
+    - desde / hasta:    rango de fechas (inclusive) sobre la columna de fecha de la tabla;
+                        sólo se abren las particiones de los meses del rango.
+    - normalizar:       aplica ``nucleo.tipos.normalizar`` como ``fetch(..., normalizar=True)``.
+    """
+    if not vigente(tabla, vigencia):
+        return None
+    if vista is not None:
+        columnas = columnas_de(vista, tabla)
+    datos = manifiesto(tabla)
+    try:
+        dataset = _dataset(tabla)
+        if columnas is None:
+            columnas = [c for c in dataset.schema.names if c not in ("temporada", "mes")]
+        else:
+            columnas = [c for c in columnas if c in dataset.schema.names]
+        df = dataset.to_table(columns=columnas, filter=_filtro(tabla, desde, hasta)).to_pandas()
+    except Exception as e:
+        # p. ej. la instantánea se reemplazó mientras se leía
+        log.warning("No se pudo leer la instantánea de %s: %s", tabla, e)
+        return None
+    for c in datos["columnas_json"]:
+        if c in df.columns:
+            df[c] = df[c].map(lambda v: None if v is None else json.loads(v))
+    if normalizar:
+        df = _normalizar(df, tabla)
+    if vista is not None:
+        df = proyectar(df, vista, tabla)
+    df.attrs.update(tabla=tabla, instantanea=datos["exportada"])
+    return df
+
+
+# --- AGREGACIÓN (DuckDB o pyarrow) ---
+def _duckdb():
+    """Conexión DuckDB del hilo con una vista por tabla exportada; None si DuckDB no está instalado.
+
+    Sólo se registran los directorios vigentes de cada tabla: los ``.tmp-*`` y
+    ``.viejo-*`` de una exportación en curso también tienen manifiesto.
+    """
+    try:
+        import duckdb
+    except ImportError:
+        return None
+    conn = getattr(_local, "duckdb", None)
+    if conn is None:
+        conn = _local.duckdb = duckdb.connect()
+    if os.path.isdir(DIRECTORIO):
+        for nombre in os.listdir(DIRECTORIO):
+            ruta = os.path.join(DIRECTORIO, nombre)
+            if TEMPORAL in nombre or VIEJO in nombre:
+                continue
+            if os.path.isfile(os.path.join(ruta, MANIFIESTO)):
+                patron = os.path.join(ruta, "**", "*.parquet").replace("'", "''")
+                conn.execute(f"CREATE OR REPLACE VIEW \"{nombre}\" AS "
+                             f"SELECT * FROM read_parquet('{patron}', hive_partitioning = true)")
+    return conn
+
+
+def consultar(sql, parametros=None):
+    """Corre ``sql`` con DuckDB sobre las instantáneas (una vista por tabla) y devuelve un DataFrame."""
+    conn = _duckdb()
+    if conn is None:
+        raise ErrorDatos("consultar() necesita DuckDB: pip install duckdb")
+    return conn.execute(sql, parametros or []).df()
+
+
+def agrupar(tabla, por, agregados, desde=None, hasta=None, vigencia=None):
+    """Group-by sobre la instantánea; None si no está vigente.
+
+    ``agregados`` es {columna_salida: (columna, funcion)} como el ``agg`` con
+    nombre de pandas, con funcion en ``AGREGADOS``:
+
+        agrupar('Control_Raleo', ['Fecha'], {'Racimos_Reales': ('Racimos_Reales', 'sum')})
+    """
+    if not vigente(tabla, vigencia):
+        return None
+    por = [por] if isinstance(por, str) else list(por)
+    for _, funcion in agregados.values():
+        if funcion not in AGREGADOS:
+            raise ErrorDatos(f"{tabla}: agregado no soportado: {funcion}")
+
+    conn = _duckdb()
+    if conn is not None:
+        columna = _columna_fecha(tabla)
+        condiciones, parametros = [], []
+        if columna and desde is not None:
+            condiciones.append(f'"{columna}" >= ?')
+            parametros.append(pd.Timestamp(desde).date().isoformat())
+        if columna and hasta is not None:
+            condiciones.append(f'"{columna}" < ?')
+            parametros.append((pd.Timestamp(hasta) + pd.Timedelta(days=1)).date().isoformat())
+        claves = ", ".join(f'"{c}"' for c in por)
+        sql = (f"SELECT {claves}, "
+               + ", ".join(f'{"avg" if f == "mean" else f}("{c}") AS "{s}"' for s, (c, f) in agregados.items())
+               + f' FROM "{_nombre(tabla)}"'
+               + (" WHERE " + " AND ".join(condiciones) if condiciones else "")
+               + f" GROUP BY {claves} ORDER BY {claves}")
+        return conn.execute(sql, parametros).df()
+
+    columnas = list(dict.fromkeys(por + [c for c, _ in agregados.values()]))
+    try:
+        arrow = _dataset(tabla).to_table(columns=columnas, filter=_filtro(tabla, desde, hasta))
+    except Exception as e:
+        log.warning("No se pudo leer la instantánea de %s: %s", tabla, e)
+        return None
+    resultado = arrow.group_by(por).aggregate([(c, f) for c, f in agregados.values()])
+    df = resultado.to_pandas().rename(columns={f"{c}_{f}": s for s, (c, f) in agregados.items()})
+    return df[por + list(agregados)].sort_values(por, ignore_index=True)
+
+
+def main(argv=None):
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Exporta las tablas de Supabase a instantáneas Parquet.")
+    parser.add_argument("--tablas", nargs="+", help="por defecto todas las de TABLAS")
+    parser.add_argument("--paralelo", type=int, default=4, help="ventanas Range simultáneas por tabla")
+    args = parser.parse_args(argv)
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(message)s")
+    resultados = exportar_todas(args.tablas, args.paralelo)
+    for tabla, r in resultados.items():
+        print(f"{tabla:<26} " + (f"ERROR {r['error']}" if "error" in r else f"{r['filas']:>8} filas"))
+    return 1 if any("error" in r for r in resultados.values()) else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,190 @@
+"""
+Instrumentación de las consultas a Supabase.
+
+Cada petición que pasa por ``nucleo.datos`` deja un registro con tabla,
+método, filtros, latencia, filas, bytes, la página/función que la pidió y
+la sesión de Streamlit:
+
+- Lecturas (``fetch``): las registra ``_pedir`` con el cuerpo ya leído, así
+  que la latencia y los bytes son los reales.
+- Escrituras y RPC del query builder: las registra un hook de la sesión httpx
+  (latencia hasta las cabeceras, bytes enviados).
+
+Los registros van a un buffer circular en memoria (``recientes()``,
+``agregados()``) y a un JSONL rotativo en el directorio de caché
+(``consultas.jsonl``). Las que superan ``LENTA_MS`` además se avisan por
+``logging`` como WARNING.
+
+El origen se deduce de la pila: el primer frame de ``modulos/`` o ``app.py``
+(p. ej. ``3_Dashboard_Sanidad.cargar_datos_sanidad``). En los hilos de
+``fetch_varios`` la pila ya no llega a la página ni hay contexto de
+Streamlit; ``propagar()`` lleva el origen y la sesión del hilo que encargó
+el trabajo.
+"""
+import contextvars
+import functools
+import json
+import logging
+import os
+import sys
+import threading
+import time
+from collections import deque
+from logging.handlers import RotatingFileHandler
+
+import pandas as pd
+
+from nucleo import metricas
+from nucleo.cache_disco import DIRECTORIO
+
+# --- CONFIGURACIÓN ---
+TAMANO_BUFFER = int(os.environ.get("PROYECTO_UVA_CONSULTAS_BUFFER", 5000))
+LENTA_MS      = float(os.environ.get("PROYECTO_UVA_CONSULTA_LENTA_MS", 1000))
+RUTA_LOG      = os.path.join(DIRECTORIO, "consultas.jsonl")
+MAX_LOG_MB    = 5
+COPIAS_LOG    = 3
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+_PAGINAS = (os.path.join(RAIZ, "modulos") + os.sep, os.path.join(RAIZ, "app.py"))
+_NO_FILTROS = {"select", "order", "limit", "offset", "on_conflict", "columns"}
+
+log = logging.getLogger(__name__)
+_registros = deque(maxlen=TAMANO_BUFFER)
+_origen = contextvars.ContextVar("origen_consulta", default=None)
+_sesion = contextvars.ContextVar("sesion_consulta", default=None)
+_jsonl = None
+_candado = threading.Lock()
+
+
+# --- ORIGEN (PÁGINA Y FUNCIÓN) ---
+def origen_actual():
+    """(pagina, funcion) que originó la llamada en curso; ('-', '-') si no viene de una página."""
+    propagado = _origen.get()
+    if propagado is not None:
+        return propagado
+    frame = sys._getframe(1)
+    while frame is not None:
+        codigo = frame.f_code
+        if codigo.co_filename.startswith(_PAGINAS) and codigo.co_name != "<lambda>":
+            return os.path.splitext(os.path.basename(codigo.co_filename))[0], codigo.co_name
+        frame = frame.f_back
+    return "-", "-"
+
+
+def sesion_actual():
+    """Id de la sesión de Streamlit que originó la llamada en curso ('-' fuera de una sesión)."""
+    propagada = _sesion.get()
+    return propagada if propagada is not None else metricas._id_sesion()
+
+
+def propagar(funcion):
+    """Envuelve ``funcion`` para que, corra en el hilo que corra, registre el origen y la sesión de quien la creó."""
+    origen, sesion = origen_actual(), sesion_actual()
+
+    @functools.wraps(funcion)
+    def envoltura(*args, **kwargs):
+        token, token_sesion = _origen.set(origen), _sesion.set(sesion)
+        try:
+            return funcion(*args, **kwargs)
+        finally:
+            _sesion.reset(token_sesion)
+            _origen.reset(token)
+    return envoltura
+
+
+# --- REGISTRO ---
+def _archivo():
+    """Logger del JSONL rotativo (se crea al primer uso; sin archivo si no se puede escribir)."""
+    global _jsonl
+    if _jsonl is None:
+        with _candado:
+            if _jsonl is None:
+                salida = logging.getLogger("nucleo.consultas.jsonl")
+                salida.propagate = False
+                salida.setLevel(logging.INFO)
+                try:
+                    os.makedirs(DIRECTORIO, exist_ok=True)
+                    manejador = RotatingFileHandler(RUTA_LOG, maxBytes=int(MAX_LOG_MB * 1024 * 1024),
+                                                    backupCount=COPIAS_LOG, encoding="utf-8")
+                    manejador.setFormatter(logging.Formatter("%(message)s"))
+                    salida.addHandler(manejador)
+                except OSError:
+                    log.warning("No se puede escribir %s: consultas sólo en memoria", RUTA_LOG)
+                _jsonl = salida
+    return _jsonl
+
+
+def _filtros(params):
+    pares = params.items() if isinstance(params, dict) else (params or [])
+    return "&".join(f"{k}={v}" for k, v in pares if k not in _NO_FILTROS)[:300]
+
+
+def _filas(resp):
+    rango = resp.headers.get("content-range", "").split("/", 1)[0]
+    if "-" in rango:
+        desde, hasta = rango.split("-")
+        return int(hasta) - int(desde) + 1
+    return 0 if rango == "*" else None
+
+
+def registrar(metodo, tabla, params, inicio, resp=None, error=None, bytes_enviados=0):
+    """Agrega una consulta al buffer y al JSONL. ``inicio`` es un ``time.perf_counter()``."""
+    latencia = (time.perf_counter() - inicio) * 1000
+    pagina, funcion = origen_actual()
+    recibidos = 0
+    if resp is not None:
+        try:
+            recibidos = len(resp.content)
+        except Exception:
+            # hook de respuesta: el cuerpo todavía no se leyó
+            recibidos = int(resp.headers.get("content-length") or 0)
+    registro = {
+        "ts": time.time(), "tabla": tabla, "metodo": metodo, "filtros": _filtros(params),
+        "latencia_ms": round(latencia, 1), "estado": resp.status_code if resp is not None else None,
+        "filas": _filas(resp) if resp is not None else None,
+        "bytes": recibidos, "enviados": bytes_enviados,
+        "pagina": pagina, "funcion": funcion, "sesion": sesion_actual(), "lenta": latencia >= LENTA_MS,
+        "error": str(error)[:300] if error is not None else None,
+    }
+    _registros.append(registro)
+    metricas.SUPABASE.observar(latencia / 1000, tabla, metodo)
+    if error is not None or (registro["estado"] or 0) >= 400:
+        metricas.SUPABASE_ERRORES.sumar(tabla)
+    try:
+        _archivo().info(json.dumps(registro, ensure_ascii=False))
+    except Exception:
+        log.exception("No se pudo escribir el registro de consultas")
+    if registro["lenta"]:
+        log.warning("Consulta lenta %.0f ms: %s %s ?%s (%s.%s)", latencia, metodo, tabla,
+                    registro["filtros"], pagina, funcion)
+    return registro
+
+
+# --- LECTURA DEL BUFFER ---
+def recientes(n=None):
+    """Los últimos ``n`` registros (todos si n es None), del más viejo al más nuevo."""
+    registros = list(_registros)
+    return registros if n is None else registros[-n:]
+
+
+def agregados(por=("tabla",)):
+    """p50/p95/máx de latencia, filas y bytes agrupados por las columnas indicadas."""
+    df = pd.DataFrame(recientes())
+    if df.empty:
+        return df
+    por = [por] if isinstance(por, str) else list(por)
+    grupos = df.groupby(por, dropna=False)
+    resultado = grupos["latencia_ms"].agg(
+        consultas="count",
+        p50_ms=lambda s: s.quantile(0.50),
+        p95_ms=lambda s: s.quantile(0.95),
+        max_ms="max",
+    )
+    resultado["lentas"] = grupos["lenta"].sum()
+    resultado["filas"] = grupos["filas"].sum()
+    resultado["mb"] = grupos["bytes"].sum() / 1e6
+    return resultado.reset_index().sort_values("p95_ms", ascending=False, ignore_index=True)
+
+
+def vaciar():
+    _registros.clear()
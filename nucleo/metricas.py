@@ -0,0 +1,243 @@
+"""
+Métricas en formato Prometheus servidas por un hilo HTTP junto a Streamlit.
+
+``iniciar_servidor()`` (lo llama app.py en cada rerun; sólo arranca una vez
+por proceso) abre ``http://127.0.0.1:PUERTO/metrics`` con:
+
+- ``uva_rerun_segundos{pagina}``                     histograma de cada rerun de página
+- ``uva_supabase_segundos{tabla,metodo}``            histograma de latencia por tabla
+- ``uva_supabase_errores_total{tabla}``              consultas fallidas (HTTP >= 400 o red)
+- ``uva_cache_memoria_{aciertos,fallos,desalojos}_total{loader}`` y ``uva_cache_memoria_bytes``
+- ``uva_cache_disco_aciertos_total{loader,estado}`` (fresco/vencido) y ``uva_cache_disco_fallos_total{loader}``
+- ``uva_cola_offline_pendientes{cola}``              registros sin subir, sumando sesiones activas
+- lo que haya en los ``*.prom`` de ``ARCHIVOS_TEXTO`` (p. ej. los resultados
+  de ``script_sincronizacion/sync_weather.py``, que corre en otra máquina y
+  escribe en formato textfile-collector).
+
+Sin dependencias: el formato de texto de Prometheus es simple y así el hilo
+no suma nada a requirements.txt. ``curl localhost:9108/metrics`` alcanza
+para mirar sin Prometheus.
+
+Configuración: ``PROYECTO_UVA_METRICAS_PUERTO`` (0 desactiva),
+``PROYECTO_UVA_METRICAS_HOST`` y ``PROYECTO_UVA_METRICAS_TEXTFILES`` (globs
+separados por ``os.pathsep``).
+
+El endpoint no tiene autenticación y deja ver tablas, páginas y volumen de
+uso: por defecto escucha sólo en 127.0.0.1 (Prometheus o un agente en la
+misma VM). Para que Prometheus lo lea desde otra máquina se pone
+``PROYECTO_UVA_METRICAS_HOST=0.0.0.0`` (o la IP de la red interna) y se
+limita el acceso al puerto con el firewall o un proxy con autenticación.
+"""
+import bisect
+import glob
+import logging
+import os
+import threading
+import time
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# --- CONFIGURACIÓN ---
+PUERTO = int(os.environ.get("PROYECTO_UVA_METRICAS_PUERTO", 9108))
+HOST = os.environ.get("PROYECTO_UVA_METRICAS_HOST", "127.0.0.1")   # sin autenticación: sólo local por defecto
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+ARCHIVOS_TEXTO = os.environ.get(
+    "PROYECTO_UVA_METRICAS_TEXTFILES",
+    os.path.join(RAIZ, "script_sincronizacion", "*.prom"),
+).split(os.pathsep)
+VIGENCIA_COLA = 3600     # segundos: una sesión que no reporta en este tiempo deja de sumar
+BUCKETS = (0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+log = logging.getLogger(__name__)
+_candado = threading.Lock()
+_servidor = None
+
+
+# --- TIPOS DE MÉTRICA ---
+def _escapar(valor):
+    return str(valor).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _etiquetas(nombres, valores):
+    if not nombres:
+        return ""
+    return "{" + ",".join(f'{n}="{_escapar(v)}"' for n, v in zip(nombres, valores)) + "}"
+
+
+class Contador:
+    def __init__(self, nombre, ayuda, etiquetas=()):
+        self.nombre, self.ayuda, self.etiquetas = nombre, ayuda, tuple(etiquetas)
+        self._valores = {}
+
+    def sumar(self, *valores, cantidad=1):
+        with _candado:
+            self._valores[valores] = self._valores.get(valores, 0) + cantidad
+
+    def exponer(self):
+        lineas = [f"# HELP {self.nombre} {self.ayuda}", f"# TYPE {self.nombre} counter"]
+        with _candado:
+            for valores, total in sorted(self._valores.items()):
+                lineas.append(f"{self.nombre}{_etiquetas(self.etiquetas, valores)} {total}")
+        return lineas
+
+
+class Histograma:
+    def __init__(self, nombre, ayuda, etiquetas=(), buckets=BUCKETS):
+        self.nombre, self.ayuda, self.etiquetas, self.buckets = nombre, ayuda, tuple(etiquetas), buckets
+        self._series = {}    # valores -> [conteos por bucket..., suma, total]
+
+    def observar(self, segundos, *valores):
+        with _candado:
+            serie = self._series.setdefault(valores, [0] * len(self.buckets) + [0.0, 0])
+            i = bisect.bisect_left(self.buckets, segundos)
+            if i < len(self.buckets):
+                serie[i] += 1
+            serie[-2] += segundos
+            serie[-1] += 1
+
+    def exponer(self):
+        lineas = [f"# HELP {self.nombre} {self.ayuda}", f"# TYPE {self.nombre} histogram"]
+        with _candado:
+            series = sorted((k, list(v)) for k, v in self._series.items())
+        for valores, serie in series:
+            acumulado = 0
+            for limite, conteo in zip(self.buckets, serie):
+                acumulado += conteo
+                etiquetas = _etiquetas(self.etiquetas + ("le",), valores + (limite,))
+                lineas.append(f"{self.nombre}_bucket{etiquetas} {acumulado}")
+            lineas.append(f"{self.nombre}_bucket{_etiquetas(self.etiquetas + ('le',), valores + ('+Inf',))} {serie[-1]}")
+            lineas.append(f"{self.nombre}_sum{_etiquetas(self.etiquetas, valores)} {serie[-2]}")
+            lineas.append(f"{self.nombre}_count{_etiquetas(self.etiquetas, valores)} {serie[-1]}")
+        return lineas
+
+
+# --- MÉTRICAS DE LA APP ---
+RERUN = Histograma("uva_rerun_segundos", "Duración de cada rerun de página.", ("pagina",))
+SUPABASE = Histograma("uva_supabase_segundos", "Latencia de las consultas a Supabase.", ("tabla", "metodo"))
+SUPABASE_ERRORES = Contador("uva_supabase_errores_total", "Consultas a Supabase fallidas.", ("tabla",))
+CACHE_DISCO_ACIERTOS = Contador("uva_cache_disco_aciertos_total", "Lecturas servidas por cache_disco.", ("loader", "estado"))
+CACHE_DISCO_FALLOS = Contador("uva_cache_disco_fallos_total", "Lecturas de cache_disco calculadas en línea.", ("loader",))
+CACHE_DISCO_REFRESCOS = Contador("uva_cache_disco_refrescos_total", "Refrescos de fondo de cache_disco por resultado.", ("loader", "resultado"))
+BANDEJA_INTENTOS = Contador("uva_bandeja_intentos_total", "Vueltas de la sincronización automática de bandejas.", ("resultado",))
+SONDEOS = Contador("uva_sondeos_total", "Sondeos de cambios por tabla (nucleo.sondeos).", ("tabla", "resultado"))
+
+_colas = {}    # (cola, sesion) -> (pendientes, reportado)
+
+
+@contextmanager
+def medir_rerun(pagina):
+    """Observa la duración del bloque en ``uva_rerun_segundos`` (también si termina con st.stop)."""
+    inicio = time.perf_counter()
+    try:
+        yield
+    finally:
+        RERUN.observar(time.perf_counter() - inicio, pagina)
+
+
+def _id_sesion():
+    try:
+        from streamlit.runtime.scriptrunner import get_script_run_ctx
+        ctx = get_script_run_ctx()
+        return ctx.session_id if ctx else "-"
+    except Exception:
+        return "-"
+
+
+def reportar_cola(cola, pendientes, sesion=None):
+    """Registra cuántos registros offline tiene pendientes la sesión actual en ``cola``."""
+    with _candado:
+        _colas[(cola, sesion or _id_sesion())] = (pendientes, time.time())
+
+
+def _exponer_colas():
+    limite = time.time() - VIGENCIA_COLA
+    totales = {}
+    with _candado:
+        for (cola, sesion), (pendientes, reportado) in list(_colas.items()):
+            if reportado < limite:
+                del _colas[(cola, sesion)]
+                continue
+            totales[cola] = totales.get(cola, 0) + pendientes
+    lineas = ["# HELP uva_cola_offline_pendientes Registros offline sin subir (sesiones activas).",
+              "# TYPE uva_cola_offline_pendientes gauge"]
+    lineas += [f'uva_cola_offline_pendientes{_etiquetas(("cola",), (c,))} {n}' for c, n in sorted(totales.items())]
+    return lineas
+
+
+def _exponer_cache_memoria():
+    from nucleo import cache_memoria
+    lineas = []
+    for nombre, clave, ayuda in (("uva_cache_memoria_aciertos_total", "aciertos", "Aciertos de cache_memoria."),
+                                 ("uva_cache_memoria_fallos_total", "fallos", "Fallos de cache_memoria."),
+                                 ("uva_cache_memoria_desalojos_total", "desalojos", "Entradas desalojadas por presupuesto.")):
+        lineas += [f"# HELP {nombre} {ayuda}", f"# TYPE {nombre} counter"]
+        lineas += [f'{nombre}{_etiquetas(("loader",), (f["loader"],))} {f.get(clave, 0)}'
+                   for f in cache_memoria.resumen()]
+    lineas += ["# HELP uva_cache_memoria_bytes Bytes ocupados por cache_memoria.",
+               "# TYPE uva_cache_memoria_bytes gauge",
+               f"uva_cache_memoria_bytes {int(cache_memoria.ocupado_mb() * 1e6)}"]
+    return lineas
+
+
+def _exponer_archivos():
+    lineas = []
+    for patron in ARCHIVOS_TEXTO:
+        for ruta in sorted(glob.glob(patron)):
+            try:
+                with open(ruta, encoding="utf-8") as f:
+                    lineas += f.read().splitlines()
+            except OSError as e:
+                log.warning("No se pudo leer %s: %s", ruta, e)
+    return lineas
+
+
+def exponer():
+    """Texto completo de /metrics."""
+    lineas = []
+    for metrica in (RERUN, SUPABASE, SUPABASE_ERRORES, CACHE_DISCO_ACIERTOS, CACHE_DISCO_FALLOS,
+                    CACHE_DISCO_REFRESCOS, BANDEJA_INTENTOS, SONDEOS):
+        lineas += metrica.exponer()
+    for seccion in (_exponer_cache_memoria, _exponer_colas, _exponer_archivos):
+        try:
+            lineas += seccion()
+        except Exception:
+            log.exception("Métricas: falló %s", seccion.__name__)
+    return "\n".join(lineas) + "\n"
+
+
+# --- SERVIDOR HTTP ---
+class _Manejador(BaseHTTPRequestHandler):
+    def do_GET(self):
+        if self.path.split("?")[0] not in ("/metrics", "/"):
+            self.send_error(404)
+            return
+        cuerpo = exponer().encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+        self.send_header("Content-Length", str(len(cuerpo)))
+        self.end_headers()
+        self.wfile.write(cuerpo)
+
+    def log_message(self, formato, *args):
+        pass   # cada scrape no debe ensuciar el log de Streamlit
+
+
+def iniciar_servidor(puerto=None):
+    """Arranca el hilo /metrics una vez por proceso (idempotente). Devuelve el servidor o None."""
+    global _servidor
+    puerto = PUERTO if puerto is None else puerto
+    if _servidor is not None or not puerto:
+        return _servidor or None
+    with _candado:
+        if _servidor is None:
+            try:
+                _servidor = ThreadingHTTPServer((HOST, puerto), _Manejador)
+            except OSError as e:
+                # Otra réplica ya tiene el puerto: ésta sigue sin endpoint propio
+                log.warning("Métricas: no se pudo abrir el puerto %s (%s)", puerto, e)
+                _servidor = False
+                return None
+            _servidor.daemon_threads = True
+            threading.Thread(target=_servidor.serve_forever, name="metricas", daemon=True).start()
+            log.info("Métricas en http://%s:%s/metrics", HOST, puerto)
+    return _servidor or None
@@ -0,0 +1,48 @@
+"""
+Importaciones diferidas para las dependencias pesadas de las páginas.
+
+Una página importa todo arriba aunque muchas veces termine en ``st.stop()``
+(sin datos, sin permiso) antes de dibujar un gráfico. Con esto, plotly o
+streamlit_extras se importan recién cuando se usan por primera vez:
+
+    from nucleo.perezoso import funcion_perezosa, modulo_perezoso
+
+    px = modulo_perezoso("plotly.express")      # se usa igual: px.bar(...)
+    style_metric_cards = funcion_perezosa("streamlit_extras.metric_cards", "style_metric_cards")
+
+Después del primer uso el módulo queda en ``sys.modules`` y el costo es el
+de un ``getattr``. ``benchmarks/importaciones.py`` mide la diferencia.
+"""
+import importlib
+
+
+class ModuloPerezoso:
+    """Se comporta como el módulo ``nombre``, pero lo importa al primer atributo pedido."""
+
+    __slots__ = ("_nombre", "_modulo")
+
+    def __init__(self, nombre):
+        self._nombre, self._modulo = nombre, None
+
+    def __getattr__(self, atributo):
+        if self._modulo is None:
+            # importlib ya serializa importaciones concurrentes del mismo módulo entre sesiones
+            self._modulo = importlib.import_module(self._nombre)
+        return getattr(self._modulo, atributo)
+
+    def __repr__(self):
+        estado = "importado" if self._modulo is not None else "sin importar"
+        return f"<módulo perezoso {self._nombre!r} ({estado})>"
+
+
+def modulo_perezoso(nombre):
+    return ModuloPerezoso(nombre)
+
+
+def funcion_perezosa(modulo, nombre):
+    """Equivale a ``from modulo import nombre`` para una función, importando al llamarla."""
+    def envoltura(*args, **kwargs):
+        return getattr(importlib.import_module(modulo), nombre)(*args, **kwargs)
+    envoltura.__name__ = envoltura.__qualname__ = nombre
+    envoltura.__doc__ = f"{modulo}.{nombre} (se importa al primer llamado)"
+    return envoltura
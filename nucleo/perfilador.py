@@ -0,0 +1,143 @@
+"""
+Perfil de un rerun de página: cProfile + tracemalloc.
+
+app.py envuelve ``menu.run()`` con ``perfil()`` cuando un Programador activa
+el interruptor de la barra lateral:
+
+    informe = {}
+    with perfil(informe):
+        menu.run()
+
+El informe trae el tiempo total, el reparto por categoría (importaciones,
+Supabase I/O, pandas, plotly, Streamlit, código de la app), las funciones con más tiempo
+acumulado y el pico de memoria con las líneas que más asignaron.
+
+cProfile sólo ve el hilo principal: las lecturas de ``fetch_varios`` corren
+en el pool y aparecen como espera (``lock.acquire``). Por eso el tiempo de
+red real se toma de ``nucleo.instrumentacion`` (unión de los intervalos de
+las consultas de esta sesión hechas durante el rerun; las de otras sesiones
+que corren a la vez no cuentan).
+
+cProfile y tracemalloc son globales al proceso: se perfila un rerun a la vez
+(si otra sesión ya está perfilando, el rerun corre normal y el informe lo dice).
+tracemalloc hace la página 2-3 veces más lenta mientras está activo.
+"""
+import cProfile
+import os
+import pstats
+import threading
+import time
+import tracemalloc
+from contextlib import contextmanager
+
+import pandas as pd
+
+from nucleo import instrumentacion
+
+TOP_FUNCIONES = 25
+TOP_ASIGNACIONES = 10
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Orden importa: la primera categoría con un fragmento en la ruta (o en el
+# nombre, para los built-ins) gana
+_RAIZ = RAIZ.replace("\\", "/")
+CATEGORIAS = [
+    ("importaciones", ("<frozen importlib", "<frozen zipimport", "marshal.", "_imp.")),
+    ("Supabase I/O", ("/httpx/", "/httpcore/", "/h11/", "/h2/", "/ssl.py", "/socket.py", "/supabase/",
+                      "/postgrest/", "sqlite3", "_ssl", "_socket", "nucleo/datos.py", "nucleo/supabase_falso.py")),
+    ("pandas", ("/pandas/", "/numpy/", "/pyarrow/", "pandas.", "numpy.", "pyarrow.")),
+    ("plotly", ("/plotly/",)),
+    ("Streamlit", ("/streamlit/", "/ast.py", "builtins.compile")),   # compila la página en cada rerun
+    ("código de la app", (_RAIZ + "/modulos/", _RAIZ + "/nucleo/", _RAIZ + "/app.py")),
+]
+
+_candado = threading.Lock()
+
+
+def _categoria(archivo, funcion):
+    ruta = archivo.replace("\\", "/")
+    if ruta == "~":   # built-in: se clasifica por su nombre
+        if "acquire" in funcion:
+            return "espera de hilos (fetch_varios)"
+        ruta = funcion
+    for nombre, fragmentos in CATEGORIAS:
+        if any(f in ruta for f in fragmentos):
+            return nombre
+    return "otros"
+
+
+def _corto(archivo):
+    if archivo.startswith(RAIZ):
+        return os.path.relpath(archivo, RAIZ)
+    partes = archivo.replace("\\", "/").split("/site-packages/")
+    return partes[-1] if len(partes) > 1 else os.path.basename(archivo)
+
+
+def _tiempo_red(desde, sesion):
+    """Segundos de reloj con al menos una consulta de ``sesion`` en vuelo desde ``desde`` (epoch)."""
+    intervalos = sorted(
+        (max(r["ts"] - r["latencia_ms"] / 1000, desde), r["ts"])
+        for r in instrumentacion.recientes() if r["ts"] >= desde and r.get("sesion") == sesion
+    )
+    total, fin = 0.0, desde
+    for inicio, termino in intervalos:
+        if termino > fin:
+            total += termino - max(inicio, fin)
+            fin = termino
+    return total, len(intervalos)
+
+
+def _resumir(perfilador, total):
+    filas, categorias = [], {}
+    for (archivo, linea, funcion), (_, llamadas, propio, acumulado, _) in pstats.Stats(perfilador).stats.items():
+        categoria = _categoria(archivo, funcion)
+        categorias[categoria] = categorias.get(categoria, 0.0) + propio
+        filas.append({"funcion": funcion, "archivo": f"{_corto(archivo)}:{linea}", "llamadas": llamadas,
+                      "propio_s": propio, "acumulado_s": acumulado, "categoria": categoria})
+    funciones = (pd.DataFrame(filas).sort_values("acumulado_s", ascending=False)
+                 .head(TOP_FUNCIONES).reset_index(drop=True))
+    reparto = pd.DataFrame(
+        [{"categoria": c, "segundos": s, "porcentaje": s / total if total else 0.0}
+         for c, s in sorted(categorias.items(), key=lambda x: -x[1])]
+    )
+    return funciones, reparto
+
+
+def _asignaciones(instantanea):
+    filas = []
+    for estadistica in instantanea.statistics("lineno")[:TOP_ASIGNACIONES]:
+        marco = estadistica.traceback[0]
+        filas.append({"linea": f"{_corto(marco.filename)}:{marco.lineno}",
+                      "mb": estadistica.size / 1e6, "bloques": estadistica.count})
+    return pd.DataFrame(filas)
+
+
+@contextmanager
+def perfil(informe):
+    """Perfila el bloque y completa el dict ``informe`` (también si el bloque termina con st.stop/st.rerun)."""
+    if not _candado.acquire(blocking=False):
+        informe["ocupado"] = True
+        yield informe
+        return
+    perfilador = cProfile.Profile()
+    ya_trazaba = tracemalloc.is_tracing()
+    if not ya_trazaba:
+        tracemalloc.start()
+    tracemalloc.reset_peak()
+    sesion = instrumentacion.sesion_actual()
+    inicio_epoch, inicio = time.time(), time.perf_counter()
+    perfilador.enable()
+    try:
+        yield informe
+    finally:
+        perfilador.disable()
+        total = time.perf_counter() - inicio
+        _, pico = tracemalloc.get_traced_memory()
+        instantanea = tracemalloc.take_snapshot()
+        if not ya_trazaba:
+            tracemalloc.stop()
+        _candado.release()
+        red, consultas = _tiempo_red(inicio_epoch, sesion)
+        funciones, reparto = _resumir(perfilador, total)
+        informe.update(total_s=total, red_s=red, consultas=consultas, pico_mb=pico / 1e6,
+                       funciones=funciones, reparto=reparto, asignaciones=_asignaciones(instantanea))
@@ -0,0 +1,118 @@
+"""
+Sondeos baratos de cambios antes de volver a bajar una tabla.
+
+``nucleo.versiones`` ve al instante las escrituras hechas desde esta app,
+pero no las de afuera (el script del clima, el SQL Editor, otra instancia
+apuntando a otro caché). Por eso los loaders tenían TTL cortos y, al
+vencer, bajaban todo aunque nada hubiera cambiado: Productos, Personal y
+Maquinaria casi nunca cambian, y ``cargar_mis_tareas`` refrescaba cada 15 s.
+
+La huella de una tabla sale de UNA petición de una fila:
+
+    GET /Tabla?select=updated_at&order=updated_at.desc.nullslast&limit=1
+    Prefer: count=exact      ->  Content-Range: 0-0/1234  +  [{"updated_at": ...}]
+
+El total detecta altas y bajas; la marca más reciente detecta ediciones
+(``updated_at``, que la migración 005 agrega con su trigger a los
+catálogos) o altas que compensan una baja (``id`` en las demás tablas).
+
+``segun_version(..., sondeo=15)`` suma la huella a la versión: sólo se
+vuelve a bajar la tabla cuando la huella se movió. Si todas las tablas del
+loader tienen marca de modificación (``updated_at`` en ``MARCAS``) su TTL
+puede ser largo (techo de seguridad); con ``id`` la huella no ve las
+ediciones externas y el TTL corto sigue siendo lo que las trae. Las huellas se guardan por proceso, así
+que cada tabla se sondea a lo sumo una vez por intervalo aunque la lean
+varios loaders y varias sesiones. El sondeo es un solo intento, sin
+reintentos y fuera de todo candado: si el servidor no responde, el loader
+sigue con la última huella conocida en lugar de esperar.
+
+    @segun_version('Tareas_Evaluador', sondeo=15)
+    @cache_memoria(ttl=600)
+    def cargar_mis_tareas(version=None):
+        ...
+"""
+import logging
+import threading
+import time
+
+from nucleo import metricas
+from nucleo.datos import ErrorDatos, _pedir, _total_de, fetch_varios
+
+# --- CONFIGURACIÓN ---
+TIMEOUT_SONDEO = 3.0   # s; un sondeo lento no debe costar más que la lectura que evita
+REPROBAR_MARCA = 3600  # s hasta volver a probar una marca que no existía (migración aplicada después)
+
+COLUMNA_INEXISTENTE = ("42703", "PGRST204")   # códigos PostgREST/Postgres de columna desconocida
+
+# Columna marca por tabla (por defecto id). updated_at llega con la migración 005.
+MARCAS = {
+    'Productos': 'updated_at',
+    'Personal': 'updated_at',
+    'Maquinaria': 'updated_at',
+    'Tareas_Evaluador': 'updated_at',
+    'clima': 'fecha_hora',
+    'Clima': 'fecha_hora',
+}
+
+log = logging.getLogger(__name__)
+
+_huellas = {}          # tabla -> (momento del sondeo, huella)
+_sin_marca = {}        # tabla -> cuándo faltó su marca (migración sin aplicar): mientras, se sondea con id
+_candado = threading.Lock()
+
+
+def _pedir_huella(tabla, marca):
+    resp = _pedir("GET", tabla, [("select", marca), ("order", f"{marca}.desc.nullslast"), ("limit", "1")],
+                  headers={"Prefer": "count=exact"}, timeout=TIMEOUT_SONDEO, reintentos=1)
+    filas = resp.json()
+    return _total_de(resp), (filas[0].get(marca) if filas else None)
+
+
+def huella(tabla):
+    """(total de filas, marca más reciente) de ``tabla`` según el servidor."""
+    faltante = time.time() - _sin_marca.get(tabla, 0.0) < REPROBAR_MARCA
+    marca = 'id' if faltante else MARCAS.get(tabla, 'id')
+    try:
+        return _pedir_huella(tabla, marca)
+    except ErrorDatos as e:
+        if marca == 'id' or not any(codigo in str(e) for codigo in COLUMNA_INEXISTENTE):
+            raise
+        log.warning("Sondeo de %s: sin columna %s, se usa id (%s)", tabla, marca, e)
+        _sin_marca[tabla] = time.time()
+        return _pedir_huella(tabla, 'id')
+
+
+def huella_reciente(tabla, cada):
+    """Huella de ``tabla`` sondeada hace menos de ``cada`` segundos (sondea si hace falta).
+
+    Si el sondeo falla (sin señal) se devuelve la última huella conocida: el
+    loader sigue sirviendo su caché hasta su TTL en lugar de reintentar una
+    lectura completa que también fallaría.
+    """
+    with _candado:
+        momento, anterior = _huellas.get(tabla, (0.0, None))
+        if time.time() - momento < cada:
+            return anterior
+        # ✅ se reserva el intervalo: mientras esta sesión sondea, las demás siguen con la huella anterior
+        _huellas[tabla] = (time.time(), anterior)
+
+    try:
+        actual = huella(tabla)   # fuera del candado: un servidor lento no frena a las otras sesiones
+    except Exception as e:
+        log.warning("Sondeo de %s falló: %s", tabla, e)
+        metricas.SONDEOS.sumar(tabla, "error")
+        return anterior
+    metricas.SONDEOS.sumar(tabla, "sin_cambios" if actual == anterior else "cambio")
+    with _candado:
+        _huellas[tabla] = (time.time(), actual)
+    return actual
+
+
+def huellas(*tablas, cada=15):
+    """Tupla con la huella reciente de cada tabla (para la clave de caché)."""
+    ahora = time.time()
+    vencidas = [t for t in tablas if ahora - _huellas.get(t, (0.0, None))[0] >= cada]
+    if len(vencidas) > 1:
+        # ⚡ los sondeos vencidos viajan a la vez por el pool compartido
+        fetch_varios({t: (lambda t=t: huella_reciente(t, cada)) for t in vencidas})
+    return tuple(huella_reciente(t, cada) for t in tablas)
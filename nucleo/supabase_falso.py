@@ -0,0 +1,636 @@
+"""
+Supabase falso en proceso (SQLite) para pruebas y benchmarks sin conexión.
+
+Imita lo justo de PostgREST y de supabase-py para que todas las páginas y
+loaders corran en una laptop sin credenciales:
+
+- ``cliente.table(t).select().eq().in_().order().limit().insert().update()
+  .upsert().delete().execute()`` (el subconjunto del query builder que usa la app).
+- ``cliente.postgrest.session.request(...)``, la ruta que usa ``nucleo.datos``
+  (filtros PostgREST, ``order``, ``limit``, cabeceras ``Range`` y
+  ``Prefer: count=exact``, HEAD y ``Accept: text/csv``).
+
+Las tablas de ``sql/`` (y ``script_sincronizacion/tabla_clima.sql``) se crean
+a partir de sus ``CREATE TABLE``; las demás se crean al primer insert, con
+``id`` y ``created_at`` como hace Supabase por defecto, y suman columnas a
+medida que llegan. Las vistas y funciones ``LANGUAGE sql`` de
+``sql/migraciones/`` también se crean (sin los casts ``::tipo``), así que
+``GET /Vista`` y ``GET|POST /rpc/funcion`` responden como en Supabase.
+Una columna inexistente en ``select``, ``order`` o un filtro responde 400
+con ``code`` 42703, como PostgREST (SQLite la tomaría por un texto y
+ordenaría o filtraría en silencio por una constante).
+
+Cada petición se cuenta (total, por tabla y por método) junto con los bytes
+enviados y recibidos, en ``cliente.estadisticas``. ``ClienteFalso(latencia=0.05)``
+agrega ese tiempo de red a cada petición (``time.sleep`` en la sesión síncrona,
+``asyncio.sleep`` en ``sesion.transporte_async()``, la que usa ``nucleo.asincrono``).
+
+Activación: ``PROYECTO_UVA_SUPABASE_FALSO=1`` (en memoria) o
+``PROYECTO_UVA_SUPABASE_FALSO=/ruta/base.sqlite`` antes de arrancar
+Streamlit; ``obtener_cliente()`` devuelve entonces un ``ClienteFalso``.
+"""
+import asyncio
+import csv
+import glob
+import io
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+from collections import Counter
+
+import httpx
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+ESQUEMAS = [
+    *sorted(glob.glob(os.path.join(RAIZ, "sql", "*.sql"))),
+    os.path.join(RAIZ, "script_sincronizacion", "tabla_clima.sql"),
+]
+MIGRACIONES = sorted(glob.glob(os.path.join(RAIZ, "sql", "migraciones", "*.sql")))
+URL_BASE = "http://supabase.falso/rest/v1/"
+
+_AHORA_SQL = "(strftime('%Y-%m-%dT%H:%M:%f+00:00', 'now'))"
+
+
+class ErrorFalso(Exception):
+    """Respuesta de error del servidor falso (equivale a postgrest.APIError).
+
+    ``codigo`` es el ``code`` del cuerpo JSON, como en PostgREST
+    (``42703`` columna inexistente, ``PGRST204``, ``PGRST202``, ...).
+    """
+
+    def __init__(self, mensaje, codigo=None):
+        super().__init__(mensaje)
+        self.codigo = codigo
+
+
+# --- TRADUCCIÓN DE ESQUEMAS POSTGRES -> SQLITE ---
+def _nombre(crudo):
+    # Sin comillas, PostgreSQL pasa el nombre a minúsculas
+    return crudo[1:-1] if crudo.startswith('"') else crudo.lower()
+
+
+def _columna_sqlite(definicion):
+    """Traduce una línea de columna de CREATE TABLE; devuelve (nombre, ddl, tipo)."""
+    m = re.match(r'\s*("[^"]+"|\w+)\s+(.*)', definicion)
+    nombre, resto = _nombre(m.group(1)), m.group(2).upper()
+    if "PRIMARY KEY" in resto and ("SERIAL" in resto or "IDENTITY" in resto or "INT" in resto):
+        return nombre, f'"{nombre}" INTEGER PRIMARY KEY AUTOINCREMENT', "int"
+
+    if "BOOL" in resto:
+        afinidad, tipo = "INTEGER", "bool"
+    elif "JSON" in resto:
+        afinidad, tipo = "TEXT", "json"
+    elif "INT" in resto or "SERIAL" in resto:
+        afinidad, tipo = "INTEGER", "int"
+    elif any(t in resto for t in ("REAL", "FLOAT", "DOUBLE", "NUMERIC", "DECIMAL")):
+        afinidad, tipo = "REAL", "float"
+    else:
+        afinidad, tipo = "TEXT", "text"
+
+    ddl = f'"{nombre}" {afinidad}'
+    if "UNIQUE" in resto:
+        ddl += " UNIQUE"
+    if "NOW()" in resto or "CURRENT_TIMESTAMP" in resto:
+        ddl += f" DEFAULT {_AHORA_SQL}"
+    elif "CURRENT_DATE" in resto:
+        ddl += " DEFAULT (date('now'))"
+    else:
+        literal = re.search(r"DEFAULT\s+('(?:[^']|'')*'|[\d.]+|TRUE|FALSE)", m.group(2), re.I)
+        if literal:
+            valor = literal.group(1)
+            ddl += " DEFAULT " + {"TRUE": "1", "FALSE": "0"}.get(valor.upper(), valor)
+    return nombre, ddl, tipo
+
+
+def _leer_esquemas(rutas):
+    """Extrae {tabla: [(columna, ddl, tipo)]} de los CREATE TABLE de los .sql."""
+    tablas = {}
+    for ruta in rutas:
+        if not os.path.exists(ruta):
+            continue
+        with open(ruta, encoding="utf-8") as f:
+            texto = re.sub(r"--[^\n]*", "", f.read())
+        for m in re.finditer(r'CREATE TABLE\s+(?:IF NOT EXISTS\s+)?("[^"]+"|\w+)\s*\((.*?)\);', texto, re.S | re.I):
+            lineas = [l.strip() for l in re.split(r",\s*\n", m.group(2)) if l.strip()]
+            tablas[_nombre(m.group(1))] = [_columna_sqlite(l) for l in lineas
+                                            if not re.match(r"(PRIMARY|UNIQUE|CONSTRAINT|FOREIGN)\b", l, re.I)]
+    return tablas
+
+
+def _leer_migraciones(rutas):
+    """Extrae ([(vista, select)], {funcion: (parametros, columnas, cuerpo)}) de las migraciones."""
+    vistas, funciones = [], {}
+    for ruta in rutas:
+        with open(ruta, encoding="utf-8") as f:
+            texto = re.sub(r"--[^\n]*", "", f.read())
+        texto = re.sub(r"::\w+", "", texto)   # SQLite no tiene casts ::tipo
+        for m in re.finditer(r'CREATE (?:OR REPLACE )?VIEW\s+("[^"]+"|\w+)\s+AS\s+(.*?);', texto, re.S | re.I):
+            vistas.append((_nombre(m.group(1)), m.group(2)))
+        for m in re.finditer(r'CREATE (?:OR REPLACE )?FUNCTION\s+("[^"]+"|\w+)\s*\((.*?)\)\s*'
+                             r'RETURNS\s+TABLE\s*\((.*?)\)[^$]*\$\$(.*?);?\s*\$\$', texto, re.S | re.I):
+            parametros = [p.split()[0] for p in m.group(2).split(",") if p.strip()]
+            # Postgres nombra las columnas según RETURNS TABLE, no según las expresiones del SELECT
+            columnas = [_nombre(c.split()[0]) for c in m.group(3).split(",") if c.strip()]
+            cuerpo = m.group(4)
+            for p in parametros:
+                cuerpo = re.sub(rf'(?<![":.\w]){p}\b', f":{p}", cuerpo)
+            funciones[_nombre(m.group(1))] = (parametros, columnas, cuerpo)
+    return vistas, funciones
+
+
+# --- PARSEO DE FILTROS POSTGREST ---
+def _escalar(texto, tipo):
+    """Convierte el texto de un filtro al tipo con que la columna se guarda en SQLite."""
+    if tipo == "bool" and texto in ("true", "false"):
+        return int(texto == "true")
+    if tipo in ("int", "float", "bool"):
+        try:
+            return int(texto) if re.fullmatch(r"-?\d+", texto) else float(texto)
+        except ValueError:
+            pass
+    return texto   # texto, fechas ISO y columnas de tipo desconocido se comparan como texto
+
+
+def _lista_in(texto, tipo):
+    interior = texto.strip()[1:-1]
+    valores, actual, comillas = [], "", False
+    for c in interior:
+        if c == '"':
+            comillas = not comillas
+        elif c == "," and not comillas:
+            valores.append(actual)
+            actual = ""
+        else:
+            actual += c
+    valores.append(actual)
+    return [_escalar(v.replace('\\"', '"'), tipo) for v in valores if v != ""]
+
+
+_OPERADORES_SQL = {"eq": "=", "neq": "!=", "gt": ">", "gte": ">=", "lt": "<", "lte": "<="}
+_PARAMETROS_RESERVADOS = {"select", "order", "limit", "offset", "on_conflict", "columns"}
+
+
+def _where(params, tipos):
+    condiciones, valores = [], []
+    for col, expr in params:
+        if col in _PARAMETROS_RESERVADOS:
+            continue
+        op, _, texto = expr.partition(".")
+        q, tipo = f'"{col}"', tipos.get(col)
+        if op in _OPERADORES_SQL:
+            condiciones.append(f"{q} {_OPERADORES_SQL[op]} ?")
+            valores.append(_escalar(texto, tipo))
+        elif op in ("like", "ilike"):
+            patron = texto.replace("*", "%")
+            condiciones.append(f"{q} LIKE ?" if op == "ilike" else f"{q} GLOB ?")
+            valores.append(patron if op == "ilike" else patron.replace("%", "*"))
+        elif op == "in":
+            lista = _lista_in(texto, tipo)
+            condiciones.append(f"{q} IN ({','.join('?' * len(lista))})" if lista else "0")
+            valores.extend(lista)
+        elif op == "is":
+            condiciones.append(f"{q} IS NULL" if texto == "null" else f"{q} IS ?")
+            if texto != "null":
+                valores.append(_escalar(texto, "bool"))
+        else:
+            raise ErrorFalso(f"Operador no soportado por el falso: {op}")
+    return (" WHERE " + " AND ".join(condiciones) if condiciones else ""), valores
+
+
+def _filtradas(params):
+    return [col for col, _ in params if col not in _PARAMETROS_RESERVADOS]
+
+
+def _ordenadas(texto):
+    return [campo.split(".")[0] for campo in texto.split(",")]
+
+
+def _order(texto):
+    partes = []
+    for campo in texto.split(","):
+        col, *mods = campo.split(".")
+        desc = "desc" in mods
+        nulos = "NULLS FIRST" if "nullsfirst" in mods or (desc and "nullslast" not in mods) else "NULLS LAST"
+        partes.append(f'"{col}" {"DESC" if desc else "ASC"} {nulos}')
+    return " ORDER BY " + ", ".join(partes)
+
+
+# --- SERVIDOR FALSO ---
+class BaseFalsa:
+    """Base SQLite con la semántica PostgREST mínima que usa la app."""
+
+    def __init__(self, ruta=None, esquemas=ESQUEMAS, migraciones=MIGRACIONES):
+        self.conn = sqlite3.connect(ruta or ":memory:", check_same_thread=False)
+        self.candado = threading.RLock()
+        self.tipos = {}        # tabla -> {columna: tipo}
+        self.declaradas = set()
+        self.conn.execute("CREATE TABLE IF NOT EXISTS _tipos (tabla TEXT, columna TEXT, tipo TEXT, "
+                          "PRIMARY KEY (tabla, columna))")
+        for tabla, tipo_col, tipo in self.conn.execute("SELECT tabla, columna, tipo FROM _tipos"):
+            self.tipos.setdefault(tabla, {})[tipo_col] = tipo
+        for tabla, columnas in _leer_esquemas(esquemas).items():
+            self.conn.execute(f'CREATE TABLE IF NOT EXISTS "{tabla}" ({", ".join(c[1] for c in columnas)})')
+            self._registrar_tipos(tabla, {c[0]: c[2] for c in columnas})
+            self.declaradas.add(tabla)
+        vistas, self.funciones = _leer_migraciones(migraciones)
+        for vista, select in vistas:
+            # SQLite acepta la vista aunque su tabla aún no exista (se crea al primer insert)
+            self.conn.execute(f'CREATE VIEW IF NOT EXISTS "{vista}" AS {select}')
+        self.conn.commit()
+
+    # --- metadatos ---
+    def _registrar_tipos(self, tabla, tipos):
+        nuevos = {c: t for c, t in tipos.items() if c not in self.tipos.get(tabla, {})}
+        self.tipos.setdefault(tabla, {}).update(nuevos)
+        self.conn.executemany("INSERT OR IGNORE INTO _tipos VALUES (?, ?, ?)",
+                              [(tabla, c, t) for c, t in nuevos.items()])
+
+    def _existe(self, tabla):
+        return self.conn.execute("SELECT 1 FROM sqlite_master WHERE type IN ('table', 'view') AND name=?",
+                                 (tabla,)).fetchone() is not None
+
+    def _columnas(self, tabla):
+        return [f[1] for f in self.conn.execute(f'PRAGMA table_info("{tabla}")')]
+
+    def _asegurar_columnas(self, tabla, filas):
+        """Crea la tabla/columnas que falten (sólo en tablas sin esquema en sql/)."""
+        tipos = {}
+        for fila in filas:
+            for col, valor in fila.items():
+                if valor is None or col in tipos:
+                    continue
+                tipos[col] = ("bool" if isinstance(valor, bool) else "json" if isinstance(valor, (dict, list))
+                              else "int" if isinstance(valor, int) else "float" if isinstance(valor, float)
+                              else "text")
+        if not self._existe(tabla):
+            self.conn.execute(f'CREATE TABLE "{tabla}" (id INTEGER PRIMARY KEY AUTOINCREMENT, '
+                              f'created_at TEXT DEFAULT {_AHORA_SQL})')
+            self._registrar_tipos(tabla, {"id": "int", "created_at": "text"})
+        existentes = set(self._columnas(tabla))
+        faltan = [c for fila in filas for c in fila if c not in existentes]
+        if faltan and tabla in self.declaradas:
+            raise ErrorFalso(f"Could not find the '{faltan[0]}' column of '{tabla}' in the schema cache",
+                             "PGRST204")
+        for col in dict.fromkeys(faltan):
+            self.conn.execute(f'ALTER TABLE "{tabla}" ADD COLUMN "{col}"')
+        self._registrar_tipos(tabla, tipos)
+
+    def _verificar(self, tabla, columnas):
+        """400 / 42703 si alguna columna no existe: SQLite tomaría un "nombre" desconocido como texto."""
+        existentes = set(self._columnas(tabla))
+        for col in columnas:
+            if col not in existentes:
+                raise ErrorFalso(f"column {tabla}.{col} does not exist", "42703")
+
+    def _a_sqlite(self, valor):
+        if isinstance(valor, bool):
+            return int(valor)
+        if isinstance(valor, (dict, list)):
+            return json.dumps(valor, ensure_ascii=False)
+        return valor
+
+    def _a_python(self, tabla, fila, columnas):
+        tipos = self.tipos.get(tabla, {})
+        salida = {}
+        for col, valor in zip(columnas, fila):
+            tipo = tipos.get(col)
+            if valor is not None and tipo == "bool":
+                valor = bool(valor)
+            elif isinstance(valor, str) and tipo == "json":
+                valor = json.loads(valor)
+            salida[col] = valor
+        return salida
+
+    def _seleccionar(self, tabla, columnas, donde="", valores=(), resto=""):
+        cursor = self.conn.execute(f'SELECT {columnas} FROM "{tabla}"{donde}{resto}', list(valores))
+        nombres = [d[0] for d in cursor.description]
+        return [self._a_python(tabla, f, nombres) for f in cursor.fetchall()]
+
+    # --- verbos HTTP ---
+    def leer(self, tabla, params, headers):
+        select = dict(params).get("select", "*")
+        pedidas = self._columnas(tabla) if select == "*" else select.split(",")
+        orden = dict(params).get("order")
+        self._verificar(tabla, [*pedidas, *_filtradas(params), *(_ordenadas(orden) if orden else [])])
+        columnas = ", ".join(f'"{c}"' for c in pedidas)
+
+        donde, valores = _where(params, self.tipos.get(tabla, {}))
+        resto = _order(orden) if orden else ""
+
+        desde, limite = int(dict(params).get("offset", 0)), dict(params).get("limit")
+        rango = headers.get("range")
+        if rango:
+            a, b = (int(x) for x in rango.split("-"))
+            desde, limite = desde + a, min(b - a + 1, int(limite)) if limite else b - a + 1
+        if limite is not None or desde:
+            resto += f" LIMIT {int(limite) if limite is not None else -1} OFFSET {desde}"
+
+        filas = self._seleccionar(tabla, columnas, donde, valores, resto)
+        total = None
+        if "count=exact" in headers.get("prefer", ""):
+            total = self.conn.execute(f'SELECT COUNT(*) FROM "{tabla}"{donde}', valores).fetchone()[0]
+        return filas, total, desde
+
+    def llamar(self, funcion, argumentos):
+        """Ejecuta una función de las migraciones; los argumentos omitidos valen NULL (DEFAULT NULL)."""
+        if funcion not in self.funciones:
+            raise ErrorFalso(f"Could not find the function public.{funcion}", "PGRST202")
+        parametros, columnas, cuerpo = self.funciones[funcion]
+        cursor = self.conn.execute(cuerpo, {p: argumentos.get(p) for p in parametros})
+        return [dict(zip(columnas, fila)) for fila in cursor.fetchall()]
+
+    def insertar(self, tabla, filas, params, prefer):
+        filas = filas if isinstance(filas, list) else [filas]
+        if not filas:
+            return []
+        self._asegurar_columnas(tabla, filas)
+        columnas = list(dict.fromkeys(c for f in filas for c in f))
+        sql = (f'INSERT INTO "{tabla}" ({", ".join(f"{chr(34)}{c}{chr(34)}" for c in columnas)}) '
+               f'VALUES ({", ".join("?" * len(columnas))})')
+
+        if "resolution=" in prefer:
+            conflicto = dict(params).get("on_conflict") or "id"
+            claves = [c.strip() for c in conflicto.split(",")]
+            self.conn.execute(f'CREATE UNIQUE INDEX IF NOT EXISTS "ux_{tabla}_{"_".join(claves)}" '
+                              f'ON "{tabla}" ({", ".join(f"{chr(34)}{c}{chr(34)}" for c in claves)})')
+            if "ignore-duplicates" in prefer:
+                sql += f' ON CONFLICT ({", ".join(f"{chr(34)}{c}{chr(34)}" for c in claves)}) DO NOTHING'
+            else:
+                otras = [c for c in columnas if c not in claves] or claves[:1]
+                sql += (f' ON CONFLICT ({", ".join(f"{chr(34)}{c}{chr(34)}" for c in claves)}) DO UPDATE SET '
+                        + ", ".join(f'"{c}" = excluded."{c}"' for c in otras))
+            sql += " RETURNING rowid"
+        else:
+            sql += " RETURNING rowid"
+
+        rowids = []
+        for fila in filas:
+            r = self.conn.execute(sql, [self._a_sqlite(fila.get(c)) for c in columnas]).fetchone()
+            if r:
+                rowids.append(r[0])
+        return self._por_rowid(tabla, rowids)
+
+    def _por_rowid(self, tabla, rowids):
+        if not rowids:
+            return []
+        return self._seleccionar(tabla, "*", f" WHERE rowid IN ({','.join('?' * len(rowids))})", rowids,
+                                 " ORDER BY rowid")
+
+    def actualizar(self, tabla, cambios, params):
+        if not self._existe(tabla):
+            return []
+        self._asegurar_columnas(tabla, [cambios])
+        self._verificar(tabla, _filtradas(params))
+        donde, valores = _where(params, self.tipos.get(tabla, {}))
+        rowids = [r[0] for r in self.conn.execute(f'SELECT rowid FROM "{tabla}"{donde}', valores)]
+        if rowids and cambios:
+            asignaciones = ", ".join(f'"{c}" = ?' for c in cambios)
+            self.conn.execute(
+                f'UPDATE "{tabla}" SET {asignaciones} WHERE rowid IN ({",".join("?" * len(rowids))})',
+                [self._a_sqlite(v) for v in cambios.values()] + rowids,
+            )
+        return self._por_rowid(tabla, rowids)
+
+    def borrar(self, tabla, params):
+        if not self._existe(tabla):
+            return []
+        self._verificar(tabla, _filtradas(params))
+        donde, valores = _where(params, self.tipos.get(tabla, {}))
+        filas = self._seleccionar(tabla, "*", donde, valores)
+        self.conn.execute(f'DELETE FROM "{tabla}"{donde}', valores)
+        return filas
+
+
+class SesionFalsa:
+    """Sustituto de la httpx.Client de postgrest: responde desde BaseFalsa."""
+
+    def __init__(self, base, latencia=0.0):
+        self.base = base
+        self.latencia = latencia
+        self.event_hooks = {"request": [], "response": []}
+        self.estadisticas = Counter()
+
+    def transporte_async(self):
+        return TransporteAsyncFalso(self)
+
+    def request(self, method, url, params=None, headers=None, content=None, timeout=None, **kwargs):
+        if self.latencia:
+            time.sleep(self.latencia)   # ida y vuelta de red simulada
+        return self._responder(method, url, params, headers, content, **kwargs)
+
+    def _responder(self, method, url, params=None, headers=None, content=None, **kwargs):
+        metodo = method.upper()
+        ruta = str(url).split("/rest/v1/")[-1].strip("/")
+        params = list(params.items() if isinstance(params, dict) else params or [])
+        headers = {k.lower(): v for k, v in (headers or {}).items()}
+        if content is None and kwargs.get("json") is not None:
+            content = json.dumps(kwargs["json"], ensure_ascii=False, default=str).encode()
+        cuerpo = content or b""
+        peticion = httpx.Request(metodo, URL_BASE + ruta, params=params, headers=headers, content=cuerpo)
+        for hook in self.event_hooks["request"]:
+            hook(peticion)
+
+        try:
+            estado, datos, cabeceras = self._atender(metodo, ruta, params, headers, cuerpo)
+        except (ErrorFalso, sqlite3.Error) as e:
+            # mismo cuerpo que PostgREST: {"code", "message", "details", "hint"}
+            estado, cabeceras = 400, {}
+            datos = {"code": getattr(e, "codigo", None), "message": str(e), "details": None, "hint": None}
+
+        csv_pedido = "text/csv" in headers.get("accept", "") and isinstance(datos, list) and estado < 400
+        if metodo == "HEAD" or datos is None:
+            contenido = b""
+        elif csv_pedido:
+            contenido = _a_csv(datos)
+        else:
+            contenido = json.dumps(datos, ensure_ascii=False, default=str).encode()
+        tipo = "text/csv" if csv_pedido else "application/json"
+        resp = httpx.Response(estado, content=contenido, request=peticion,
+                              headers={"content-type": tipo, **cabeceras})
+
+        with self.base.candado:
+            self.estadisticas["peticiones"] += 1
+            self.estadisticas[f"peticiones:{metodo}"] += 1
+            self.estadisticas[f"peticiones:{ruta}"] += 1
+            self.estadisticas["bytes_enviados"] += len(cuerpo)
+            self.estadisticas["bytes_recibidos"] += len(contenido)
+            self.estadisticas[f"bytes:{ruta}"] += len(contenido)
+        for hook in self.event_hooks["response"]:
+            hook(resp)
+        return resp
+
+    def _atender(self, metodo, tabla, params, headers, cuerpo):
+        prefer = headers.get("prefer", "")
+        base = self.base
+        if tabla.startswith("rpc/"):
+            # GET pasa los argumentos en la query string (funciones STABLE); POST en el cuerpo JSON
+            argumentos = dict(params) if metodo == "GET" else (json.loads(cuerpo) if cuerpo else {})
+            with base.candado:
+                return 200, base.llamar(tabla[len("rpc/"):], argumentos), {}
+        with base.candado:
+            if metodo in ("GET", "HEAD"):
+                filas, total, desde = base.leer(tabla, params, headers) if base._existe(tabla) else ([], 0, 0)
+                fin = desde + len(filas) - 1
+                rango = f"{desde}-{fin}" if filas else "*"
+                return 200, filas, {"content-range": f"{rango}/{total if total is not None else '*'}"}
+
+            datos = json.loads(cuerpo) if cuerpo else {}
+            if metodo == "POST":
+                filas = base.insertar(tabla, datos, params, prefer)
+                estado = 201
+            elif metodo == "PATCH":
+                filas = base.actualizar(tabla, datos, params)
+                estado = 200
+            elif metodo == "DELETE":
+                filas = base.borrar(tabla, params)
+                estado = 200
+            else:
+                return 405, {"message": metodo}, {}
+            base.conn.commit()
+        return estado, (filas if "return=representation" in prefer else None), {}
+
+
+class TransporteAsyncFalso(httpx.AsyncBaseTransport):
+    """Transporte de ``httpx.AsyncClient`` que responde desde la misma SesionFalsa."""
+
+    def __init__(self, sesion):
+        self.sesion = sesion
+
+    async def handle_async_request(self, request):
+        if self.sesion.latencia:
+            await asyncio.sleep(self.sesion.latencia)
+        cuerpo = await request.aread()
+        resp = self.sesion._responder(request.method, request.url.path, request.url.params.multi_items(),
+                                      dict(request.headers), cuerpo or None)
+        return httpx.Response(resp.status_code, headers=resp.headers, content=resp.content)
+
+
+def _a_csv(filas):
+    """Serializa como PostgREST con ``Accept: text/csv`` (nulos vacíos, JSON como texto)."""
+    if not filas:
+        return b""
+    salida = io.StringIO()
+    escritor = csv.writer(salida, lineterminator="\n")
+    escritor.writerow(filas[0].keys())
+    for fila in filas:
+        escritor.writerow(
+            "" if v is None else ("true" if v else "false") if isinstance(v, bool)
+            else json.dumps(v, ensure_ascii=False) if isinstance(v, (dict, list)) else v
+            for v in fila.values()
+        )
+    return salida.getvalue().encode()
+
+
+# --- QUERY BUILDER (subconjunto de supabase-py) ---
+class RespuestaFalsa:
+    def __init__(self, data, count=None):
+        self.data, self.count = data, count
+
+
+class ConsultaFalsa:
+    def __init__(self, sesion, tabla):
+        self.sesion, self.tabla = sesion, tabla
+        self.metodo, self.params, self.headers, self.cuerpo = "GET", [], {}, None
+
+    # lectura
+    def select(self, *columnas, count=None):
+        self.params.append(("select", ",".join(c.replace(" ", "") for c in columnas) or "*"))
+        if count:
+            self.headers["Prefer"] = f"count={count}"
+        return self
+
+    def _filtro(self, col, op, valor):
+        from nucleo.datos import _formatear_valor
+        self.params.append((col, f"{op}.{_formatear_valor(valor)}"))
+        return self
+
+    def eq(self, col, valor):  return self._filtro(col, "eq", valor)
+    def neq(self, col, valor): return self._filtro(col, "neq", valor)
+    def gt(self, col, valor):  return self._filtro(col, "gt", valor)
+    def gte(self, col, valor): return self._filtro(col, "gte", valor)
+    def lt(self, col, valor):  return self._filtro(col, "lt", valor)
+    def lte(self, col, valor): return self._filtro(col, "lte", valor)
+
+    def in_(self, col, valores):
+        from nucleo.datos import _formatear_lista
+        self.params.append((col, "in." + _formatear_lista(valores)))
+        return self
+
+    def order(self, col, desc=False):
+        self.params.append(("order", f"{col}.desc" if desc else col))
+        return self
+
+    def limit(self, n):
+        self.params.append(("limit", str(int(n))))
+        return self
+
+    # escritura
+    def insert(self, datos):
+        self.metodo, self.cuerpo = "POST", datos
+        self.headers["Prefer"] = "return=representation"
+        return self
+
+    def upsert(self, datos, on_conflict="", ignore_duplicates=False, returning="representation"):
+        self.metodo, self.cuerpo = "POST", datos
+        resolucion = "ignore-duplicates" if ignore_duplicates else "merge-duplicates"
+        self.headers["Prefer"] = f"return={returning},resolution={resolucion}"
+        if on_conflict:
+            self.params.append(("on_conflict", on_conflict))
+        return self
+
+    def update(self, datos):
+        self.metodo, self.cuerpo = "PATCH", datos
+        self.headers["Prefer"] = "return=representation"
+        return self
+
+    def delete(self):
+        self.metodo = "DELETE"
+        self.headers["Prefer"] = "return=representation"
+        return self
+
+    def execute(self):
+        if self.metodo == "GET" and not any(k == "select" for k, _ in self.params):
+            self.params.append(("select", "*"))
+        resp = self.sesion.request(self.metodo, f"/{self.tabla}", params=self.params,
+                                   headers=self.headers, json=self.cuerpo)
+        if resp.is_error:
+            cuerpo = resp.json()
+            raise ErrorFalso(cuerpo.get("message", resp.text), cuerpo.get("code"))
+        datos = resp.json() if resp.content else []
+        total = resp.headers.get("content-range", "").rsplit("/", 1)[-1]
+        return RespuestaFalsa(datos, int(total) if total.isdigit() else None)
+
+
+class _PostgrestFalso:
+    def __init__(self, sesion):
+        self.session = sesion
+
+
+class ClienteFalso:
+    """Sustituto de supabase.Client con el subconjunto que usa la app."""
+
+    def __init__(self, ruta=None, esquemas=ESQUEMAS, migraciones=MIGRACIONES, latencia=0.0):
+        self.base = BaseFalsa(ruta, esquemas, migraciones)
+        self.postgrest = _PostgrestFalso(SesionFalsa(self.base, latencia))
+
+    def table(self, tabla):
+        return ConsultaFalsa(self.postgrest.session, tabla)
+
+    from_ = table
+
+    @property
+    def estadisticas(self):
+        return self.postgrest.session.estadisticas
+
+    def reiniciar_estadisticas(self):
+        self.postgrest.session.estadisticas.clear()
+
+    def sembrar(self, tabla, filas, lote=1000):
+        """Carga filas directo en la base (sin contar peticiones); útil para benchmarks."""
+        with self.base.candado:
+            for i in range(0, len(filas), lote):
+                self.base.insertar(tabla, filas[i:i + lote], [], "")
+            self.base.conn.commit()
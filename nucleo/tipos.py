@@ -0,0 +1,129 @@
+"""
+Tipos de columna declarados por tabla.
+
+El transporte CSV (``fetch(..., formato='csv')``) no trae tipos: sin esta
+declaración pyarrow tendría que adivinarlos página por página y dos páginas
+podrían salir con tipos distintos. Aquí se fijan para las tablas grandes y
+planas; las columnas no declaradas se infieren.
+
+Los enteros que pueden venir nulos usan ``Int64`` (nullable); las fechas se
+dejan como texto, igual que en el camino JSON, y cada página las convierte.
+
+Aparte, ``NORMALIZACION`` declara tipos compactos para los frames que quedan
+guardados en memoria (caché incremental, ``fetch(..., normalizar=True)``):
+categorías para el texto repetido (Sector, Evaluador, Status...), int32 para
+conteos, datetime64 para fechas y float32 sólo para mediciones que nunca se
+exportan sin formato. ``normalizar()`` los aplica una vez al cargar y deja en
+``df.attrs['memoria']`` los bytes antes/después.
+
+Ojo con las categorías: ``groupby``/``pivot_table`` sobre ellas deben llevar
+``observed=True`` (en pandas < 3 el valor por defecto agrega grupos vacíos).
+"""
+import logging
+
+import pandas as pd
+
+log = logging.getLogger(__name__)
+
+# Mismo mapeo que usa 1_Diametro_Baya.py al guardar
+_RACIMOS_DIAMETRO = tuple(f"Racimo_{r}_{p}" for r in (1, 2) for p in ("Superior", "Medio", "Inferior"))
+
+TIPOS = {
+    "Control_Raleo": {
+        "id": "int64", "created_at": "str", "Fecha": "str", "Sector": "str", "Evaluador": "str",
+        "Numero_de_Fila": "Int64", "Nombre_del_Trabajador": "str",
+        "Racimos_Reales": "Int64", "Tandas_Equivalentes": "float64",
+    },
+    "Diametro_Baya": {
+        "id": "int64", "created_at": "str", "Fecha": "str", "Sector": "str", "Planta": "Int64",
+        **{c: "float64" for c in _RACIMOS_DIAMETRO},
+    },
+    "clima": {
+        "id": "int64", "fecha_hora": "str", "creado_en": "str", "viento_dir": "str",
+        "temp_out": "float64", "hum_out": "float64", "viento_vel": "float64",
+        "lluvia_mm": "float64", "radiacion_solar": "float64",
+    },
+}
+TIPOS["Clima"] = TIPOS["clima"]
+
+
+# --- NORMALIZACIÓN EN MEMORIA ---
+# 'categoria' sólo se aplica si la columna repite valores (baja cardinalidad).
+# Las columnas marca de agua (created_at, fecha_hora) no van aquí: el caché
+# incremental las compara como texto ISO.
+NORMALIZACION = {
+    "Control_Raleo": {
+        "Fecha": "fecha", "Sector": "categoria", "Evaluador": "categoria",
+        "Nombre_del_Trabajador": "categoria", "Numero_de_Fila": "entero", "Racimos_Reales": "entero",
+    },
+    "Diametro_Baya": {
+        "Fecha": "fecha", "Sector": "categoria", "Planta": "entero",
+        **{c: "real" for c in _RACIMOS_DIAMETRO},   # mm con 2 decimales, siempre se muestran con formato
+    },
+    "Monitoreo_Mosca": {
+        "Fecha": "fecha", "Sector": "categoria", "Ceratitis_capitata": "entero",
+        "Anastrepha_fraterculus": "entero", "Anastrepha_distinta": "entero",
+    },
+    "Ordenes_de_Trabajo": {"Status": "categoria", "Sector_Aplicacion": "categoria", "Fecha_Programada": "fecha"},
+    "Evaluaciones_Fenologicas": {"Fecha": "fecha", "Sector": "categoria"},
+    "clima": {"viento_dir": "categoria"},
+}
+NORMALIZACION["Clima"] = NORMALIZACION["clima"]
+
+MAX_PROPORCION_CATEGORIA = 0.5   # únicos / filas por encima de esto no conviene categoría
+_INT32 = (-2**31, 2**31 - 1)
+
+
+def tipos_de(tabla):
+    """Dict {columna: dtype} declarado para la tabla (vacío si no hay declaración)."""
+    return TIPOS.get(tabla, {})
+
+
+def _a_entero(serie):
+    numeros = pd.to_numeric(serie, errors='coerce')
+    validos = numeros.dropna()
+    if validos.empty or (validos % 1 != 0).any() or validos.min() < _INT32[0] or validos.max() > _INT32[1]:
+        return serie   # decimales o fuera de rango: no es seguro
+    return numeros.astype("Int32" if numeros.isna().any() else "int32")
+
+
+def _a_categoria(serie):
+    if isinstance(serie.dtype, pd.CategoricalDtype):
+        return serie
+    if serie.map(type).isin([dict, list]).any():   # JSONB: no es texto plano
+        return serie
+    if len(serie) and serie.nunique() / len(serie) > MAX_PROPORCION_CATEGORIA:
+        return serie
+    return serie.astype("category")
+
+
+def _convertir(serie, tipo):
+    if tipo == "fecha":
+        if pd.api.types.is_datetime64_any_dtype(serie):
+            return serie
+        return pd.to_datetime(serie, format="ISO8601", errors="coerce")
+    if tipo == "entero":
+        return _a_entero(serie)
+    if tipo == "real":
+        return pd.to_numeric(serie, errors="coerce").astype("float32")
+    return _a_categoria(serie)
+
+
+def normalizar(df, tabla):
+    """Aplica ``NORMALIZACION[tabla]`` a las columnas presentes (idempotente).
+
+    Devuelve un frame nuevo con ``attrs['memoria'] = {'antes': bytes, 'despues': bytes}``.
+    """
+    esquema = NORMALIZACION.get(tabla)
+    if not esquema or df.empty:
+        return df
+    antes = int(df.memory_usage(deep=True).sum())
+    df = df.copy()
+    for col, tipo in esquema.items():
+        if col in df.columns:
+            df[col] = _convertir(df[col], tipo)
+    despues = int(df.memory_usage(deep=True).sum())
+    df.attrs['memoria'] = {'antes': antes, 'despues': despues}
+    log.info("normalizar %s: %d filas, %.2f MB -> %.2f MB",
+             tabla, len(df), antes / 1e6, despues / 1e6)
+    return df
@@ -0,0 +1,94 @@
+"""
+Versión por tabla para invalidar cachés sin ``.clear()``.
+
+Cada escritura exitosa a Supabase (insert, update, upsert, delete, anular)
+sube el contador de su tabla: ``nucleo.datos`` lo hace solo, con un hook de
+respuesta en la sesión HTTP del cliente compartido, así que ninguna página
+tiene que acordarse. Los loaders declaran de qué tablas dependen y la versión
+entra en su clave de caché:
+
+    @segun_version('Productos', 'Ingresos', 'Salidas')
+    @st.cache_data(ttl=60)
+    def cargar_todo(version=None):
+        ...
+
+Cuando Mezclas despacha Salidas, el Kardex ve otra versión en su próximo
+rerun y recarga; los cachés de tablas no tocadas siguen calientes.
+
+Las escrituras hechas fuera de la app no pasan por el hook: con
+``segun_version(..., sondeo=N)`` la versión suma además una huella barata
+del servidor (``nucleo.sondeos``) y el TTL del loader queda como techo.
+
+Los contadores viven en el mismo SQLite que ``nucleo.cache_disco``, por lo
+que los comparten todos los procesos del servidor.
+"""
+import functools
+import os
+import sqlite3
+
+from nucleo.cache_disco import DIRECTORIO, RUTA
+
+
+def _conectar():
+    os.makedirs(DIRECTORIO, exist_ok=True)
+    conn = sqlite3.connect(RUTA, timeout=30)
+    conn.execute("CREATE TABLE IF NOT EXISTS versiones (tabla TEXT PRIMARY KEY, version INTEGER)")
+    return conn
+
+
+def _normalizar(tabla):
+    # PostgreSQL pliega a minúsculas los nombres sin comillas (Clima == clima)
+    return tabla.lower()
+
+
+def versiones(*tablas):
+    """Tupla con la versión actual de cada tabla (0 si nunca se escribió)."""
+    conn = _conectar()
+    try:
+        filas = dict(conn.execute(
+            f"SELECT tabla, version FROM versiones WHERE tabla IN ({','.join('?' * len(tablas))})",
+            [_normalizar(t) for t in tablas],
+        ).fetchall())
+    finally:
+        conn.close()
+    return tuple(filas.get(_normalizar(t), 0) for t in tablas)
+
+
+def incrementar(*tablas):
+    """Sube la versión de las tablas indicadas (llamado tras cada escritura)."""
+    conn = _conectar()
+    try:
+        with conn:
+            conn.executemany(
+                "INSERT INTO versiones VALUES (?, 1) "
+                "ON CONFLICT(tabla) DO UPDATE SET version = version + 1",
+                [(_normalizar(t),) for t in tablas],
+            )
+    finally:
+        conn.close()
+
+
+def segun_version(*tablas, sondeo=None):
+    """Decorador: pasa ``version=versiones(*tablas)`` al loader cacheado que envuelve.
+
+    Con ``sondeo=N`` la versión incluye además la huella de cada tabla en el
+    servidor, sondeada a lo sumo cada N segundos (ver ``nucleo.sondeos``):
+    así también se ven los cambios hechos fuera de la app sin depender del TTL.
+    """
+    def decorador(cargador):
+        if sondeo is None:
+            def version():
+                return versiones(*tablas)
+        else:
+            from nucleo.sondeos import huellas   # sondeos importa datos, que importa este módulo
+
+            def version():
+                return versiones(*tablas), huellas(*tablas, cada=sondeo)
+
+        @functools.wraps(cargador)
+        def envoltura(*args, **kwargs):
+            return cargador(*args, version=version(), **kwargs)
+
+        envoltura.clear = cargador.clear
+        return envoltura
+    return decorador
@@ -19,6 +19,14 @@ SUPABASE_KEY = "REEMPLAZA_CON_TU_ANON_KEY_DE_SUPABASE"
 # NOTA: En WeatherLink ir a File -> Export -> Configurar para exportar automático diario
 RUTA_ARCHIVO_WEATHERLINK = r"C:\WeatherLink\Fundo Belessia\download.txt"
 
+# Resultado de cada ejecución en formato Prometheus (textfile collector).
+# node_exporter --collector.textfile.directory, o la app (nucleo/metricas.py)
+# si este archivo se copia/monta en script_sincronizacion/ del servidor.
+RUTA_METRICAS = os.environ.get(
+    "PROYECTO_UVA_SYNC_WEATHER_PROM",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), "sync_weather.prom"),
+)
+
 def procesar_archivo_weatherlink():
     if not os.path.exists(RUTA_ARCHIVO_WEATHERLINK):
         print(f"❌ No se encontró el archivo de WeatherLink en: {RUTA_ARCHIVO_WEATHERLINK}")
@@ -47,8 +55,10 @@ def procesar_archivo_weatherlink():
     return datos_extraidos
 
 def enviar_datos_a_supabase(datos):
+    """Sube los registros y devuelve cuántos terminaron en ok / error_http / error_red."""
+    resultados = {"ok": 0, "error_http": 0, "error_red": 0}
     if not datos:
-        return
+        return resultados
 
     print("🚀 Enviando datos a Supabase...")
     headers = {
@@ -66,10 +76,61 @@ def enviar_datos_a_supabase(datos):
             response = requests.post(url_tabla, headers=headers, json=registro)
             if response.status_code in [200, 201]:
                 print(f"✅ Registro de {registro['fecha_hora']} guardado con éxito.")
+                resultados["ok"] += 1
             else:
                 print(f"❌ Error al guardar registro: {response.text}")
+                resultados["error_http"] += 1
         except Exception as e:
             print(f"⚠️ Error de conexión a internet: {e}")
+            resultados["error_red"] += 1
+    return resultados
+
+def _leer_metricas_previas():
+    """Totales y último éxito de la ejecución anterior (los contadores son acumulativos)."""
+    totales, ultimo_exito = {}, 0.0
+    try:
+        with open(RUTA_METRICAS, encoding="utf-8") as f:
+            for linea in f:
+                if linea.startswith("uva_sync_weather_registros_total{"):
+                    resultado = linea.split('resultado="', 1)[1].split('"', 1)[0]
+                    totales[resultado] = int(float(linea.rsplit(" ", 1)[1]))
+                elif linea.startswith("uva_sync_weather_ultimo_exito_timestamp "):
+                    ultimo_exito = float(linea.rsplit(" ", 1)[1])
+    except (OSError, ValueError, IndexError):
+        pass
+    return totales, ultimo_exito
+
+def escribir_metricas(resultados, leidos):
+    """Deja el resultado en RUTA_METRICAS (escritura atómica: tmp + replace)."""
+    ahora = time.time()
+    totales, ultimo_exito = _leer_metricas_previas()
+    for resultado, n in resultados.items():
+        totales[resultado] = totales.get(resultado, 0) + n
+    if resultados["ok"] and not resultados["error_http"] and not resultados["error_red"]:
+        ultimo_exito = ahora
+    lineas = [
+        "# HELP uva_sync_weather_registros_total Registros de clima enviados, por resultado.",
+        "# TYPE uva_sync_weather_registros_total counter",
+    ]
+    lineas += [f'uva_sync_weather_registros_total{{resultado="{r}"}} {n}' for r, n in sorted(totales.items())]
+    lineas += [
+        "# HELP uva_sync_weather_leidos Registros leídos de WeatherLink en la última ejecución.",
+        "# TYPE uva_sync_weather_leidos gauge",
+        f"uva_sync_weather_leidos {leidos}",
+        "# HELP uva_sync_weather_ultima_ejecucion_timestamp Fin de la última ejecución (epoch).",
+        "# TYPE uva_sync_weather_ultima_ejecucion_timestamp gauge",
+        f"uva_sync_weather_ultima_ejecucion_timestamp {ahora:.0f}",
+        "# HELP uva_sync_weather_ultimo_exito_timestamp Última ejecución sin errores (epoch).",
+        "# TYPE uva_sync_weather_ultimo_exito_timestamp gauge",
+        f"uva_sync_weather_ultimo_exito_timestamp {ultimo_exito:.0f}",
+    ]
+    try:
+        temporal = RUTA_METRICAS + ".tmp"
+        with open(temporal, "w", encoding="utf-8") as f:
+            f.write("\n".join(lineas) + "\n")
+        os.replace(temporal, RUTA_METRICAS)
+    except OSError as e:
+        print(f"⚠️ No se pudieron escribir las métricas en {RUTA_METRICAS}: {e}")
 
 if __name__ == "__main__":
     print("==================================================")
@@ -81,7 +142,8 @@ if __name__ == "__main__":
     datos = procesar_archivo_weatherlink()
     
     # 2. Enviarlos a internet
-    enviar_datos_a_supabase(datos)
+    resultados = enviar_datos_a_supabase(datos)
+    escribir_metricas(resultados, len(datos))
     
     print("\nProceso terminado. La ventana se cerrará en 10 segundos...")
     time.sleep(10)
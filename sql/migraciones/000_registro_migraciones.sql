@@ -0,0 +1,20 @@
+-- =============================================
+-- MIGRACIÓN 000: registro de migraciones aplicadas
+-- Ejecutar en Supabase > SQL Editor > New Query, antes que las demás.
+--
+-- Las migraciones de esta carpeta se aplican en orden de número, una vez
+-- cada una. Cada archivo deja su fila en "Migraciones": para ver qué falta
+-- aplicar basta con  SELECT * FROM "Migraciones" ORDER BY version;
+-- Todas son idempotentes (CREATE OR REPLACE / IF NOT EXISTS): volver a
+-- correr una no rompe nada.
+-- =============================================
+
+CREATE TABLE IF NOT EXISTS "Migraciones" (
+    version TEXT PRIMARY KEY,
+    descripcion TEXT NOT NULL,
+    aplicada_en TIMESTAMPTZ DEFAULT NOW()
+);
+
+INSERT INTO "Migraciones" (version, descripcion)
+VALUES ('000', 'Registro de migraciones')
+ON CONFLICT (version) DO NOTHING;
@@ -0,0 +1,29 @@
+-- =============================================
+-- MIGRACIÓN 001: VISTA Salidas_por_Ingreso
+-- Ejecutar en Supabase > SQL Editor > New Query
+--
+-- Consumo acumulado por lote: una fila por Ingreso_ID en lugar de una por
+-- movimiento. La usa el Kardex (generar_kardex) con
+-- PROYECTO_UVA_AGREGADOS_SERVIDOR=1 (ver nucleo/agregados.py).
+-- =============================================
+
+BEGIN;
+
+CREATE OR REPLACE VIEW "Salidas_por_Ingreso" AS
+SELECT "Ingreso_ID",
+       SUM("Cantidad_Usada") AS "Cantidad_Usada",
+       COUNT(*)              AS "Movimientos",
+       MAX("Fecha_Aplicacion") AS "Ultima_Salida"
+FROM "Salidas"
+GROUP BY "Ingreso_ID";
+
+GRANT SELECT ON "Salidas_por_Ingreso" TO anon, authenticated;
+
+-- El GROUP BY recorre Salidas por lote
+CREATE INDEX IF NOT EXISTS idx_salidas_ingreso ON "Salidas" ("Ingreso_ID");
+
+INSERT INTO "Migraciones" (version, descripcion)
+VALUES ('001', 'Vista Salidas_por_Ingreso')
+ON CONFLICT (version) DO NOTHING;
+
+COMMIT;
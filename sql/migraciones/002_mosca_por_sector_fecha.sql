@@ -0,0 +1,31 @@
+-- =============================================
+-- MIGRACIÓN 002: VISTA Mosca_por_Sector_Fecha
+-- Ejecutar en Supabase > SQL Editor > New Query
+--
+-- Capturas de mosca sumadas por sector y día (todas las trampas del sector
+-- en una fila). Se filtra por fecha como cualquier tabla:
+--     /Mosca_por_Sector_Fecha?Fecha=gte.2025-07-01
+-- La usa el Dashboard General con PROYECTO_UVA_AGREGADOS_SERVIDOR=1.
+-- =============================================
+
+BEGIN;
+
+CREATE OR REPLACE VIEW "Mosca_por_Sector_Fecha" AS
+SELECT "Sector",
+       "Fecha",
+       SUM("Ceratitis_capitata")     AS "Ceratitis_capitata",
+       SUM("Anastrepha_fraterculus") AS "Anastrepha_fraterculus",
+       SUM("Anastrepha_distinta")    AS "Anastrepha_distinta",
+       COUNT(*)                      AS "Lecturas"
+FROM "Monitoreo_Mosca"
+GROUP BY "Sector", "Fecha";
+
+GRANT SELECT ON "Mosca_por_Sector_Fecha" TO anon, authenticated;
+
+CREATE INDEX IF NOT EXISTS idx_mosca_fecha_sector ON "Monitoreo_Mosca" ("Fecha", "Sector");
+
+INSERT INTO "Migraciones" (version, descripcion)
+VALUES ('002', 'Vista Mosca_por_Sector_Fecha')
+ON CONFLICT (version) DO NOTHING;
+
+COMMIT;
@@ -0,0 +1,45 @@
+-- =============================================
+-- MIGRACIÓN 003: RPC horas_tractor_por_sector(desde, hasta)
+-- Ejecutar en Supabase > SQL Editor > New Query
+--
+-- Horas de maquinaria y costo de mano de obra por sector en un periodo,
+-- con el mismo cruce que la planilla de Finanzas (nucleo/calculos.py,
+-- armar_planilla): sólo tractoristas/operadores/maquinistas, sueldo nulo
+-- cuenta como 0. Es una función y no una vista porque "Jornadas" (días
+-- distintos) depende del periodo.
+--
+-- Es STABLE: PostgREST la acepta por GET
+--     /rpc/horas_tractor_por_sector?desde=2025-07-01&hasta=2025-07-31
+-- La usa el Dashboard Finanzas con PROYECTO_UVA_AGREGADOS_SERVIDOR=1.
+-- =============================================
+
+BEGIN;
+
+CREATE OR REPLACE FUNCTION horas_tractor_por_sector(desde DATE DEFAULT NULL, hasta DATE DEFAULT NULL)
+RETURNS TABLE ("Sector" TEXT, "Costo_Total" NUMERIC, "Horas_Total" NUMERIC, "Jornadas" BIGINT, "Registros" BIGINT)
+LANGUAGE sql STABLE AS $$
+    SELECT h."Sector",
+           SUM(COALESCE(h."Total_Horas", 0) * COALESCE(p."Sueldo_Hora", 0)),
+           SUM(COALESCE(h."Total_Horas", 0)),
+           COUNT(DISTINCT h."Fecha"::date),
+           COUNT(*)
+    FROM "Registro_Horas_Tractor" h
+    JOIN "Personal" p ON p.id = h.personal_id
+    WHERE lower(trim(p.rol)) IN ('tractorista', 'operador', 'maquinista')
+      AND h."Sector" IS NOT NULL
+      AND h."Fecha" IS NOT NULL
+      AND (desde IS NULL OR h."Fecha"::date >= desde)
+      AND (hasta IS NULL OR h."Fecha"::date <= hasta)
+    GROUP BY h."Sector"
+    ORDER BY h."Sector";
+$$;
+
+GRANT EXECUTE ON FUNCTION horas_tractor_por_sector(DATE, DATE) TO anon, authenticated;
+
+CREATE INDEX IF NOT EXISTS idx_horas_tractor_fecha ON "Registro_Horas_Tractor" ("Fecha");
+
+INSERT INTO "Migraciones" (version, descripcion)
+VALUES ('003', 'RPC horas_tractor_por_sector')
+ON CONFLICT (version) DO NOTHING;
+
+COMMIT;
@@ -0,0 +1,30 @@
+-- =============================================
+-- MIGRACIÓN 004: uuid de la bandeja offline en las tablas de campo
+-- Ejecutar en Supabase > SQL Editor > New Query
+--
+-- La bandeja de salida (nucleo/bandeja.py) sella cada registro con un uuid
+-- generado en el teléfono y sube con
+--     upsert(lote, on_conflict="uuid", ignore_duplicates=True)
+-- ON CONFLICT necesita un índice único sobre la columna. Las filas antiguas
+-- quedan con uuid NULL, que no choca entre sí.
+-- =============================================
+
+BEGIN;
+
+ALTER TABLE "Evaluaciones_Sanitarias"  ADD COLUMN IF NOT EXISTS uuid UUID;
+ALTER TABLE "Monitoreo_Mosca"          ADD COLUMN IF NOT EXISTS uuid UUID;
+ALTER TABLE "Control_Raleo"            ADD COLUMN IF NOT EXISTS uuid UUID;
+ALTER TABLE "Diametro_Baya"            ADD COLUMN IF NOT EXISTS uuid UUID;
+ALTER TABLE "Evaluaciones_Fenologicas" ADD COLUMN IF NOT EXISTS uuid UUID;
+
+CREATE UNIQUE INDEX IF NOT EXISTS ux_sanitarias_uuid  ON "Evaluaciones_Sanitarias"  (uuid);
+CREATE UNIQUE INDEX IF NOT EXISTS ux_mosca_uuid       ON "Monitoreo_Mosca"          (uuid);
+CREATE UNIQUE INDEX IF NOT EXISTS ux_raleo_uuid       ON "Control_Raleo"            (uuid);
+CREATE UNIQUE INDEX IF NOT EXISTS ux_diametro_uuid    ON "Diametro_Baya"            (uuid);
+CREATE UNIQUE INDEX IF NOT EXISTS ux_fenologicas_uuid ON "Evaluaciones_Fenologicas" (uuid);
+
+INSERT INTO "Migraciones" (version, descripcion)
+VALUES ('004', 'Columna uuid de la bandeja offline')
+ON CONFLICT (version) DO NOTHING;
+
+COMMIT;
@@ -0,0 +1,52 @@
+-- =============================================
+-- MIGRACIÓN 005: updated_at en los catálogos (sondeos de cambios)
+-- Ejecutar en Supabase > SQL Editor > New Query
+--
+-- nucleo/sondeos.py decide si un loader tiene que volver a bajar una tabla
+-- con una petición de una fila:
+--     GET /Productos?select=updated_at&order=updated_at.desc.nullslast&limit=1
+--     Prefer: count=exact
+-- El conteo ve altas y bajas; updated_at ve las ediciones. El trigger la
+-- mantiene al día en cada UPDATE (venga de la app, del SQL Editor o de otro
+-- script). Sin esta migración el sondeo usa id y sólo detecta altas y bajas.
+-- =============================================
+
+BEGIN;
+
+CREATE OR REPLACE FUNCTION tocar_updated_at() RETURNS trigger
+LANGUAGE plpgsql AS $$
+BEGIN
+    NEW.updated_at := NOW();
+    RETURN NEW;
+END;
+$$;
+
+ALTER TABLE "Productos"        ADD COLUMN IF NOT EXISTS updated_at TIMESTAMPTZ DEFAULT NOW();
+ALTER TABLE "Personal"         ADD COLUMN IF NOT EXISTS updated_at TIMESTAMPTZ DEFAULT NOW();
+ALTER TABLE "Maquinaria"       ADD COLUMN IF NOT EXISTS updated_at TIMESTAMPTZ DEFAULT NOW();
+ALTER TABLE "Tareas_Evaluador" ADD COLUMN IF NOT EXISTS updated_at TIMESTAMPTZ DEFAULT NOW();
+
+DROP TRIGGER IF EXISTS tr_productos_updated_at ON "Productos";
+CREATE TRIGGER tr_productos_updated_at BEFORE UPDATE ON "Productos"
+    FOR EACH ROW EXECUTE FUNCTION tocar_updated_at();
+DROP TRIGGER IF EXISTS tr_personal_updated_at ON "Personal";
+CREATE TRIGGER tr_personal_updated_at BEFORE UPDATE ON "Personal"
+    FOR EACH ROW EXECUTE FUNCTION tocar_updated_at();
+DROP TRIGGER IF EXISTS tr_maquinaria_updated_at ON "Maquinaria";
+CREATE TRIGGER tr_maquinaria_updated_at BEFORE UPDATE ON "Maquinaria"
+    FOR EACH ROW EXECUTE FUNCTION tocar_updated_at();
+DROP TRIGGER IF EXISTS tr_tareas_updated_at ON "Tareas_Evaluador";
+CREATE TRIGGER tr_tareas_updated_at BEFORE UPDATE ON "Tareas_Evaluador"
+    FOR EACH ROW EXECUTE FUNCTION tocar_updated_at();
+
+-- El sondeo lee sólo la fila más reciente: con índice es un index scan de una fila
+CREATE INDEX IF NOT EXISTS idx_productos_updated_at ON "Productos"        (updated_at DESC);
+CREATE INDEX IF NOT EXISTS idx_personal_updated_at  ON "Personal"         (updated_at DESC);
+CREATE INDEX IF NOT EXISTS idx_maquinaria_updated_at ON "Maquinaria"      (updated_at DESC);
+CREATE INDEX IF NOT EXISTS idx_tareas_updated_at    ON "Tareas_Evaluador" (updated_at DESC);
+
+INSERT INTO "Migraciones" (version, descripcion)
+VALUES ('005', 'updated_at con trigger en los catálogos')
+ON CONFLICT (version) DO NOTHING;
+
+COMMIT;
@@ -0,0 +1,36 @@
+"""
+Fixtures comunes: cada prueba corre contra un Supabase falso nuevo
+(``nucleo/supabase_falso.py``) y con cachés vacíos.
+
+Las variables de entorno se fijan antes de importar ``nucleo``: varios
+módulos leen su configuración al importarse.
+"""
+import os
+import sys
+import tempfile
+
+os.environ["PROYECTO_UVA_CACHE_DIR"] = tempfile.mkdtemp(prefix="uva-pruebas-")
+os.environ["PROYECTO_UVA_METRICAS_PUERTO"] = "0"   # sin servidor de métricas
+os.environ.pop("PROYECTO_UVA_ASYNC", None)
+os.environ.pop("PROYECTO_UVA_SUPABASE_FALSO", None)
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pytest
+
+from nucleo import cache_memoria, cache_tablas, datos, sondeos
+from nucleo.supabase_falso import ClienteFalso
+
+
+@pytest.fixture
+def cliente(monkeypatch):
+    """ClienteFalso en memoria instalado como cliente compartido; sin esperas entre reintentos."""
+    monkeypatch.setattr(datos, "ESPERA_BASE", 0.0)
+    falso = ClienteFalso()
+    anterior = datos._cliente
+    datos.usar_cliente(falso)
+    cache_tablas.olvidar()
+    cache_memoria.borrar()
+    sondeos._huellas.clear()
+    sondeos._sin_marca.clear()
+    yield falso
+    datos._cliente = anterior
@@ -0,0 +1,44 @@
+import datetime as dt
+
+import pandas as pd
+import pytest
+
+from nucleo import agregados
+from nucleo.calculos import armar_planilla
+
+INICIO = dt.date(2025, 9, 1)
+
+
+@pytest.fixture
+def horas(cliente):
+    cliente.sembrar('Personal', [
+        {'id': 1, 'nombre_completo': 'ANA', 'rol': 'Tractorista', 'Sueldo_Hora': 10.0},
+        {'id': 2, 'nombre_completo': 'LUIS', 'rol': ' operador ', 'Sueldo_Hora': 12.5},
+        {'id': 3, 'nombre_completo': 'EVA', 'rol': 'Evaluador', 'Sueldo_Hora': 9.0},
+    ])
+    cliente.sembrar('Registro_Horas_Tractor', [
+        {'id': i, 'Fecha': (INICIO + dt.timedelta(days=i % 20)).isoformat(), 'personal_id': 1 + i % 3,
+         'Sector': ('J2', 'K1', 'W1')[i % 3 if i % 7 else 0], 'Total_Horas': 1.0 + i % 4}
+        for i in range(1, 61)
+    ])
+    return cliente
+
+
+def test_camino_cliente_y_servidor_coinciden_en_el_rango(horas):
+    df_horas = pd.DataFrame(horas.table('Registro_Horas_Tractor').select('*').execute().data)
+    df_personal = pd.DataFrame(horas.table('Personal').select('*').execute().data)
+    # la planilla cubre todo el mes; el agregado sólo la semana pedida
+    _, df_planilla = armar_planilla(df_horas, df_personal, INICIO, INICIO + dt.timedelta(days=30))
+    df_planilla['Total_Pago_Labor'] = df_planilla['Total_Horas'] * df_planilla['Sueldo_Hora']
+    desde, hasta = INICIO + dt.timedelta(days=3), INICIO + dt.timedelta(days=9)
+
+    cliente = agregados.horas_tractor_por_sector(desde, hasta, df_planilla, servidor=False)
+    servidor = agregados.horas_tractor_por_sector(desde, hasta, servidor=True)
+
+    assert cliente['Registros'].sum() < len(df_planilla)
+    pd.testing.assert_frame_equal(cliente, servidor, check_dtype=False)
+
+
+def test_camino_cliente_sin_planilla_falla_en_voz_alta():
+    with pytest.raises(ValueError, match="df_planilla"):
+        agregados.horas_tractor_por_sector(servidor=False)
@@ -0,0 +1,36 @@
+import pytest
+
+from nucleo import asincrono
+
+
+@pytest.fixture
+def productos(cliente, monkeypatch):
+    # AsyncClient nuevo sobre el ClienteFalso de esta prueba (se cachean por id de la sesión)
+    monkeypatch.setattr(asincrono, "_sesiones", {})
+    cliente.sembrar('Productos', [{'id': i, 'Codigo': f"P{i:03d}", 'Producto': f"PRODUCTO {i}"}
+                                  for i in range(1, 31)])
+    return cliente
+
+
+def test_fetch_varios_aisla_la_tabla_que_falla(productos):
+    res = asincrono.fetch_varios({
+        'Columna_Mala': dict(tabla='Productos', columnas="id, No_Existe"),
+        'Productos':    dict(orden='Producto'),
+        'Formato_Malo': dict(tabla='Productos', formato='xml'),
+    })
+
+    assert list(res) == ['Columna_Mala', 'Productos', 'Formato_Malo']   # orden pedido
+    assert len(res['Productos']) == 30 and 'error' not in res['Productos'].attrs
+    assert '42703' in res['Columna_Mala'].attrs['error']
+    assert 'formato' in res['Formato_Malo'].attrs['error']
+    for nombre in ('Columna_Mala', 'Formato_Malo'):
+        assert res[nombre].empty and res[nombre].attrs['tabla'] == nombre
+
+
+def test_fetch_varios_todas_invalidas_no_toca_el_loop(productos):
+    res = asincrono.fetch_varios({'A': dict(tabla='Productos', formato='xml'),
+                                  'B': dict(tabla='Productos', columnas="id", vista='Dashboard General')})
+
+    assert set(res) == {'A', 'B'}
+    assert all('error' in df.attrs for df in res.values())
+    assert productos.estadisticas['peticiones'] == 0
@@ -0,0 +1,85 @@
+import json
+
+import httpx
+import pytest
+
+from nucleo.bandeja import LOTE_FILAS, Bandeja, lotes
+
+
+class AlmacenFalso(dict):
+    """Mismo contrato que streamlit_local_storage.LocalStorage, en un dict."""
+
+    def getItem(self, clave):
+        return self.get(clave)
+
+    def setItem(self, clave, valor, key=None):
+        self[clave] = valor
+
+    def deleteItem(self, clave, key=None):
+        self.pop(clave, None)
+
+
+def _lecturas(n):
+    return [{'Fecha': '2025-10-01', 'Sector': 'W1', 'Numero_Trampa': i, 'Ceratitis_capitata': i % 5}
+            for i in range(n)]
+
+
+def _filas(cliente, tabla):
+    return cliente.base.conn.execute(f'SELECT COUNT(*), COUNT(DISTINCT uuid) FROM "{tabla}"').fetchone()
+
+
+def test_lotes_respeta_filas_y_bytes():
+    registros = _lecturas(450)
+    assert [len(l) for l in lotes(registros)] == [LOTE_FILAS, LOTE_FILAS, 50]
+
+    iguales = [{'Observaciones': 'x' * 100}] * 10
+    peso = len(json.dumps(iguales[0]).encode())
+    assert [len(l) for l in lotes(iguales, tope_bytes=3 * peso)] == [3, 3, 3, 1]
+
+
+def test_sincronizar_sube_por_lotes_y_vacia_el_dispositivo(cliente):
+    almacen = AlmacenFalso()
+    bandeja = Bandeja('Monitoreo_Mosca', almacen=almacen)
+    bandeja.agregar(_lecturas(450))
+    cliente.reiniciar_estadisticas()
+
+    assert bandeja.sincronizar(cliente) == 450
+    assert cliente.estadisticas['peticiones:POST'] == 3
+    assert _filas(cliente, 'Monitoreo_Mosca') == (450, 450)
+    assert not bandeja and json.loads(almacen[bandeja.clave]) == []
+
+
+def test_reintento_tras_un_corte_no_duplica_filas(cliente, monkeypatch):
+    almacen = AlmacenFalso()
+    bandeja = Bandeja('Monitoreo_Mosca', almacen=almacen)
+    bandeja.agregar(_lecturas(450))
+    enviados = []
+    responder = cliente.postgrest.session.request
+
+    def corte_en_el_segundo_lote(metodo, url, **kwargs):
+        enviados.append(metodo)
+        respuesta = responder(metodo, url, **kwargs)
+        if len(enviados) == 2:
+            raise httpx.ReadTimeout("la respuesta no volvió")   # el servidor sí guardó el lote
+        return respuesta
+
+    monkeypatch.setattr(cliente.postgrest.session, "request", corte_en_el_segundo_lote)
+    with pytest.raises(httpx.ReadTimeout):
+        bandeja.sincronizar(cliente)
+    assert len(bandeja) == 250   # sólo sale del dispositivo lo confirmado
+
+    # otra sesión (o la página tras recargar) lee la misma bandeja del dispositivo
+    monkeypatch.setattr(cliente.postgrest.session, "request", responder)
+    assert Bandeja('Monitoreo_Mosca', almacen=almacen).sincronizar(cliente) == 250
+    assert _filas(cliente, 'Monitoreo_Mosca') == (450, 450)
+
+
+def test_agregar_conserva_el_uuid_de_un_registro_ya_sellado(cliente):
+    bandeja = Bandeja('Monitoreo_Mosca', almacen=AlmacenFalso())
+    bandeja.agregar(_lecturas(1))
+    sellado = bandeja.registros[0]
+    bandeja.sincronizar(cliente)
+
+    bandeja.agregar(sellado)   # reenvío del mismo registro
+    bandeja.sincronizar(cliente)
+    assert _filas(cliente, 'Monitoreo_Mosca') == (1, 1)
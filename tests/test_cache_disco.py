@@ -0,0 +1,45 @@
+import logging
+import threading
+
+import pandas as pd
+
+from nucleo import cache_disco as cd
+from nucleo import metricas
+
+
+def _esperar_hilo(nombre):
+    for hilo in threading.enumerate():
+        if hilo.name == nombre:
+            hilo.join(5)
+
+
+def test_refresco_de_fondo_que_falla_se_registra_y_cuenta(caplog):
+    def cargar():
+        raise RuntimeError("sin señal")
+
+    antes = metricas.CACHE_DISCO_REFRESCOS._valores.get(("prueba.falla", "error"), 0)
+    with caplog.at_level(logging.WARNING, logger="nucleo.cache_disco"):
+        cd._refrescar_en_fondo("prueba.falla:x", "prueba.falla", cargar, (), {})
+        _esperar_hilo("cache_disco:prueba.falla")
+
+    assert metricas.CACHE_DISCO_REFRESCOS._valores[("prueba.falla", "error")] == antes + 1
+    assert "sin señal" in caplog.text
+    assert "prueba.falla:x" not in cd._en_curso
+
+
+def test_memoria_del_proceso_respeta_su_limite(monkeypatch):
+    monkeypatch.setattr(cd, "LIMITE_MEMORIA_MB", 0.05)   # ~52 KB
+
+    @cd.cache_disco(ttl=600, nombre="prueba.memoria")
+    def cargar(i):
+        return pd.DataFrame({'x': range(i * 1000, i * 1000 + 2000)})   # ~16 KB cada uno
+
+    for i in range(10):
+        cargar(i)
+    assert cd._bytes_memoria <= 0.05 * 1024 * 1024 and len(cd._memoria) < 10
+    assert cd._bytes_memoria == sum(len(blob) for _, blob in cd._memoria.values())
+
+    # lo desalojado de memoria se sigue sirviendo desde SQLite
+    assert cargar(0)['x'].iloc[0] == 0
+    cargar.clear()
+    assert cd._bytes_memoria == sum(len(blob) for _, blob in cd._memoria.values())
@@ -0,0 +1,39 @@
+import pandas as pd
+
+from nucleo import cache_memoria as cm
+from nucleo.datos import fallida
+
+
+def _contando(resultados, **opciones):
+    llamadas = []
+
+    @cm.cache_memoria(nombre="prueba", **opciones)   # el fixture cliente vacía el caché
+    def cargar():
+        llamadas.append(1)
+        return resultados[min(len(llamadas), len(resultados)) - 1]
+
+    return cargar, llamadas
+
+
+def test_un_fallo_marcado_no_se_cachea(cliente):
+    cargar, llamadas = _contando([fallida('Tareas_Evaluador', 'sin señal'), pd.DataFrame({'id': [1]})],
+                                 ttl=600)
+
+    assert 'error' in cargar().attrs
+    assert len(cargar()) == 1 and len(llamadas) == 2   # el rerun siguiente reintenta
+    cargar()
+    assert len(llamadas) == 2
+
+
+def test_ttl_vacio_acorta_solo_los_resultados_vacios(cliente, monkeypatch):
+    reloj = [1000.0]
+    monkeypatch.setattr(cm.time, "time", lambda: reloj[0])
+    cargar, llamadas = _contando([pd.DataFrame(columns=['id']), pd.DataFrame({'id': [1]})],
+                                 ttl=3600, ttl_vacio=30)
+
+    assert cargar().empty
+    reloj[0] += 31
+    assert len(cargar()) == 1 and len(llamadas) == 2
+    reloj[0] += 600   # el catálogo con filas sí conserva el TTL largo
+    cargar()
+    assert len(llamadas) == 2
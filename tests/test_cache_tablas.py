@@ -0,0 +1,68 @@
+import pandas as pd
+
+from nucleo import cache_tablas
+from nucleo.cache_tablas import tabla_incremental
+
+INICIO = pd.Timestamp('2025-09-01T00:00:00+00:00')
+
+
+def _fila(i, horas=None, **extra):
+    creada = INICIO + pd.Timedelta(hours=i if horas is None else horas)
+    return {'id': i, 'Fecha': creada.strftime('%Y-%m-%d'), 'Sector': f"S{i % 3}", 'Racimos_Reales': i,
+            'Estado': 'Vigente', 'created_at': creada.isoformat(), **extra}
+
+
+def test_delta_pide_solo_el_margen_y_deduplica_el_solape(cliente):
+    cliente.sembrar('Control_Raleo', [_fila(i) for i in range(1, 51)])   # una fila por hora
+    inicial = tabla_incremental('Control_Raleo', reconciliar_cada=None)
+    assert len(inicial) == 50 and inicial.attrs['filas_nuevas'] == 50
+
+    cliente.sembrar('Control_Raleo', [_fila(51)])
+    df = tabla_incremental('Control_Raleo', reconciliar_cada=None)
+
+    # la última fila vista vuelve por el margen de solape; sólo se guarda una vez
+    assert df.attrs['filas_nuevas'] == 2
+    assert len(df) == 51 and df['id'].is_unique
+
+
+def test_reconciliacion_quita_borradas_trae_retroactivas_y_refresca_mutables(cliente, monkeypatch):
+    monkeypatch.setattr(cache_tablas, "LOTE_FALTANTES", 2)
+    cliente.sembrar('Control_Raleo', [_fila(i) for i in range(1, 21)])
+    tabla_incremental('Control_Raleo', mutables=('Estado',), reconciliar_cada=0)
+
+    cliente.table('Control_Raleo').delete().eq('id', 3).execute()
+    cliente.table('Control_Raleo').update({'Estado': 'Anulado'}).eq('id', 5).execute()
+    # cargas retroactivas: marca anterior a la guardada, el delta no las ve
+    cliente.sembrar('Control_Raleo', [_fila(i, horas=-i) for i in range(100, 105)])
+    cliente.reiniciar_estadisticas()
+
+    df = tabla_incremental('Control_Raleo', mutables=('Estado',), reconciliar_cada=0)
+
+    ids = set(df['id'])
+    assert 3 not in ids
+    assert set(range(100, 105)) <= ids and len(df) == 24
+    assert df.loc[df['id'] == 5, 'Estado'].iloc[0] == 'Anulado'
+    # delta + lista de ids + 5 faltantes en lotes de 2
+    assert cliente.estadisticas['peticiones:Control_Raleo'] == 1 + 1 + 3
+
+
+def test_reconciliacion_con_la_tabla_vacia_devuelve_vacio(cliente):
+    cliente.sembrar('Control_Raleo', [_fila(i) for i in range(1, 6)])
+    tabla_incremental('Control_Raleo', reconciliar_cada=0)
+    cliente.table('Control_Raleo').delete().gte('id', 1).execute()
+
+    assert tabla_incremental('Control_Raleo', reconciliar_cada=0).empty
+
+
+def test_ventana_acota_la_carga_y_recorta_lo_guardado(cliente, monkeypatch):
+    ahora = pd.Timestamp.now(tz='UTC').floor('h')
+    cliente.sembrar('Control_Raleo', [_fila(i, horas=0, created_at=(ahora - pd.Timedelta(hours=48 - i)).isoformat())
+                                      for i in range(1, 49)])   # una fila por hora, las últimas 48 h
+
+    df = tabla_incremental('Control_Raleo', reconciliar_cada=None, ventana=24 * 3600)
+    assert len(df) == 24 and df['id'].min() == 25
+
+    # el tiempo avanza 6 h: las filas que salen de la ventana se descartan del caché
+    monkeypatch.setattr(cache_tablas, "_piso", lambda ventana: ahora - pd.Timedelta(hours=18))
+    df = tabla_incremental('Control_Raleo', reconciliar_cada=0, ventana=24 * 3600)
+    assert df['id'].min() == 30 and len(df) == 19
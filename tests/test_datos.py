@@ -0,0 +1,62 @@
+import pytest
+
+from nucleo import datos
+from nucleo.datos import ErrorDatos, fetch
+
+SECTORES = ['J2', 'K1', 'W1', 'W3']
+
+
+@pytest.fixture
+def paginas_chicas(monkeypatch):
+    monkeypatch.setattr(datos, "TAMANO_PAGINA", 10)
+
+
+def _trampas(cliente, dias=9, trampas=3):
+    cliente.sembrar('Monitoreo_Mosca', [
+        {'Fecha': f"2025-10-{d:02d}", 'Sector': s, 'Numero_Trampa': t, 'Ceratitis_capitata': d + t,
+         'Anastrepha_fraterculus': 0, 'Anastrepha_distinta': 1}
+        for d in range(1, dias + 1) for s in SECTORES for t in range(trampas)
+    ])
+
+
+@pytest.mark.parametrize("paralelo", [1, 3])
+def test_fetch_pagina_sin_repetir_ni_omitir_filas(cliente, paginas_chicas, paralelo):
+    cliente.sembrar('Control_Raleo', [{'id': i, 'Sector': SECTORES[i % 4], 'Racimos_Reales': i}
+                                      for i in range(1, 96)])
+
+    # el orden por Sector empata: sin el desempate por id las ventanas se solaparían
+    df = fetch('Control_Raleo', orden='Sector', paralelo=paralelo)
+
+    assert len(df) == 95 and sorted(df['id']) == list(range(1, 96))
+    assert df.attrs['paginas'] == 10
+
+
+def test_fetch_con_limite_mayor_que_la_pagina(cliente, paginas_chicas):
+    cliente.sembrar('Control_Raleo', [{'id': i, 'Racimos_Reales': i} for i in range(1, 96)])
+
+    df = fetch('Control_Raleo', orden='-id', limite=25)
+    assert df['id'].tolist() == list(range(95, 70, -1))
+
+
+def test_vista_sin_id_pagina_con_su_propia_clave(cliente, paginas_chicas):
+    _trampas(cliente)
+
+    df = fetch('Mosca_por_Sector_Fecha', orden='-Fecha', clave_orden=['Sector', 'Fecha'], paralelo=2)
+
+    assert len(df) == 9 * len(SECTORES)
+    assert not df.duplicated(['Sector', 'Fecha']).any()
+    assert (df['Lecturas'] == 3).all()
+
+
+def test_vista_sin_id_con_la_clave_por_defecto_falla_en_voz_alta(cliente, paginas_chicas):
+    _trampas(cliente, dias=2)
+
+    with pytest.raises(ErrorDatos, match="42703"):
+        fetch('Mosca_por_Sector_Fecha')
+
+
+def test_clave_orden_en_texto_no_repite_columnas_del_orden():
+    params, _, paginar = datos._preparar('Mosca_por_Sector_Fecha', "*", None, '-Fecha', None, None, "json",
+                                         clave_orden="Sector, Fecha")
+    assert paginar
+    assert dict(params)['order'] == 'Fecha.desc,Sector'
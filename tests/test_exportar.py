@@ -0,0 +1,24 @@
+import pandas as pd
+import pytest
+
+from nucleo import exportar
+
+
+class ContenedorFalso:
+    def download_button(self, etiqueta, data, file_name, **kwargs):
+        self.data = data
+
+
+@pytest.mark.parametrize("con_cow", [True, False])
+def test_el_archivo_diferido_no_ve_cambios_posteriores_al_boton(cliente, monkeypatch, con_cow):
+    monkeypatch.setattr(exportar, "DIFERIDO", True)
+    monkeypatch.setattr(exportar, "CON_COW", con_cow)
+    df = pd.DataFrame({'Sector': ['J2', 'K1'], 'Racimos': [10, 20]})
+    contenedor = ContenedorFalso()
+    exportar.boton_descarga("📥", df, "Raleo.csv", bom=False, contenedor=contenedor)
+
+    # la página sigue trabajando sobre su frame antes del clic
+    df.loc[0, 'Racimos'] = 99
+    df['Sector'] = 'W1'
+
+    assert contenedor.data() == b"Sector,Racimos\nJ2,10\nK1,20\n"
@@ -0,0 +1,65 @@
+import os
+import shutil
+
+import pandas as pd
+import pytest
+
+from nucleo import instantaneas
+from nucleo.versiones import incrementar
+
+duckdb = pytest.importorskip("duckdb")
+
+AGREGADOS = {'Racimos_Reales': ('Racimos_Reales', 'sum'), 'Lecturas': ('Racimos_Reales', 'count')}
+
+
+@pytest.fixture
+def exportada(cliente, tmp_path, monkeypatch):
+    monkeypatch.setattr(instantaneas, "DIRECTORIO", str(tmp_path))
+    instantaneas._local.__dict__.clear()   # conexión DuckDB nueva, sin vistas de otra prueba
+    cliente.sembrar('Control_Raleo', [
+        {'id': i, 'Fecha': f"2025-{(i % 12) + 1:02d}-{(i % 28) + 1:02d}", 'Sector': f"S{i % 4}",
+         'Racimos_Reales': i % 7}
+        for i in range(1, 1201)
+    ])
+    instantaneas.exportar('Control_Raleo', paralelo=2)
+    return tmp_path
+
+
+def _pyarrow(monkeypatch, *args, **kwargs):
+    with monkeypatch.context() as m:
+        m.setattr(instantaneas, "_duckdb", lambda: None)
+        return instantaneas.agrupar(*args, **kwargs)
+
+
+def test_agrupar_duckdb_igual_a_pyarrow(exportada, monkeypatch):
+    for por, rango in ((['Fecha'], {}), (['Sector'], {'desde': '2025-03-01', 'hasta': '2025-06-30'})):
+        con_duckdb = instantaneas.agrupar('Control_Raleo', por, AGREGADOS, **rango)
+        con_pyarrow = _pyarrow(monkeypatch, 'Control_Raleo', por, AGREGADOS, **rango)
+        assert not con_duckdb.empty
+        pd.testing.assert_frame_equal(con_duckdb, con_pyarrow, check_dtype=False)
+
+
+def test_agrupar_respeta_el_rango(exportada):
+    df = instantaneas.agrupar('Control_Raleo', ['Fecha'], AGREGADOS, desde='2025-03-01', hasta='2025-03-31')
+    assert df['Fecha'].min() >= '2025-03-01' and df['Fecha'].max() <= '2025-03-31'
+    assert df['Lecturas'].sum() == 100
+
+
+def test_consultar_ignora_directorios_de_un_reemplazo(exportada):
+    ruta = os.path.join(exportada, 'control_raleo')
+    for sufijo in (instantaneas.TEMPORAL, instantaneas.VIEJO):
+        shutil.copytree(ruta, f"{ruta}{sufijo}999")   # con manifiesto, como a mitad de exportar()
+
+    vistas = instantaneas.consultar("SELECT table_name FROM information_schema.tables")['table_name'].tolist()
+    assert vistas == ['control_raleo']
+    total = instantaneas.consultar('SELECT count(*) AS n FROM control_raleo')['n'].iloc[0]
+    assert total == 1200
+
+
+def test_vigente_compara_solo_la_version_de_su_tabla(exportada):
+    assert instantaneas.vigente('Control_Raleo')
+    incrementar('Monitoreo_Mosca')
+    assert instantaneas.vigente('Control_Raleo')
+    incrementar('Control_Raleo')
+    assert not instantaneas.vigente('Control_Raleo')
+    assert instantaneas.agrupar('Control_Raleo', ['Fecha'], AGREGADOS) is None
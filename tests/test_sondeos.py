@@ -0,0 +1,52 @@
+import httpx
+
+from nucleo import sondeos
+
+
+def _catalogo(n):
+    return [{'id': i, 'nombre_completo': f"Operario {i}", 'activo': True} for i in range(1, n + 1)]
+
+
+def test_sin_updated_at_se_sondea_con_id(cliente):
+    cliente.sembrar('Personal', _catalogo(12))   # migración 005 sin aplicar
+
+    assert sondeos.huella('Personal') == (12, 12)
+    assert 'Personal' in sondeos._sin_marca
+
+    cliente.reiniciar_estadisticas()
+    sondeos.huella('Personal')
+    assert cliente.estadisticas['peticiones:Personal'] == 1   # ya no prueba updated_at
+
+
+def test_con_updated_at_una_edicion_mueve_la_huella(cliente):
+    cliente.sembrar('Personal', [dict(f, updated_at='2025-09-01T00:00:00+00:00') for f in _catalogo(3)])
+    antes = sondeos.huella('Personal')
+    cliente.table('Personal').update({'updated_at': '2025-09-02T00:00:00+00:00'}).eq('id', 2).execute()
+
+    assert sondeos.huella('Personal') != antes
+    assert 'Personal' not in sondeos._sin_marca
+
+
+def test_sondeo_fallido_devuelve_la_ultima_huella_sin_reintentos(cliente, monkeypatch):
+    cliente.sembrar('Personal', _catalogo(4))
+    conocida = sondeos.huella_reciente('Personal', cada=0)
+
+    intentos = []
+
+    def sin_senal(*args, **kwargs):
+        intentos.append(args)
+        raise httpx.ConnectError("sin señal")
+
+    monkeypatch.setattr(cliente.postgrest.session, "request", sin_senal)
+    assert sondeos.huella_reciente('Personal', cada=0) == conocida
+    assert len(intentos) == 1
+
+
+def test_huella_reciente_no_vuelve_a_sondear_dentro_del_intervalo(cliente):
+    cliente.sembrar('Personal', _catalogo(4))
+    sondeos.huella_reciente('Personal', cada=60)
+    cliente.sembrar('Personal', [{'id': 5, 'nombre_completo': 'Nuevo', 'activo': True}])
+    cliente.reiniciar_estadisticas()
+
+    assert sondeos.huella_reciente('Personal', cada=60) == (4, 4)
+    assert cliente.estadisticas['peticiones'] == 0